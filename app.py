@@ -3,6 +3,13 @@
 Main application class for D&D Dice Roller
 """
 
+import time
+
+# Startup instrumentation must be installed before Kivy is imported
+# (enabled with DICE_STARTUP_PROFILE, see utils/startup_profiler.py)
+from utils.startup_profiler import profiler
+profiler.install()
+
 from kivy.config import Config
 import os
 import platform
@@ -39,22 +46,31 @@ Config.set('graphics', 'height', '0')  # Use screen height
 Config.set('graphics', 'resizable', False)
 
 from kivy.app import App
-from kivy.uix.screenmanager import ScreenManager, FadeTransition
-from kivy.core.window import Window
-from kivy.properties import ObjectProperty, DictProperty
+from kivy.uix.screenmanager import NoTransition
+with profiler.phase('window_create'):
+    from kivy.core.window import Window
+from kivy.properties import ObjectProperty, DictProperty, BooleanProperty
 from kivy.lang import Builder
 
-# Import screens
+# Import screens (the others are imported and built on first navigation)
 from screens.main_screen import MainScreen
-from screens.profile_screen import ProfileScreen
-from screens.profile_editor import ProfileEditorScreen
-from screens.roll_screen import RollScreen, RollManager
-
-# from screens.roll_screen import RollScreen
+from screens.roll_screen import RollScreen, RollManager, print_roll
 
 # Import custom components (needed for KV files)
 from components.buttons import PrimaryButton, DiceButton
+from components.lazy_screen_manager import LazyScreenManager
+from components.transitions import SnapshotFadeTransition
 from components.text_inputs import PersistentKeyboardTextInput
+from utils.combat_journal import combat_log
+from utils.event_bus import ROLL_RESULT, WORKER, event_bus
+from utils.frame_governor import frame_governor
+from utils.io_executor import io_executor
+from utils.latency_tracer import tracer
+from utils.roll_ledger import roll_ledger
+from utils.roll_stream import roll_stream
+from utils.sampling_profiler import sampling_profiler
+from utils.session import session
+from utils.telemetry import telemetry, uplink_for
 
 # Set window size explicitly after imports
 Window.size = (800, 480)
@@ -62,11 +78,36 @@ Window.softinput_mode = 'below_target'
 Window.allow_vkeyboard = False  # Disable built-in virtual keyboard (custom keyboard handles input)
 
 # Load KV language files from the kv directory
+# Only the main screen is needed for the first frame; the other KV files are
+# loaded by LazyScreenManager right before their screen is built.
 kv_path = os.path.join(os.path.dirname(__file__), 'kv')
-Builder.load_file(os.path.join(kv_path, 'main_screen.kv'))
-Builder.load_file(os.path.join(kv_path, 'profile_screen.kv'))
-Builder.load_file(os.path.join(kv_path, 'profile_editor.kv'))
-Builder.load_file(os.path.join(kv_path, 'roll_screen.kv'))
+with profiler.phase('kv_compile'):
+    Builder.load_file(os.path.join(kv_path, 'main_screen.kv'))
+profiler.mark('imports_done')
+
+
+def create_profile_screen(**kwargs):
+    """Import and build the profile list screen"""
+    from screens.profile_screen import ProfileScreen
+    return ProfileScreen(**kwargs)
+
+
+def create_group_roll_screen(**kwargs):
+    """Import and build the party group-roll screen"""
+    from screens.group_roll_screen import GroupRollScreen
+    return GroupRollScreen(**kwargs)
+
+
+def create_initiative_screen(**kwargs):
+    """Import and build the initiative tracker screen"""
+    from screens.initiative_screen import InitiativeScreen
+    return InitiativeScreen(**kwargs)
+
+
+def create_profile_editor_screen(**kwargs):
+    """Import and build the profile editor screen"""
+    from screens.profile_editor import ProfileEditorScreen
+    return ProfileEditorScreen(**kwargs)
 
 
 class DnDDiceRollerApp(App):
@@ -76,7 +117,10 @@ class DnDDiceRollerApp(App):
     screen_manager = ObjectProperty(None)
     current_profile = DictProperty(None, allownone=True)
     roll_manager = ObjectProperty(None)
+    # Fast mode: instant results with a short, skippable animation (DICE_FAST_MODE=1)
+    fast_mode = BooleanProperty(os.environ.get('DICE_FAST_MODE', '') not in ('', '0', 'false', 'False'))
     current_language = 'en'  # Default to English
+    time_to_first_frame = None  # Seconds from process start to the first flipped frame
     
     # Language translations
     translations = {
@@ -106,20 +150,33 @@ class DnDDiceRollerApp(App):
     
     def build(self):
         """Build the application"""
+        profiler.mark('build_start')
         self.title = self.get_text('title')
         
         # Initialize screen manager
-        self.screen_manager = ScreenManager(transition=FadeTransition())
+        # Fades cross-fade from a snapshot; rolling in and out of the table is instant
+        self.screen_manager = LazyScreenManager(transition=SnapshotFadeTransition())
+        self.screen_manager.set_route_transition('main', 'roll', NoTransition())
+        self.screen_manager.set_route_transition('roll', 'main', NoTransition())
         
-        # Add screens
+        # Add screens: only the main screen is built before the first frame
         self.screen_manager.add_widget(MainScreen(name='main'))
-        self.screen_manager.add_widget(ProfileScreen(name='profiles'))
-        self.screen_manager.add_widget(ProfileEditorScreen(name='profile_editor'))
-        self.screen_manager.add_widget(RollScreen(name='roll'))
+        self.screen_manager.register_screen('roll', RollScreen, os.path.join(kv_path, 'roll_screen.kv'))
+        self.screen_manager.register_screen('profiles', create_profile_screen, os.path.join(kv_path, 'profile_screen.kv'))
+        self.screen_manager.register_screen('profile_editor', create_profile_editor_screen, os.path.join(kv_path, 'profile_editor.kv'))
+        self.screen_manager.register_screen('group_roll', create_group_roll_screen, os.path.join(kv_path, 'group_roll_screen.kv'))
+        self.screen_manager.register_screen('initiative', create_initiative_screen, os.path.join(kv_path, 'initiative_screen.kv'))
         self.roll_manager = RollManager(self)
+        # "Roll: <name> rolled <n>" lines for log parsers, printed off the UI thread
+        event_bus.subscribe(ROLL_RESULT, print_roll, mode=WORKER, name='roll_log')
         # Load initial data
-        self.load_profiles()
+        with profiler.phase('load_profiles'):
+            self.load_profiles()
+        # Session recording for deterministic replay (see utils/session.py)
+        if os.environ.get('DICE_RECORD'):
+            session.start(os.environ['DICE_RECORD'], app=self)
         
+        profiler.mark('build_done')
         return self.screen_manager
     
     def get_text(self, key):
@@ -137,36 +194,54 @@ class DnDDiceRollerApp(App):
             # Force refresh of the screen content
             main_screen.on_enter()
     
+    def toggle_fast_mode(self):
+        """Toggle between the full roll animation and instant results"""
+        self.fast_mode = not self.fast_mode
+    
     def load_profiles(self):
-        """Load character profiles from JSON files"""
+        """Start with a default profile and switch to the first saved one once it has been read"""
         from utils.file_utils import get_character_files, load_character_profile
         
-        # Get list of saved character files
-        character_files = get_character_files()
-        
-        if character_files:
-            # Load the first character as current profile
-            first_character = character_files[0].replace('.json', '')
-            self.current_profile = load_character_profile(first_character)
-        else:
-            # No saved profiles, create a default one
-            self.current_profile = {
-                'name': 'Default Character',
-                'level': 1,
-                'abilities': {
-                    'STR': 10,
-                    'DEX': 10,
-                    'CON': 10,
-                    'INT': 10,
-                    'WIS': 10,
-                    'CHA': 10
-                },
-                'weapons': [],
-                'saving_throw_proficiencies': []
-            }
+        def read_first_profile():
+            # Runs on an I/O thread
+            character_files = get_character_files()
+            if not character_files:
+                return None
+            return load_character_profile(character_files[0].replace('.json', ''))
+        
+        def use_first_profile(profile):
+            # Unless a profile has been picked in the meantime
+            if profile and self.current_profile == default_profile:
+                self.current_profile = profile
+        
+        default_profile = self.default_profile()
+        self.current_profile = default_profile
+        io_executor.submit(read_first_profile, on_done=use_first_profile)
+    
+    def default_profile(self):
+        """Profile used until (or when no) saved character has been loaded"""
+        return {
+            'name': 'Default Character',
+            'level': 1,
+            'abilities': {
+                'STR': 10,
+                'DEX': 10,
+                'CON': 10,
+                'INT': 10,
+                'WIS': 10,
+                'CHA': 10
+            },
+            'weapons': [],
+            'saving_throw_proficiencies': []
+        }
     
     def on_start(self):
         """Actions to perform when app starts"""
+        Window.bind(on_flip=self._on_first_frame)
+        # Drop to a low frame rate while nothing is animating or being touched
+        frame_governor.install()
+        frame_governor.track_transitions(self.screen_manager)
+        
         # Set background color - Black
         Window.clearcolor = (0.0, 0.0, 0.0, 1)  # #000000
         
@@ -180,10 +255,84 @@ class DnDDiceRollerApp(App):
             except:
                 pass
         
+    def _on_first_frame(self, *args):
+        """Record time-to-first-frame and start building the other screens"""
+        Window.unbind(on_flip=self._on_first_frame)
+        self.time_to_first_frame = profiler.mark('first_frame') / 1000
+        
+        # Build the remaining screens in idle frames after the first render
+        self.screen_manager.prebuild_when_idle(on_complete=self._on_prebuild_complete)
+        # Rebuild the session's HP, conditions and slots from the combat log
+        combat_log.load_async()
+        # Continue the tamper-evident roll ledger from its last entry
+        roll_ledger.load_async()
+        # Stream roll results to local consumers (DICE_STREAM=<path>, or 0 for off)
+        stream_path = os.environ.get('DICE_STREAM', '')
+        if stream_path not in ('0', 'false', 'False'):
+            if stream_path not in ('', '1', 'true', 'True'):
+                roll_stream.path = stream_path
+            roll_stream.start()
+        # Aggregated roll summaries for the cloud dashboard (see utils/telemetry.py)
+        if os.environ.get('DICE_TELEMETRY_URL'):
+            self._start_telemetry(os.environ['DICE_TELEMETRY_URL'], os.environ.get('DICE_TELEMETRY_TOKEN'))
+        # Demo mode: play a recorded session back at DICE_REPLAY_SPEED times real time
+        if os.environ.get('DICE_REPLAY'):
+            self._start_replay(os.environ['DICE_REPLAY'], float(os.environ.get('DICE_REPLAY_SPEED', '1')))
+        
+        # Startup benchmark mode: report and quit (see benchmarks/startup.py)
+        if os.environ.get('DICE_STARTUP_BENCH'):
+            print(f"STARTUP first_frame_ms={self.time_to_first_frame * 1000:.1f} epoch={time.time():.6f}")
+            self.stop()
+    
+    def _start_replay(self, path, speed):
+        from utils.session_replay import SessionPlayer, load_session
+        
+        def report(player):
+            summary = player.report()
+            print(f"REPLAY inputs={summary['inputs']} results={summary['results_replayed']}"
+                  f" divergences={len(summary['divergences'])}")
+        
+        self.session_player = SessionPlayer(load_session(path), self)
+        self.session_player.on_complete = report
+        self.session_player.play(speed)
+    
+    def _start_telemetry(self, url, token):
+        try:
+            uplink = uplink_for(url, token)
+        except (ImportError, ValueError) as e:
+            print(f"Telemetry disabled: {e}")
+            return
+        telemetry.flush_every = float(os.environ.get('DICE_TELEMETRY_INTERVAL', telemetry.flush_every))
+        telemetry.start(uplink)
+    
+    def _on_prebuild_complete(self):
+        """All screens are built; warm up the dialog module and write the startup report"""
+        with profiler.phase('dialogs_import'):
+            import components.dialogs  # noqa: F401 - imported for its side effect on first tap latency
+        profiler.mark('idle_prebuild_done')
+        report_path = profiler.write_report()
+        if report_path:
+            print(f"Startup profile written to {report_path}")
+    
     def on_stop(self):
         """Actions to perform when app closes"""
-        # Save any pending changes
-        pass
+        # Seal the night's last rolls, then let queued writes reach the card
+        roll_ledger.checkpoint()
+        profile_path = sampling_profiler.stop()
+        if profile_path:
+            print(f"Profile written to {profile_path}")
+        io_executor.shutdown(wait=True)
+        roll_stream.stop()
+        telemetry.stop()
+        event_bus.shutdown()
+        
+        if frame_governor.enabled:
+            print(frame_governor.summary())
+        
+        # Write roll latency histograms when tracing is enabled (DICE_TRACE=1)
+        if tracer.enabled:
+            print(tracer.summary())
+            print(f"Latency trace written to {tracer.export()}")
 
 if __name__ == '__main__':
     DnDDiceRollerApp().run()
\ No newline at end of file
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Compare two startup profile reports and flag regressions
+
+Reports are written by the app when DICE_STARTUP_PROFILE is set (see
+utils/startup_profiler.py). Marks, phases and module imports are compared;
+an entry regresses when it is slower by more than both the absolute and the
+relative threshold. Exits with status 1 when anything regressed, so it can
+gate a deploy script.
+
+Usage:
+    python3 -m benchmarks.compare_startup baseline.json current.json
+    python3 -m benchmarks.compare_startup old.json new.json --min-ms 5 --pct 15
+"""
+
+import argparse
+import json
+import sys
+
+
+def load_report(path):
+    with open(path, 'r') as file:
+        return json.load(file)
+
+
+def flatten(report):
+    """Return {label: ms} for every comparable entry in a report"""
+    entries = {}
+    for name, value in report.get('marks', {}).items():
+        entries[f"mark:{name}"] = value
+    for name, value in report.get('phases', {}).items():
+        entries[f"phase:{name}"] = value
+    for name, stats in report.get('imports', {}).items():
+        entries[f"import:{name}"] = stats['cumulative_ms']
+    return entries
+
+
+def compare(baseline, current, min_ms=5.0, pct=10.0):
+    """Return a list of (label, before_ms, after_ms, status) rows"""
+    before, after = flatten(baseline), flatten(current)
+    rows = []
+    for label in sorted(set(before) | set(after)):
+        old, new = before.get(label), after.get(label)
+        if old is None:
+            status = 'new' if new >= min_ms else 'ok'
+        elif new is None:
+            status = 'removed'
+        else:
+            delta = new - old
+            relative = (delta / old * 100) if old else float('inf')
+            if delta > min_ms and relative > pct:
+                status = 'REGRESSION'
+            elif -delta > min_ms and -relative > pct:
+                status = 'improved'
+            else:
+                status = 'ok'
+        rows.append((label, old, new, status))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Flag startup regressions between two profile reports")
+    parser.add_argument('baseline')
+    parser.add_argument('current')
+    parser.add_argument('--min-ms', type=float, default=5.0, help="ignore changes smaller than this (ms)")
+    parser.add_argument('--pct', type=float, default=10.0, help="ignore changes smaller than this (%%)")
+    parser.add_argument('--all', action='store_true', help="also list unchanged entries")
+    args = parser.parse_args(argv)
+
+    rows = compare(load_report(args.baseline), load_report(args.current), args.min_ms, args.pct)
+    regressions = 0
+    print(f"{'entry':<52}{'before':>10}{'after':>10}  status")
+    for label, old, new, status in rows:
+        if status == 'REGRESSION':
+            regressions += 1
+        if status == 'ok' and not args.all:
+            continue
+        old_text = f"{old:.1f}" if old is not None else "-"
+        new_text = f"{new:.1f}" if new is not None else "-"
+        print(f"{label:<52}{old_text:>10}{new_text:>10}  {status}")
+
+    print(f"\n{regressions} regression(s)")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Dice pool benchmark: CPU per animation frame for large pools
+
+Animates a pool of dice (8d6 by default) for a fixed number of frames, once
+with one DiceAnimation widget per die and once with the batched DicePool the
+roll screen uses. Reports the process CPU time per frame and the achieved
+frame rate for each.
+
+Usage (on the Pi, from the project root):
+    python3 -m benchmarks.dice_pool --dice 8 --sides 6
+    python3 -m benchmarks.dice_pool --dice 20 --frames 300
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+# Keep Kivy from parsing the benchmark's own command-line options
+os.environ.setdefault('KIVY_NO_ARGS', '1')
+
+from kivy.app import App
+from kivy.clock import Clock
+from kivy.uix.floatlayout import FloatLayout
+
+from components.dice_pool import DicePool, get_dice_atlas
+from screens.roll_screen import DiceAnimation
+
+
+class WidgetPerDie(FloatLayout):
+    """The unbatched alternative: a DiceAnimation widget for every die"""
+
+    def __init__(self, pool, **kwargs):
+        super().__init__(**kwargs)
+        self.dice = []
+        for index, sides in enumerate(pool):
+            dice = DiceAnimation(dice_type=sides, size_hint=(None, None), size=(90, 90))
+            dice.pos = (20 + (index % 7) * 110, 20 + (index // 7) * 110)
+            self.add_widget(dice)
+            self.dice.append(dice)
+
+    def set_values(self, values):
+        for dice, value in zip(self.dice, values):
+            dice.current_value = value
+
+    def set_roll_progress(self, progress):
+        for dice in self.dice:
+            dice.set_roll_progress(progress)
+
+
+class PoolBenchApp(App):
+    """Runs each variant for a fixed number of frames and then exits"""
+
+    def __init__(self, dice, sides, frames, **kwargs):
+        super().__init__(**kwargs)
+        self.pool = [sides] * dice
+        self.frames = frames
+        self.rng = random.Random(1)
+        self.results = {}
+        self._variants = [
+            ('widget_per_die', lambda: WidgetPerDie(self.pool)),
+            ('dice_pool', lambda: DicePool(self.pool)),
+        ]
+
+    def build(self):
+        self.root_layout = FloatLayout()
+        return self.root_layout
+
+    def on_start(self):
+        get_dice_atlas()
+        Clock.schedule_once(self._next_variant, 0.5)
+
+    def _next_variant(self, dt):
+        if not self._variants:
+            self.stop()
+            return
+        self._name, factory = self._variants.pop(0)
+        self.root_layout.clear_widgets()
+        self._widget = factory()
+        self.root_layout.add_widget(self._widget)
+        self._frame = 0
+        self._cpu_start = time.process_time()
+        self._wall_start = time.perf_counter()
+        Clock.schedule_interval(self._animate, 0)
+
+    def _animate(self, dt):
+        if self._frame >= self.frames:
+            cpu = time.process_time() - self._cpu_start
+            wall = time.perf_counter() - self._wall_start
+            self.results[self._name] = {
+                'cpu_ms_per_frame': round(cpu * 1000 / self.frames, 3),
+                'fps': round(self.frames / wall, 1) if wall else None,
+            }
+            Clock.schedule_once(self._next_variant, 0.2)
+            return False
+        randint = self.rng.randint
+        self._widget.set_values([randint(1, sides) for sides in self.pool])
+        self._widget.set_roll_progress((self._frame % 60) / 60)
+        self._frame += 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare per-frame CPU of per-die widgets and DicePool")
+    parser.add_argument('--dice', type=int, default=8)
+    parser.add_argument('--sides', type=int, default=6)
+    parser.add_argument('--frames', type=int, default=600)
+    parser.add_argument('--json', dest='json_path', default=None, help="also write results to this file")
+    args = parser.parse_args(argv)
+
+    app = PoolBenchApp(args.dice, args.sides, args.frames)
+    app.run()
+
+    results = {'dice': args.dice, 'sides': args.sides, 'frames': args.frames, 'variants': app.results}
+    print(json.dumps(results, indent=4))
+    if args.json_path:
+        with open(args.json_path, 'w') as file:
+            json.dump(results, file, indent=4)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,26 @@
+"""
+Generated data shared by the benchmarks (no Kivy dependency)
+"""
+
+from rules.abilities import ABILITIES, SKILLS
+
+
+def generate_profile(rng, index):
+    """A character profile shaped like the ones the editor saves"""
+    return {
+        'name': f"Bench Character {index}",
+        'level': rng.randint(1, 20),
+        'abilities': {ability: rng.randint(8, 18) for ability in ABILITIES},
+        'saving_throw_proficiencies': rng.sample(ABILITIES, 2),
+        'skill_proficiencies': rng.sample(SKILLS, 4),
+        'weapons': [
+            {
+                'name': f"Weapon {n}",
+                'ability': rng.choice(('STR', 'DEX')),
+                'damage_dice': rng.choice(('d4', 'd6', 'd8', '2d6', '1d10')),
+                'damage_bonus': rng.randint(0, 3),
+                'proficient': True,
+            }
+            for n in range(3)
+        ],
+    }
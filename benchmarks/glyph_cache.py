@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Glyph cache benchmark: CPU per flicker frame, Label vs GlyphLabel
+
+Opens a small window and flickers a dice value every frame, first with a
+plain Kivy Label (a new text texture per change) and then with the cached
+GlyphLabel used by the roll screen. Reports the process CPU time per frame
+for each, so the numbers are comparable on the Pi.
+
+Usage (on the Pi, from the project root):
+    python3 -m benchmarks.glyph_cache --frames 600
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+# Keep Kivy from parsing the benchmark's own command-line options
+os.environ.setdefault('KIVY_NO_ARGS', '1')
+
+from kivy.app import App
+from kivy.clock import Clock
+from kivy.uix.floatlayout import FloatLayout
+from kivy.uix.label import Label
+
+from components.glyph_cache import DICE_NUMBERS, GlyphLabel, glyph_cache
+
+FONT_SIZE = 32
+
+
+class GlyphBenchApp(App):
+    """Runs each variant for a fixed number of frames and then exits"""
+
+    def __init__(self, frames, sides, **kwargs):
+        super().__init__(**kwargs)
+        self.frames = frames
+        self.sides = sides
+        self.rng = random.Random(1)
+        self.results = {}
+        self._variants = [
+            ('label', lambda: Label(text="1", font_size=FONT_SIZE, bold=True)),
+            ('glyph_label', lambda: GlyphLabel(text="1", font_size=FONT_SIZE, bold=True)),
+        ]
+
+    def build(self):
+        self.root_layout = FloatLayout()
+        return self.root_layout
+
+    def on_start(self):
+        glyph_cache.prewarm(DICE_NUMBERS[:self.sides], font_size=FONT_SIZE, bold=True)
+        Clock.schedule_once(self._next_variant, 0.5)
+
+    def _next_variant(self, dt):
+        if not self._variants:
+            self.stop()
+            return
+        self._name, factory = self._variants.pop(0)
+        self.root_layout.clear_widgets()
+        self._widget = factory()
+        self.root_layout.add_widget(self._widget)
+        self._frame = 0
+        self._cpu_start = time.process_time()
+        self._wall_start = time.perf_counter()
+        Clock.schedule_interval(self._flicker, 0)
+
+    def _flicker(self, dt):
+        if self._frame >= self.frames:
+            cpu = time.process_time() - self._cpu_start
+            wall = time.perf_counter() - self._wall_start
+            self.results[self._name] = {
+                'cpu_ms_per_frame': round(cpu * 1000 / self.frames, 3),
+                'fps': round(self.frames / wall, 1) if wall else None,
+            }
+            Clock.schedule_once(self._next_variant, 0.2)
+            return False
+        self._widget.text = str(self.rng.randint(1, self.sides))
+        self._frame += 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare per-frame CPU of Label and GlyphLabel flicker")
+    parser.add_argument('--frames', type=int, default=600)
+    parser.add_argument('--sides', type=int, default=20)
+    parser.add_argument('--json', dest='json_path', default=None, help="also write results to this file")
+    args = parser.parse_args(argv)
+
+    app = GlyphBenchApp(args.frames, args.sides)
+    app.run()
+
+    results = {'frames': args.frames, 'sides': args.sides, 'variants': app.results}
+    label = app.results.get('label', {}).get('cpu_ms_per_frame')
+    glyph = app.results.get('glyph_label', {}).get('cpu_ms_per_frame')
+    if label and glyph:
+        results['cpu_saved_pct'] = round((label - glyph) / label * 100, 1)
+    print(json.dumps(results, indent=4))
+    if args.json_path:
+        with open(args.json_path, 'w') as file:
+            json.dump(results, file, indent=4)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
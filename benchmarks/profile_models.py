@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Profile model benchmark: memory per loaded profile and copy cost
+
+Generates a roster of character profiles and compares holding them as the
+JSON dicts the app used to pass around with holding them as the slotted
+rules.models.Character. For each roster size it reports:
+
+  - traced memory per profile (tracemalloc) for dicts and for Characters
+  - load cost: json.loads alone and json.loads + Character.from_dict
+  - copy cost: dict.copy() (shallow, shares the nested dicts), deepcopy,
+    Character.replace() for an edit, and Character.from_dict() as used by
+    the profile editor to detach from the live profile
+  - save cost: json.dumps of a dict and of Character.to_dict()
+
+Usage (on the Pi, from the project root):
+    python3 -m benchmarks.profile_models
+    python3 -m benchmarks.profile_models --sizes 100 1000 10000 --json models.json
+"""
+
+import argparse
+import copy
+import gc
+import json
+import random
+import sys
+import time
+import tracemalloc
+
+from benchmarks.fixtures import generate_profile
+from rules.models import Character
+
+
+def retained_bytes(build):
+    """Traced memory still held by the object ``build()`` returns"""
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    kept = build()
+    gc.collect()
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return after - before
+
+
+def per_item_us(fn, items):
+    """Mean microseconds per call of ``fn(item)`` over ``items``"""
+    start = time.perf_counter()
+    for item in items:
+        fn(item)
+    return (time.perf_counter() - start) * 1e6 / len(items)
+
+
+def measure(size, rng):
+    documents = [json.dumps(generate_profile(rng, index), indent=4) for index in range(size)]
+    dicts = [json.loads(document) for document in documents]
+    characters = [Character.from_dict(data) for data in dicts]
+
+    dict_bytes = retained_bytes(lambda: [json.loads(document) for document in documents])
+    model_bytes = retained_bytes(lambda: [Character.from_dict(json.loads(document)) for document in documents])
+    return {
+        'profiles': size,
+        'bytes_per_profile': {
+            'dict': round(dict_bytes / size),
+            'character': round(model_bytes / size),
+        },
+        'load_us': {
+            'json': round(per_item_us(json.loads, documents), 2),
+            'json_to_character': round(per_item_us(lambda doc: Character.from_dict(json.loads(doc)), documents), 2),
+        },
+        'copy_us': {
+            'dict_shallow': round(per_item_us(dict.copy, dicts), 2),
+            'dict_deepcopy': round(per_item_us(copy.deepcopy, dicts), 2),
+            'character_replace': round(per_item_us(lambda c: c.replace(level=c.level + 1), characters), 2),
+            'dict_to_character': round(per_item_us(Character.from_dict, dicts), 2),
+        },
+        'save_us': {
+            'dict_json': round(per_item_us(lambda data: json.dumps(data, indent=4), dicts), 2),
+            'character_json': round(per_item_us(lambda c: json.dumps(c.to_dict(), indent=4), characters), 2),
+        },
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare profile dicts with the slotted Character model")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--json', dest='json_path', default=None, help="also write results to this file")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    results = {'rosters': [measure(size, rng) for size in args.sizes]}
+    print(json.dumps(results, indent=4))
+    if args.json_path:
+        with open(args.json_path, 'w') as file:
+            json.dump(results, file, indent=4)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Deterministic session replay, headless
+
+Plays a session recorded with DICE_RECORD=<path> (see utils/session.py) back
+through RollManager and the roll screen, and checks every result against
+the recording. By default the replay runs as fast as it can: fast mode is
+forced, animations are skipped and deferred button actions run at once.
+--speed plays it on the clock instead (1.0 is real time, with the recorded
+fast mode and animations).
+
+Prints the throughput and the speed-up over the recorded session, lists
+any divergence between recorded and replayed results and exits 1 if there
+was one.
+
+--generate records a synthetic session of N inputs (attacks and their
+damage, saves, checks, dice, re-rolls) to replay, with a few seconds of
+simulated time between inputs.
+
+Usage (from the project root):
+    python3 -m benchmarks.replay data/sessions/friday.jsonl
+    python3 -m benchmarks.replay data/sessions/friday.jsonl --speed 1
+    python3 -m benchmarks.replay --generate 5000 /tmp/synthetic.jsonl && python3 -m benchmarks.replay /tmp/synthetic.jsonl
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+
+# Importing the suite configures the headless window before Kivy loads
+from benchmarks.suite import PROJECT_ROOT, BenchApp
+
+from kivy.base import EventLoop
+from kivy.lang import Builder
+from kivy.uix.screenmanager import NoTransition, Screen, ScreenManager
+
+from benchmarks.fixtures import generate_profile
+from utils.io_executor import io_executor
+from utils.session import session
+from utils.session_replay import SessionPlayer, load_session
+
+
+class ReplayHarness:
+    """A roll screen and RollManager on a hidden window"""
+
+    def setup(self, profile):
+        EventLoop.ensure_window()
+        Builder.load_file(os.path.join(PROJECT_ROOT, 'kv', 'roll_screen.kv'))
+
+        from screens.roll_screen import RollManager, RollScreen
+        from utils.combat_journal import combat_log
+        from utils.roll_ledger import roll_ledger
+
+        # Rolls and damage are logged; keep them out of the real data directory
+        self.workdir = tempfile.mkdtemp(prefix='dice-replay-')
+        combat_log.journal.path = os.path.join(self.workdir, 'combat.jsonl')
+        combat_log.load()
+        roll_ledger.journal.path = os.path.join(self.workdir, 'ledger.jsonl')
+        roll_ledger.load()
+
+        self.app = BenchApp(profile)
+        self.screen_manager = ScreenManager(transition=NoTransition())
+        self.screen_manager.add_widget(Screen(name='main'))
+        self.roll_screen = RollScreen(name='roll')
+        self.roll_screen.app = self.app
+        self.screen_manager.add_widget(self.roll_screen)
+        self.app.screen_manager = self.screen_manager
+        self.app.roll_manager = RollManager(self.app)
+        EventLoop.window.add_widget(self.screen_manager)
+        EventLoop.idle()
+
+    def teardown(self):
+        io_executor.shutdown(wait=True)
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+
+def generate(path, count, seed):
+    """Record a synthetic session of ``count`` inputs to ``path``"""
+    rng = random.Random(seed)
+    harness = ReplayHarness()
+    harness.setup(generate_profile(rng, 0))
+    app, screen = harness.app, harness.roll_screen
+    manager = app.roll_manager
+    screen.fast_animation = False
+
+    # Simulated time: a few seconds at the table between inputs
+    now = [0.0]
+    session.clock = lambda: now[0]
+    session.start(path, app=app, seed=seed)
+
+    actions = [
+        lambda: manager.roll_attack(rng.randrange(2)),
+        lambda: manager.roll_saving_throw(rng.choice(('STR', 'DEX', 'CON', 'WIS'))),
+        lambda: manager.roll_ability_check(rng.choice(('Stealth', 'Perception', 'STR', 'Athletics'))),
+        lambda: manager.roll_dice(rng.choice((4, 6, 8, 10, 12, 20, 100))),
+        lambda: manager.roll_custom_dice(rng.randint(2, 8), 6),
+    ]
+    inputs = 0
+    while inputs < count:
+        now[0] += rng.uniform(1.0, 6.0)
+        rng.choice(actions)()
+        inputs += 1
+        if screen.roll_type == 'attack' and rng.random() < 0.6:
+            now[0] += rng.uniform(0.5, 2.0)
+            screen.confirm_hit()
+            screen.flush_deferred()
+            inputs += 1
+        if rng.random() < 0.2:
+            now[0] += rng.uniform(0.5, 2.0)
+            screen.new_roll()
+            screen.flush_deferred()
+            inputs += 1
+        now[0] += rng.uniform(0.5, 2.0)
+        screen.back_to_main()
+        screen.flush_deferred()
+        inputs += 1
+    session.stop()
+    harness.teardown()
+    return inputs
+
+
+def replay(path, speed):
+    events = load_session(path)
+    harness = ReplayHarness()
+    harness.setup(events[0].get('profile'))
+    player = SessionPlayer(events, harness.app)
+    if speed:
+        done = []
+        player.on_complete = done.append
+        player.play(speed)
+        while not done:
+            EventLoop.idle()
+        report = player.report()
+    else:
+        report = player.run()
+    harness.teardown()
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a recorded session and check it for divergence")
+    parser.add_argument('path', help="session recording (JSON lines)")
+    parser.add_argument('--speed', type=float, default=0.0,
+                        help="play on the clock at this multiple of real time (default: as fast as possible)")
+    parser.add_argument('--generate', type=int, default=None, metavar='N',
+                        help="record a synthetic session of about N inputs to PATH instead")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--json', dest='json_path', default=None, help="also write the report to this file")
+    args = parser.parse_args(argv)
+
+    if args.generate:
+        inputs = generate(args.path, args.generate, args.seed)
+        print(f"Recorded {inputs} inputs to {args.path}")
+        return 0
+
+    report = replay(args.path, args.speed)
+    print(f"{report['inputs']} inputs, {report['results_replayed']}/{report['results_recorded']} results "
+          f"in {report['replay_seconds']} s: {report['inputs_per_second']} inputs/s, "
+          f"{report['speedup']}x the recorded {report['recorded_seconds']} s")
+    if report['unknown_actions']:
+        print("Inputs this version cannot replay: " + ", ".join(report['unknown_actions']))
+    if args.json_path:
+        with open(args.json_path, 'w') as file:
+            json.dump(report, file, indent=4)
+
+    if report['divergences']:
+        print(f"\n{len(report['divergences'])} divergence(s); first ones:")
+        for divergence in report['divergences'][:10]:
+            print(f"  result {divergence['index']}: recorded {divergence['expected']} "
+                  f"replayed {divergence['replayed']}")
+        return 1
+    print("\nReplay matches the recording.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Memory soak test: thousands of roll and navigation cycles, headless
+
+Drives the roll screen the way a kiosk session does, over and over: attacks
+followed by their damage roll, saving throws, ability checks and dice pools,
+each animated or in fast mode, then back to the main screen. The roll
+controller runs on a ManualClock so a full animated roll takes no wall time.
+
+Every --sample-every cycles the harness collects garbage and records the
+traced Python heap (tracemalloc), the process RSS and the number of live
+objects per type. At the end it reports the heap growth per cycle, the types
+whose instance counts kept growing and the allocation sites that grew the
+most since the warm-up, and exits 1 when the growth looks like a leak.
+
+Usage (from the project root):
+    python3 -m benchmarks.soak --cycles 10000
+    python3 -m benchmarks.soak --cycles 100000 --sample-every 2000 --json data/bench/soak.json
+"""
+
+import argparse
+import collections
+import contextlib
+import gc
+import io
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Importing the suite configures the headless window before Kivy loads
+from benchmarks.suite import PROJECT_ROOT, BenchApp
+
+from kivy.base import EventLoop
+from kivy.lang import Builder
+from kivy.uix.screenmanager import NoTransition, Screen, ScreenManager
+
+from benchmarks.fixtures import generate_profile
+from utils.io_executor import io_executor
+from utils.roll_controller import ManualClock
+
+BENCHMARKS_DIR = os.path.join(PROJECT_ROOT, 'benchmarks')
+
+# Types a roll creates; any lasting growth in these is a leak
+WATCHED_TYPES = (
+    'DiceAnimation', 'DicePool', 'Image', 'Label', 'GlyphLabel', 'Widget', 'BoxLayout',
+    'PrimaryButton', 'InstructionGroup', 'Rectangle', 'Animation', 'ClockEvent', 'Texture',
+)
+
+
+def rss_bytes():
+    """Resident set size of this process (Linux), or None"""
+    try:
+        with open('/proc/self/statm') as file:
+            return int(file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def type_counts():
+    """Live object count per type name, for objects tracked by the GC"""
+    return collections.Counter(type(obj).__name__ for obj in gc.get_objects())
+
+
+def floor_trend(points):
+    """Growth per unit x of the low points of a sawtooth series of (x, y).
+
+    The heap rises and falls as rolls build and clear their widgets, so the
+    minimum of the later half is compared with the minimum of the earlier
+    half, over the distance between the two halves' midpoints.
+    """
+    if len(points) < 2:
+        return 0.0
+    half = len(points) // 2
+    early, late = points[:half], points[half:]
+    distance = sum(x for x, _ in late) / len(late) - sum(x for x, _ in early) / len(early)
+    if distance <= 0:
+        return 0.0
+    return (min(y for _, y in late) - min(y for _, y in early)) / distance
+
+
+class SoakHarness:
+    """Runs roll/navigation cycles against a RollScreen and samples memory"""
+
+    def __init__(self, seed=1):
+        self.rng = random.Random(seed)
+        self.clock = ManualClock()
+        self.samples = []
+
+    def setup(self):
+        EventLoop.ensure_window()
+        self.window = EventLoop.window
+        kv_path = os.path.join(PROJECT_ROOT, 'kv')
+        Builder.load_file(os.path.join(kv_path, 'roll_screen.kv'))
+
+        from screens.roll_screen import RollManager, RollScreen
+        from utils.combat_journal import combat_log
+        from utils.roll_ledger import roll_ledger
+
+        # Rolls and damage are logged; keep them out of the real data directory
+        self.workdir = tempfile.mkdtemp(prefix='dice-soak-')
+        combat_log.journal.path = os.path.join(self.workdir, 'combat.jsonl')
+        combat_log.load()
+        roll_ledger.journal.path = os.path.join(self.workdir, 'ledger.jsonl')
+        roll_ledger.load()
+
+        self.app = BenchApp(generate_profile(self.rng, 0))
+        self.screen_manager = ScreenManager(transition=NoTransition())
+        self.screen_manager.add_widget(Screen(name='main'))
+        self.roll_screen = RollScreen(name='roll')
+        self.roll_screen.app = self.app
+        self.roll_screen.controller.clock = self.clock
+        self.screen_manager.add_widget(self.roll_screen)
+        self.app.screen_manager = self.screen_manager
+        self.roll_manager = RollManager(self.app)
+        self.window.add_widget(self.screen_manager)
+
+        manager = self.roll_manager
+        # (name, fast mode, start the roll, follow up once the result is shown)
+        self.actions = [
+            ('attack_then_damage', False, lambda: manager.roll_attack(0), self.roll_screen.confirm_hit),
+            ('saving_throw', False, lambda: manager.roll_saving_throw('DEX'), None),
+            ('ability_check_fast', True, lambda: manager.roll_ability_check('STR'), None),
+            ('pool_8d6', False, lambda: manager.roll_custom_dice(8, 6), None),
+            ('attack_fast_then_damage', True, lambda: manager.roll_attack(1), self.roll_screen.confirm_hit),
+            ('d20', False, lambda: manager.roll_dice(20), self.roll_screen.new_roll),
+        ]
+        self.frames(2)
+
+    def teardown(self):
+        io_executor.shutdown(wait=True)
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+    def frames(self, count=1):
+        for _ in range(count):
+            EventLoop.idle()
+
+    def finish_roll(self):
+        """Play the rest of the animated roll on the manual clock"""
+        self.frames()
+        self.clock.advance(5.0, step=1 / 30.0)
+        self.frames()
+
+    def cycle(self, index):
+        name, fast, start, follow_up = self.actions[index % len(self.actions)]
+        self.app.fast_mode = fast
+        start()
+        self.finish_roll()
+        if follow_up is not None:
+            follow_up()
+            self.frames(4)  # Follow-ups are deferred by up to 0.05 s
+            self.finish_roll()
+        self.screen_manager.current = 'main'
+        self.frames()
+
+    def sample(self, cycle):
+        gc.collect()
+        traced, _ = tracemalloc.get_traced_memory()
+        counts = type_counts()
+        self.samples.append({
+            'cycle': cycle,
+            'traced_bytes': traced,
+            'rss_bytes': rss_bytes(),
+            'objects': sum(counts.values()),
+            'watched': {name: counts.get(name, 0) for name in WATCHED_TYPES},
+        })
+        return counts
+
+
+def top_growth(before, after, limit):
+    """Types whose live count grew the most between two samples"""
+    growth = [(name, after[name] - before.get(name, 0)) for name in after]
+    growth = [item for item in growth if item[1] > 0]
+    growth.sort(key=lambda item: item[1], reverse=True)
+    return growth[:limit]
+
+
+def allocation_sites(baseline, snapshot, limit, key_type):
+    """Allocation sites that grew the most, project files first"""
+    filters = [
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap*>'),
+        tracemalloc.Filter(False, '<unknown>'),
+    ]
+    baseline = baseline.filter_traces(filters)
+    snapshot = snapshot.filter_traces(filters)
+    sites = []
+    for stat in snapshot.compare_to(baseline, key_type):
+        if stat.size_diff <= 0:
+            continue
+        # Innermost frame first; the harness itself is not an allocation site of interest
+        frames = [frame for frame in reversed(stat.traceback) if not frame.filename.startswith(BENCHMARKS_DIR)]
+        sites.append({
+            'size_diff_bytes': stat.size_diff,
+            'count_diff': stat.count_diff,
+            'in_project': any(frame.filename.startswith(PROJECT_ROOT) for frame in frames),
+            'traceback': [f"{frame.filename}:{frame.lineno}" for frame in frames],
+        })
+    sites.sort(key=lambda site: (not site['in_project'], -site['size_diff_bytes']))
+    return sites[:limit]
+
+
+def _round_up(value, multiple):
+    return -(-value // multiple) * multiple
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Soak the roll screen and attribute memory growth")
+    parser.add_argument('--cycles', type=int, default=10000)
+    parser.add_argument('--warmup', type=int, default=500, help="cycles before the baseline snapshot")
+    parser.add_argument('--sample-every', type=int, default=500)
+    parser.add_argument('--frames', type=int, default=8, help="traceback depth kept by tracemalloc")
+    parser.add_argument('--top', type=int, default=15, help="allocation sites and types to report")
+    parser.add_argument('--max-bytes-per-cycle', type=float, default=64.0,
+                        help="heap growth per cycle above which the run fails")
+    parser.add_argument('--max-objects', type=int, default=50,
+                        help="growth of any watched type above which the run fails")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--json', dest='json_path', default=None, help="also write results to this file")
+    args = parser.parse_args(argv)
+
+    # Trace from before the screens exist; memory allocated untraced and
+    # freed later would otherwise make the heap look like it grows
+    tracemalloc.start(args.frames)
+    harness = SoakHarness(seed=args.seed)
+    harness.setup()
+    random.seed(args.seed)  # The roll screen rolls with the module-level RNG
+    # Sample after the same action every time; the roll screen keeps the
+    # widgets of its last roll, which differ from action to action
+    actions = len(harness.actions)
+    args.warmup = _round_up(args.warmup, actions)
+    args.sample_every = _round_up(max(args.sample_every, 1), actions)
+
+    started = time.perf_counter()
+    output = io.StringIO()  # show_result prints every d20 roll
+    with contextlib.redirect_stdout(output):
+        for index in range(args.warmup):
+            harness.cycle(index)
+    # Snapshots hold their traces as Python objects: take the baseline before
+    # counting objects and the final snapshot after
+    baseline = tracemalloc.take_snapshot()
+    first_counts = harness.sample(0)
+
+    for cycle in range(1, args.cycles + 1):
+        with contextlib.redirect_stdout(output):
+            harness.cycle(args.warmup + cycle)
+        output.seek(0)
+        output.truncate()
+        if cycle % args.sample_every == 0 or cycle == args.cycles:
+            harness.sample(cycle)
+            latest = harness.samples[-1]
+            print(f"cycle {cycle:>7}: heap {latest['traced_bytes'] / 1024:>9.1f} KiB  "
+                  f"objects {latest['objects']:>8}  rss {(latest['rss_bytes'] or 0) / 2 ** 20:>7.1f} MiB")
+    last_counts = type_counts()
+    snapshot = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    elapsed = time.perf_counter() - started
+    harness.teardown()
+
+    first, last = harness.samples[0], harness.samples[-1]
+    bytes_per_cycle = floor_trend([(s['cycle'], s['traced_bytes']) for s in harness.samples])
+    watched_growth = {name: last['watched'][name] - first['watched'][name] for name in WATCHED_TYPES}
+    results = {
+        'cycles': args.cycles,
+        'seconds': round(elapsed, 1),
+        'cycles_per_second': round(args.cycles / elapsed, 1),
+        'heap_growth_bytes': last['traced_bytes'] - first['traced_bytes'],
+        'heap_bytes_per_cycle': round(bytes_per_cycle, 2),
+        'watched_growth': watched_growth,
+        'type_growth': top_growth(first_counts, last_counts, args.top),
+        'allocation_sites': allocation_sites(baseline, snapshot, args.top,
+                                             'traceback' if args.frames > 1 else 'lineno'),
+        'samples': harness.samples,
+    }
+
+    print(f"\n{args.cycles} cycles in {results['seconds']} s; heap {results['heap_bytes_per_cycle']} bytes/cycle")
+    print("Types with more live objects than after warm-up:")
+    for name, growth in results['type_growth']:
+        print(f"  {name:<28} +{growth}")
+    print("Allocation sites that grew:")
+    for site in results['allocation_sites']:
+        frames = site['traceback'] or ['<harness>']
+        print(f"  +{site['size_diff_bytes'] / 1024:.1f} KiB ({site['count_diff']:+d} blocks)  {frames[0]}")
+        for frame in frames[1:4]:
+            print(f"      from {frame}")
+
+    if args.json_path:
+        os.makedirs(os.path.dirname(os.path.abspath(args.json_path)), exist_ok=True)
+        with open(args.json_path, 'w') as file:
+            json.dump(results, file, indent=4)
+
+    leaks = []
+    if bytes_per_cycle > args.max_bytes_per_cycle:
+        leaks.append(f"heap grows {bytes_per_cycle:.1f} bytes per cycle")
+    leaks += [f"{name} +{growth}" for name, growth in watched_growth.items() if growth > args.max_objects]
+    if leaks:
+        print("\nLeak suspected: " + ", ".join(leaks))
+        return 1
+    print("\nNo leak detected.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
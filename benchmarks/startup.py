@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark: time-to-first-frame of app.py
+
+Launches the app repeatedly with DICE_STARTUP_BENCH=1, which makes it print
+its time-to-first-frame after the first flipped frame and exit. Reports both
+the in-process figure (from the top of app.py) and the wall-clock time from
+process launch, which also includes interpreter start-up.
+
+Usage (on the Pi, from the project root):
+    python3 -m benchmarks.startup --runs 5
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_STARTUP_LINE = re.compile(r"STARTUP first_frame_ms=([\d.]+) epoch=([\d.]+)")
+
+
+def measure_once(timeout):
+    """Launch the app once and return (in_process_ms, wall_ms)"""
+    env = dict(os.environ, DICE_STARTUP_BENCH='1')
+    launched = time.time()
+    completed = subprocess.run(
+        [sys.executable, 'app.py'],
+        cwd=PROJECT_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=timeout
+    )
+    match = _STARTUP_LINE.search(completed.stdout)
+    if not match:
+        raise RuntimeError(f"app did not report a first frame:\n{completed.stdout}{completed.stderr}")
+    return float(match.group(1)), (float(match.group(2)) - launched) * 1000
+
+
+def summarize(values):
+    return {
+        'min_ms': round(min(values), 1),
+        'median_ms': round(statistics.median(values), 1),
+        'max_ms': round(max(values), 1),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure time-to-first-frame of the app")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--timeout', type=float, default=120.0)
+    parser.add_argument('--json', dest='json_path', default=None, help="also write results to this file")
+    args = parser.parse_args(argv)
+
+    in_process, wall = [], []
+    for run in range(args.runs):
+        first_frame_ms, wall_ms = measure_once(args.timeout)
+        in_process.append(first_frame_ms)
+        wall.append(wall_ms)
+        print(f"run {run + 1}: first frame {first_frame_ms:.1f} ms (launch to frame {wall_ms:.1f} ms)")
+
+    results = {
+        'runs': args.runs,
+        'first_frame': summarize(in_process),
+        'launch_to_first_frame': summarize(wall),
+    }
+    print(json.dumps(results, indent=4))
+    if args.json_path:
+        with open(args.json_path, 'w') as file:
+            json.dump(results, file, indent=4)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,421 @@
+#!/usr/bin/env python3
+"""
+Headless benchmark suite for the app's hot paths
+
+Opens a hidden Kivy window (SDL's offscreen driver when there is no display)
+and times, without running the app itself:
+
+  roll.*        RollManager.roll_* through to RollScreen.show_result (fast mode)
+  dialog.*      construction of each dialog in components/dialogs.py
+  profiles.*    ProfileScreen.load_profiles with 10/100/1000 generated profiles,
+                until the first button (first_N) and every button (load_N) shows
+  animation.*   one DiceAnimation / DicePool frame, including the redraw
+  group.*       a 12-character group roll (rules/party.py) and its result board
+  save_json.*   save_json_file for a new file and for an overwrite (with backup)
+
+Every case reports median / p95 / min in milliseconds. Results are checked
+against the budgets in benchmarks/thresholds.json and, with --baseline,
+against an earlier run; the exit status is 1 when anything regressed.
+
+Usage (on the Pi, from the project root):
+    python3 -m benchmarks.suite --json data/bench/today.json
+    python3 -m benchmarks.suite --quick --only roll,dialog
+    python3 -m benchmarks.suite --baseline data/bench/today.json --pct 15
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+THRESHOLDS_PATH = os.path.join(PROJECT_ROOT, 'benchmarks', 'thresholds.json')
+
+# Headless window; must be configured before Kivy is imported
+if not (os.environ.get('DISPLAY') or os.environ.get('WAYLAND_DISPLAY')):
+    os.environ.setdefault('SDL_VIDEODRIVER', 'offscreen')
+os.environ.setdefault('KIVY_NO_ARGS', '1')
+
+from kivy.config import Config
+
+Config.set('kivy', 'log_level', 'warning')
+Config.set('graphics', 'window_state', 'hidden')
+Config.set('graphics', 'maxfps', '0')  # Never sleep inside a timed frame
+
+from kivy.base import EventLoop
+from kivy.lang import Builder
+from kivy.uix.screenmanager import NoTransition, Screen, ScreenManager
+
+from benchmarks.fixtures import generate_profile
+
+PROFILE_COUNTS = (10, 100, 1000)
+
+
+def summarize(samples):
+    """Median, p95 and min of a list of durations in seconds, as ms"""
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+    return {
+        'runs': len(ordered),
+        'median_ms': round(statistics.median(ordered) * 1000, 3),
+        'p95_ms': round(p95 * 1000, 3),
+        'min_ms': round(ordered[0] * 1000, 3),
+    }
+
+
+def measure(fn, repeat, warmup=2, setup=None):
+    """Time ``fn()`` ``repeat`` times; ``setup()`` runs untimed before each call"""
+    samples = []
+    for index in range(warmup + repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        if index >= warmup:
+            samples.append(elapsed)
+    return samples
+
+
+class BenchApp:
+    """The few attributes of DiceRollerApp the screens and RollManager use"""
+
+    def __init__(self, profile):
+        self.current_profile = profile
+        self.fast_mode = True
+        self.screen_manager = None
+
+
+class Suite:
+    """Builds the shared fixtures once and runs the selected case groups"""
+
+    def __init__(self, quick=False):
+        self.quick = quick
+        self.rng = random.Random(1)
+        self.results = {}
+        self.workdir = tempfile.mkdtemp(prefix='dice-bench-')
+
+    def repeat(self, full, quick):
+        return quick if self.quick else full
+
+    def record(self, name, samples):
+        self.results[name] = summarize(samples)
+        stats = self.results[name]
+        print(f"  {name:<32} median {stats['median_ms']:>9.3f} ms   p95 {stats['p95_ms']:>9.3f} ms")
+
+    def setup(self):
+        EventLoop.ensure_window()
+        self.window = EventLoop.window
+        kv_path = os.path.join(PROJECT_ROOT, 'kv')
+        Builder.load_file(os.path.join(kv_path, 'profile_screen.kv'))
+        Builder.load_file(os.path.join(kv_path, 'roll_screen.kv'))
+
+        from screens.roll_screen import RollManager, RollScreen
+        from utils.combat_journal import combat_log
+        from utils.roll_ledger import roll_ledger
+
+        # Rolls and damage are logged; keep them out of the real data directory
+        combat_log.journal.path = os.path.join(self.workdir, 'combat.jsonl')
+        combat_log.load()
+        roll_ledger.journal.path = os.path.join(self.workdir, 'ledger.jsonl')
+        roll_ledger.load()
+
+        self.app = BenchApp(generate_profile(self.rng, 0))
+        self.screen_manager = ScreenManager(transition=NoTransition())
+        self.screen_manager.add_widget(Screen(name='main'))
+        self.roll_screen = RollScreen(name='roll')
+        self.roll_screen.app = self.app
+        self.screen_manager.add_widget(self.roll_screen)
+        self.app.screen_manager = self.screen_manager
+        self.roll_manager = RollManager(self.app)
+        self.window.add_widget(self.screen_manager)
+        self.frame()
+
+    def teardown(self):
+        from utils.io_executor import io_executor
+
+        self.window.remove_widget(self.screen_manager)
+        io_executor.shutdown(wait=True)
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+    def frame(self):
+        """Run one iteration of the event loop: clock, layout and redraw"""
+        EventLoop.idle()
+
+    # ------------------------------------------------------------------
+    # Cases
+    # ------------------------------------------------------------------
+    def bench_roll(self):
+        """RollManager.roll_* -> RollScreen.show_result, synchronous in fast mode"""
+        manager = self.roll_manager
+        rolls = {
+            'roll.attack': lambda: manager.roll_attack(0),
+            'roll.saving_throw': lambda: manager.roll_saving_throw('DEX'),
+            'roll.ability_check': lambda: manager.roll_ability_check('STR'),
+            'roll.custom_8d6': lambda: manager.roll_custom_dice(8, 6),
+        }
+
+        def back_to_main():
+            self.screen_manager.current = 'main'
+            self.frame()
+
+        def quiet(fn):
+            # show_result prints every d20 roll
+            def run():
+                with contextlib.redirect_stdout(io.StringIO()):
+                    fn()
+            return run
+
+        repeat = self.repeat(50, 10)
+        for name, roll in rolls.items():
+            self.record(name, measure(quiet(roll), repeat, setup=back_to_main))
+        # The result step alone, as reached at the end of an animated roll
+        screen = self.roll_screen
+        self.record('roll.show_result', measure(quiet(lambda: screen.show_result(12)), repeat))
+        back_to_main()
+
+    def bench_dialog(self):
+        """Construction of every dialog (not opening it)"""
+        from components.dialogs import AbilityDialog, ComprehensiveAbilityDialog, DiceDialog, WeaponDialog
+
+        profile = self.app.current_profile
+        dialogs = {
+            'dialog.ability': AbilityDialog,
+            'dialog.comprehensive_ability': lambda: ComprehensiveAbilityDialog(profile_data=profile),
+            'dialog.weapon': lambda: WeaponDialog(profile['weapons']),
+            'dialog.dice': DiceDialog,
+        }
+        repeat = self.repeat(30, 5)
+        for name, factory in dialogs.items():
+            self.record(name, measure(factory, repeat))
+
+    def bench_profiles(self):
+        """ProfileScreen.load_profiles over generated profile directories"""
+        from screens.profile_screen import ProfileScreen
+
+        counts = PROFILE_COUNTS[:2] if self.quick else PROFILE_COUNTS
+        cwd = os.getcwd()
+        try:
+            for count in counts:
+                # ProfileScreen reads data/characters relative to the working directory
+                root = os.path.join(self.workdir, f'profiles_{count}')
+                characters = os.path.join(root, 'data', 'characters')
+                os.makedirs(characters)
+                for index in range(count):
+                    with open(os.path.join(characters, f'bench_{index:04d}.json'), 'w') as file:
+                        json.dump(generate_profile(self.rng, index), file, indent=4)
+
+                os.chdir(root)
+                screen = ProfileScreen(name='profiles')
+                container = screen.ids.profiles_container
+                first, complete = [], []
+
+                def load():
+                    # Files are read on the I/O threads; pump frames until
+                    # the first and then every button is on the list
+                    start = time.perf_counter()
+                    screen.load_profiles()
+                    while len(container.children) < 2:
+                        self.frame()
+                    first.append(time.perf_counter() - start)
+                    while len(container.children) < count + 1:
+                        self.frame()
+                    complete.append(time.perf_counter() - start)
+
+                repeat = self.repeat(10 if count < 1000 else 3, 2)
+                measure(load, repeat, warmup=1)
+                self.record(f'profiles.first_{count}', first[-repeat:])
+                self.record(f'profiles.load_{count}', complete[-repeat:])
+                container.clear_widgets()
+                os.chdir(cwd)
+        finally:
+            os.chdir(cwd)
+
+    def bench_animation(self):
+        """One animation frame: update the dice, then lay out and redraw"""
+        from components.dice_pool import DicePool, get_dice_atlas
+        from kivy.uix.floatlayout import FloatLayout
+        from screens.roll_screen import DiceAnimation
+
+        get_dice_atlas()
+        layout = FloatLayout()
+        self.window.add_widget(layout)
+        frames = self.repeat(300, 60)
+        rng = self.rng
+
+        dice = DiceAnimation(dice_type=20, size_hint=(None, None), size=(150, 150))
+        layout.add_widget(dice)
+        counter = iter(range(10 ** 9))
+
+        def dice_frame():
+            frame = next(counter)
+            dice.current_value = rng.randint(1, 20)
+            dice.set_roll_progress((frame % 60) / 60)
+            self.frame()
+
+        self.record('animation.d20_frame', measure(dice_frame, frames, warmup=5))
+        layout.clear_widgets()
+
+        pool = [6] * 8
+        dice_pool = DicePool(pool, size_hint=(1, 1))
+        layout.add_widget(dice_pool)
+
+        def pool_frame():
+            frame = next(counter)
+            dice_pool.set_values([rng.randint(1, sides) for sides in pool])
+            dice_pool.set_roll_progress((frame % 60) / 60)
+            self.frame()
+
+        self.record('animation.pool_8d6_frame', measure(pool_frame, frames, warmup=5))
+        self.window.remove_widget(layout)
+
+    def bench_group(self):
+        """Group rolls for a 12-character party: the rules alone, and through the board"""
+        from rules.models import Character
+        from rules.party import DerivedStats, group_roll
+        from screens.group_roll_screen import GroupRollScreen, PartyMemberButton
+
+        Builder.load_file(os.path.join(PROJECT_ROOT, 'kv', 'group_roll_screen.kv'))
+        party = [Character.from_dict(generate_profile(self.rng, index)) for index in range(12)]
+        repeat = self.repeat(50, 10)
+        # Every row computed afresh, then read from the derived-stat table
+        self.record('group.rules_cold_12', measure(lambda: group_roll(party, 'Stealth', table=DerivedStats()), repeat))
+        self.record('group.rules_12', measure(lambda: group_roll(party, 'Stealth'), repeat))
+
+        screen = GroupRollScreen(name='group_roll')
+        screen.app = self.app
+        self.screen_manager.add_widget(screen)
+        self.screen_manager.current = 'group_roll'
+        # Entering lists the saved characters; replace them with the party
+        while screen.loading:
+            self.frame()
+        screen.ids.party_container.clear_widgets()
+        for character in party:
+            screen.ids.party_container.add_widget(PartyMemberButton(character))
+        self.frame()
+
+        def roll_frame():
+            screen.roll()
+            self.frame()
+
+        self.record('group.board_12', measure(roll_frame, repeat))
+        self.screen_manager.current = 'main'
+        self.screen_manager.remove_widget(screen)
+        self.frame()
+
+    def bench_save_json(self):
+        """save_json_file for a new file and for an overwrite, which also backs up"""
+        from utils.file_utils import get_data_paths, save_json_file
+
+        profile = generate_profile(self.rng, 1)
+        directory = os.path.join(self.workdir, 'save')
+        os.makedirs(directory)
+        repeat = self.repeat(50, 10)
+        counter = iter(range(10 ** 9))
+
+        def save_new():
+            save_json_file(os.path.join(directory, f'new_{next(counter)}.json'), profile)
+
+        self.record('save_json.new_file', measure(save_new, repeat))
+
+        # Overwrites copy the old file into data/backups; remove those copies
+        # again so the suite leaves the real backups alone
+        filename = f'bench_overwrite_{os.getpid()}.json'
+        target = os.path.join(directory, filename)
+        save_json_file(target, profile)
+        try:
+            self.record('save_json.overwrite', measure(lambda: save_json_file(target, profile), repeat))
+        finally:
+            backups = get_data_paths()['backups']
+            for name in os.listdir(backups):
+                if name.endswith('_' + filename):
+                    os.remove(os.path.join(backups, name))
+
+
+GROUPS = ('roll', 'dialog', 'profiles', 'animation', 'group', 'save_json')
+
+
+def check_thresholds(results, thresholds):
+    """Cases whose median exceeds their absolute budget"""
+    failures = []
+    for name, stats in results.items():
+        budget = thresholds.get(name, {}).get('max_median_ms')
+        if budget is not None and stats['median_ms'] > budget:
+            failures.append(f"{name}: median {stats['median_ms']} ms over budget {budget} ms")
+    return failures
+
+
+def check_baseline(results, baseline, pct, min_ms):
+    """Cases at least ``pct`` percent and ``min_ms`` slower than the baseline run"""
+    failures = []
+    for name, stats in results.items():
+        before = baseline.get(name)
+        if not before:
+            continue
+        delta = stats['median_ms'] - before['median_ms']
+        if delta >= min_ms and delta > before['median_ms'] * pct / 100:
+            failures.append(
+                f"{name}: median {before['median_ms']} -> {stats['median_ms']} ms "
+                f"(+{delta / before['median_ms'] * 100:.0f}%)"
+            )
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time the roll, dialog, profile and save hot paths headlessly")
+    parser.add_argument('--quick', action='store_true', help="fewer runs and no 1000-profile case")
+    parser.add_argument('--only', default=None, help=f"comma-separated groups out of: {', '.join(GROUPS)}")
+    parser.add_argument('--json', dest='json_path', default=None, help="also write results to this file")
+    parser.add_argument('--thresholds', default=THRESHOLDS_PATH, help="budgets file (default: %(default)s)")
+    parser.add_argument('--baseline', default=None, help="results of an earlier run to compare against")
+    parser.add_argument('--pct', type=float, default=20.0, help="allowed slowdown against the baseline (percent)")
+    parser.add_argument('--min-ms', type=float, default=0.5, help="ignore baseline slowdowns smaller than this")
+    args = parser.parse_args(argv)
+
+    groups = GROUPS if not args.only else [group.strip() for group in args.only.split(',')]
+    unknown = [group for group in groups if group not in GROUPS]
+    if unknown:
+        parser.error(f"unknown group(s): {', '.join(unknown)}")
+
+    suite = Suite(quick=args.quick)
+    suite.setup()
+    try:
+        for group in groups:
+            print(f"{group}:")
+            getattr(suite, f'bench_{group}')()
+    finally:
+        suite.teardown()
+
+    results = {'quick': args.quick, 'cases': suite.results}
+    if args.json_path:
+        os.makedirs(os.path.dirname(os.path.abspath(args.json_path)), exist_ok=True)
+        with open(args.json_path, 'w') as file:
+            json.dump(results, file, indent=4)
+
+    failures = []
+    if args.thresholds and os.path.exists(args.thresholds):
+        with open(args.thresholds) as file:
+            failures += check_thresholds(suite.results, json.load(file))
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file).get('cases', {})
+        failures += check_baseline(suite.results, baseline, args.pct, args.min_ms)
+
+    if failures:
+        print("\nRegressions:")
+        for failure in failures:
+            print(f"  {failure}")
+        return 1
+    print("\nNo regressions.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Telemetry uplink against a local stand-in endpoint
+
+Starts an HTTP server on localhost that plays the cloud dashboard: it
+answers the first --fail requests with 503 and the next one with 429 and a
+Retry-After, then accepts every batch. Synthetic rolls for a few characters
+are published on an event bus over --duration seconds; halfway through the
+telemetry stage is stopped and a fresh one started on the same outbox, as
+after a reboot.
+
+Once the outbox has drained, the batches the stand-in received are added
+back up per character and die and checked against the rolls published: the
+counts, mean rolls and crits must match and no batch may arrive twice.
+Prints the requests, retries and bytes sent next to what one message per
+roll would have cost, and exits 1 on a mismatch.
+
+Usage (from the project root):
+    python3 -m benchmarks.telemetry
+    python3 -m benchmarks.telemetry --rolls 20000 --duration 5 --fail 5 --json data/bench/telemetry.json
+"""
+
+import argparse
+import collections
+import gzip
+import json
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from utils.event_bus import ROLL_RESULT, EventBus
+from utils.telemetry import HttpUplink, Telemetry
+
+CHARACTERS = ('Aria', 'Borin', 'Cael', 'Dalia')
+DICE = (4, 6, 8, 10, 12, 20, 20, 20, 100)
+
+
+class StandIn:
+    """The dashboard endpoint: fails on cue, then keeps every batch."""
+
+    def __init__(self, fail):
+        self.fail = fail
+        self.requests = 0
+        self.batches = []
+        self.ids = collections.Counter()
+        self.lock = threading.Lock()
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers['Content-Length']))
+                with stand_in.lock:
+                    stand_in.requests += 1
+                    number = stand_in.requests
+                if number <= stand_in.fail:
+                    self.send_response(503)
+                    self.end_headers()
+                    return
+                if number == stand_in.fail + 1:
+                    self.send_response(429)
+                    self.send_header('Retry-After', '1')
+                    self.end_headers()
+                    return
+                if self.headers.get('Content-Encoding') == 'gzip':
+                    body = gzip.decompress(body)
+                batch = json.loads(body)
+                with stand_in.lock:
+                    stand_in.batches.append(batch)
+                    stand_in.ids[batch['id']] += 1
+                self.send_response(200)
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}/telemetry'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def make_telemetry(outbox, bus, args):
+    return Telemetry(outbox=outbox, bucket_seconds=1, flush_every=args.flush_every, max_rolls=args.max_rolls,
+                     min_interval=0.05, base_backoff=0.1, max_backoff=1.0, bus=bus)
+
+
+def publish_rolls(bus, rng, count, duration, expected):
+    """Publish ``count`` synthetic rolls spread over ``duration`` seconds"""
+    started = time.perf_counter()
+    raw_bytes = 0
+    for index in range(count):
+        dice = rng.choice(DICE)
+        natural = rng.randint(1, dice)
+        outcome = {
+            'roll_type': 'attack' if dice == 20 else 'damage',
+            'dice_type': dice,
+            'natural': natural,
+            'modifier': 3,
+            'total': natural + 3,
+            'critical_hit': dice == 20 and natural == 20,
+            'critical_fail': dice == 20 and natural == 1,
+            'character': rng.choice(CHARACTERS),
+        }
+        bus.publish(ROLL_RESULT, outcome)
+        raw_bytes += len(json.dumps(outcome, separators=(',', ':')))
+        totals = expected[(outcome['character'], dice)]
+        totals[0] += 1
+        totals[1] += natural
+        totals[2] += outcome['critical_hit']
+        delay = started + duration * (index + 1) / count - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+    return raw_bytes
+
+
+def wait_drained(telemetry, timeout):
+    telemetry.flush()
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        stats = telemetry.stats()
+        if not stats['pending'] and not stats['waiting']:
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def check(batches, expected):
+    """Mismatches between the received summaries and the rolls published"""
+    received = collections.defaultdict(lambda: [0, 0.0, 0.0])
+    for batch in batches:
+        for bucket in batch['buckets']:
+            totals = received[(bucket['character'], bucket['dice'])]
+            totals[0] += bucket['count']
+            totals[1] += bucket['mean'] * bucket['count']
+            totals[2] += bucket['crit_rate'] * bucket['count']
+    problems = []
+    for key in sorted(set(expected) | set(received)):
+        count, total, crits = expected.get(key, (0, 0, 0))
+        got = received.get(key, (0, 0.0, 0.0))
+        if got[0] != count or abs(got[1] - total) > 0.001 * max(1, count) or abs(got[2] - crits) > 0.001 * max(1, count):
+            problems.append(f"{key[0]} d{key[1]}: published {count} rolls summing {total} with {crits} crits, "
+                            f"received {got[0]} summing {got[1]:.0f} with {got[2]:.0f}")
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the telemetry uplink against a local stand-in endpoint")
+    parser.add_argument('--rolls', type=int, default=5000)
+    parser.add_argument('--duration', type=float, default=3.0, help="seconds to spread the rolls over")
+    parser.add_argument('--fail', type=int, default=3, help="requests the stand-in fails before accepting")
+    parser.add_argument('--flush-every', type=float, default=0.5)
+    parser.add_argument('--max-rolls', type=int, default=500)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--json', dest='json_path', default=None, help="also write the report to this file")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    bus = EventBus(clock=object())  # Telemetry subscribes synchronously; nothing is scheduled
+    stand_in = StandIn(args.fail)
+    outbox = tempfile.mkdtemp(prefix='dice-telemetry-')
+    expected = collections.defaultdict(lambda: [0, 0, 0])
+
+    # First run, stopped halfway with batches still in the outbox
+    first = make_telemetry(outbox, bus, args)
+    first.start(HttpUplink(stand_in.url, token='stand-in'))
+    half = args.rolls // 2
+    raw_bytes = publish_rolls(bus, rng, half, args.duration / 2, expected)
+    first.stop()
+    left_over = first.stats()['pending']
+
+    # Second run picks the outbox up
+    second = make_telemetry(outbox, bus, args)
+    started = time.perf_counter()
+    second.start(HttpUplink(stand_in.url, token='stand-in'))
+    raw_bytes += publish_rolls(bus, rng, args.rolls - half, args.duration / 2, expected)
+    drained = wait_drained(second, timeout=30.0)
+    drain_seconds = time.perf_counter() - started
+    second.stop()
+    stand_in.close()
+    shutil.rmtree(outbox, ignore_errors=True)
+
+    problems = check(stand_in.batches, expected)
+    duplicates = [batch_id for batch_id, seen in stand_in.ids.items() if seen > 1]
+    if not drained:
+        problems.append("the outbox did not drain within 30 s")
+    if duplicates:
+        problems.append(f"{len(duplicates)} batch(es) received more than once")
+
+    runs = (first.stats(), second.stats())
+    report = {
+        'rolls': args.rolls,
+        'requests': stand_in.requests,
+        'batches_received': len(stand_in.batches),
+        'buckets_received': sum(len(batch['buckets']) for batch in stand_in.batches),
+        'failures_retried': sum(run['failures'] for run in runs),
+        'left_in_outbox_at_restart': left_over,
+        'bytes_sent': sum(run['bytes_sent'] for run in runs),
+        'bytes_one_message_per_roll': raw_bytes,
+        'message_reduction': round(args.rolls / max(1, len(stand_in.batches)), 1),
+        'byte_reduction': round(raw_bytes / max(1, sum(run['bytes_sent'] for run in runs)), 1),
+        'second_run_seconds': round(drain_seconds, 2),
+        'problems': problems,
+    }
+    print(f"{args.rolls} rolls -> {report['batches_received']} batches ({report['buckets_received']} buckets) "
+          f"in {report['requests']} requests, {report['failures_retried']} retried")
+    print(f"{report['bytes_sent']} bytes sent vs {raw_bytes} for one message per roll: "
+          f"{report['message_reduction']}x fewer messages, {report['byte_reduction']}x fewer bytes")
+    print(f"{left_over} batch(es) were still in the outbox at the restart")
+    if args.json_path:
+        with open(args.json_path, 'w') as file:
+            json.dump(report, file, indent=4)
+
+    if problems:
+        print(f"\n{len(problems)} problem(s):")
+        for problem in problems[:10]:
+            print(f"  {problem}")
+        return 1
+    print("\nEvery roll is accounted for.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Command-line entry point for scripted rolling (no Kivy import)
+
+Uses the same rules package as the touchscreen app, so it starts in a few
+milliseconds and can be called from tests, Node-RED exec nodes and
+benchmarks.
+
+Examples:
+    python3 cli.py roll 1d20+5 -n 1000 --seed 42
+    python3 cli.py check Teste Stealth
+    python3 cli.py save Teste DEX --format json
+    python3 cli.py attack Teste --weapon "New Weapon" --damage
+    python3 cli.py bench -n 100000
+    python3 cli.py verify data/ledger.jsonl
+"""
+
+import time
+
+_IMPORT_START = time.perf_counter()
+
+import argparse
+import json
+import os
+import random
+import sys
+
+from rules.checks import (
+    ability_check_spec,
+    attack_spec,
+    default_weapons,
+    roll_damage,
+    roll_spec,
+    saving_throw_spec,
+    RollSpec,
+)
+from rules.dice import DiceExpression
+from utils.file_utils import load_character_profile, load_json_file
+
+_IMPORT_MS = (time.perf_counter() - _IMPORT_START) * 1000
+
+
+def load_profile(args):
+    """Load the profile named on the command line (by name or JSON path)"""
+    if args.profile.endswith('.json'):
+        profile = load_json_file(args.profile)
+    else:
+        profile = load_character_profile(args.profile)
+    if profile is None:
+        raise SystemExit(f"Profile not found: {args.profile}")
+    return profile
+
+
+def emit(outcome, args, character_name=None):
+    """Print one outcome in the requested format"""
+    if args.format == 'json':
+        if character_name:
+            outcome['character'] = character_name
+        print(json.dumps(outcome))
+        return
+
+    modifier = outcome['modifier']
+    modifier_text = f" {'+' if modifier >= 0 else '-'} {abs(modifier)}" if modifier else ""
+    flags = " (CRITICAL HIT!)" if outcome['critical_hit'] else " (CRITICAL FAIL!)" if outcome['critical_fail'] else ""
+    print(f"{outcome['description']}: {outcome['natural']}{modifier_text} = {outcome['total']}{flags}")
+    if outcome['dice_type'] == 20 and character_name:
+        # Same line the app prints, so existing log parsers keep working
+        print(f"Roll: {character_name} rolled {outcome['natural']}")
+
+
+def roll_many(spec, args, rng, character_name=None):
+    for _ in range(args.count):
+        emit(roll_spec(spec, rng), args, character_name)
+
+
+def cmd_roll(args, rng):
+    try:
+        expression = DiceExpression.parse(args.expression)
+    except ValueError as exc:
+        raise SystemExit(str(exc))
+    for _ in range(args.count):
+        dice_total, rolls = expression.roll(rng)
+        emit({
+            'roll_type': 'custom',
+            'dice_type': expression.sides,
+            'description': args.expression,
+            'natural': dice_total,
+            'modifier': expression.bonus,
+            'total': dice_total + expression.bonus,
+            'rolls': rolls,
+            'critical_hit': False,
+            'critical_fail': False,
+        }, args)
+
+
+def cmd_check(args, rng):
+    profile = load_profile(args)
+    try:
+        spec = ability_check_spec(profile, args.ability_or_skill)
+    except ValueError as exc:
+        raise SystemExit(str(exc))
+    roll_many(spec, args, rng, profile.get('name'))
+
+
+def cmd_save(args, rng):
+    profile = load_profile(args)
+    try:
+        spec = saving_throw_spec(profile, args.ability.upper())
+    except ValueError as exc:
+        raise SystemExit(str(exc))
+    roll_many(spec, args, rng, profile.get('name'))
+
+
+def cmd_attack(args, rng):
+    profile = load_profile(args)
+    weapons = profile.get('weapons') or default_weapons(profile)
+    weapon = weapons[0]
+    if args.weapon:
+        matches = [w for w in weapons if w.get('name') == args.weapon]
+        if not matches:
+            raise SystemExit(f"Weapon not found: {args.weapon}")
+        weapon = matches[0]
+
+    spec = attack_spec(profile, weapon)
+    for _ in range(args.count):
+        outcome = roll_spec(spec, rng)
+        emit(outcome, args, profile.get('name'))
+        if args.damage:
+            try:
+                _, damage = roll_damage(weapon, critical=outcome['critical_hit'], rng=rng)
+            except ValueError as exc:
+                raise SystemExit(f"Cannot roll damage for {weapon.get('name')}: {exc}")
+            emit(damage, args)
+
+
+def cmd_verify(args, rng):
+    """Check the roll ledger's hash chain and checkpoints, or prove one roll"""
+    from utils.roll_ledger import prove, verify_file, verify_proof
+
+    if not os.path.isfile(args.ledger):
+        raise SystemExit(f"No ledger at {args.ledger}")
+    if args.seq is not None:
+        proof = prove(args.ledger, args.seq)
+        if proof is None:
+            raise SystemExit(f"Roll {args.seq} is not covered by a checkpoint yet")
+        proof['verified'] = verify_proof(proof, args.checkpoint)
+        if args.format == 'json':
+            print(json.dumps(proof))
+        else:
+            print(proof['line'])
+            print(f"{len(proof['path'])} hashes to the checkpoint: {'OK' if proof['verified'] else 'FAILED'}")
+        return 0 if proof['verified'] else 1
+
+    start = time.perf_counter()
+    report = verify_file(args.ledger)
+    elapsed = time.perf_counter() - start
+    report['entries_per_second'] = round((report['rolls'] + report['checkpoints']) / elapsed) if elapsed else None
+    if args.format == 'json':
+        print(json.dumps(report))
+    elif report['ok']:
+        print(f"OK: {report['rolls']} rolls, {report['checkpoints']} checkpoints "
+              f"({report['entries_per_second']:,} entries/s)")
+        print(f"Last checkpoint: {report['last_checkpoint']}")
+        if report['unsealed']:
+            print(f"{report['unsealed']} rolls after the last checkpoint")
+        if report['torn']:
+            print(f"{report['torn']} torn lines skipped")
+    else:
+        print(f"FAILED: {report['error']}")
+    return 0 if report['ok'] else 1
+
+
+def cmd_bench(args, rng):
+    """Time the rules core for scripted workloads"""
+    profile = {
+        'name': 'Bench', 'level': 5,
+        'abilities': {'STR': 16, 'DEX': 14, 'CON': 12, 'INT': 10, 'WIS': 13, 'CHA': 8},
+        'skill_proficiencies': ['Stealth', 'Athletics'],
+        'saving_throw_proficiencies': ['STR', 'CON'],
+        'weapons': [{'name': 'Longsword', 'ability': 'STR', 'proficient': True,
+                     'damage_dice': '1d8', 'damage_bonus': 3}],
+    }
+    weapon = profile['weapons'][0]
+    workloads = {
+        'd20': lambda: roll_spec(RollSpec('basic', 20), rng),
+        'skill_check': lambda: roll_spec(ability_check_spec(profile, 'Stealth'), rng),
+        'saving_throw': lambda: roll_spec(saving_throw_spec(profile, 'CON'), rng),
+        'attack+damage': lambda: (roll_spec(attack_spec(profile, weapon), rng),
+                                  roll_damage(weapon, rng=rng)),
+        '8d6': lambda: DiceExpression.parse('8d6').roll(rng),
+    }
+
+    results = {'import_ms': round(_IMPORT_MS, 2), 'iterations': args.count, 'rolls_per_second': {}}
+    for name, workload in workloads.items():
+        start = time.perf_counter()
+        for _ in range(args.count):
+            workload()
+        elapsed = time.perf_counter() - start
+        results['rolls_per_second'][name] = round(args.count / elapsed) if elapsed else None
+
+    if args.format == 'json':
+        print(json.dumps(results))
+    else:
+        print(f"Import time: {results['import_ms']:.2f} ms")
+        for name, rate in results['rolls_per_second'].items():
+            print(f"{name:<16}{rate:>12,} rolls/s")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="D&D Dice Roller - headless rolling")
+    parser.add_argument('--seed', type=int, default=None, help="seed the RNG for reproducible output")
+    parser.add_argument('--format', choices=('text', 'json'), default='text')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    roll = subparsers.add_parser('roll', help="roll dice notation such as 2d6+3")
+    roll.add_argument('expression')
+    roll.set_defaults(handler=cmd_roll)
+
+    check = subparsers.add_parser('check', help="ability or skill check for a profile")
+    check.add_argument('profile', help="character name or path to a profile JSON file")
+    check.add_argument('ability_or_skill')
+    check.set_defaults(handler=cmd_check)
+
+    save = subparsers.add_parser('save', help="saving throw for a profile")
+    save.add_argument('profile')
+    save.add_argument('ability')
+    save.set_defaults(handler=cmd_save)
+
+    attack = subparsers.add_parser('attack', help="attack roll (and damage) for a profile")
+    attack.add_argument('profile')
+    attack.add_argument('--weapon', default=None)
+    attack.add_argument('--damage', action='store_true', help="also roll damage")
+    attack.set_defaults(handler=cmd_attack)
+
+    bench = subparsers.add_parser('bench', help="measure scripted roll throughput")
+    bench.set_defaults(handler=cmd_bench)
+
+    verify = subparsers.add_parser('verify', help="verify the tamper-evident roll ledger")
+    verify.add_argument('ledger', nargs='?', default=os.path.join('data', 'ledger.jsonl'))
+    verify.add_argument('--seq', type=int, default=None, help="prove a single roll instead")
+    verify.add_argument('--checkpoint', default=None, help="published checkpoint hash the proof must match")
+    verify.add_argument('--format', choices=('text', 'json'), default=argparse.SUPPRESS)
+    verify.set_defaults(handler=cmd_verify)
+
+    for subparser in (roll, check, save, attack, bench):
+        subparser.add_argument('-n', '--count', type=int, default=1, help="number of rolls")
+        subparser.add_argument('--seed', type=int, default=argparse.SUPPRESS)
+        subparser.add_argument('--format', choices=('text', 'json'), default=argparse.SUPPRESS)
+    bench.set_defaults(count=10000)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    rng = random.Random(args.seed)
+    return args.handler(args, rng) or 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
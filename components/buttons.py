@@ -7,6 +7,8 @@ from kivy.uix.button import Button
 from kivy.properties import ListProperty, NumericProperty
 from kivy.animation import Animation
 
+from utils.frame_governor import frame_governor
+
 class PrimaryButton(Button):
     """Primary button with clean, modern styling"""
 
@@ -42,6 +44,7 @@ class PrimaryButton(Button):
         self._is_animating = True
         from kivy.animation import Animation
         anim = Animation(opacity=0.7, duration=0.1)
+        frame_governor.track(anim)
         anim.start(self)
 
     def _on_release_animation(self, instance):
@@ -49,6 +52,7 @@ class PrimaryButton(Button):
         from kivy.animation import Animation
         anim = Animation(opacity=1.0, duration=0.15)
         anim.bind(on_complete=lambda *args: setattr(self, '_is_animating', False))
+        frame_governor.track(anim)
         anim.start(self)
     
     def on_touch_down(self, touch):
@@ -108,6 +112,7 @@ class DiceButton(Button):
         self._is_animating = True
         from kivy.animation import Animation
         anim = Animation(opacity=0.7, duration=0.1)
+        frame_governor.track(anim)
         anim.start(self)
 
     def _on_release_animation(self, instance):
@@ -115,6 +120,7 @@ class DiceButton(Button):
         from kivy.animation import Animation
         anim = Animation(opacity=1.0, duration=0.15)
         anim.bind(on_complete=lambda *args: setattr(self, '_is_animating', False))
+        frame_governor.track(anim)
         anim.start(self)
     
     def on_touch_down(self, touch):
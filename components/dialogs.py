@@ -6,6 +6,7 @@ from kivy.uix.label import Label
 from kivy.uix.modalview import ModalView
 from kivy.clock import Clock
 from components.buttons import PrimaryButton
+from rules.abilities import ABILITIES, SKILL_ABILITIES, calculate_modifier, calculate_proficiency_bonus
 
 class SelectionDialog(ModalView):
     """Base class for selection dialogs"""
@@ -77,8 +78,7 @@ class AbilityDialog(SelectionDialog):
     """Dialog for selecting an ability"""
     
     def __init__(self, **kwargs):
-        abilities = ["STR", "DEX", "CON", "INT", "WIS", "CHA"]
-        super().__init__("Select Ability", abilities, **kwargs)
+        super().__init__("Select Ability", list(ABILITIES), **kwargs)
 
 class ComprehensiveAbilityDialog(ModalView):
     """Comprehensive dialog for selecting abilities and skills with scrolling"""
@@ -131,10 +131,9 @@ class ComprehensiveAbilityDialog(ModalView):
         content_layout.add_widget(abilities_label)
         
         # Basic abilities
-        basic_abilities = ["STR", "DEX", "CON", "INT", "WIS", "CHA"]
-        for ability in basic_abilities:
+        for ability in ABILITIES:
             ability_score = self.profile_data.get('abilities', {}).get(ability, 10)
-            ability_mod = (ability_score - 10) // 2
+            ability_mod = calculate_modifier(ability_score)
             
             btn = PrimaryButton(
                 text=f"{ability} (Modifier: {ability_mod:+d})",
@@ -156,26 +155,7 @@ class ComprehensiveAbilityDialog(ModalView):
         content_layout.add_widget(skills_label)
         
         # Skills with their associated abilities
-        skills_data = [
-            ("Acrobatics", "DEX"),
-            ("Animal Handling", "WIS"),
-            ("Arcana", "INT"),
-            ("Athletics", "STR"),
-            ("Deception", "CHA"),
-            ("History", "INT"),
-            ("Insight", "WIS"),
-            ("Intimidation", "CHA"),
-            ("Investigation", "INT"),
-            ("Medicine", "WIS"),
-            ("Nature", "INT"),
-            ("Perception", "WIS"),
-            ("Performance", "CHA"),
-            ("Persuasion", "CHA"),
-            ("Religion", "INT"),
-            ("Sleight of Hand", "DEX"),
-            ("Stealth", "DEX"),
-            ("Survival", "WIS")
-        ]
+        skills_data = list(SKILL_ABILITIES.items())
         
         skill_proficiencies = self.profile_data.get('skill_proficiencies', [])
         level = self.profile_data.get('level', 1)
@@ -183,7 +163,7 @@ class ComprehensiveAbilityDialog(ModalView):
         
         for skill_name, skill_ability in skills_data:
             ability_score = self.profile_data.get('abilities', {}).get(skill_ability, 10)
-            ability_mod = (ability_score - 10) // 2
+            ability_mod = calculate_modifier(ability_score)
             is_proficient = skill_name in skill_proficiencies
             
             total_mod = ability_mod + (prof_bonus if is_proficient else 0)
@@ -218,16 +198,7 @@ class ComprehensiveAbilityDialog(ModalView):
     
     def calculate_proficiency_bonus(self, level):
         """Calculate proficiency bonus based on level"""
-        if level < 5:
-            return 2
-        elif level < 9:
-            return 3
-        elif level < 13:
-            return 4
-        elif level < 17:
-            return 5
-        else:
-            return 6
+        return calculate_proficiency_bonus(level)
     
     def _enable_buttons(self):
         """Enable button interactions after dialog is fully displayed"""
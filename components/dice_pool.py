@@ -0,0 +1,263 @@
+"""Batched rendering of several dice at once (e.g. a fireball's 8d6).
+
+Every die face and every number 1-100 is drawn once into a single atlas
+texture at first use. A :class:`DicePool` then draws the whole pool from
+regions of that texture inside one ``InstructionGroup``, so a frame costs a
+handful of attribute updates per die instead of one widget tree per die.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import random
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from kivy.core.image import Image as CoreImage
+from kivy.graphics import (
+    ClearBuffers,
+    ClearColor,
+    Color,
+    Ellipse,
+    Fbo,
+    InstructionGroup,
+    PopMatrix,
+    PushMatrix,
+    Rectangle,
+    Rotate,
+)
+from kivy.uix.widget import Widget
+
+from components.glyph_cache import glyph_cache
+
+DICE_SIDES = (4, 6, 8, 10, 12, 20, 100)
+IMAGES_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets", "images")
+
+Region = Tuple[int, int, int, int]
+
+
+class DiceAtlas:
+    """One texture holding every die face and the numbers 1..max_number."""
+
+    def __init__(self, face_size: int = 128, number_font_size: int = 32, max_number: int = 100) -> None:
+        self.face_size = face_size
+        self.number_font_size = number_font_size
+        self.max_number = max_number
+        self.texture = None
+        self._faces: Dict[int, object] = {}
+        self._numbers: Dict[int, object] = {}
+        self._fbo = None
+
+    def build(self) -> None:
+        """Draw the faces and numbers into an offscreen buffer."""
+        glyphs = [glyph_cache.get(str(n), self.number_font_size, True) for n in range(1, self.max_number + 1)]
+        cell_w = max(glyph.width for glyph in glyphs) + 2
+        cell_h = max(glyph.height for glyph in glyphs) + 2
+        width = max(self.face_size * len(DICE_SIDES), 512)
+        per_row = width // cell_w
+        height = self.face_size + math.ceil(len(glyphs) / per_row) * cell_h
+        size = (_next_power_of_two(width), _next_power_of_two(height))
+
+        face_regions: Dict[int, Region] = {}
+        number_regions: Dict[int, Region] = {}
+        self._fbo = Fbo(size=size)
+        with self._fbo:
+            ClearColor(0, 0, 0, 0)
+            ClearBuffers()
+            for index, sides in enumerate(DICE_SIDES):
+                x = index * self.face_size
+                face_regions[sides] = (x, 0, self.face_size, self.face_size)
+                self._draw_face(sides, x)
+            Color(1, 1, 1, 1)
+            for index, glyph in enumerate(glyphs):
+                x = (index % per_row) * cell_w + 1
+                y = self.face_size + (index // per_row) * cell_h + 1
+                Rectangle(texture=glyph, pos=(x, y), size=glyph.size)
+                number_regions[index + 1] = (x, y, glyph.width, glyph.height)
+        self._fbo.draw()
+
+        self.texture = self._fbo.texture
+        self._faces = {sides: self.texture.get_region(*region) for sides, region in face_regions.items()}
+        self._numbers = {value: self.texture.get_region(*region) for value, region in number_regions.items()}
+
+    def face(self, sides: int):
+        """Texture region of a die face (the d20 stands in for unknown dice)."""
+        return self._faces.get(sides) or self._faces[20]
+
+    def number(self, value: int):
+        """Texture region of a number; values beyond the atlas use the glyph cache."""
+        region = self._numbers.get(value)
+        if region is None:
+            return glyph_cache.get(str(value), self.number_font_size, True)
+        return region
+
+    def _draw_face(self, sides: int, x: int) -> None:
+        image_path = os.path.join(IMAGES_PATH, f"d{sides}.png")
+        if os.path.exists(image_path):
+            Color(1, 1, 1, 1)
+            Rectangle(texture=CoreImage(image_path).texture, pos=(x, 0), size=(self.face_size, self.face_size))
+        else:
+            # Same plain shape DiceAnimation falls back to
+            Color(0.8, 0.8, 0.8, 1)
+            Ellipse(pos=(x, 0), size=(self.face_size, self.face_size))
+
+
+def _next_power_of_two(value: int) -> int:
+    return 1 << (value - 1).bit_length()
+
+
+_atlas: Optional[DiceAtlas] = None
+
+
+def get_dice_atlas() -> DiceAtlas:
+    """Return the shared atlas, building it on first use."""
+    global _atlas
+    if _atlas is None:
+        _atlas = DiceAtlas()
+        _atlas.build()
+    return _atlas
+
+
+class DicePool(Widget):
+    """Draws a pool of dice, with their values, in a single instruction group."""
+
+    MAX_DIE_SIZE = 150
+
+    def __init__(self, pool: Sequence[int], atlas: Optional[DiceAtlas] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.atlas = atlas or get_dice_atlas()
+        self.pool = list(pool)
+        self.values = [1] * len(self.pool)
+        self.die_size = self.MAX_DIE_SIZE
+        self.cell_size = self.MAX_DIE_SIZE
+        self._centers: List[Tuple[float, float]] = [(0, 0)] * len(self.pool)
+        self._offsets: List[Tuple[float, float]] = [(0, 0)] * len(self.pool)
+        self._scales = [1.0] * len(self.pool)
+        # Each die tumbles a little differently but all land flat (angle 0)
+        self._spin = [720 + random.uniform(-180, 180) for _ in self.pool]
+
+        self.group = InstructionGroup()
+        self._rotations: List[Rotate] = []
+        self._faces: List[Rectangle] = []
+        self._numbers: List[Rectangle] = []
+
+        # Faces first, then every number, so the group only switches colour once
+        self.group.add(Color(1, 1, 1, 1))
+        for sides in self.pool:
+            rotation = Rotate(angle=0)
+            face = Rectangle(texture=self.atlas.face(sides))
+            for instruction in (PushMatrix(), rotation, face, PopMatrix()):
+                self.group.add(instruction)
+            self._rotations.append(rotation)
+            self._faces.append(face)
+        self.number_color = Color(1, 1, 0, 1)
+        self.group.add(self.number_color)
+        for _ in self.pool:
+            number = Rectangle()
+            self.group.add(number)
+            self._numbers.append(number)
+
+        self.canvas.add(self.group)
+        self.bind(pos=self._layout, size=self._layout)
+        self._layout()
+        self.set_values(self.values)
+
+    def set_values(self, values: Sequence[int]) -> None:
+        """Show one value per die."""
+        self.values = list(values)
+        for index, value in enumerate(self.values):
+            number = self._numbers[index]
+            number.texture = self.atlas.number(value)
+            self._place_number(index)
+
+    def set_number_color(self, rgba) -> None:
+        self.number_color.rgba = rgba
+
+    def set_roll_progress(self, progress: float) -> None:
+        """Pose every die for a point in the tumble (0 -> 1)"""
+        # Same scale pulse as DiceAnimation: 1.0 -> 1.3 -> 0.8 -> 1.0
+        if progress < 1 / 3:
+            scale = 1.0 + 0.3 * (progress * 3)
+        elif progress < 2 / 3:
+            scale = 1.3 - 0.5 * ((progress - 1 / 3) * 3)
+        else:
+            scale = 0.8 + 0.2 * ((progress - 2 / 3) * 3)
+        self._scales = [scale] * len(self.pool)
+        for rotation, spin in zip(self._rotations, self._spin):
+            rotation.angle = spin * progress
+        self._place_faces()
+
+    def set_settle_progress(self, progress: float) -> None:
+        """Unwind the rotations while the dice settle on their final faces"""
+        self._scales = [1.0] * len(self.pool)
+        for rotation, spin in zip(self._rotations, self._spin):
+            rotation.angle = spin * (1 - progress)
+        self._place_faces()
+
+    def set_poses(self, poses) -> None:
+        """Place each die from a tumble pose: (dx, dy, angle, scale).
+
+        Offsets are in tray units and are scaled to half a grid cell, so
+        every die lands back on its own place in the grid.
+        """
+        reach = self.cell_size / 2
+        self._offsets = [(dx * reach, dy * reach) for dx, dy, _, _ in poses]
+        self._scales = [scale for _, _, _, scale in poses]
+        for rotation, (_, _, angle, _) in zip(self._rotations, poses):
+            rotation.angle = angle
+        self._place_faces()
+        for index in range(len(self.pool)):
+            self._place_number(index)
+
+    def _layout(self, *args) -> None:
+        """Arrange the dice in the grid that gives the largest dice"""
+        count = len(self.pool)
+        if not count:
+            return
+        best_size, best_cols = 0, 1
+        for cols in range(1, count + 1):
+            rows = math.ceil(count / cols)
+            size = min(self.width / cols, self.height / rows)
+            if size > best_size:
+                best_size, best_cols = size, cols
+        self.die_size = min(self.MAX_DIE_SIZE, best_size * 0.8)
+        self.cell_size = best_size
+
+        cols = best_cols
+        rows = math.ceil(count / cols)
+        cell = best_size
+        top = self.center_y + rows * cell / 2
+        centers = []
+        for index in range(count):
+            row, col = divmod(index, cols)
+            in_row = min(cols, count - row * cols)  # Centre a short last row
+            left = self.center_x - in_row * cell / 2
+            centers.append((left + (col + 0.5) * cell, top - (row + 0.5) * cell))
+        self._centers = centers
+        self._place_faces()
+        for index in range(count):
+            self._place_number(index)
+
+    def _place_faces(self) -> None:
+        for index, (rotation, face) in enumerate(zip(self._rotations, self._faces)):
+            cx, cy = self._die_center(index)
+            size = self.die_size * self._scales[index]
+            rotation.origin = (cx, cy)
+            face.pos = (cx - size / 2, cy - size / 2)
+            face.size = (size, size)
+
+    def _die_center(self, index: int) -> Tuple[float, float]:
+        (cx, cy), (dx, dy) = self._centers[index], self._offsets[index]
+        return cx + dx, cy + dy
+
+    def _place_number(self, index: int) -> None:
+        number = self._numbers[index]
+        texture = number.texture
+        if texture is None:
+            return
+        # Numbers are rendered for 128 px faces; shrink them with smaller dice
+        factor = min(1.0, self.die_size / self.atlas.face_size)
+        width, height = texture.width * factor, texture.height * factor
+        cx, cy = self._die_center(index)
+        number.pos = (cx - width / 2, cy - height / 2)
+        number.size = (width, height)
@@ -0,0 +1,131 @@
+"""Pre-rendered text textures shared by every label that shows dice values.
+
+A Kivy ``Label`` lays out and rasterizes a new texture each time its text
+changes, which is what the roll screen does on every flicker frame. The
+cache renders each string once (in white, so any colour can be applied with
+a ``Color`` instruction) and :class:`GlyphLabel` only swaps the texture of
+its ``Rectangle`` when its text changes.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Iterable, List, Optional, Tuple
+
+from kivy.clock import Clock
+from kivy.core.text import Label as CoreLabel
+from kivy.graphics import Color, Rectangle
+from kivy.properties import BooleanProperty, ListProperty, NumericProperty, StringProperty
+from kivy.uix.widget import Widget
+
+# Numbers 1-100 cover every face of every die the app rolls
+DICE_NUMBERS = tuple(str(value) for value in range(1, 101))
+
+GlyphKey = Tuple[str, float, bool]
+
+
+class GlyphCache:
+    """LRU cache of white text textures keyed by (text, font_size, bold)."""
+
+    def __init__(self, max_entries: int = 512) -> None:
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._textures: "OrderedDict[GlyphKey, object]" = OrderedDict()
+        self._prewarm_queue: List[GlyphKey] = []
+        self._prewarm_event = None
+
+    def __len__(self) -> int:
+        return len(self._textures)
+
+    def get(self, text: str, font_size: float = 32, bold: bool = True):
+        """Return the texture for ``text``, rendering it on first use."""
+        key = (text, font_size, bold)
+        texture = self._textures.get(key)
+        if texture is not None:
+            self.hits += 1
+            self._textures.move_to_end(key)
+            return texture
+
+        self.misses += 1
+        texture = self._render(key)
+        self._textures[key] = texture
+        if len(self._textures) > self.max_entries:
+            self._textures.popitem(last=False)
+        return texture
+
+    def prewarm(self, texts: Iterable[str], font_size: float = 32, bold: bool = True) -> None:
+        """Render every string now."""
+        for text in texts:
+            self.get(text, font_size, bold)
+
+    def prewarm_when_idle(self, texts: Iterable[str], font_size: float = 32, bold: bool = True,
+                          per_frame: int = 10) -> None:
+        """Render the strings a few per frame so start-up frames are not delayed."""
+        self._prewarm_queue.extend((text, font_size, bold) for text in texts)
+        if self._prewarm_event is None:
+            self._prewarm_event = Clock.schedule_interval(lambda dt: self._prewarm_next(per_frame), 0)
+
+    def clear(self) -> None:
+        self._textures.clear()
+        self.hits = self.misses = 0
+
+    def _prewarm_next(self, per_frame: int):
+        for _ in range(min(per_frame, len(self._prewarm_queue))):
+            key = self._prewarm_queue.pop(0)
+            if key not in self._textures:
+                self.get(*key)
+        if not self._prewarm_queue:
+            self._prewarm_event = None
+            return False
+
+    @staticmethod
+    def _render(key: GlyphKey):
+        text, font_size, bold = key
+        label = CoreLabel(text=text, font_size=font_size, bold=bold, color=(1, 1, 1, 1))
+        label.refresh()
+        return label.texture
+
+
+class GlyphLabel(Widget):
+    """Single-line label drawn from :data:`glyph_cache` textures.
+
+    Text changes swap the texture of one ``Rectangle`` and colour changes only
+    touch the ``Color`` instruction, so neither triggers text layout.
+    """
+
+    text = StringProperty("")
+    font_size = NumericProperty(32)
+    bold = BooleanProperty(True)
+    color = ListProperty([1, 1, 1, 1])
+
+    def __init__(self, cache: Optional[GlyphCache] = None, **kwargs):
+        self.cache = cache if cache is not None else glyph_cache  # An empty cache is falsy
+        super().__init__(**kwargs)
+        with self.canvas:
+            self._color = Color(*self.color)
+            self._rect = Rectangle()
+        self.bind(text=self._update_texture, font_size=self._update_texture, bold=self._update_texture)
+        self.bind(pos=self._update_rect, size=self._update_rect, color=self._update_color)
+        self._update_texture()
+
+    def _update_texture(self, *args) -> None:
+        if self.text:
+            texture = self.cache.get(self.text, self.font_size, self.bold)
+            self._rect.texture = texture
+            self._rect.size = texture.size
+        else:
+            self._rect.texture = None
+            self._rect.size = (0, 0)
+        self._update_rect()
+
+    def _update_rect(self, *args) -> None:
+        width, height = self._rect.size
+        self._rect.pos = (self.center_x - width / 2, self.center_y - height / 2)
+
+    def _update_color(self, *args) -> None:
+        self._color.rgba = self.color
+
+
+# Global instance shared by all glyph labels
+glyph_cache = GlyphCache()
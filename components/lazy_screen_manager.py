@@ -0,0 +1,108 @@
+"""ScreenManager that builds screens, and loads their KV rules, on first use."""
+
+from __future__ import annotations
+
+import os
+from typing import Callable, Dict, Optional, Tuple
+
+from kivy.clock import Clock
+from kivy.lang import Builder
+from kivy.uix.screenmanager import Screen, ScreenManager, TransitionBase
+
+from utils.startup_profiler import profiler
+
+ScreenFactory = Callable[..., Screen]
+
+
+def load_kv_once(kv_file: Optional[str]) -> None:
+    """Load a KV file unless Builder already has its rules."""
+    if not kv_file:
+        return
+    kv_file = os.path.abspath(kv_file)
+    if kv_file in (os.path.abspath(f) for f in Builder.files):
+        return
+    with profiler.phase(f"kv_compile:{os.path.basename(kv_file)}"):
+        Builder.load_file(kv_file)
+
+
+class LazyScreenManager(ScreenManager):
+    """Defers screen construction until navigation (or an idle frame) needs it.
+
+    Screens are registered with a factory and an optional KV file. Asking for
+    a screen by name - ``get_screen``, ``has_screen`` or setting ``current`` -
+    loads the KV rules and instantiates the screen on the spot.
+
+    Transitions can also be chosen per route with ``set_route_transition``;
+    routes without one use the manager's ``transition``.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.default_transition: TransitionBase = self.transition
+        self._routes: Dict[Tuple[str, str], TransitionBase] = {}
+        self._factories: Dict[str, Tuple[ScreenFactory, Optional[str]]] = {}
+        self._prebuild_event = None
+        self._prebuild_complete: Optional[Callable[[], None]] = None
+
+    def register_screen(self, name: str, factory: ScreenFactory, kv_file: Optional[str] = None) -> None:
+        """Register a screen to be built the first time it is needed."""
+        self._factories[name] = (factory, kv_file)
+
+    @property
+    def pending_screens(self):
+        """Names of screens that have not been built yet."""
+        return list(self._factories)
+
+    def has_screen(self, name):
+        return name in self._factories or super().has_screen(name)
+
+    def get_screen(self, name):
+        if name in self._factories:
+            self.build_screen(name)
+        return super().get_screen(name)
+
+    def set_route_transition(self, from_name: str, to_name: str, transition: TransitionBase) -> None:
+        """Use ``transition`` when switching from one screen to another ('*' matches any)."""
+        self._routes[(from_name, to_name)] = transition
+
+    def on_current(self, instance, value):
+        previous = self.current_screen.name if self.current_screen else None
+        transition = (
+            self._routes.get((previous, value))
+            or self._routes.get((previous, '*'))
+            or self._routes.get(('*', value))
+            or self.default_transition
+        )
+        if transition is not self.transition:
+            # Finish the running transition before the manager forgets about it
+            self.transition.stop()
+            self.transition = transition
+        super().on_current(instance, value)
+
+    def build_screen(self, name: str) -> Screen:
+        """Load the screen's KV rules, instantiate it and add it to the manager."""
+        factory, kv_file = self._factories.pop(name)
+        load_kv_once(kv_file)
+        screen = factory(name=name)
+        self.add_widget(screen)
+        return screen
+
+    def prebuild_when_idle(self, delay: float = 1.0, on_complete: Optional[Callable[[], None]] = None) -> None:
+        """Build the remaining screens one per frame, starting after ``delay``."""
+        if self._prebuild_event is not None:
+            self._prebuild_event.cancel()
+        self._prebuild_complete = on_complete
+        self._prebuild_event = Clock.schedule_once(self._prebuild_next, delay)
+
+    def _prebuild_next(self, dt) -> None:
+        self._prebuild_event = None
+        if self._factories:
+            name = next(iter(self._factories))
+            with profiler.phase(f"screen_build:{name}"):
+                self.build_screen(name)
+        if self._factories:
+            # Spread the remaining work over the following frames
+            self._prebuild_event = Clock.schedule_once(self._prebuild_next, 0)
+        elif self._prebuild_complete is not None:
+            callback, self._prebuild_complete = self._prebuild_complete, None
+            callback()
@@ -0,0 +1,96 @@
+"""Screen transitions that are cheap on the Pi's GPU.
+
+Kivy's ``FadeTransition`` renders both screens into FBOs on every frame of
+the fade. :class:`SnapshotFadeTransition` renders the outgoing screen once
+into a texture, takes it out of the widget tree and fades that static image
+out over the live incoming screen. If frames still come in over budget the
+fade is cut short and the new screen is shown straight away.
+"""
+
+from __future__ import annotations
+
+import time
+
+from kivy.graphics import Color, InstructionGroup, Rectangle
+from kivy.properties import NumericProperty
+from kivy.uix.screenmanager import NoTransition, TransitionBase
+
+__all__ = ("SnapshotFadeTransition", "NoTransition")
+
+
+class SnapshotFadeTransition(TransitionBase):
+    """Cross-fade from a one-off snapshot of the outgoing screen."""
+
+    duration = NumericProperty(0.25)
+    # Longest acceptable frame (seconds); two slow frames in a row cut the fade
+    frame_budget = NumericProperty(1 / 30.0)
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.cuts = 0  # Fades abandoned for running over budget
+        self._snapshot = None
+        self._overlay = None
+        self._overlay_color = None
+        self._last_frame = None
+        self._slow_frames = 0
+
+    def start(self, manager):
+        try:
+            self._snapshot = self.screen_out.export_as_image().texture
+            self._snapshot.flip_vertical()  # FBO rows come out bottom-up
+        except Exception:
+            # No snapshot (e.g. screen not laid out yet): behave like a cut
+            self._snapshot = None
+        self._last_frame = None
+        self._slow_frames = 0
+        super().start(manager)
+
+    def add_screen(self, screen):
+        super().add_screen(screen)
+        if screen is not self.screen_in:
+            return
+        # The outgoing screen is only needed as the snapshot from here on
+        self.manager.real_remove_widget(self.screen_out)
+        screen.pos = self.manager.pos
+        if self._snapshot is not None:
+            self._overlay = InstructionGroup()
+            self._overlay_color = Color(1, 1, 1, 1)
+            self._overlay.add(self._overlay_color)
+            self._overlay.add(Rectangle(texture=self._snapshot, pos=self.manager.pos, size=self.manager.size))
+            self.manager.canvas.after.add(self._overlay)
+
+    def on_progress(self, progress):
+        if self._overlay_color is None:
+            return
+        self._overlay_color.a = 1.0 - progress
+
+        now = time.perf_counter()
+        if self._last_frame is not None and progress < 1.0:
+            # The first frame also pays for building the new screen, so only
+            # sustained slow frames count against the budget
+            if now - self._last_frame > self.frame_budget:
+                self._slow_frames += 1
+            else:
+                self._slow_frames = 0
+            if self._slow_frames >= 2:
+                self.cuts += 1
+                self._cut()
+                return
+        self._last_frame = now
+
+    def on_complete(self):
+        self._remove_overlay()
+        self.screen_in.pos = self.manager.pos
+        super().on_complete()
+
+    def _cut(self):
+        """Skip the rest of the fade and finish the switch now."""
+        if self._anim is not None:
+            self._anim.stop(self)  # Dispatches on_complete, which finishes the switch
+
+    def _remove_overlay(self):
+        if self._overlay is not None:
+            self.manager.canvas.after.remove(self._overlay)
+        self._overlay = None
+        self._overlay_color = None
+        self._snapshot = None
@@ -2,13 +2,19 @@
 Main application class for D&D Dice Roller
 """
 
+# Startup instrumentation (DICE_STARTUP_PROFILE, see utils/startup_profiler.py)
+from utils.startup_profiler import profiler
+profiler.install()
+
 from kivy.app import App
-from kivy.uix.screenmanager import ScreenManager, FadeTransition
+from kivy.uix.screenmanager import ScreenManager
 from kivy.core.window import Window
 from kivy.properties import ObjectProperty
 from kivy.lang import Builder
 import os
 
+from components.transitions import SnapshotFadeTransition
+
 # Import screens (to be implemented in future steps)
 # from screens.main_screen import MainScreen
 # from screens.profile_screen import ProfileScreen
@@ -16,9 +22,10 @@ import os
 
 # Load KV language files from the kv directory
 kv_path = os.path.join(os.path.dirname(__file__), 'kv')
-Builder.load_file(os.path.join(kv_path, 'main_screen.kv'))
-Builder.load_file(os.path.join(kv_path, 'profile_screen.kv'))
-Builder.load_file(os.path.join(kv_path, 'roll_screen.kv'))
+with profiler.phase('kv_compile'):
+    Builder.load_file(os.path.join(kv_path, 'main_screen.kv'))
+    Builder.load_file(os.path.join(kv_path, 'profile_screen.kv'))
+    Builder.load_file(os.path.join(kv_path, 'roll_screen.kv'))
 
 def create_data_directories():
     """Create the necessary data directories"""
@@ -45,7 +52,7 @@ class DnDDiceRollerApp(App):
         self.title = "D&D Dice Roller"
         
         # Initialize screen manager
-        self.screen_manager = ScreenManager(transition=FadeTransition())
+        self.screen_manager = ScreenManager(transition=SnapshotFadeTransition())
         
         # Add screens (to be implemented)
         # self.screen_manager.add_widget(MainScreen(name='main'))
@@ -67,6 +74,9 @@ class DnDDiceRollerApp(App):
         # Set background color
         Window.clearcolor = (0.173, 0.243, 0.314, 1)  # #2C3E50
         
+        profiler.mark('on_start')
+        profiler.write_report()
+        
     def on_stop(self):
         """Actions to perform when app closes"""
         # Save any pending changes
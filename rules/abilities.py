@@ -0,0 +1,81 @@
+"""
+Ability scores, proficiency and skills (D&D 5e), with no Kivy dependency
+"""
+
+ABILITIES = ("STR", "DEX", "CON", "INT", "WIS", "CHA")
+
+# Skill-to-ability mapping
+SKILL_ABILITIES = {
+    "Acrobatics": "DEX",
+    "Animal Handling": "WIS",
+    "Arcana": "INT",
+    "Athletics": "STR",
+    "Deception": "CHA",
+    "History": "INT",
+    "Insight": "WIS",
+    "Intimidation": "CHA",
+    "Investigation": "INT",
+    "Medicine": "WIS",
+    "Nature": "INT",
+    "Perception": "WIS",
+    "Performance": "CHA",
+    "Persuasion": "CHA",
+    "Religion": "INT",
+    "Sleight of Hand": "DEX",
+    "Stealth": "DEX",
+    "Survival": "WIS"
+}
+
+SKILLS = tuple(SKILL_ABILITIES)
+
+
+def calculate_modifier(score):
+    """Calculate ability modifier from score: (score - 10) // 2"""
+    return (score - 10) // 2
+
+
+def calculate_proficiency_bonus(level):
+    """Calculate proficiency bonus based on level (D&D 5e standards)"""
+    if level < 5:
+        return 2
+    elif level < 9:
+        return 3
+    elif level < 13:
+        return 4
+    elif level < 17:
+        return 5
+    else:
+        return 6
+
+
+def validate_ability_score(score):
+    """Validate ability score is between 1 and 30"""
+    return max(1, min(30, score))
+
+
+def ability_modifier(profile, ability):
+    """Return the modifier for one of the profile's abilities"""
+    return calculate_modifier(profile.get('abilities', {}).get(ability, 10))
+
+
+def proficiency_bonus(profile):
+    """Return the profile's proficiency bonus"""
+    return calculate_proficiency_bonus(profile.get('level', 1))
+
+
+def skill_modifier(profile, skill):
+    """Return (modifier, is_proficient) for a skill"""
+    is_proficient = skill in profile.get('skill_proficiencies', [])
+    modifier = ability_modifier(profile, SKILL_ABILITIES[skill])
+    if is_proficient:
+        modifier += proficiency_bonus(profile)
+    return modifier, is_proficient
+
+
+def saving_throw_modifier(profile, ability):
+    """Return (modifier, is_proficient) for a saving throw"""
+    is_proficient = ability in profile.get('saving_throw_proficiencies', [])
+    modifier = ability_modifier(profile, ability)
+    if is_proficient:
+        modifier += proficiency_bonus(profile)
+    return modifier, is_proficient
@@ -0,0 +1,212 @@
+"""
+Roll specifications and outcomes for attacks, saves, checks and damage
+
+Everything here works on plain profile dicts (the JSON shape stored in
+data/characters) and takes an optional ``rng`` so scripted and replayed
+sessions can be seeded. The roll screen, RollManager and cli.py all call
+into this module.
+"""
+
+import random
+
+from rules.abilities import (
+    ABILITIES,
+    SKILL_ABILITIES,
+    ability_modifier,
+    proficiency_bonus,
+    saving_throw_modifier,
+    skill_modifier,
+)
+from rules.dice import DiceExpression
+
+D20_ROLL_TYPES = ("attack", "saving_throw", "ability_check")
+
+
+class RollSpec:
+    """Everything the roll screen needs to know before the dice are thrown."""
+
+    __slots__ = ('roll_type', 'dice_type', 'modifier', 'description', 'weapon', 'count', 'dice_pool')
+
+    def __init__(self, roll_type, dice_type=20, modifier=0, description="", weapon=None, count=1, dice_pool=None):
+        self.roll_type = roll_type
+        self.dice_type = dice_type
+        self.modifier = modifier
+        self.description = description
+        self.weapon = weapon
+        self.count = count
+        # Sides of each die, for pools mixing dice types (e.g. 1d6+1d4)
+        self.dice_pool = tuple(dice_pool) if dice_pool else (dice_type,) * count
+
+    def to_dict(self):
+        return {
+            'roll_type': self.roll_type,
+            'dice_type': self.dice_type,
+            'count': self.count,
+            'modifier': self.modifier,
+            'description': self.description,
+        }
+
+
+# ----------------------------------------------------------------------
+# Specs
+# ----------------------------------------------------------------------
+def default_weapons(profile):
+    """Sample weapons used when a profile has none"""
+    return [
+        {
+            'name': 'Longsword',
+            'ability': 'STR',
+            'proficient': True,
+            'damage_dice': '1d8',
+            'damage_bonus': ability_modifier(profile, 'STR'),
+            'damage_type': 'slashing'
+        },
+        {
+            'name': 'Dagger',
+            'ability': 'DEX',
+            'proficient': True,
+            'damage_dice': '1d4',
+            'damage_bonus': ability_modifier(profile, 'DEX'),
+            'damage_type': 'piercing'
+        }
+    ]
+
+
+def attack_spec(profile, weapon):
+    """Attack roll with a weapon: 1d20 + ability modifier (+ proficiency)"""
+    modifier = ability_modifier(profile, weapon.get('ability', 'STR'))
+    if weapon.get('proficient', False):
+        modifier += proficiency_bonus(profile)
+    return RollSpec(
+        roll_type="attack",
+        dice_type=20,
+        modifier=modifier,
+        description=f"Attack with {weapon.get('name', 'Weapon')}",
+        weapon=weapon
+    )
+
+
+def saving_throw_spec(profile, ability):
+    """Saving throw for one of the six abilities"""
+    if ability not in ABILITIES:
+        raise ValueError(f"unknown ability: {ability!r}")
+    modifier, _ = saving_throw_modifier(profile, ability)
+    return RollSpec(
+        roll_type="saving_throw",
+        dice_type=20,
+        modifier=modifier,
+        description=f"{ability} Saving Throw"
+    )
+
+
+def ability_check_spec(profile, ability_or_skill):
+    """Ability check for a basic ability or one of the 18 skills"""
+    if ability_or_skill in SKILL_ABILITIES:
+        ability = SKILL_ABILITIES[ability_or_skill]
+        modifier, is_proficient = skill_modifier(profile, ability_or_skill)
+        description = f"{ability_or_skill} ({ability}) Check"
+        if is_proficient:
+            description += " (Proficient)"
+    elif ability_or_skill in ABILITIES:
+        modifier = ability_modifier(profile, ability_or_skill)
+        description = f"{ability_or_skill} Check"
+    else:
+        raise ValueError(f"unknown ability or skill: {ability_or_skill!r}")
+    return RollSpec(
+        roll_type="ability_check",
+        dice_type=20,
+        modifier=modifier,
+        description=description
+    )
+
+
+def initiative_spec(profile):
+    """Initiative roll: 1d20 + DEX modifier (a natural 20 is not a critical)"""
+    return RollSpec(
+        roll_type="initiative",
+        dice_type=20,
+        modifier=ability_modifier(profile, 'DEX'),
+        description=f"{profile.get('name', 'Unknown')} Initiative"
+    )
+
+
+def basic_spec(sides):
+    """A single die with no modifiers"""
+    return RollSpec(roll_type="basic", dice_type=sides, description=f"d{sides} Roll")
+
+
+def custom_spec(count, sides):
+    """Several dice of one type, e.g. 8d6"""
+    return RollSpec(roll_type="custom", dice_type=sides, description=f"{count}d{sides} Roll", count=count)
+
+
+# ----------------------------------------------------------------------
+# Outcomes
+# ----------------------------------------------------------------------
+def resolve_roll(roll_type, dice_type, natural, modifier=0):
+    """Combine a natural roll with its modifier and flag criticals"""
+    is_d20_check = dice_type == 20 and roll_type in D20_ROLL_TYPES
+    return {
+        'roll_type': roll_type,
+        'dice_type': dice_type,
+        'natural': natural,
+        'modifier': modifier,
+        'total': natural + modifier,
+        'critical_hit': is_d20_check and natural == 20,
+        'critical_fail': is_d20_check and natural == 1,
+    }
+
+
+def roll_spec(spec, rng=None):
+    """Roll a spec and return its outcome dict"""
+    rng = rng or random
+    if spec.count > 1:
+        rolls = [rng.randint(1, spec.dice_type) for _ in range(spec.count)]
+        natural = sum(rolls)
+    else:
+        natural = rng.randint(1, spec.dice_type)
+        rolls = [natural]
+    outcome = resolve_roll(spec.roll_type, spec.dice_type, natural, spec.modifier)
+    outcome['description'] = spec.description
+    outcome['rolls'] = rolls
+    return outcome
+
+
+def damage_expression(weapon):
+    """Return (DiceExpression, damage_type) for a weapon dict (or the 1d8 default)"""
+    if not weapon:
+        return DiceExpression.parse("1d8"), "slashing"
+    expression = DiceExpression.parse(weapon.get('damage_dice', '1d8'))
+    expression.bonus += weapon.get('damage_bonus', 0)
+    return expression, weapon.get('damage_type', 'slashing')
+
+
+def damage_spec(weapon, critical=False):
+    """Damage roll for a weapon; critical hits double the dice"""
+    expression, damage_type = damage_expression(weapon)
+    if critical:
+        expression = expression.doubled()
+    # The expression already carries damage_bonus, and leaves out a zero bonus
+    label = "Critical Damage" if critical else "Damage"
+    description = f"{label}: {expression} ({damage_type})"
+    spec = RollSpec(
+        roll_type="damage",
+        dice_type=expression.sides,
+        modifier=expression.bonus,
+        description=description,
+        weapon=weapon,
+        count=expression.count,
+        dice_pool=expression.pool()
+    )
+    return spec, expression
+
+
+def roll_damage(weapon, critical=False, rng=None):
+    """Roll weapon damage and return (spec, outcome)"""
+    spec, expression = damage_spec(weapon, critical)
+    dice_total, rolls = expression.roll(rng)
+    outcome = resolve_roll("damage", spec.dice_type, dice_total, spec.modifier)
+    outcome['description'] = spec.description
+    outcome['rolls'] = rolls
+    outcome['damage_type'] = weapon.get('damage_type', 'slashing') if weapon else 'slashing'
+    return spec, outcome
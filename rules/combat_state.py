@@ -0,0 +1,160 @@
+"""
+Hit points, conditions and spell slots during a session, with no Kivy dependency
+
+The state is only ever changed by events (damage taken, healing, a condition
+added, a slot spent...), applied in order by :meth:`CombatState.apply`.
+:meth:`CombatState.snapshot` is itself an event that restores everything at
+once, so the state can be rebuilt from the latest snapshot plus the events
+logged after it (see utils/combat_journal.py).
+
+Creatures are tracked by name and appear on their first event.
+"""
+
+
+class Creature:
+    """Session state of one character or monster."""
+
+    __slots__ = ('name', 'hp', 'max_hp', 'temp_hp', 'conditions', 'slots', 'damage_dealt')
+
+    def __init__(self, name, hp=None, max_hp=None, temp_hp=0, conditions=(), slots=None, damage_dealt=0):
+        self.name = name
+        self.max_hp = max_hp
+        self.hp = hp if hp is not None else max_hp
+        self.temp_hp = temp_hp
+        self.conditions = set(conditions)
+        # Spell level -> [used, total]
+        self.slots = {int(level): list(counts) for level, counts in (slots or {}).items()}
+        self.damage_dealt = damage_dealt
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['name'], data.get('hp'), data.get('max_hp'), data.get('temp_hp', 0),
+                   data.get('conditions', ()), data.get('slots'), data.get('damage_dealt', 0))
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'hp': self.hp,
+            'max_hp': self.max_hp,
+            'temp_hp': self.temp_hp,
+            'conditions': sorted(self.conditions),
+            'slots': {str(level): list(counts) for level, counts in self.slots.items()},
+            'damage_dealt': self.damage_dealt,
+        }
+
+    def slots_left(self, level):
+        used, total = self.slots.get(level, (0, 0))
+        return total - used
+
+    def __repr__(self):
+        return f"Creature({self.name!r}, hp={self.hp}/{self.max_hp})"
+
+
+class CombatState:
+    """Every creature's session state, changed only through events."""
+
+    def __init__(self):
+        self.creatures = {}
+        self.events_applied = 0
+
+    def creature(self, name):
+        """The state of a creature, created on first use"""
+        creature = self.creatures.get(name)
+        if creature is None:
+            creature = self.creatures[name] = Creature(name)
+        return creature
+
+    def apply(self, event):
+        """Apply one event"""
+        op = event['op']
+        handler = _HANDLERS.get(op)
+        if handler is None:
+            raise ValueError(f"unknown combat event: {op!r}")
+        handler(self, event)
+        self.events_applied += 1
+
+    def replay(self, events):
+        for event in events:
+            self.apply(event)
+
+    def snapshot(self):
+        """One event that restores the whole state as it is now"""
+        return {'op': 'snapshot', 'creatures': [creature.to_dict() for creature in self.creatures.values()]}
+
+    # ------------------------------------------------------------------
+    # Event handlers
+    # ------------------------------------------------------------------
+    def _snapshot(self, event):
+        self.creatures = {}
+        for data in event['creatures']:
+            creature = Creature.from_dict(data)
+            self.creatures[creature.name] = creature
+
+    def _set_max_hp(self, event):
+        creature = self.creature(event['target'])
+        creature.max_hp = event['max_hp']
+        if creature.hp is None or event.get('full', True):
+            creature.hp = creature.max_hp
+
+    def _damage(self, event):
+        amount = max(0, event['amount'])
+        if event.get('source'):
+            self.creature(event['source']).damage_dealt += amount
+        if not event.get('target'):
+            return
+        creature = self.creature(event['target'])
+        # Temporary hit points soak damage first
+        absorbed = min(creature.temp_hp, amount)
+        creature.temp_hp -= absorbed
+        if creature.hp is not None:
+            creature.hp = max(0, creature.hp - (amount - absorbed))
+
+    def _heal(self, event):
+        creature = self.creature(event['target'])
+        if creature.hp is None:
+            return
+        creature.hp += max(0, event['amount'])
+        if creature.max_hp is not None:
+            creature.hp = min(creature.hp, creature.max_hp)
+
+    def _temp_hp(self, event):
+        # Temporary hit points do not stack; the higher value is kept
+        creature = self.creature(event['target'])
+        creature.temp_hp = max(creature.temp_hp, event['amount'])
+
+    def _condition_add(self, event):
+        self.creature(event['target']).conditions.add(event['condition'])
+
+    def _condition_remove(self, event):
+        self.creature(event['target']).conditions.discard(event['condition'])
+
+    def _set_slots(self, event):
+        creature = self.creature(event['target'])
+        creature.slots[int(event['level'])] = [0, event['total']]
+
+    def _slot_use(self, event):
+        creature = self.creature(event['target'])
+        counts = creature.slots.setdefault(int(event['level']), [0, 0])
+        counts[0] = min(counts[1], counts[0] + 1)
+
+    def _long_rest(self, event):
+        creature = self.creature(event['target'])
+        if creature.max_hp is not None:
+            creature.hp = creature.max_hp
+        creature.temp_hp = 0
+        for counts in creature.slots.values():
+            counts[0] = 0
+
+
+_HANDLERS = {
+    'snapshot': CombatState._snapshot,
+    'set_max_hp': CombatState._set_max_hp,
+    'damage': CombatState._damage,
+    'heal': CombatState._heal,
+    'temp_hp': CombatState._temp_hp,
+    'condition_add': CombatState._condition_add,
+    'condition_remove': CombatState._condition_remove,
+    'set_slots': CombatState._set_slots,
+    'slot_use': CombatState._slot_use,
+    'long_rest': CombatState._long_rest,
+}
@@ -0,0 +1,112 @@
+"""
+Dice notation parsing and rolling, with no Kivy dependency
+"""
+
+import random
+import re
+
+# One term of an expression: "2d6", "d20", "+3", "- 1d4"
+_TERM = re.compile(r'\s*([+-]?)\s*(?:(\d*)[dD](\d+)|(\d+))\s*')
+
+
+class DiceExpression:
+    """Parsed dice notation such as "1d20+5" or "1d6+3d6+2"."""
+
+    __slots__ = ('dice', 'bonus')
+
+    def __init__(self, dice=(), bonus=0):
+        # dice: tuple of (count, sides, sign) groups
+        self.dice = tuple(dice)
+        self.bonus = bonus
+
+    @classmethod
+    def parse(cls, text):
+        """Parse dice notation, raising ValueError on malformed input"""
+        text = str(text).strip()
+        if not text:
+            raise ValueError("empty dice expression")
+
+        dice = []
+        bonus = 0
+        position = 0
+        while position < len(text):
+            match = _TERM.match(text, position)
+            if not match or match.end() == position:
+                raise ValueError(f"invalid dice expression: {text!r}")
+            if position > 0 and not match.group(1):
+                raise ValueError(f"missing operator in dice expression: {text!r}")
+            sign = -1 if match.group(1) == '-' else 1
+            if match.group(3):
+                count = int(match.group(2)) if match.group(2) else 1
+                sides = int(match.group(3))
+                if sides < 1 or count < 1:
+                    raise ValueError(f"invalid dice group in {text!r}")
+                dice.append((count, sides, sign))
+            else:
+                bonus += sign * int(match.group(4))
+            position = match.end()
+        return cls(dice, bonus)
+
+    @property
+    def sides(self):
+        """Sides of the first dice group (the die shown by the roll screen)"""
+        return self.dice[0][1] if self.dice else 0
+
+    @property
+    def count(self):
+        """Total number of dice rolled"""
+        return sum(count for count, _, _ in self.dice)
+
+    def pool(self):
+        """Sides of every individual die, in the order roll() rolls them"""
+        return [sides for count, sides, _ in self.dice for _ in range(count)]
+
+    def doubled(self):
+        """Return the critical-hit version of this expression (dice doubled)"""
+        return DiceExpression(
+            [(count * 2, sides, sign) for count, sides, sign in self.dice],
+            self.bonus
+        )
+
+    def roll(self, rng=None):
+        """Roll the expression and return (dice_total, individual_rolls)"""
+        rng = rng or random
+        rolls = []
+        dice_total = 0
+        for count, sides, sign in self.dice:
+            for _ in range(count):
+                value = rng.randint(1, sides)
+                rolls.append(value)
+                dice_total += sign * value
+        return dice_total, rolls
+
+    def __str__(self):
+        parts = []
+        for count, sides, sign in self.dice:
+            term = f"{count}d{sides}"
+            if parts:
+                term = ("+ " if sign > 0 else "- ") + term
+            elif sign < 0:
+                term = "-" + term
+            parts.append(term)
+        if self.bonus and not parts:
+            parts.append(str(self.bonus))
+        elif self.bonus:
+            parts.append(f"+ {self.bonus}" if self.bonus > 0 else f"- {abs(self.bonus)}")
+        return " ".join(parts) or "0"
+
+
+def parse_dice(text):
+    """Parse dice notation into a DiceExpression"""
+    return DiceExpression.parse(text)
+
+
+def roll_die(sides, rng=None):
+    """Roll a single die"""
+    return (rng or random).randint(1, sides)
+
+
+def roll_dice(sides, count=1, rng=None):
+    """Roll several dice of the same type and return the individual values"""
+    randint = (rng or random).randint
+    return [randint(1, sides) for _ in range(count)]
@@ -0,0 +1,290 @@
+"""
+Initiative order for an encounter, with no Kivy dependency
+
+Combatants are kept in two heaps ordered by initiative, then DEX modifier,
+then the order they joined: those still to act this round and those who
+already have. Adding, removing, delaying and readying are heap pushes or
+O(1) removals (entries are only marked dead and skipped when popped), and
+the next turn is a single pop; when the round runs out the heaps swap.
+
+Every change is an event dict applied by :meth:`InitiativeQueue.apply`.
+The same events are handed to ``on_event`` so they can be journaled, and
+replaying them (or the latest :meth:`InitiativeQueue.snapshot` followed by
+the events after it) rebuilds the encounter exactly.
+"""
+
+import heapq
+import random
+
+from rules.abilities import calculate_modifier
+from rules.checks import resolve_roll
+
+
+def roll_initiative(modifier=0, rng=None):
+    """d20 + modifier, resolved like the roll screen's initiative rolls"""
+    natural = (rng or random).randint(1, 20)
+    outcome = resolve_roll("initiative", 20, natural, modifier)
+    outcome['description'] = "Initiative"
+    return outcome
+
+
+def dex_modifier(profile):
+    """Initiative modifier of a profile (its DEX modifier)"""
+    return calculate_modifier(profile.get('abilities', {}).get('DEX', 10))
+
+
+class Combatant:
+    """One creature in the initiative order."""
+
+    __slots__ = ('id', 'name', 'initiative', 'dex', 'monster', 'key')
+
+    def __init__(self, id, name, initiative, dex=0, monster=False, key=None):
+        self.id = id
+        self.name = name
+        self.initiative = initiative
+        self.dex = dex
+        self.monster = monster
+        # Heap key: higher initiative, then higher DEX, then who joined first
+        self.key = tuple(key) if key else (-initiative, -dex, id, 0)
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['id'], data['name'], data['initiative'], data.get('dex', 0), data.get('monster', False),
+                   data.get('key'))
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'initiative': self.initiative,
+            'dex': self.dex,
+            'monster': self.monster,
+            'key': list(self.key),
+        }
+
+    def __repr__(self):
+        return f"Combatant({self.name!r}, {self.initiative})"
+
+
+class InitiativeQueue:
+    """Turn order of an encounter, changed only through events."""
+
+    def __init__(self, on_event=None):
+        self.on_event = on_event
+        self.reset()
+
+    def reset(self):
+        self.round = 0  # 0 until the first turn
+        self.current = None
+        self.combatants = {}  # id -> Combatant, everyone in the encounter
+        self.held = {}  # id -> Combatant, delayed out of the order
+        self._pending = []  # Heap of [key, id] still to act this round
+        self._acted = []  # Heap of [key, id] that already acted
+        self._entries = {}  # id -> live heap entry
+        self._dead = 0
+        self._next_id = 1
+
+    # ------------------------------------------------------------------
+    # Commands (each one is a single event)
+    # ------------------------------------------------------------------
+    def add(self, name, initiative, dex=0, monster=False):
+        """Add a combatant; returns it"""
+        combatant = Combatant(self._next_id, name, initiative, dex, monster)
+        self._emit({'op': 'add', 'combatant': combatant.to_dict()})
+        return combatant
+
+    def remove(self, combatant_id):
+        self._emit({'op': 'remove', 'id': combatant_id})
+
+    def delay(self, combatant_id=None):
+        """Take a combatant (the current one by default) out of the order until readied"""
+        if combatant_id is None:
+            if self.current is None:
+                return
+            combatant_id = self.current.id
+        self._emit({'op': 'delay', 'id': combatant_id})
+
+    def ready(self, combatant_id):
+        """Bring a delayed combatant back to act right after the current one"""
+        combatant = self.held.get(combatant_id)
+        if combatant is None:
+            return
+        key, initiative = combatant.key, combatant.initiative
+        if self.current is not None:
+            # Same initiative as the current combatant, sorted just after them
+            key = self.current.key[:3] + (self._next_id,)
+            initiative = self.current.initiative
+        self._emit({'op': 'ready', 'id': combatant_id, 'key': list(key), 'initiative': initiative})
+
+    def next_turn(self):
+        """End the current turn; returns whoever is up next"""
+        self._emit({'op': 'next'})
+        return self.current
+
+    def clear(self):
+        self._emit({'op': 'clear'})
+
+    # ------------------------------------------------------------------
+    # Events
+    # ------------------------------------------------------------------
+    def apply(self, event):
+        """Apply one event (from a command or a journal being replayed)"""
+        op = event['op']
+        if op == 'add':
+            combatant = Combatant.from_dict(event['combatant'])
+            self.combatants[combatant.id] = combatant
+            self._next_id = max(self._next_id, combatant.id + 1)
+            self._place(combatant)
+        elif op == 'remove':
+            combatant = self.combatants.pop(event['id'], None)
+            if combatant is None:
+                return
+            self.held.pop(combatant.id, None)
+            self._discard(combatant.id)
+            if self.current is combatant:
+                self.current = None
+                self._advance()
+        elif op == 'delay':
+            combatant = self.combatants.get(event['id'])
+            if combatant is None or combatant.id in self.held:
+                return
+            self.held[combatant.id] = combatant
+            self._discard(combatant.id)
+            if self.current is combatant:
+                self.current = None
+                self._advance()
+        elif op == 'ready':
+            combatant = self.held.pop(event['id'], None)
+            if combatant is None:
+                return
+            combatant.key = tuple(event['key'])
+            combatant.initiative = event['initiative']
+            self._next_id = max(self._next_id, combatant.key[3] + 1)
+            self._push(self._pending, combatant)
+        elif op == 'next':
+            if self.current is not None:
+                self._push(self._acted, self.current)
+                self.current = None
+            self._advance()
+        elif op == 'clear':
+            self.reset()
+        elif op == 'snapshot':
+            self._restore(event)
+        else:
+            raise ValueError(f"unknown initiative event: {op!r}")
+
+    def replay(self, events):
+        """Rebuild the encounter from journaled events"""
+        self.reset()
+        for event in events:
+            self.apply(event)
+
+    def snapshot(self):
+        """One event that restores the whole encounter as it is now"""
+        return {
+            'op': 'snapshot',
+            'round': self.round,
+            'current': self.current.id if self.current is not None else None,
+            'combatants': [combatant.to_dict() for combatant in self.combatants.values()],
+            'pending': [entry[1] for entry in self._pending if self._entries.get(entry[1]) is entry],
+            'held': list(self.held),
+            'next_id': self._next_id,
+        }
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    @property
+    def on_deck(self):
+        """Who acts after the current combatant"""
+        self._skip_dead(self._pending)
+        if self._pending:
+            return self.combatants[self._pending[0][1]]
+        self._skip_dead(self._acted)
+        if self._acted:
+            return self.combatants[self._acted[0][1]]
+        return None
+
+    def order(self):
+        """Everyone in the order, from the current combatant round to the one before them"""
+        current = [self.current] if self.current is not None else []
+        return current + self._sorted(self._pending) + self._sorted(self._acted)
+
+    def __len__(self):
+        return len(self.combatants)
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+    def _emit(self, event):
+        self.apply(event)
+        if self.on_event is not None:
+            self.on_event(event)
+
+    def _place(self, combatant):
+        # Joining after their slot in this round means waiting for the next one
+        if self.current is not None and combatant.key < self.current.key:
+            self._push(self._acted, combatant)
+        else:
+            self._push(self._pending, combatant)
+
+    def _push(self, heap, combatant):
+        entry = [combatant.key, combatant.id]
+        self._entries[combatant.id] = entry
+        heapq.heappush(heap, entry)
+
+    def _discard(self, combatant_id):
+        # The heap entry stays until popped; it is no longer the live one
+        if self._entries.pop(combatant_id, None) is not None:
+            self._dead += 1
+            if self._dead > len(self._entries) + 8:
+                self._compact()
+
+    def _compact(self):
+        for heap in (self._pending, self._acted):
+            heap[:] = [entry for entry in heap if self._entries.get(entry[1]) is entry]
+            heapq.heapify(heap)
+        self._dead = 0
+
+    def _skip_dead(self, heap):
+        while heap and self._entries.get(heap[0][1]) is not heap[0]:
+            heapq.heappop(heap)
+            self._dead -= 1
+
+    def _advance(self):
+        self._skip_dead(self._pending)
+        if not self._pending:
+            self._skip_dead(self._acted)
+            if not self._acted:
+                return
+            # Everyone has acted: a new round starts
+            self._pending, self._acted = self._acted, self._pending
+            self.round += 1
+        elif self.round == 0:
+            self.round = 1
+        entry = heapq.heappop(self._pending)
+        del self._entries[entry[1]]
+        self.current = self.combatants[entry[1]]
+
+    def _sorted(self, heap):
+        return [self.combatants[entry[1]] for entry in sorted(heap) if self._entries.get(entry[1]) is entry]
+
+    def _restore(self, event):
+        self.reset()
+        for data in event['combatants']:
+            combatant = Combatant.from_dict(data)
+            self.combatants[combatant.id] = combatant
+        self.round = event['round']
+        self._next_id = event['next_id']
+        pending = set(event['pending'])
+        held = set(event['held'])
+        current = event['current']
+        for combatant in self.combatants.values():
+            if combatant.id == current:
+                self.current = combatant
+            elif combatant.id in held:
+                self.held[combatant.id] = combatant
+            elif combatant.id in pending:
+                self._push(self._pending, combatant)
+            else:
+                self._push(self._acted, combatant)
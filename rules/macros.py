@@ -0,0 +1,195 @@
+"""
+Per-character roll macros, with no Kivy dependency
+
+A macro is one line in the profile's "macros" list:
+
+    Sneak Attack: 1d20+{DEX}+{PB}; on hit 1d6+{DEX}+3d6 piercing
+
+The name comes before the colon and the roll after it, in dice notation
+where {STR} ... {CHA} stand for ability modifiers, {PB} for the proficiency
+bonus and {LEVEL} for the character level. A d20 roll with an "on hit"
+clause is an attack whose damage (optionally followed by a damage type) is
+rolled when the hit is confirmed; a d20 roll alone is a check and anything
+else is a dice pool.
+
+compile_macro() does all the parsing once and returns a MacroProgram with
+every placeholder already replaced by the character's numbers: a RollSpec
+for the roll screen and, for attacks, a weapon dict for roll_damage().
+MacroLibrary caches the compiled programs and only compiles again when the
+macros or the stats they read change.
+"""
+
+import re
+from collections import OrderedDict
+
+from rules.abilities import ABILITIES, ability_modifier, proficiency_bonus
+from rules.checks import RollSpec
+from rules.dice import DiceExpression
+
+_PLACEHOLDER = re.compile(r'\{\s*(\w+)\s*\}')
+_ON_HIT = re.compile(r'^\s*on\s+hit\s+', re.IGNORECASE)
+_DAMAGE_TYPE = re.compile(r'\s+([A-Za-z]+)\s*$')
+# Signs left next to each other once a negative modifier is filled in
+_SIGNS = re.compile(r'([+-])\s*([+-])')
+
+
+def macro_variables(profile):
+    """The numbers a macro can refer to, by placeholder name"""
+    variables = {ability: ability_modifier(profile, ability) for ability in ABILITIES}
+    variables['PB'] = proficiency_bonus(profile)
+    variables['LEVEL'] = profile.get('level', 1)
+    return variables
+
+
+def _bind(text, variables):
+    """Dice notation with every placeholder replaced by its number"""
+    def value(match):
+        name = match.group(1).upper()
+        if name not in variables:
+            raise ValueError(f"unknown macro value {{{match.group(1)}}}")
+        return str(variables[name])
+    bound = _PLACEHOLDER.sub(value, text)
+    while True:
+        collapsed = _SIGNS.sub(lambda match: '+' if match.group(1) == match.group(2) else '-', bound)
+        if collapsed == bound:
+            return DiceExpression.parse(bound)
+        bound = collapsed
+
+
+def split_macro(text):
+    """(name, roll, damage or None) of a macro line, raising ValueError if malformed"""
+    text = str(text).strip()
+    name, separator, body = text.partition(':')
+    if not separator:
+        name, body = text, text
+    name, body = name.strip(), body.strip()
+    if not name or not body:
+        raise ValueError(f"empty macro: {text!r}")
+    roll, _, damage = body.partition(';')
+    damage = damage.strip() or None
+    if damage is not None:
+        match = _ON_HIT.match(damage)
+        if not match:
+            raise ValueError(f"expected 'on hit' after ';' in macro {name!r}")
+        damage = damage[match.end():]
+    return name, roll.strip(), damage
+
+
+class MacroProgram:
+    """A macro compiled against one character's stats."""
+
+    __slots__ = ('name', 'text', 'spec', 'damage')
+
+    def __init__(self, name, text, spec, damage=None):
+        self.name = name
+        self.text = text
+        self.spec = spec  # RollSpec handed to the roll screen
+        self.damage = damage  # Weapon dict rolled on a confirmed hit (attacks only)
+
+    @property
+    def roll_type(self):
+        return self.spec.roll_type
+
+    def __repr__(self):
+        return f"MacroProgram({self.name!r}, {self.spec.roll_type})"
+
+
+def compile_macro(text, profile, variables=None):
+    """Compile one macro line for a profile (dict or Character)"""
+    name, roll_text, damage_text = split_macro(text)
+    variables = variables or macro_variables(profile)
+    roll = _bind(roll_text, variables)
+    if any(sign < 0 for _, _, sign in roll.dice):
+        raise ValueError(f"macro {name!r} subtracts dice")
+
+    is_d20 = roll.dice == ((1, 20, 1),)
+    if damage_text is not None:
+        if not is_d20:
+            raise ValueError(f"attack macro {name!r} must roll a single d20")
+        damage_type = 'slashing'
+        match = _DAMAGE_TYPE.search(damage_text)
+        if match:
+            damage_type = match.group(1).lower()
+            damage_text = damage_text[:match.start()]
+        damage = _bind(damage_text, variables)
+        if not damage.dice:
+            raise ValueError(f"macro {name!r} rolls no damage dice")
+        weapon = {
+            'name': name,
+            'damage_dice': str(DiceExpression(damage.dice)),
+            'damage_bonus': damage.bonus,
+            'damage_type': damage_type,
+        }
+        spec = RollSpec("attack", 20, roll.bonus, name, weapon=weapon)
+        return MacroProgram(name, text, spec, weapon)
+
+    if is_d20:
+        return MacroProgram(name, text, RollSpec("ability_check", 20, roll.bonus, name))
+    if not roll.dice:
+        raise ValueError(f"macro {name!r} rolls no dice")
+    pool = roll.pool()
+    spec = RollSpec("custom", roll.sides, roll.bonus, name, count=len(pool), dice_pool=pool)
+    return MacroProgram(name, text, spec)
+
+
+def _fingerprint(profile):
+    """Everything a profile's compiled macros depend on"""
+    abilities = profile.get('abilities') or {}
+    return (
+        tuple(profile.get('macros') or ()),
+        profile.get('level', 1),
+        tuple(abilities.get(ability, 10) for ability in ABILITIES),
+    )
+
+
+class MacroLibrary:
+    """Cache of compiled macro programs, per set of macros and stats.
+
+    Looking a profile up costs building its fingerprint (the macro lines,
+    the level and the six scores); the lines are only parsed again when that
+    changes, e.g. after the profile was edited. The least recently used
+    entries are dropped beyond ``max_entries``.
+    """
+
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # fingerprint -> (programs, errors)
+
+    def programs(self, profile):
+        """The profile's compiled macros, in order; lines that do not compile are left out"""
+        return self._entry(profile)[0]
+
+    def errors(self, profile):
+        """(line, message) for each of the profile's macros that does not compile"""
+        return self._entry(profile)[1]
+
+    def _entry(self, profile):
+        if not profile:
+            return (), ()
+        key = _fingerprint(profile)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+        self.misses += 1
+        variables = macro_variables(profile)
+        programs, errors = [], []
+        for line in key[0]:
+            try:
+                programs.append(compile_macro(line, profile, variables))
+            except ValueError as error:
+                errors.append((line, str(error)))
+        entry = self._entries[key] = (tuple(programs), tuple(errors))
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return entry
+
+    def clear(self):
+        self._entries.clear()
+
+
+# Global library
+macro_library = MacroLibrary()
@@ -0,0 +1,267 @@
+"""
+Compact character, ability and weapon models, with no Kivy dependency
+
+Profiles are stored as JSON dicts (data/characters). These slotted classes
+hold the same data in far less memory: ability scores live in a six-byte
+array, proficiency lists are tuples of interned strings and weapons are
+slotted records.
+
+The models are values: every part is immutable and ``replace()`` returns a
+new object that shares whatever did not change. Copying a character is
+therefore free, and editing a copy can never reach back into the original
+(copy-on-write). ``get()`` and ``[]`` read the models with the JSON key
+names, so the helpers in rules/abilities.py and rules/checks.py accept a
+Character, Abilities or Weapon wherever they take a dict.
+"""
+
+import copy
+import sys
+from array import array
+
+from rules.abilities import ABILITIES, validate_ability_score
+
+_ABILITY_INDEX = {ability: index for index, ability in enumerate(ABILITIES)}
+_MISSING = object()
+
+
+def _names(values):
+    """A tuple of interned strings (shared between all loaded profiles)"""
+    return tuple(map(sys.intern, map(str, values)))
+
+
+def _interned(value, default):
+    """An interned string, or ``default`` for a missing or empty value"""
+    if value is None or value == '':
+        return default
+    return sys.intern(str(value))
+
+
+def _extra(data, fields):
+    """Keys of a JSON dict that the model has no field for, or None"""
+    if data.keys() <= fields:
+        return None
+    return {key: value for key, value in data.items() if key not in fields}
+
+
+class Abilities:
+    """The six ability scores in a fixed-size byte array."""
+
+    __slots__ = ('_scores',)
+
+    def __init__(self, scores=(10, 10, 10, 10, 10, 10)):
+        # Scores are kept in ABILITIES order and clamped to 1..30
+        scores = list(scores)
+        if len(scores) != len(ABILITIES):
+            raise ValueError(f"expected {len(ABILITIES)} ability scores, got {len(scores)}")
+        try:
+            self._scores = array('B', scores)
+        except (TypeError, OverflowError):
+            self._scores = None
+        if self._scores is None or min(self._scores) < 1 or max(self._scores) > 30:
+            self._scores = array('B', [validate_ability_score(int(score)) for score in scores])
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build from {"STR": 16, ...}; missing abilities default to 10"""
+        data = data or {}
+        return cls([data.get(ability, 10) for ability in ABILITIES])
+
+    def to_dict(self):
+        return dict(zip(ABILITIES, self._scores))
+
+    def replace(self, **scores):
+        """A copy with some scores changed, e.g. ``replace(STR=18)``"""
+        values = list(self._scores)
+        for ability, score in scores.items():
+            values[_ABILITY_INDEX[ability]] = score
+        return Abilities(values)
+
+    def get(self, ability, default=None):
+        index = _ABILITY_INDEX.get(ability)
+        return default if index is None else self._scores[index]
+
+    def __getitem__(self, ability):
+        return self._scores[_ABILITY_INDEX[ability]]
+
+    def __contains__(self, ability):
+        return ability in _ABILITY_INDEX
+
+    def __iter__(self):
+        return iter(ABILITIES)
+
+    def __len__(self):
+        return len(ABILITIES)
+
+    def keys(self):
+        return ABILITIES
+
+    def values(self):
+        return tuple(self._scores)
+
+    def items(self):
+        return tuple(zip(ABILITIES, self._scores))
+
+    def __eq__(self, other):
+        if isinstance(other, Abilities):
+            return self._scores == other._scores
+        return NotImplemented
+
+    def __repr__(self):
+        scores = ", ".join(f"{ability}={score}" for ability, score in self.items())
+        return f"Abilities({scores})"
+
+
+class _Record:
+    """Shared read access and copying for the slotted records below."""
+
+    __slots__ = ()
+
+    # JSON keys in the order they are written
+    _fields = ()
+
+    def get(self, key, default=None):
+        value = self._lookup(key)
+        return default if value is _MISSING else value
+
+    def __getitem__(self, key):
+        value = self._lookup(key)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        return self._lookup(key) is not _MISSING
+
+    def _lookup(self, key):
+        if key in self._fields:
+            value = getattr(self, key)
+            return _MISSING if value is None else value
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        return _MISSING
+
+    def replace(self, **changes):
+        """A copy with some fields changed; everything else is shared"""
+        fields = {name: getattr(self, name) for name in self.__slots__}
+        fields.update(changes)
+        return type(self)(**fields)
+
+    def copy(self):
+        """Copies are free: nothing in a record is ever modified in place"""
+        return self
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({getattr(self, 'name', '')!r})"
+
+
+class Weapon(_Record):
+    """One weapon as stored in a profile's "weapons" list."""
+
+    __slots__ = ('name', 'ability', 'damage_dice', 'damage_bonus', 'proficient', 'damage_type', 'extra')
+
+    _fields = ('name', 'ability', 'damage_dice', 'damage_bonus', 'proficient', 'damage_type')
+
+    def __init__(self, name="New Weapon", ability="STR", damage_dice="d6", damage_bonus=0, proficient=True,
+                 damage_type=None, extra=None):
+        self.name = name
+        # Hand-edited profiles may hold null or a number here
+        self.ability = _interned(ability, "STR")
+        self.damage_dice = _interned(damage_dice, "d6")
+        self.damage_bonus = damage_bonus
+        self.proficient = proficient
+        self.damage_type = _interned(damage_type, None)
+        self.extra = extra or None  # Keys this version does not know about
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            data.get('name', 'New Weapon'),
+            data.get('ability', 'STR'),
+            data.get('damage_dice', 'd6'),
+            data.get('damage_bonus', 0),
+            data.get('proficient', True),
+            data.get('damage_type'),
+            _extra(data, _WEAPON_FIELDS),
+        )
+
+    def to_dict(self):
+        data = {
+            'name': self.name,
+            'ability': self.ability,
+            'damage_dice': self.damage_dice,
+            'damage_bonus': self.damage_bonus,
+            'proficient': self.proficient,
+        }
+        if self.damage_type:
+            data['damage_type'] = self.damage_type
+        if self.extra:
+            data.update(copy.deepcopy(self.extra))
+        return data
+
+
+_WEAPON_FIELDS = frozenset(Weapon._fields)
+
+
+class Character(_Record):
+    """A character profile: name, level, abilities, proficiencies, weapons and macros."""
+
+    __slots__ = ('name', 'level', 'abilities', 'saving_throw_proficiencies', 'skill_proficiencies', 'weapons',
+                 'macros', 'extra')
+
+    _fields = ('name', 'level', 'abilities', 'saving_throw_proficiencies', 'skill_proficiencies', 'weapons', 'macros')
+
+    def __init__(self, name="New Character", level=1, abilities=None, saving_throw_proficiencies=(),
+                 skill_proficiencies=(), weapons=(), macros=(), extra=None):
+        self.name = name
+        self.level = level
+        self.abilities = abilities if isinstance(abilities, Abilities) else Abilities.from_dict(abilities)
+        # Tuples come from another Character (replace) and are already interned
+        if type(saving_throw_proficiencies) is not tuple:
+            saving_throw_proficiencies = _names(saving_throw_proficiencies)
+        if type(skill_proficiencies) is not tuple:
+            skill_proficiencies = _names(skill_proficiencies)
+        self.saving_throw_proficiencies = saving_throw_proficiencies
+        self.skill_proficiencies = skill_proficiencies
+        if not (type(weapons) is tuple and all(type(weapon) is Weapon for weapon in weapons)):
+            weapons = tuple(weapon if isinstance(weapon, Weapon) else Weapon.from_dict(weapon) for weapon in weapons)
+        self.weapons = weapons
+        self.macros = tuple(macros)  # Roll macro lines (rules/macros.py)
+        self.extra = extra or None  # Keys this version does not know about
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build from the JSON shape; missing keys get the editor's defaults"""
+        return cls(
+            data.get('name', 'New Character'),
+            data.get('level', 1),
+            Abilities.from_dict(data.get('abilities')),
+            data.get('saving_throw_proficiencies') or (),
+            data.get('skill_proficiencies') or (),
+            tuple(map(Weapon.from_dict, data.get('weapons') or ())),
+            data.get('macros') or (),
+            _extra(data, _CHARACTER_FIELDS),
+        )
+
+    def to_dict(self):
+        """A new dict in the JSON shape; nothing in it is shared with the model"""
+        data = {
+            'name': self.name,
+            'level': self.level,
+            'abilities': self.abilities.to_dict(),
+            'saving_throw_proficiencies': list(self.saving_throw_proficiencies),
+            'skill_proficiencies': list(self.skill_proficiencies),
+            'weapons': [weapon.to_dict() for weapon in self.weapons],
+        }
+        if self.macros:
+            data['macros'] = list(self.macros)
+        if self.extra:
+            data.update(copy.deepcopy(self.extra))
+        return data
+
+
+_CHARACTER_FIELDS = frozenset(Character._fields)
@@ -0,0 +1,139 @@
+"""
+Group rolls for a whole party at once, with no Kivy dependency
+
+When the GM calls for "everyone roll Stealth", every selected character
+rolls the same check. Each character's modifiers for all the checks a group
+can roll are worked out once and cached as one row of a derived-stat table,
+so a group roll only reads a column of it, rolls every d20 in one batched
+call and sorts the results.
+"""
+
+import operator
+from array import array
+from collections import OrderedDict
+
+from rules.abilities import (
+    ABILITIES,
+    SKILL_ABILITIES,
+    SKILLS,
+    ability_modifier,
+    saving_throw_modifier,
+    skill_modifier,
+)
+from rules.checks import resolve_roll
+from rules.dice import roll_dice
+from rules.models import Character
+
+INITIATIVE = "Initiative"
+SAVE_SUFFIX = " Save"
+
+# Columns of the derived-stat table, in the order the group screen lists them
+GROUP_CHECKS = (INITIATIVE,) + ABILITIES + SKILLS + tuple(ability + SAVE_SUFFIX for ability in ABILITIES)
+_COLUMN = {check: index for index, check in enumerate(GROUP_CHECKS)}
+
+
+def check_roll_type(check):
+    """The roll type a group check resolves as"""
+    if check == INITIATIVE:
+        return "initiative"
+    return "saving_throw" if check.endswith(SAVE_SUFFIX) else "ability_check"
+
+
+def check_description(check):
+    """Title for a group check, e.g. "Stealth (DEX) Check" """
+    if check == INITIATIVE:
+        return "Initiative (DEX)"
+    if check.endswith(SAVE_SUFFIX):
+        return f"{check[:-len(SAVE_SUFFIX)]} Saving Throw"
+    if check in SKILL_ABILITIES:
+        return f"{check} ({SKILL_ABILITIES[check]}) Check"
+    return f"{check} Check"
+
+
+def derived_row(character):
+    """(modifiers, proficient) for every GROUP_CHECKS column of a character"""
+    modifiers = [ability_modifier(character, 'DEX')]
+    proficient = [0]
+    for ability in ABILITIES:
+        modifiers.append(ability_modifier(character, ability))
+        proficient.append(0)
+    for skill in SKILLS:
+        modifier, is_proficient = skill_modifier(character, skill)
+        modifiers.append(modifier)
+        proficient.append(is_proficient)
+    for ability in ABILITIES:
+        modifier, is_proficient = saving_throw_modifier(character, ability)
+        modifiers.append(modifier)
+        proficient.append(is_proficient)
+    return array('b', modifiers), array('B', proficient)
+
+
+class DerivedStats:
+    """Cache of derived-stat rows, one per Character.
+
+    Characters are immutable (rules/models.py), so a row stays valid for as
+    long as the Character it was computed from; an edited profile is a new
+    Character and gets a new row. Rows are keyed by identity and the least
+    recently used ones are dropped beyond ``max_rows``.
+    """
+
+    def __init__(self, max_rows=256):
+        self.max_rows = max_rows
+        self.hits = 0
+        self.misses = 0
+        self._rows = OrderedDict()  # id(character) -> (character, modifiers, proficient)
+
+    def row(self, character):
+        """(modifiers, proficient) arrays for a Character"""
+        key = id(character)
+        entry = self._rows.get(key)
+        if entry is not None and entry[0] is character:
+            self._rows.move_to_end(key)
+            self.hits += 1
+            return entry[1], entry[2]
+        self.misses += 1
+        modifiers, proficient = derived_row(character)
+        self._rows[key] = (character, modifiers, proficient)
+        if len(self._rows) > self.max_rows:
+            self._rows.popitem(last=False)
+        return modifiers, proficient
+
+    def column(self, party, check):
+        """(modifiers, proficient) lists of one check for every party member"""
+        index = _COLUMN[check]
+        rows = [self.row(character) for character in party]
+        return [modifiers[index] for modifiers, _ in rows], [bool(proficient[index]) for _, proficient in rows]
+
+    def clear(self):
+        self._rows.clear()
+
+
+# Global table
+derived_stats = DerivedStats()
+
+
+def group_roll(party, check, rng=None, table=None):
+    """Roll one check for every party member and return the results, best first.
+
+    ``party`` holds Characters (profile dicts are converted, but only
+    Characters hit the cache). Each result is a resolve_roll() outcome with
+    the member's ``name``, ``proficient`` flag and 1-based ``rank``; ties on
+    the total go to the higher modifier, then by name.
+    """
+    if check not in _COLUMN:
+        raise ValueError(f"unknown group check: {check!r}")
+    party = [member if isinstance(member, Character) else Character.from_dict(member) for member in party]
+    modifiers, proficient = (table or derived_stats).column(party, check)
+    naturals = roll_dice(20, len(party), rng)
+    totals = list(map(operator.add, naturals, modifiers))
+
+    roll_type = check_roll_type(check)
+    order = sorted(range(len(party)), key=lambda i: (-totals[i], -modifiers[i], party[i].name))
+    results = []
+    for rank, i in enumerate(order, start=1):
+        outcome = resolve_roll(roll_type, 20, naturals[i], modifiers[i])
+        outcome['name'] = party[i].name
+        outcome['proficient'] = proficient[i]
+        outcome['rank'] = rank
+        results.append(outcome)
+    return results
@@ -0,0 +1,154 @@
+# screens/group_roll_screen.py
+from kivy.uix.screenmanager import Screen
+from kivy.properties import BooleanProperty, ListProperty, ObjectProperty, StringProperty
+from kivy.uix.boxlayout import BoxLayout
+from kivy.uix.togglebutton import ToggleButton
+from components.glyph_cache import GlyphLabel  # noqa: F401 - used by group_roll_screen.kv
+from rules.models import Character
+from rules.party import GROUP_CHECKS, INITIATIVE, check_description, group_roll
+from utils.io_executor import io_executor, read_json
+from utils.latency_tracer import tracer
+import os
+
+
+class PartyMemberButton(ToggleButton):
+    """Toggle for including one saved character in the party"""
+    character = ObjectProperty(None)
+
+    def __init__(self, character, **kwargs):
+        super().__init__(**kwargs)
+        self.character = character
+        self.text = character.name
+        self.state = 'down'  # Everyone rolls unless left out
+        self.background_normal = ''
+        self.background_down = ''
+        self.size_hint_y = None
+        self.height = 48
+        self.bind(state=self.update_color)
+        self.update_color()
+
+    def update_color(self, *args):
+        if self.state == 'down':
+            self.background_color = (0.541, 0.169, 0.886, 1)
+        else:
+            self.background_color = (0.3, 0.3, 0.3, 1)
+
+
+class GroupResultRow(BoxLayout):
+    """One line of the result board: rank, name, d20, modifier and total"""
+    rank = StringProperty("")
+    name_text = StringProperty("")
+    natural = StringProperty("")
+    modifier = StringProperty("")
+    total = StringProperty("")
+    highlight = ListProperty([0.925, 0.941, 0.945, 1])
+
+    def show(self, result):
+        """Fill the row from a group_roll() result"""
+        self.rank = str(result['rank'])
+        self.name_text = result['name'] + (" *" if result['proficient'] else "")
+        self.natural = str(result['natural'])
+        self.modifier = f"{result['modifier']:+d}"
+        self.total = str(result['total'])
+        if result['critical_hit']:
+            self.highlight = [0.2, 0.8, 0.3, 1]
+        elif result['critical_fail']:
+            self.highlight = [0.906, 0.298, 0.235, 1]
+        else:
+            self.highlight = [0.925, 0.941, 0.945, 1]
+
+
+class GroupRollScreen(Screen):
+    """Roll one check for every selected character and rank the results"""
+
+    check = StringProperty(INITIATIVE)
+    check_values = ListProperty(GROUP_CHECKS)
+    title = StringProperty(check_description(INITIATIVE))
+    status = StringProperty("")
+    loading = BooleanProperty(False)
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.app = None
+        self._loading = None  # Stream of the party list load in progress
+        self._rows = []  # Result rows, reused from roll to roll
+
+    def on_enter(self):
+        """Called when the screen is displayed"""
+        if not self.app:
+            from kivy.app import App
+            self.app = App.get_running_app()
+        self.load_party()
+
+    def on_check(self, instance, check):
+        self.title = check_description(check)
+
+    def load_party(self):
+        """List every saved character, filled in as the files are read"""
+        if self._loading is not None:
+            self._loading.cancel()
+        self.ids.party_container.clear_widgets()
+        self.loading = True
+        self._loading = io_executor.stream(
+            self.read_character, self.get_profile_files, self.add_member_button,
+            on_done=self.party_loaded
+        )
+        return self._loading
+
+    def get_profile_files(self):
+        """Get list of profile files (runs on an I/O thread)"""
+        profiles_path = os.path.join('data', 'characters')
+        if not os.path.exists(profiles_path):
+            return []
+        return sorted(f for f in os.listdir(profiles_path) if f.endswith('.json'))
+
+    def read_character(self, filename):
+        """Read a profile file into a Character (runs on an I/O thread)"""
+        return Character.from_dict(read_json(os.path.join('data', 'characters', filename)))
+
+    def add_member_button(self, filename, character):
+        if character is not None:
+            self.ids.party_container.add_widget(PartyMemberButton(character))
+
+    def party_loaded(self):
+        self.loading = False
+        if not self.ids.party_container.children:
+            self.status = "No saved characters"
+
+    def selected_party(self):
+        """Characters whose toggle is down, in list order"""
+        return [button.character for button in reversed(self.ids.party_container.children)
+                if button.state == 'down']
+
+    def roll(self):
+        """Roll the current check for the whole party and show the board"""
+        tracer.begin('group_roll')
+        party = self.selected_party()
+        if not party:
+            self.status = "Select at least one character"
+            tracer.cancel()
+            return None
+        results = group_roll(party, self.check)
+        self.show_results(results)
+        self.status = f"{len(results)} rolled"
+        tracer.end_on_next_flip()
+        return results
+
+    def show_results(self, results):
+        """Fill the result board, reusing the rows of the previous roll"""
+        board = self.ids.results_container
+        while len(self._rows) < len(results):
+            self._rows.append(GroupResultRow())
+        for row, result in zip(self._rows, results):
+            row.show(result)
+        shown = self._rows[:len(results)]
+        if board.children[::-1] != shown:
+            board.clear_widgets()
+            for row in shown:
+                board.add_widget(row)
+
+    def back_to_main(self):
+        """Return to the main screen"""
+        if self._loading is not None:
+            self._loading.cancel()
+        self.app.screen_manager.current = 'main'
@@ -0,0 +1,182 @@
+# screens/initiative_screen.py
+from kivy.uix.screenmanager import Screen
+from kivy.properties import BooleanProperty, NumericProperty, ObjectProperty, StringProperty
+from kivy.uix.boxlayout import BoxLayout
+from rules.initiative import InitiativeQueue, dex_modifier, roll_initiative
+from rules.models import Character
+from rules.party import INITIATIVE, group_roll
+from utils.io_executor import io_executor, read_json
+from utils.journal import Journal
+import os
+
+ENCOUNTER_PATH = os.path.join('data', 'encounter.jsonl')
+COMPACT_AFTER = 100  # Journaled events before the journal is rewritten as one snapshot
+
+
+def read_saved_characters():
+    """Every saved profile as a Character (runs on an I/O thread)"""
+    profiles_path = os.path.join('data', 'characters')
+    if not os.path.exists(profiles_path):
+        return []
+    characters = []
+    for filename in sorted(f for f in os.listdir(profiles_path) if f.endswith('.json')):
+        try:
+            characters.append(Character.from_dict(read_json(os.path.join(profiles_path, filename))))
+        except (OSError, ValueError, AttributeError):
+            continue
+    return characters
+
+
+class InitiativeRow(BoxLayout):
+    """One combatant in the turn order"""
+    combatant = ObjectProperty(None)
+    initiative = StringProperty("")
+    name_text = StringProperty("")
+    action_text = StringProperty("Remove")
+    is_current = BooleanProperty(False)
+    is_held = BooleanProperty(False)
+    monster = BooleanProperty(False)
+
+    def __init__(self, screen, combatant, is_current=False, is_held=False, **kwargs):
+        super().__init__(**kwargs)
+        self.screen = screen
+        self.combatant = combatant
+        self.initiative = str(combatant.initiative)
+        self.name_text = combatant.name + (" (delayed)" if is_held else "")
+        self.action_text = "Ready" if is_held else "Remove"
+        self.is_current = is_current
+        self.is_held = is_held
+        self.monster = combatant.monster
+
+    def action(self):
+        if self.is_held:
+            self.screen.ready(self.combatant.id)
+        else:
+            self.screen.remove(self.combatant.id)
+
+
+class InitiativeScreen(Screen):
+    """Turn order for an encounter: party profiles plus ad-hoc monsters"""
+
+    round_text = StringProperty("Not started")
+    current_text = StringProperty("")
+    loaded = BooleanProperty(False)
+    monster_name = StringProperty("")
+    monster_modifier = NumericProperty(0)
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.app = None
+        self.journal = Journal(ENCOUNTER_PATH)
+        self.queue = InitiativeQueue(on_event=self.record)
+        self._rolled_id = None  # Combatant added by the roll screen's current roll
+
+    def on_enter(self):
+        """Called when the screen is displayed"""
+        if not self.app:
+            from kivy.app import App
+            self.app = App.get_running_app()
+        if not self.loaded:
+            # Resume the encounter that was running before a restart
+            self.journal.load_async(self.resume)
+        else:
+            self.refresh()
+
+    def resume(self, events):
+        self.queue.replay(events)
+        self.loaded = True
+        self.refresh()
+
+    def record(self, event):
+        """Journal every change; a long journal is replaced by one snapshot"""
+        if self.journal.appended >= COMPACT_AFTER:
+            self.journal.rewrite([self.queue.snapshot()])
+        else:
+            self.journal.append(event)
+
+    # ------------------------------------------------------------------
+    # Commands
+    # ------------------------------------------------------------------
+    def next_turn(self):
+        if self.loaded:
+            self.queue.next_turn()
+            self.refresh()
+
+    def delay(self):
+        if self.loaded:
+            self.queue.delay()
+            self.refresh()
+
+    def ready(self, combatant_id):
+        self.queue.ready(combatant_id)
+        self.refresh()
+
+    def remove(self, combatant_id):
+        self.queue.remove(combatant_id)
+        self.refresh()
+
+    def end_encounter(self):
+        if self.loaded:
+            self.queue.clear()
+            self.journal.clear()
+            self.refresh()
+
+    def add_monster(self):
+        """Roll d20 + the entered modifier for an ad-hoc monster"""
+        if not self.loaded:
+            return None
+        name = self.monster_name.strip() or f"Monster {len(self.queue) + 1}"
+        outcome = roll_initiative(self.monster_modifier)
+        combatant = self.queue.add(name, outcome['total'], self.monster_modifier, monster=True)
+        self.monster_name = ""
+        self.refresh()
+        return combatant
+
+    def roll_party(self):
+        """Roll initiative for every saved character not yet in the encounter, in one batch"""
+        if self.loaded:
+            io_executor.submit(read_saved_characters, on_done=self.add_party)
+
+    def add_party(self, characters):
+        present = {combatant.name for combatant in self.queue.combatants.values() if not combatant.monster}
+        party = [character for character in characters if character.name not in present]
+        if not party:
+            return
+        # One batched roll; the initiative modifier is the DEX modifier
+        for result in group_roll(party, INITIATIVE):
+            self.queue.add(result['name'], result['total'], result['modifier'])
+        self.refresh()
+
+    def roll_current_character(self):
+        """Roll the current character's initiative on the roll screen, then come back here"""
+        if not (self.loaded and self.app and self.app.current_profile):
+            return None
+        self._rolled_id = None
+        return self.app.roll_manager.roll_initiative(self.app.current_profile, self._on_rolled)
+
+    def _on_rolled(self, outcome):
+        # "New Roll" on the roll screen replaces the earlier result
+        if self._rolled_id is not None:
+            self.queue.remove(self._rolled_id)
+        profile = self.app.current_profile
+        combatant = self.queue.add(profile.get('name', 'Unknown'), outcome['total'], dex_modifier(profile))
+        self._rolled_id = combatant.id
+
+    # ------------------------------------------------------------------
+    # Display
+    # ------------------------------------------------------------------
+    def refresh(self):
+        """Rebuild the turn order list"""
+        queue = self.queue
+        self.round_text = f"Round {queue.round}" if queue.round else "Not started"
+        self.current_text = f"Up: {queue.current.name}" if queue.current is not None else ""
+        container = self.ids.order_container
+        container.clear_widgets()
+        for combatant in queue.order():
+            container.add_widget(InitiativeRow(self, combatant, is_current=combatant is queue.current))
+        for combatant in queue.held.values():
+            container.add_widget(InitiativeRow(self, combatant, is_held=True))
+
+    def back_to_main(self):
+        """Return to the main screen"""
+        self.app.screen_manager.current = 'main'
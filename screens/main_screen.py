@@ -2,10 +2,23 @@
 from typing import Optional
 
 from kivy.uix.screenmanager import Screen
-from kivy.properties import ObjectProperty, StringProperty
+from kivy.uix.widget import Widget
+from kivy.properties import BooleanProperty, ObjectProperty, StringProperty
 from kivy.clock import Clock
 
+from components.buttons import PrimaryButton
+from rules.macros import macro_library
+from utils.event_bus import MOTION_DETECTED, MOTION_ERROR, MOTION_STATUS, event_bus
+from utils.frame_governor import frame_governor
+from utils.latency_tracer import tracer
 from utils.motion_sensor import MotionSensorWatcher
+from utils.sampling_profiler import sampling_profiler
+from utils.session import session
+
+# Macros shown on the quick-bar (the first ones in the profile)
+QUICK_BAR_SIZE = 5
+# Seconds the title must be held to start or stop the profiler
+PROFILER_LONG_PRESS = 1.5
 
 class MainScreen(Screen):
     """Main screen with dice rolling interface"""
@@ -14,12 +27,16 @@ class MainScreen(Screen):
     current_character = StringProperty("None")
     motion_status = StringProperty("")
     motion_button_text = StringProperty("Motion Sensor Roll (d20)")
+    macro_hint = StringProperty("")
+    profiling = BooleanProperty(False)
     
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.app = None
         self.motion_watcher: Optional[MotionSensorWatcher] = None
         self._motion_button_default = "Motion Sensor Roll (d20)"
+        self._macro_names = None  # Names on the quick-bar, to skip rebuilding it
+        self._title_press = None
         
     def on_enter(self):
         """Called when the screen is displayed"""
@@ -27,57 +44,101 @@ class MainScreen(Screen):
         if not self.app:
             from kivy.app import App
             self.app = App.get_running_app()
+            # The saved profile is read in the background and may arrive later
+            self.app.bind(current_profile=self._update_current_character)
             
         # Update current character display
+        self._update_current_character()
+        if not self.motion_status:
+            self.motion_status = "Press to arm the motion sensor"
+    
+    def _update_current_character(self, *args):
+        """Show the name of the app's current profile"""
         if self.app.current_profile:
             self.current_character = self.app.current_profile.get('name', 'Unknown')
         else:
             self.current_character = "None"
-        if not self.motion_status:
-            self.motion_status = "Press to arm the motion sensor"
+        self._show_macros()
+    
+    def _show_macros(self):
+        """Fill the quick-bar with the current profile's macros"""
+        bar = self.ids.get('macro_bar')
+        if bar is None:
+            return
+        programs = macro_library.programs(self.app.current_profile)[:QUICK_BAR_SIZE]
+        names = [program.name for program in programs]
+        if names == self._macro_names:
+            return
+        self._macro_names = names
+        bar.clear_widgets()
+        for index, program in enumerate(programs):
+            button = PrimaryButton(text=program.name, font_size=15, shorten=True, halign='center', valign='middle')
+            button.bind(size=lambda button, size: setattr(button, 'text_size', size))  # Long names are cut short
+            button.background_color = [0.7, 0.1, 0.1, 1] if program.damage else [0.541, 0.169, 0.886, 1]
+            button.bind(on_release=lambda button, index=index: self.roll_macro(index))
+            bar.add_widget(button)
+        if programs:
+            for _ in range(QUICK_BAR_SIZE - len(programs)):
+                bar.add_widget(Widget())  # Keep every button the same width
+        self.macro_hint = "" if programs else "Add roll macros to this character in the profile editor"
+    
+    def roll_macro(self, index):
+        """Roll a quick-bar macro"""
+        tracer.ensure('macro')
+        if self.app and self.app.roll_manager:
+            self.app.roll_manager.roll_macro(index)
     
     def initiate_attack_roll(self):
         """Initiate an attack roll"""
+        tracer.begin('attack')
         # Defer to allow touch event to complete before showing dialog
         Clock.schedule_once(lambda dt: self._show_weapon_dialog(), 0.1)
     
     def _show_weapon_dialog(self):
         """Internal method to show weapon dialog"""
+        tracer.stamp('dialog_open')
         if self.app and self.app.roll_manager:
             self.app.roll_manager.show_weapon_dialog()
 
     def initiate_saving_throw(self):
         """Initiate a saving throw"""
+        tracer.begin('saving_throw')
         # Defer to allow touch event to complete before showing dialog
         Clock.schedule_once(lambda dt: self._show_saving_throw_dialog(), 0.1)
     
     def _show_saving_throw_dialog(self):
         """Internal method to show saving throw dialog"""
+        tracer.stamp('dialog_open')
         if self.app and self.app.roll_manager:
             self.app.roll_manager.show_ability_dialog("saving_throw")
 
     def initiate_ability_check(self):
         """Initiate an ability check"""
+        tracer.begin('ability_check')
         # Defer to allow touch event to complete before showing dialog
         Clock.schedule_once(lambda dt: self._show_ability_check_dialog(), 0.1)
     
     def _show_ability_check_dialog(self):
         """Internal method to show ability check dialog"""
+        tracer.stamp('dialog_open')
         if self.app and self.app.roll_manager:
             self.app.roll_manager.show_ability_dialog("ability_check")
 
     def show_custom_dice_dialog(self):
         """Show custom dice dialog"""
+        tracer.begin('custom')
         # Defer to allow touch event to complete before showing dialog
         Clock.schedule_once(lambda dt: self._show_custom_dialog(), 0.1)
     
     def _show_custom_dialog(self):
         """Internal method to show custom dice dialog"""
+        tracer.stamp('dialog_open')
         if self.app and self.app.roll_manager:
             self.app.roll_manager.show_custom_dice_dialog()
 
     def roll_dice(self, sides):
         """Roll a specific die"""
+        tracer.ensure('dice')
         if self.app and self.app.roll_manager:
             self.app.roll_manager.roll_dice(sides)
 
@@ -88,6 +149,11 @@ class MainScreen(Screen):
         """Toggle motion sensor monitoring and roll a d20 when triggered."""
         if self.motion_watcher is None:
             self.motion_watcher = MotionSensorWatcher()
+            # The watcher calls back on its own thread; the bus hands the events to this screen on the main thread
+            event_bus.subscribe(MOTION_DETECTED, lambda payload: self._handle_motion_detected(), maxsize=1,
+                                name='main_screen.motion_detected')
+            event_bus.subscribe(MOTION_STATUS, self._update_motion_status, maxsize=8, name='main_screen.motion_status')
+            event_bus.subscribe(MOTION_ERROR, self._handle_motion_error, maxsize=8, name='main_screen.motion_error')
 
         if not self.motion_watcher.available:
             self.motion_status = "Motion sensor unavailable on this device"
@@ -101,19 +167,14 @@ class MainScreen(Screen):
             return
 
         def handle_detected():
-            Clock.schedule_once(lambda dt: self._handle_motion_detected(), 0)
-
-        def handle_status(message: str) -> None:
-            Clock.schedule_once(lambda dt: self._update_motion_status(message), 0)
-
-        def handle_error(exc: Exception) -> None:
-            Clock.schedule_once(lambda dt: self._handle_motion_error(exc), 0)
+            tracer.begin('motion')
+            event_bus.publish(MOTION_DETECTED)
 
         try:
             started = self.motion_watcher.start_monitoring(
                 on_detected=handle_detected,
-                on_status=handle_status,
-                on_error=handle_error,
+                on_status=lambda message: event_bus.publish(MOTION_STATUS, message),
+                on_error=lambda exc: event_bus.publish(MOTION_ERROR, exc),
             )
         except RuntimeError as exc:
             self.motion_status = f"Motion sensor unavailable: {exc}"
@@ -128,12 +189,15 @@ class MainScreen(Screen):
         self.motion_status = message
 
     def _handle_motion_detected(self) -> None:
+        tracer.stamp('motion_dispatched')
+        frame_governor.boost()
         self.motion_status = "Motion detected! Rolling d20..."
         self.motion_button_text = self._motion_button_default
         # Ensure watcher is stopped before rolling to allow re-arming later
         if self.motion_watcher and self.motion_watcher.is_running:
             self.motion_watcher.stop()
-        self.roll_dice(20)
+        with session.source('motion'):
+            self.roll_dice(20)
         Clock.schedule_once(
             lambda dt: self._update_motion_status("Motion roll complete"),
             1.0,
@@ -145,6 +209,30 @@ class MainScreen(Screen):
             self.motion_watcher.stop()
         self.motion_status = f"Sensor error: {exc}"
 
+    # ------------------------------------------------------------------
+    # Sampling profiler (hidden admin action: long-press the title)
+    # ------------------------------------------------------------------
+    def on_title_touch_down(self, label, touch):
+        if label.collide_point(*touch.pos):
+            self.on_title_touch_up(label, touch)
+            self._title_press = Clock.schedule_once(self._toggle_profiler, PROFILER_LONG_PRESS)
+
+    def on_title_touch_up(self, label, touch):
+        if self._title_press is not None:
+            self._title_press.cancel()
+            self._title_press = None
+
+    def _toggle_profiler(self, dt):
+        self._title_press = None
+        if sampling_profiler.running:
+            path = sampling_profiler.stop(on_saved=lambda path: print(f"Profile written to {path}"))
+            stats = sampling_profiler.stats()
+            print(f"Profile: {stats['samples']} samples over {stats['seconds']} s, "
+                  f"{(stats['overhead'] or 0) * 100:.2f}% spent sampling" + ("" if path else " (nothing to write)"))
+        else:
+            sampling_profiler.start()
+        self.profiling = sampling_profiler.running
+
     def on_leave(self, *args):  # noqa: D401 - inherited hook
         """Reset motion sensor watcher when leaving the screen."""
         if self.motion_watcher and self.motion_watcher.is_running:
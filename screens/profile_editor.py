@@ -10,8 +10,11 @@ from kivy.uix.spinner import Spinner
 from kivy.uix.checkbox import CheckBox
 from kivy.uix.button import Button
 from components.buttons import PrimaryButton
+from rules.abilities import ABILITIES, SKILLS
+from rules.macros import compile_macro
+from rules.models import Character, Weapon
+from utils.io_executor import io_executor, write_json
 from utils.calculations import calculate_modifier, calculate_proficiency_bonus, validate_ability_score
-import json
 import os
 
 class AbilityInput(BoxLayout):
@@ -65,6 +68,20 @@ class WeaponInput(BoxLayout):
     weapon_damage_dice = StringProperty("d6")
     weapon_damage_bonus = NumericProperty(0)
     weapon_proficient = ObjectProperty(True)
+    weapon = ObjectProperty(None)  # The Weapon it was filled from, for the fields the form does not show
+
+class MacroInput(BoxLayout):
+    """Widget for one roll macro line, e.g. "Smite: 1d20+{STR}+{PB}; on hit 2d8+{STR}" """
+    macro_text = StringProperty("")
+    error = StringProperty("")
+    
+    def on_macro_text(self, instance, text):
+        """Check the syntax as it is typed (stats are filled in when it is rolled)"""
+        try:
+            compile_macro(text, {})
+            self.error = ""
+        except ValueError as error:
+            self.error = str(error) if text.strip() else ""
 
 class ProfileEditorScreen(Screen):
     """Screen for editing character profiles"""
@@ -72,7 +89,7 @@ class ProfileEditorScreen(Screen):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.app = None
-        self.profile_data = None
+        self.character = None  # The edited copy; the live profile is only replaced on save
         self.is_new_profile = False
     
     def on_enter(self):
@@ -84,21 +101,12 @@ class ProfileEditorScreen(Screen):
         
         # Load profile data if editing existing profile
         if self.app.current_profile:
-            self.profile_data = self.app.current_profile.copy()
+            # A detached copy: nothing in it is shared with the live profile
+            self.character = Character.from_dict(self.app.current_profile)
             self.is_new_profile = False
         else:
-            # Create new profile data structure
-            self.profile_data = {
-                "name": "New Character",
-                "level": 1,
-                "abilities": {
-                    "STR": 10, "DEX": 10, "CON": 10,
-                    "INT": 10, "WIS": 10, "CHA": 10
-                },
-                "saving_throw_proficiencies": [],
-                "skill_proficiencies": [],
-                "weapons": []
-            }
+            # New profile with default values
+            self.character = Character()
             self.is_new_profile = True
         
         # Populate the form with profile data
@@ -108,14 +116,13 @@ class ProfileEditorScreen(Screen):
         """Populate the form with profile data"""
         # Basic info
         if self.ids.get('character_name'):
-            self.ids.character_name.text = self.profile_data.get('name', '')
+            self.ids.character_name.text = self.character.name
         
         if self.ids.get('character_level'):
-            self.ids.character_level.text = str(self.profile_data.get('level', 1))
+            self.ids.character_level.text = str(self.character.level)
         
         # Ability scores
-        abilities = self.profile_data.get('abilities', {})
-        for ability, value in abilities.items():
+        for ability, value in self.character.abilities.items():
             ability_id = f'ability_{ability.lower()}'
             if self.ids.get(ability_id):
                 ability_input = self.ids[ability_id]
@@ -125,13 +132,13 @@ class ProfileEditorScreen(Screen):
                     ability_input.ids.ability_value_input.text = str(value)
         
         # Saving throw proficiencies
-        saving_throws = self.profile_data.get('saving_throw_proficiencies', [])
-        for ability in ['STR', 'DEX', 'CON', 'INT', 'WIS', 'CHA']:
+        saving_throws = self.character.saving_throw_proficiencies
+        for ability in ABILITIES:
             if self.ids.get(f'save_{ability.lower()}'):
                 self.ids[f'save_{ability.lower()}'].active = ability in saving_throws
         
         # Skill proficiencies
-        skills = self.profile_data.get('skill_proficiencies', [])
+        skills = self.character.skill_proficiencies
         for skill in self.get_skill_list():
             skill_id = skill.lower().replace(' ', '_')
             widget_id = f'skill_{skill_id}'
@@ -143,36 +150,32 @@ class ProfileEditorScreen(Screen):
         if self.ids.get('weapons_container'):
             self.ids.weapons_container.clear_widgets()
             
-            weapons = self.profile_data.get('weapons', [])
-            for weapon in weapons:
+            for weapon in self.character.weapons:
                 self.add_weapon_input(weapon)
+        
+        # Macros
+        if self.ids.get('macros_container'):
+            self.ids.macros_container.clear_widgets()
+            
+            for macro in self.character.macros:
+                self.add_macro_input(macro)
     
     def get_skill_list(self):
         """Return list of all skills"""
-        return [
-            "Acrobatics", "Animal Handling", "Arcana", "Athletics", "Deception",
-            "History", "Insight", "Intimidation", "Investigation", "Medicine",
-            "Nature", "Perception", "Performance", "Persuasion", "Religion",
-            "Sleight of Hand", "Stealth", "Survival"
-        ]
+        return list(SKILLS)
     
     def add_weapon_input(self, weapon_data=None):
         """Add a weapon input widget"""
         if not weapon_data:
-            weapon_data = {
-                "name": "New Weapon",
-                "ability": "STR",
-                "damage_dice": "d6",
-                "damage_bonus": 0,
-                "proficient": True
-            }
+            weapon_data = Weapon()
         
         weapon_input = WeaponInput(
-            weapon_name=weapon_data.get('name', ''),
-            weapon_ability=weapon_data.get('ability', 'STR'),
-            weapon_damage_dice=weapon_data.get('damage_dice', 'd6'),
-            weapon_damage_bonus=weapon_data.get('damage_bonus', 0),
-            weapon_proficient=weapon_data.get('proficient', True),
+            weapon_name=weapon_data.name,
+            weapon_ability=weapon_data.ability,
+            weapon_damage_dice=weapon_data.damage_dice,
+            weapon_damage_bonus=weapon_data.damage_bonus,
+            weapon_proficient=weapon_data.proficient,
+            weapon=weapon_data,
             size_hint_y=None,
             height=100
         )
@@ -185,81 +188,97 @@ class ProfileEditorScreen(Screen):
         if self.ids.get('weapons_container'):
             self.ids.weapons_container.remove_widget(instance)
     
+    def add_macro_input(self, macro_text=""):
+        """Add a macro input widget"""
+        if self.ids.get('macros_container'):
+            self.ids.macros_container.add_widget(MacroInput(macro_text=macro_text))
+    
+    def remove_macro_input(self, instance):
+        """Remove a macro input widget"""
+        if self.ids.get('macros_container'):
+            self.ids.macros_container.remove_widget(instance)
+    
     def save_profile(self):
         """Save the profile data"""
         # Basic info
-        self.profile_data['name'] = self.ids.character_name.text
         try:
-            self.profile_data['level'] = int(self.ids.character_level.text)
+            level = int(self.ids.character_level.text)
         except ValueError:
-            self.profile_data['level'] = 1
+            level = 1
         
         # Ability scores
-        for ability in ['STR', 'DEX', 'CON', 'INT', 'WIS', 'CHA']:
+        scores = {}
+        for ability in ABILITIES:
             ability_id = f'ability_{ability.lower()}'
             if self.ids.get(ability_id):
-                ability_input = self.ids[ability_id]
-                old_value = self.profile_data['abilities'].get(ability, 10)
-                new_value = validate_ability_score(ability_input.ability_value)
-                self.profile_data['abilities'][ability] = new_value
+                scores[ability] = self.ids[ability_id].ability_value
         
         # Saving throw proficiencies
-        self.profile_data['saving_throw_proficiencies'] = []
-        for ability in ['STR', 'DEX', 'CON', 'INT', 'WIS', 'CHA']:
-            if self.ids[f'save_{ability.lower()}'].active:
-                self.profile_data['saving_throw_proficiencies'].append(ability)
+        saving_throws = [ability for ability in ABILITIES if self.ids[f'save_{ability.lower()}'].active]
         
         # Skill proficiencies
-        self.profile_data['skill_proficiencies'] = []
+        skills = []
         for skill in self.get_skill_list():
             skill_id = skill.lower().replace(' ', '_')
             widget_id = f'skill_{skill_id}'
-            if self.ids.get(widget_id):
-                is_active = self.ids[widget_id].ids.checkbox.active
-                if is_active:
-                    self.profile_data['skill_proficiencies'].append(skill)
+            if self.ids.get(widget_id) and self.ids[widget_id].ids.checkbox.active:
+                skills.append(skill)
         
-        # Weapons
-        self.profile_data['weapons'] = []
+        # Weapons, in the order they were added (children are newest first)
+        weapons = []
         if self.ids.get('weapons_container'):
-            for child in self.ids.weapons_container.children:
+            for child in reversed(self.ids.weapons_container.children):
                 if isinstance(child, WeaponInput):
-                    weapon_data = {
-                        "name": child.weapon_name,
-                        "ability": child.weapon_ability,
-                        "damage_dice": child.weapon_damage_dice,
-                        "damage_bonus": child.weapon_damage_bonus,
-                        "proficient": child.weapon_proficient
-                    }
-                    self.profile_data['weapons'].append(weapon_data)
+                    # Damage type and unknown keys carry over from the weapon as loaded
+                    weapons.append((child.weapon or Weapon()).replace(
+                        name=child.weapon_name,
+                        ability=child.weapon_ability,
+                        damage_dice=child.weapon_damage_dice,
+                        damage_bonus=child.weapon_damage_bonus,
+                        proficient=child.weapon_proficient
+                    ))
+        
+        # Macros, in order; lines that do not compile are kept so they can be fixed later
+        macros = []
+        if self.ids.get('macros_container'):
+            for child in reversed(self.ids.macros_container.children):
+                if isinstance(child, MacroInput) and child.macro_text.strip():
+                    macros.append(child.macro_text.strip())
+        
+        self.character = self.character.replace(
+            name=self.ids.character_name.text,
+            level=level,
+            abilities=self.character.abilities.replace(**scores),
+            saving_throw_proficiencies=saving_throws,
+            skill_proficiencies=skills,
+            weapons=weapons,
+            macros=macros
+        )
         
         # Save to file
         self.save_to_file()
         
         # Update app current profile
-        self.app.current_profile = self.profile_data
+        self.app.current_profile = self.character.to_dict()
         
         # Return to profile screen
         self.app.screen_manager.current = 'profiles'
     
     def save_to_file(self):
-        """Save profile data to JSON file"""
-        try:
-            profiles_path = os.path.join('data', 'characters')
-            if not os.path.exists(profiles_path):
-                os.makedirs(profiles_path)
-            
-            # Create a safe filename
-            safe_name = "".join(c for c in self.profile_data['name'] if c.isalnum() or c in (' ', '-', '_')).rstrip()
-            filename = f"{safe_name}.json"
-            filepath = os.path.join(profiles_path, filename)
-            
-            with open(filepath, 'w') as f:
-                json.dump(self.profile_data, f, indent=4)
-            
-            return True
-        except IOError:
-            return False
+        """Save profile data to JSON file (written on the I/O thread)"""
+        profiles_path = os.path.join('data', 'characters')
+        
+        # Create a safe filename
+        safe_name = "".join(c for c in self.character.name if c.isalnum() or c in (' ', '-', '_')).rstrip()
+        filename = f"{safe_name}.json"
+        filepath = os.path.join(profiles_path, filename)
+        profile_data = self.character.to_dict()
+        
+        def save():
+            os.makedirs(profiles_path, exist_ok=True)
+            return write_json(filepath, profile_data)
+        
+        return io_executor.submit(save, write=True)
     
     def back_to_profiles(self):
         """Return to the profile screen without saving"""
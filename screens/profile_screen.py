@@ -1,4 +1,5 @@
 # screens/profile_screen.py
+from kivy.clock import Clock
 from kivy.uix.screenmanager import Screen
 from kivy.properties import ListProperty, ObjectProperty
 from kivy.uix.boxlayout import BoxLayout
@@ -7,6 +8,8 @@ from kivy.uix.label import Label
 from kivy.uix.scrollview import ScrollView
 from kivy.uix.gridlayout import GridLayout
 from components.buttons import PrimaryButton
+from rules.models import Character
+from utils.io_executor import io_executor, write_json
 import os
 import json
 
@@ -74,6 +77,9 @@ class ProfileScreen(Screen):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.app = None
+        self._loading = None  # Stream of the list load in progress
+        self._pending = []  # Profiles read but not on the list yet
+        self._add_pending = Clock.create_trigger(self.add_pending_buttons)
         
     def on_enter(self):
         """Called when the screen is displayed"""
@@ -86,14 +92,20 @@ class ProfileScreen(Screen):
         self.load_profiles()
     
     def load_profiles(self):
-        """Load and display all character profiles"""
+        """Load and display all character profiles
+        
+        Files are read and parsed on the I/O threads and the buttons are
+        added in batches per frame, so the list fills in while the rest is
+        still loading without a relayout per button.
+        """
+        if self._loading is not None:
+            self._loading.cancel()
+        self._pending = []
+        
         # Clear existing profiles
         if self.ids.get('profiles_container'):
             self.ids.profiles_container.clear_widgets()
         
-        # Get profiles from data directory
-        profiles = self.get_profile_files()
-        
         # Add create new profile button
         create_btn = PrimaryButton(
             text="Create New Profile",
@@ -105,19 +117,46 @@ class ProfileScreen(Screen):
         if self.ids.get('profiles_container'):
             self.ids.profiles_container.add_widget(create_btn)
         
-        # Add profile buttons
-        for profile_file in profiles:
-            profile_data = self.load_profile(profile_file)
-            if profile_data:
-                profile_btn = ProfileButton(
-                    profile_data=profile_data,
-                    size_hint_y=None,
-                    height=60
-                )
-                profile_btn.bind(on_press=self.select_profile)
-                
-                if self.ids.get('profiles_container'):
-                    self.ids.profiles_container.add_widget(profile_btn)
+        # Get profiles from data directory and add their buttons as they arrive
+        self._loading = io_executor.stream(self.read_character, self.get_profile_files, self.add_profile_button)
+        return self._loading
+    
+    def read_character(self, filename):
+        """Read a profile file into a compact Character (runs on an I/O thread)"""
+        profile_data = self.load_profile(filename)
+        return Character.from_dict(profile_data) if profile_data else None
+    
+    def add_profile_button(self, filename, character):
+        """Queue the button for one loaded profile"""
+        if character is None:
+            return
+        self._pending.append(character)
+        self._add_pending()
+    
+    def add_pending_buttons(self, dt=None):
+        """Add the queued buttons, at most as many as the list already has
+        
+        Every frame that adds buttons lays out the whole list again, so the
+        batch grows with the list: the first profile shows on the next frame
+        and a long list still takes only a handful of relayouts.
+        """
+        container = self.ids.get('profiles_container')
+        if container is None:
+            self._pending = []
+            return
+        batch = max(len(container.children), 1)
+        pending, self._pending = self._pending[:batch], self._pending[batch:]
+        if self._pending:
+            self._add_pending()
+        for character in pending:
+            # Each button keeps the compact Character, not the JSON dict
+            profile_btn = ProfileButton(
+                profile_data=character,
+                size_hint_y=None,
+                height=60
+            )
+            profile_btn.bind(on_press=self.select_profile)
+            container.add_widget(profile_btn)
     
     def get_profile_files(self):
         """Get list of profile files"""
@@ -140,11 +179,11 @@ class ProfileScreen(Screen):
     
     def select_profile(self, profile_data):
         """Select a profile and return to main screen"""
-        self.app.current_profile = profile_data
+        self.app.current_profile = profile_data.to_dict()
         self.app.screen_manager.current = 'main'
     def edit_profile(self, profile_data):
         """Edit a profile"""
-        self.app.current_profile = profile_data
+        self.app.current_profile = profile_data.to_dict()
         self.app.screen_manager.current = 'profile_editor'
 
     def create_new_profile(self, instance):
@@ -154,48 +193,35 @@ class ProfileScreen(Screen):
         self.app.screen_manager.current = 'profile_editor'
 
     def save_profile(self, profile_data):
-        """Save a profile to file"""
-        try:
-            profiles_path = os.path.join('data', 'characters')
-            if not os.path.exists(profiles_path):
-                os.makedirs(profiles_path)
-            
-            # Create a safe filename
-            safe_name = "".join(c for c in profile_data['name'] if c.isalnum() or c in (' ', '-', '_')).rstrip()
-            filename = f"{safe_name}.json"
-            filepath = os.path.join(profiles_path, filename)
-            
-            with open(filepath, 'w') as f:
-                json.dump(profile_data, f, indent=4)
-            
-            return True
-        except IOError:
-            return False
+        """Save a profile to file (written on the I/O thread)"""
+        profiles_path = os.path.join('data', 'characters')
+        
+        # Create a safe filename
+        safe_name = "".join(c for c in profile_data['name'] if c.isalnum() or c in (' ', '-', '_')).rstrip()
+        filename = f"{safe_name}.json"
+        filepath = os.path.join(profiles_path, filename)
+        
+        def save():
+            os.makedirs(profiles_path, exist_ok=True)
+            return write_json(filepath, profile_data)
+        
+        return io_executor.submit(save, write=True)
     
     def delete_profile(self, profile_data):
         """Delete a profile file"""
-        try:
-            profiles_path = os.path.join('data', 'characters')
-            
-            # Create the same safe filename as when saving
-            safe_name = "".join(c for c in profile_data['name'] if c.isalnum() or c in (' ', '-', '_')).rstrip()
-            filename = f"{safe_name}.json"
-            filepath = os.path.join(profiles_path, filename)
-            
-            # Remove the file if it exists
-            if os.path.exists(filepath):
-                os.remove(filepath)
-            
-            # If this was the currently selected profile, clear it
-            if self.app.current_profile and self.app.current_profile.get('name') == profile_data.get('name'):
-                self.app.current_profile = None
-            
-            # Refresh the profile list
-            self.load_profiles()
-            
-            return True
-        except IOError:
-            return False
+        profiles_path = os.path.join('data', 'characters')
+        
+        # Create the same safe filename as when saving
+        safe_name = "".join(c for c in profile_data['name'] if c.isalnum() or c in (' ', '-', '_')).rstrip()
+        filename = f"{safe_name}.json"
+        filepath = os.path.join(profiles_path, filename)
+        
+        # If this was the currently selected profile, clear it
+        if self.app.current_profile and self.app.current_profile.get('name') == profile_data.get('name'):
+            self.app.current_profile = None
+        
+        # Remove the file on the I/O thread, then refresh the profile list
+        return io_executor.remove(filepath, on_done=lambda path: self.load_profiles())
     
     def back_to_main(self):
         """Return to the main screen"""
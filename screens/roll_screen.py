@@ -1,7 +1,6 @@
 # screens/roll_screen.py
 from kivy.uix.screenmanager import Screen
 from kivy.properties import StringProperty, NumericProperty, ListProperty, ObjectProperty, BooleanProperty
-from kivy.animation import Animation
 from kivy.clock import Clock
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.label import Label
@@ -9,8 +8,30 @@ from kivy.uix.image import Image
 from kivy.uix.widget import Widget
 from kivy.graphics import Color, Ellipse, PushMatrix, PopMatrix, Rotate
 from components.buttons import PrimaryButton
-from utils.calculations import calculate_modifier, calculate_proficiency_bonus
-import random
+from components.dice_pool import DicePool, get_dice_atlas
+from components.glyph_cache import DICE_NUMBERS, GlyphLabel, glyph_cache
+from rules.checks import (
+    D20_ROLL_TYPES,
+    attack_spec,
+    ability_check_spec,
+    basic_spec,
+    custom_spec,
+    default_weapons,
+    initiative_spec,
+    resolve_roll,
+    roll_damage,
+    saving_throw_spec,
+)
+from rules.macros import macro_library
+from utils.combat_journal import combat_log
+from utils.event_bus import ROLL_RESULT, event_bus
+from utils.frame_governor import frame_governor
+from utils.io_executor import io_executor
+from utils.latency_tracer import tracer
+from utils.roll_controller import RollController, ROLLING, SETTLING
+from utils.roll_ledger import roll_ledger
+from utils.session import session
+from utils.tumble import tumble_library
 import os
 import math
 
@@ -25,8 +46,6 @@ class DiceAnimation(Widget):
         super().__init__(**kwargs)
         self.dice_type = dice_type
         self.current_value = 1
-        self.animation_event = None
-        self.rolling = False
         
         # Create the image widget
         self.dice_image = Image(
@@ -186,57 +205,34 @@ class DiceAnimation(Widget):
                 with self.fallback_shape.canvas.after:
                     from kivy.graphics import PopMatrix
                     PopMatrix()
-    def start_roll(self, duration=2.0, pause_before=0.5):
-        """Start the dice rolling animation with optional pause before starting"""
-        self.rolling = True
-        self.current_value = 1
-        
-        # Schedule the actual animation to start after the pause
-        Clock.schedule_once(lambda dt: self._begin_animation(duration), pause_before)
-        
-    def _begin_animation(self, duration):
-        """Begin the actual rolling animation after the pause"""
-        # Schedule value changes to simulate rolling
-        self.animation_event = Clock.schedule_interval(self.update_value, 0.1)
-        
-        # Schedule the end of animation
-        Clock.schedule_once(lambda dt: self.stop_roll(), duration)
-        
-        # Add visual animation (rotation and scaling)
-        rotation_anim = Animation(rotation=720, duration=duration)  # Two full rotations
-        rotation_anim.start(self)
-        
-        scale_anim = (Animation(scale=1.3, duration=duration/3) + 
-                      Animation(scale=0.8, duration=duration/3) + 
-                      Animation(scale=1.0, duration=duration/3))
-        scale_anim.start(self)
     
-    def update_value(self, dt):
-        """Update the displayed value during rolling"""
-        if self.rolling:
-            self.current_value = random.randint(1, self.dice_type)
-            
-    def stop_roll(self):
-        """Stop the rolling animation and get final result"""
-        if self.animation_event:
-            self.animation_event.cancel()
-            self.animation_event = None
-        
-        self.rolling = False
-        # Final roll
-        final_result = random.randint(1, self.dice_type)
-        self.current_value = final_result
-        
-        # Stop rotation smoothly
-        stop_anim = Animation(rotation=0, duration=0.3)
-        stop_anim.start(self)
-        
-        return final_result
+    def set_roll_progress(self, progress):
+        """Pose the dice for a point in the tumble (0 -> 1)"""
+        self.rotation = 720 * progress  # Two full rotations
+        
+        # Scale pulse: 1.0 -> 1.3 -> 0.8 -> 1.0 in equal thirds
+        if progress < 1 / 3:
+            self.scale = 1.0 + 0.3 * (progress * 3)
+        elif progress < 2 / 3:
+            self.scale = 1.3 - 0.5 * ((progress - 1 / 3) * 3)
+        else:
+            self.scale = 0.8 + 0.2 * ((progress - 2 / 3) * 3)
+    
+    def set_settle_progress(self, progress):
+        """Unwind the rotation while the dice settle on the final face"""
+        self.rotation = 720 * (1 - progress)
+        self.scale = 1
+    
+    def set_pose(self, center, angle, scale):
+        """Place the dice for one keyframe of a precomputed tumble"""
+        self.center = center
+        self.rotation = angle
+        self.scale = scale
 
 class RollScreen(Screen):
     """Screen for displaying dice rolls and results"""
     
-    roll_type = StringProperty("")  # "attack", "saving_throw", "ability_check", "basic", "damage"
+    roll_type = StringProperty("")  # "attack", "saving_throw", "ability_check", "initiative", "basic", "damage"
     dice_type = NumericProperty(20)
     result = NumericProperty(0)
     modifier = NumericProperty(0)
@@ -246,13 +242,74 @@ class RollScreen(Screen):
     critical_fail = BooleanProperty(False)
     show_attack_result = BooleanProperty(False)
     attack_success = BooleanProperty(False)
+    fast_animation = BooleanProperty(True)  # Short settle animation in fast mode
+    fast_animation_duration = NumericProperty(0.3)
+    
+    VALUE_FONT_SIZE = 32  # Font size of the flickering value under the dice
     
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.app = None
         self.dice_animation = None
-        self.roll_callback = None
+        self.dice_pool = None  # Batched renderer used when more than one die is rolled
+        self.current_value_label = None
+        self.roll_callback = None  # Called with each outcome, e.g. by the initiative tracker
+        self.return_screen = 'main'  # Where "Back" goes
         self.weapon_data = None  # Store weapon data for damage rolls
+        self.pool_sides = (20,)  # Sides of each die in the roll
+        self._tumbles = None  # Precomputed trajectories played by the current roll
+        self._tumble_duration = 0
+        self._rest_center = (0, 0)
+        self._result_shown = False
+        self._decided_result = None  # Natural total decided before the animation (damage)
+        self._deferred_event = None  # Single pending deferred action (touch-safe)
+        self._deferred_callback = None
+        
+        # The controller owns the only roll timer; everything else reacts to it
+        self.controller = RollController()
+        self.controller.on_state = self._on_roll_state
+        self.controller.on_frame = self._on_roll_frame
+        self.controller.on_result = self._on_roll_result
+        # Keep the full frame rate for the whole roll
+        frame_governor.add_activity_source(lambda: self.controller.busy)
+        
+        # Render the flicker values once, in idle frames, instead of on every tick
+        glyph_cache.prewarm_when_idle(DICE_NUMBERS, font_size=self.VALUE_FONT_SIZE, bold=True)
+        # Build the shared dice atlas in an idle frame rather than on the first pool roll
+        Clock.schedule_once(lambda dt: get_dice_atlas(), 1.0)
+        # Load (or simulate) the tumble trajectories on an I/O thread, one die type at a time between rolls
+        self._tumble_warming = False
+        Clock.schedule_interval(self._warm_tumbles, 0.2)
+    
+    def _warm_tumbles(self, dt):
+        """Hand the next die type to an I/O thread while no roll is playing; unschedules once all are ready"""
+        if self._tumble_warming or self.controller.busy:
+            return True
+        sides = tumble_library.next_cold()
+        if sides is None:
+            return False
+        
+        def warmed(*args):
+            self._tumble_warming = False
+        
+        self._tumble_warming = True
+        io_executor.submit(tumble_library.load, sides, on_done=warmed, on_error=warmed)
+        return True
+    
+    def is_fast_mode(self):
+        """Return True when the app is configured for instant results"""
+        return bool(self.app and getattr(self.app, 'fast_mode', False))
+    
+    def on_pre_enter(self):
+        """Called before the transition; fast mode renders the result here"""
+        if not self.app:
+            from kivy.app import App
+            self.app = App.get_running_app()
+        
+        if self.is_fast_mode():
+            tracer.stamp('screen_enter')
+            self.reset_roll()
+            self.start_fast_roll()
         
     def on_enter(self):
         """Called when the screen is displayed"""
@@ -261,7 +318,28 @@ class RollScreen(Screen):
             from kivy.app import App
             self.app = App.get_running_app()
         
-        # Reset UI state completely
+        # Fast mode already rendered the result in on_pre_enter
+        if self.is_fast_mode():
+            return
+        tracer.stamp('screen_enter')
+        
+        self.reset_roll()
+        self.start_roll()
+    
+    def on_leave(self, *args):
+        """Stop any roll still in progress when the screen goes away"""
+        self.controller.cancel()
+        return super().on_leave(*args)
+    
+    def reset_roll(self):
+        """Cancel the current roll and reset the UI to its initial state"""
+        self.controller.cancel()
+        self._result_shown = False
+        self._decided_result = None
+        self._tumbles = None
+        
+        self.critical_hit = False
+        self.critical_fail = False
         self.show_attack_result = False
         self.attack_success = False
         self.result = 0
@@ -271,15 +349,10 @@ class RollScreen(Screen):
         if self.ids.get('result_label'):
             self.ids.result_label.text = "Preparing roll..."
         
-        # Clear any existing content only once at start
         self.clear_all_containers()
-        
-        # Cancel any existing update events
-        if hasattr(self, 'update_event'):
-            self.update_event.cancel()
-        
-        # Start the roll animation with a small delay to ensure layout is ready
-        Clock.schedule_once(lambda dt: self.start_roll(), 0.2)
+        self.dice_animation = None
+        self.dice_pool = None
+        self.current_value_label = None
     
     def clear_all_containers(self):
         """Clear all dynamic containers once"""
@@ -290,125 +363,238 @@ class RollScreen(Screen):
         if self.ids.get('attack_result_container'):
             self.ids.attack_result_container.clear_widgets()
 
-    def setup_roll(self, roll_type, dice_type=20, modifier=0, description="", callback=None, weapon_data=None):
+    def setup_roll(self, roll_type, dice_type=20, modifier=0, description="", callback=None, weapon_data=None,
+                   dice_pool=None, return_screen='main'):
         """Set up the roll parameters"""
+        tracer.stamp('roll_setup')
         self.roll_type = roll_type
         self.dice_type = dice_type
+        self.pool_sides = tuple(dice_pool) if dice_pool else (dice_type,)
         self.modifier = modifier
         self.roll_description = description
         self.roll_callback = callback
+        self.return_screen = return_screen
         self.weapon_data = weapon_data
         self.critical_hit = False
         self.critical_fail = False
         self.show_attack_result = False
         self.attack_success = False
-        
+    
     def start_roll(self):
         """Start the dice roll animation"""
-        if self.ids.get('animation_container') and self.roll_type != "damage":
-            # Only clear if there's existing content
-            container = self.ids.animation_container
-            if container.children:
-                container.clear_widgets()
-            
-            # Update result label to show rolling state
+        if self.roll_type == "damage":
+            # Damage dice are rolled up front and then animated
             if self.ids.get('result_label'):
-                self.ids.result_label.text = "Rolling..."
-            
-            # Create the dice animation with bigger size for the larger container
-            self.dice_animation = DiceAnimation(
-                dice_type=self.dice_type,
+                self.ids.result_label.text = "Calculating damage..."
+            self._perform_damage_roll()
+            return
+        
+        # Update result label to show rolling state
+        if self.ids.get('result_label'):
+            self.ids.result_label.text = "Rolling..."
+        
+        self._build_dice(with_value_label=True)
+        tracer.stamp('animation_setup')
+        self._start_animated_roll(pause_before=0.5)
+    
+    def _start_animated_roll(self, final_values=None, pause_before=0.5, duration=2.0):
+        """Run the full roll animation, playing a physical tumble when one is available"""
+        if final_values is None:
+            final_values = [session.rng.randint(1, sides) for sides in self.pool_sides]
+        
+        # Trajectories are indexed by final face, so the throw lands on the decided values
+        self._tumbles = tumble_library.pick_many(self.pool_sides, final_values)
+        if self._tumbles:
+            self._tumble_duration = max(trajectory.duration for trajectory in self._tumbles)
+            duration = self._tumble_duration
+        self.controller.start(self.pool_sides, duration=duration, pause_before=pause_before, settle_time=0.3,
+                              final_values=final_values)
+    
+    def start_fast_roll(self):
+        """Decide the result immediately and render it within the current frame"""
+        if self.roll_type == "damage":
+            self._perform_damage_roll()
+            return
+        
+        rolls = [session.rng.randint(1, sides) for sides in self.pool_sides]
+        self._start_fast_animation(rolls)
+        self.show_result(sum(rolls))
+    
+    def _start_fast_animation(self, rolls):
+        """Short, interruptible settle animation that ends on the known dice"""
+        if self.fast_animation and self._build_dice(with_value_label=False):
+            self.controller.start(
+                self.pool_sides,
+                duration=self.fast_animation_duration,
+                pause_before=0,
+                settle_time=0,
+                final_values=rolls
+            )
+    
+    def _build_dice(self, with_value_label):
+        """Create the dice widget (and optional value label) in the animation container"""
+        container = self.ids.get('animation_container')
+        if container is None:
+            return False
+        
+        if len(self.pool_sides) > 1:
+            # Whole pools are drawn by one widget from the shared dice atlas
+            self.dice_pool = DicePool(
+                self.pool_sides,
                 size_hint=(None, None),
-                size=(180, 180)  # Increased from (140, 140) to (180, 180)
+                size=container.size,
+                pos=container.pos
             )
-            
-            # Calculate center position before adding to container
-            def setup_animation(*args):
-                if container.size[0] > 0 and container.size[1] > 0:
-                    # Position dice in center of container
-                    self.dice_animation.center_x = container.center_x
-                    self.dice_animation.center_y = container.center_y
-                    
-                    # Add the dice to container
-                    container.add_widget(self.dice_animation)
-                    
-                    # Force update of dice image position immediately
-                    self.dice_animation.update_image_pos()
-                    
-                    # Create text label positioned below dice (bigger)
-                    self.current_value_label = Label(
-                        text=str(self.dice_animation.current_value),
-                        font_size=32,  # Increased from 24 to 32
-                        bold=True,
-                        color=(1, 1, 0.8, 1),  # Light yellow
-                        size_hint=(None, None),
-                        size=(100, 40),  # Increased from (80, 30) to (100, 40)
-                        center_x=container.center_x,
-                        y=self.dice_animation.y - 40  # Increased offset from -60 to -80
-                    )
-                    container.add_widget(self.current_value_label)
-                    
-                    # Start the animation AFTER positioning is complete
-                    self.dice_animation.start_roll(duration=2.0)
-                    
-                    # Schedule periodic updates of the text
-                    self.update_event = Clock.schedule_interval(self.update_dice_text, 0.15)
-                    
-                    # Schedule the result display (add pause duration to timing)
-                    Clock.schedule_once(lambda dt: self.show_result(), 2.8)  # 2.0 + 0.5 pause + 0.3 buffer
-            
-            # Wait for layout to be complete, then setup animation
-            Clock.schedule_once(setup_animation, 0.1)
-        else:
-            # For damage rolls, show result immediately
-            if self.ids.get('result_label'):
-                self.ids.result_label.text = "Calculating damage..."
-            Clock.schedule_once(lambda dt: self.show_result(), 0.1)
+            container.add_widget(self.dice_pool)
+            return True
+        
+        # Create the dice animation with bigger size for the larger container
+        self.dice_animation = DiceAnimation(
+            dice_type=self.dice_type,
+            size_hint=(None, None),
+            size=(180, 180)
+        )
+        self.dice_animation.center = container.center
+        self._rest_center = container.center
+        container.add_widget(self.dice_animation)
+        
+        # Force update of dice image position immediately
+        self.dice_animation.update_image_pos()
+        
+        if with_value_label:
+            # Create text label positioned below dice (cached glyph textures)
+            self.current_value_label = GlyphLabel(
+                text=str(self.dice_animation.current_value),
+                font_size=self.VALUE_FONT_SIZE,
+                bold=True,
+                color=(1, 1, 0.8, 1),  # Light yellow
+                size_hint=(None, None),
+                size=(100, 40),
+                center_x=container.center_x,
+                y=self.dice_animation.y - 40
+            )
+            container.add_widget(self.current_value_label)
+        return True
+    
+    def on_touch_down(self, touch):
+        """Tapping the dice skips a running fast-mode animation"""
+        if self.is_fast_mode() and self.controller.busy:
+            container = self.ids.get('animation_container')
+            if container is not None and container.collide_point(*touch.pos):
+                session.input('skip')
+                self.controller.skip()
+                return True
+        return super().on_touch_down(touch)
     
-    def update_dice_text(self, dt):
-        """Update the dice value text during animation"""
-        if hasattr(self, 'current_value_label') and self.dice_animation:
-            self.current_value_label.text = str(self.dice_animation.current_value)
-            if self.dice_animation.rolling:
+    # ------------------------------------------------------------------
+    # Roll controller callbacks
+    # ------------------------------------------------------------------
+    def _on_roll_state(self, state):
+        """React to roll lifecycle changes"""
+        if state == ROLLING:
+            tracer.stamp('animation_begin')
+        elif state == SETTLING:
+            tracer.stamp('animation_stop')
+    
+    def _on_roll_frame(self, state, progress, value):
+        """Update the dice visuals for the current controller tick"""
+        if self._tumbles:
+            self._show_tumble_frame(state, progress)
+            return
+        
+        if self.dice_pool:
+            self.dice_pool.set_values(self.controller.values)
+            if state == ROLLING:
+                self.dice_pool.set_roll_progress(progress)
+                self.dice_pool.set_number_color((1, 1, 0, 1))  # Yellow while rolling
+            else:
+                self.dice_pool.set_settle_progress(progress)
+                self.dice_pool.set_number_color((1, 1, 1, 1))  # White when stopped
+        
+        if self.dice_animation:
+            self.dice_animation.current_value = value
+            if state == ROLLING:
+                self.dice_animation.set_roll_progress(progress)
+            else:
+                self.dice_animation.set_settle_progress(progress)
+        
+        if self.current_value_label:
+            self.current_value_label.text = str(value)
+            if state == ROLLING:
                 self.current_value_label.color = (1, 1, 0, 1)  # Yellow while rolling
-                # Keep result label showing "Rolling..." during animation
-                if self.ids.get('result_label'):
-                    self.ids.result_label.text = "Rolling..."
             else:
                 self.current_value_label.color = (1, 1, 1, 1)  # White when stopped
-                if hasattr(self, 'update_event'):
-                    self.update_event.cancel()
     
-    def show_result(self):
+    def _show_tumble_frame(self, state, progress):
+        """Pose the dice from their trajectories; the faces follow the tumble"""
+        t = progress * self._tumble_duration if state == ROLLING else self._tumble_duration
+        poses = [trajectory.sample(t) for trajectory in self._tumbles]
+        faces = [trajectory.face_at(t) for trajectory in self._tumbles]
+        color = (1, 1, 0, 1) if state == ROLLING else (1, 1, 1, 1)  # Yellow while rolling
+        
+        if self.dice_pool:
+            self.dice_pool.set_poses(poses)
+            self.dice_pool.set_values(faces)
+            self.dice_pool.set_number_color(color)
+        
+        if self.dice_animation:
+            container = self.ids.animation_container
+            dx, dy, angle, scale = poses[0]
+            rest_x, rest_y = self._rest_center
+            center = (rest_x + dx * container.width / 2, rest_y + dy * container.height / 2)
+            self.dice_animation.current_value = faces[0]
+            self.dice_animation.set_pose(center, angle, scale)
+        
+        if self.current_value_label:
+            self.current_value_label.text = str(sum(faces))
+            self.current_value_label.color = color
+    
+    def _on_roll_result(self, value):
+        """The dice have settled; show the result unless it is already on screen"""
+        if not self._result_shown:
+            self.show_result(value if self._decided_result is None else self._decided_result)
+    
+    def show_result(self, roll_result=None):
         """Display the roll result"""
-        if self.dice_animation and self.roll_type != "damage":
-            # Get the final result from animation
-            roll_result = self.dice_animation.current_value
-        else:
-            # For damage rolls, calculate directly
-            roll_result = random.randint(1, self.dice_type)
+        # The controller, fast mode and damage rolls pass in the decided result
+        if roll_result is None:
+            roll_result = session.rng.randint(1, self.dice_type)
         
-        self.result = roll_result
-        self.total = roll_result + self.modifier
+        outcome = resolve_roll(self.roll_type, self.dice_type, roll_result, self.modifier)
+        self._result_shown = True
+        self.result = outcome['natural']
+        self.total = outcome['total']
+        tracer.stamp('result')
         
-        # Print d20 rolls with character name and rolled value
-        if self.dice_type == 20:
-            character_name = self.app.current_profile.get('name', 'Unknown') if self.app and self.app.current_profile else 'Unknown'
-            print(f"Roll: {character_name} rolled {roll_result}")
+        # Results computed without the tumble still move the controller along
+        if not self.controller.busy:
+            self.controller.resolve(roll_result, damage=(self.roll_type == "damage"))
+        
+        character_name = self.app.current_profile.get('name', 'Unknown') if self.app and self.app.current_profile else 'Unknown'
         
         # Check for critical hits/fails
-        if self.dice_type == 20 and self.roll_type in ["attack", "saving_throw", "ability_check"]:
-            self.critical_hit = (roll_result == 20)
-            self.critical_fail = (roll_result == 1)
+        if self.dice_type == 20 and self.roll_type in D20_ROLL_TYPES:
+            self.critical_hit = outcome['critical_hit']
+            self.critical_fail = outcome['critical_fail']
+        
+        session.result(outcome)
+        roll_ledger.record(outcome, character_name)
+        if event_bus.has_subscribers(ROLL_RESULT):
+            event_bus.publish(ROLL_RESULT, dict(outcome, character=character_name))
         
         # Update the result label
         self.update_result_display()
+        if self.roll_callback is not None:
+            self.roll_callback(outcome)
         
         # Handle follow-up actions based on roll type
         if self.roll_type == "attack":
             self.handle_attack_result()
         elif self.roll_type == "damage":
             self.handle_damage_result()
+        
+        # Close the trace once the result has reached the screen
+        tracer.end_on_next_flip()
     
     def update_result_display(self):
         """Update the result display with formatting"""
@@ -454,6 +640,7 @@ class RollScreen(Screen):
     
     def confirm_hit(self):
         """User confirms the attack hit - proceed to damage roll"""
+        session.input('confirm_hit')
         if self.weapon_data:
             self.roll_damage(None)
         else:
@@ -491,125 +678,110 @@ class RollScreen(Screen):
                 
                 container.add_widget(button_layout)
     
+    def _defer(self, callback, delay):
+        """Run callback after touch handling completes, replacing any pending action"""
+        if self._deferred_event is not None:
+            self._deferred_event.cancel()
+        self._deferred_callback = callback
+        self._deferred_event = Clock.schedule_once(callback, delay)
+    
+    def flush_deferred(self):
+        """Run the pending deferred action now (session replay without a clock)"""
+        if self._deferred_event is not None:
+            self._deferred_event.cancel()
+            self._deferred_callback(0)
+    
     def roll_damage(self, instance):
         """Roll damage for an attack"""
-        # Use Clock.schedule_once to defer the action, preventing touchscreen crashes
-        Clock.schedule_once(lambda dt: self._perform_damage_roll(), 0.05)
+        tracer.begin('damage')
+        # Defer the action to prevent touchscreen crashes
+        # (fast mode only waits for the end of the current frame)
+        delay = 0 if self.is_fast_mode() else 0.05
+        self._defer(self._perform_damage_roll, delay)
     
-    def _perform_damage_roll(self):
+    def _perform_damage_roll(self, *args):
         """Internal method to perform the damage roll after touch events are handled"""
-        if not self.weapon_data:
-            # Default damage if no weapon data
-            damage_dice = "1d8"
-            damage_bonus = 0
-            damage_type = "slashing"
+        self._deferred_event = None
+        # Default 1d8 slashing damage if no weapon data; critical hits double the dice
+        try:
+            spec, outcome = roll_damage(self.weapon_data, critical=self.critical_hit, rng=session.rng)
+        except ValueError as error:
+            # Hand-edited damage dice that do not parse
+            tracer.cancel()
+            if self.ids.get('result_label'):
+                self.ids.result_label.text = f"Cannot roll damage: {error}"
+            return
+        combat_log.damage(
+            outcome['total'],
+            source=self.app.current_profile.get('name') if self.app and self.app.current_profile else None,
+            damage_type=outcome['damage_type'],
+            critical=self.critical_hit
+        )
+        
+        # Set up damage roll display
+        self.setup_roll(
+            roll_type="damage",
+            dice_type=spec.dice_type,
+            modifier=spec.modifier,
+            description=spec.description,
+            weapon_data=self.weapon_data,
+            dice_pool=spec.dice_pool
+        )
+        self.reset_roll()
+        
+        # The dice are already rolled; the animation lands on the same values
+        self._decided_result = outcome['natural']
+        if self.is_fast_mode():
+            self._start_fast_animation(outcome['rolls'])
+            self.show_result(outcome['natural'])
+        elif self._build_dice(with_value_label=True):
+            if self.ids.get('result_label'):
+                self.ids.result_label.text = "Rolling damage..."
+            self._start_animated_roll(outcome['rolls'], pause_before=0, duration=1.0)
         else:
-            damage_dice = self.weapon_data.get('damage_dice', '1d8')
-            damage_bonus = self.weapon_data.get('damage_bonus', 0)
-            damage_type = self.weapon_data.get('damage_type', 'slashing')
-        
-        # Parse damage dice (e.g., "2d6")
-        if 'd' in damage_dice:
-            parts = damage_dice.split('d')
-            count = int(parts[0]) if parts[0] else 1
-            sides = int(parts[1])
-            
-            # Double dice on critical hit
-            if self.critical_hit:
-                count *= 2
-                description = f"Critical Damage: {count}d{sides}"
-            else:
-                description = f"Damage: {damage_dice}"
-            
-            if damage_bonus != 0:
-                description += f" + {damage_bonus}"
-            description += f" ({damage_type})"
-            
-            # Calculate total damage
-            dice_damage = sum(random.randint(1, sides) for _ in range(count))
-            total_damage = dice_damage + damage_bonus
-            
-            # Set up damage roll display
-            self.setup_roll(
-                roll_type="damage",
-                dice_type=sides,
-                modifier=damage_bonus,
-                description=description,
-                weapon_data=self.weapon_data
-            )
-            
-            # Set the result directly (showing individual dice + bonus)
-            self.result = dice_damage
-            self.total = total_damage
-            self.show_result()
+            self.show_result(outcome['natural'])
     
     def new_roll(self, *args):
         """Start a new roll of the same type"""
-        # Use Clock.schedule_once to defer the action, allowing touch events to complete
+        session.input('new_roll')
+        tracer.begin('reroll')
+        # Defer the action, allowing touch events to complete
         # This prevents crashes on touchscreens where touch events might conflict with widget clearing
-        Clock.schedule_once(self._perform_new_roll, 0.05)
+        delay = 0 if self.is_fast_mode() else 0.05
+        self._defer(self._perform_new_roll, delay)
     
     def _perform_new_roll(self, dt):
         """Internal method to perform the new roll after touch events are handled"""
-        # Cancel any existing update events
-        if hasattr(self, 'update_event'):
-            try:
-                self.update_event.cancel()
-            except:
-                pass  # Ignore if already cancelled
+        self._deferred_event = None
+        self.reset_roll()
         
-        # Cancel any existing animations
-        if hasattr(self, 'dice_animation') and self.dice_animation:
-            Animation.cancel_all(self.dice_animation)
-        
-        # Reset critical states
-        self.critical_hit = False
-        self.critical_fail = False
-        self.show_attack_result = False
-        self.attack_success = False
-        self.result = 0
-        self.total = 0
-        
-        # Clear result label immediately
-        if self.ids.get('result_label'):
-            self.ids.result_label.text = "Preparing roll..."
-        
-        # Clear containers only once
-        try:
-            self.clear_all_containers()
-        except:
-            pass  # Ignore if containers already cleared
-        
-        # Restart the roll with a small delay
-        Clock.schedule_once(lambda dt: self.start_roll(), 0.2)
+        # Restart the roll (fast mode renders the result right away)
+        if self.is_fast_mode():
+            self.start_fast_roll()
+        else:
+            self.start_roll()
     
     def back_to_main(self, *args):
         """Return to the main screen"""
-        # Use Clock.schedule_once to defer screen transition, preventing touchscreen crashes
-        Clock.schedule_once(self._perform_back_to_main, 0.05)
+        session.input('back_to_main')
+        # Defer screen transition, preventing touchscreen crashes
+        self._defer(self._perform_back_to_main, 0.05)
     
     def _perform_back_to_main(self, dt):
         """Internal method to perform screen transition after touch events are handled"""
-        # Cancel any existing update events
-        if hasattr(self, 'update_event'):
-            try:
-                self.update_event.cancel()
-            except:
-                pass  # Ignore if already cancelled
+        self._deferred_event = None
+        self.reset_roll()
         
-        # Cancel any existing animations
-        if hasattr(self, 'dice_animation') and self.dice_animation:
-            Animation.cancel_all(self.dice_animation)
-        
-        # Clear containers before transitioning
-        try:
-            self.clear_all_containers()
-        except:
-            pass  # Ignore if already cleared
-        
-        # Transition to main screen
+        # Transition back to where the roll came from
         if self.app and self.app.screen_manager:
-            self.app.screen_manager.current = 'main'
+            self.app.screen_manager.current = self.return_screen
+
+
+def print_roll(outcome):
+    """Print d20 rolls with character name and rolled value (a ROLL_RESULT subscriber)"""
+    if outcome['dice_type'] == 20:
+        print(f"Roll: {outcome['character']} rolled {outcome['natural']}")
+
 
 class RollManager:
     """Manager class for handling different types of rolls"""
@@ -623,11 +795,15 @@ class RollManager:
         """Show ability selection dialog"""
         def on_dialog_dismiss(instance):
             if instance.selected_option:
+                tracer.stamp('dialog_selected')
                 self.current_ability = instance.selected_option
-                if roll_type == "saving_throw":
-                    self.roll_saving_throw(instance.selected_option)
-                elif roll_type == "ability_check":
-                    self.roll_ability_check(instance.selected_option)
+                with session.source('dialog'):
+                    if roll_type == "saving_throw":
+                        self.roll_saving_throw(instance.selected_option)
+                    elif roll_type == "ability_check":
+                        self.roll_ability_check(instance.selected_option)
+            else:
+                tracer.cancel()
         
         if roll_type == "saving_throw":
             # Use simple dialog for saving throws (just the 6 abilities)
@@ -655,8 +831,12 @@ class RollManager:
         
         def on_dialog_dismiss(instance):
             if instance.selected_option is not None:
+                tracer.stamp('dialog_selected')
                 weapon_index = weapons.index(next(w for w in weapons if w.get('name') == instance.selected_option))
-                self.roll_attack(weapon_index)
+                with session.source('dialog'):
+                    self.roll_attack(weapon_index)
+            else:
+                tracer.cancel()
         
         dialog = WeaponDialog(weapons)
         dialog.bind(on_dismiss=on_dialog_dismiss)
@@ -668,6 +848,7 @@ class RollManager:
         
         def on_dialog_dismiss(instance):
             if instance.selected_option:
+                tracer.stamp('dialog_selected')
                 if instance.selected_option == "Custom":
                     self.show_custom_dice_input()
                 else:
@@ -676,7 +857,10 @@ class RollManager:
                         parts = instance.selected_option.split('d')
                         count = int(parts[0]) if parts[0] else 1
                         sides = int(parts[1])
-                        self.roll_custom_dice(count, sides)
+                        with session.source('dialog'):
+                            self.roll_custom_dice(count, sides)
+            else:
+                tracer.cancel()
         
         dialog = DiceDialog()
         dialog.bind(on_dismiss=on_dialog_dismiss)
@@ -688,22 +872,31 @@ class RollManager:
         # For now, just roll 1d20 as a placeholder
         self.roll_custom_dice(1, 20)
 
-    def roll_custom_dice(self, count, sides):
-        """Roll custom dice"""
-        # For multiple dice, we'll need to modify the roll screen to handle this
-        # For now, just roll one die of the specified type
+    def _start_roll(self, spec, callback=None, return_screen='main'):
+        """Hand a roll spec to the roll screen and switch to it"""
         roll_screen = self.app.screen_manager.get_screen('roll')
         roll_screen.setup_roll(
-            roll_type="custom",
-            dice_type=sides,
-            modifier=0,
-            description=f"{count}d{sides} Roll"
+            roll_type=spec.roll_type,
+            dice_type=spec.dice_type,
+            modifier=spec.modifier,
+            description=spec.description,
+            callback=callback,
+            weapon_data=spec.weapon,
+            dice_pool=spec.dice_pool,
+            return_screen=return_screen
         )
         
         self.app.screen_manager.current = 'roll'
+        return spec.modifier
+
+    def roll_custom_dice(self, count, sides):
+        """Roll custom dice (several dice are animated as one pool)"""
+        session.input('roll_custom_dice', count, sides)
+        self._start_roll(custom_spec(count, sides))
 
     def roll_attack(self, weapon_index=0):
         """Roll an attack with the selected weapon"""
+        session.input('roll_attack', weapon_index)
         if not self.app.current_profile:
             return None
         
@@ -712,150 +905,46 @@ class RollManager:
         
         # Create sample weapons if none exist
         if not weapons:
-            weapons = [
-                {
-                    'name': 'Longsword',
-                    'ability': 'STR',
-                    'proficient': True,
-                    'damage_dice': '1d8',
-                    'damage_bonus': calculate_modifier(profile['abilities'].get('STR', 10)),
-                    'damage_type': 'slashing'
-                },
-                {
-                    'name': 'Dagger',
-                    'ability': 'DEX',
-                    'proficient': True,
-                    'damage_dice': '1d4',
-                    'damage_bonus': calculate_modifier(profile['abilities'].get('DEX', 10)),
-                    'damage_type': 'piercing'
-                }
-            ]
+            weapons = default_weapons(profile)
             # Update profile with default weapons
             profile['weapons'] = weapons
         
         if weapon_index >= len(weapons):
             weapon_index = 0
-            
-        weapon = weapons[weapon_index]
-        ability = weapon.get('ability', 'STR')
-        proficient = weapon.get('proficient', False)
         
-        # Calculate modifiers
-        ability_mod = calculate_modifier(profile['abilities'].get(ability, 10))
-        prof_bonus = calculate_proficiency_bonus(profile['level']) if proficient else 0
-        modifier = ability_mod + prof_bonus
-        
-        # Set up the roll screen
-        roll_screen = self.app.screen_manager.get_screen('roll')
-        roll_screen.setup_roll(
-            roll_type="attack",
-            dice_type=20,
-            modifier=modifier,
-            description=f"Attack with {weapon.get('name', 'Weapon')}",
-            weapon_data=weapon
-        )
-        
-        self.app.screen_manager.current = 'roll'
-        return modifier
+        return self._start_roll(attack_spec(profile, weapons[weapon_index]))
     
     def roll_saving_throw(self, ability):
         """Roll a saving throw for the specified ability"""
+        session.input('roll_saving_throw', ability)
         if not self.app.current_profile:
             return None
         
-        profile = self.app.current_profile
-        proficient = ability in profile.get('saving_throw_proficiencies', [])
-        
-        # Calculate modifiers
-        ability_mod = calculate_modifier(profile['abilities'].get(ability, 10))
-        prof_bonus = calculate_proficiency_bonus(profile['level']) if proficient else 0
-        modifier = ability_mod + prof_bonus
-        
-        # Set up the roll screen
-        roll_screen = self.app.screen_manager.get_screen('roll')
-        roll_screen.setup_roll(
-            roll_type="saving_throw",
-            dice_type=20,
-            modifier=modifier,
-            description=f"{ability} Saving Throw"
-        )
-        
-        self.app.screen_manager.current = 'roll'
-        return modifier
+        return self._start_roll(saving_throw_spec(self.app.current_profile, ability))
     
     def roll_ability_check(self, ability_or_skill):
         """Roll an ability check for the specified ability or skill"""
+        session.input('roll_ability_check', ability_or_skill)
         if not self.app.current_profile:
             return None
         
-        profile = self.app.current_profile
-        
-        # Define skill-to-ability mapping
-        skill_abilities = {
-            "Acrobatics": "DEX",
-            "Animal Handling": "WIS",
-            "Arcana": "INT",
-            "Athletics": "STR",
-            "Deception": "CHA",
-            "History": "INT",
-            "Insight": "WIS",
-            "Intimidation": "CHA",
-            "Investigation": "INT",
-            "Medicine": "WIS",
-            "Nature": "INT",
-            "Perception": "WIS",
-            "Performance": "CHA",
-            "Persuasion": "CHA",
-            "Religion": "INT",
-            "Sleight of Hand": "DEX",
-            "Stealth": "DEX",
-            "Survival": "WIS"
-        }
-        
-        # Check if it's a skill or basic ability
-        if ability_or_skill in skill_abilities:
-            # It's a skill
-            ability = skill_abilities[ability_or_skill]
-            skill_proficiencies = profile.get('skill_proficiencies', [])
-            is_proficient = ability_or_skill in skill_proficiencies
-            
-            # Calculate modifiers
-            ability_score = profile['abilities'].get(ability, 10)
-            ability_mod = calculate_modifier(ability_score)
-            prof_bonus = calculate_proficiency_bonus(profile['level']) if is_proficient else 0
-            modifier = ability_mod + prof_bonus
-            
-            description = f"{ability_or_skill} ({ability}) Check"
-            if is_proficient:
-                description += " (Proficient)"
-        else:
-            # It's a basic ability check
-            ability_mod = calculate_modifier(profile['abilities'].get(ability_or_skill, 10))
-            modifier = ability_mod
-            description = f"{ability_or_skill} Check"
-        
-        # Set up the roll screen
-        roll_screen = self.app.screen_manager.get_screen('roll')
-        roll_screen.setup_roll(
-            roll_type="ability_check",
-            dice_type=20,
-            modifier=modifier,
-            description=description
-        )
-        
-        self.app.screen_manager.current = 'roll'
-        return modifier
+        return self._start_roll(ability_check_spec(self.app.current_profile, ability_or_skill))
     
     def roll_dice(self, dice_type):
         """Roll a basic die with no modifiers"""
-        # Set up the roll screen
-        roll_screen = self.app.screen_manager.get_screen('roll')
-        roll_screen.setup_roll(
-            roll_type="basic",
-            dice_type=dice_type,
-            modifier=0,
-            description=f"d{dice_type} Roll"
-        )
+        session.input('roll_dice', dice_type)
+        return self._start_roll(basic_spec(dice_type))
+    
+    def roll_macro(self, index):
+        """Roll one of the current profile's macros (see rules/macros.py)"""
+        session.input('roll_macro', index)
+        programs = macro_library.programs(self.app.current_profile)
+        if index >= len(programs):
+            return None
         
-        self.app.screen_manager.current = 'roll'
-        return 0
\ No newline at end of file
+        return self._start_roll(programs[index].spec)
+    
+    def roll_initiative(self, profile, callback, return_screen='initiative'):
+        """Roll initiative for a profile; ``callback(outcome)`` gets each result"""
+        session.input('roll_initiative', dict(profile))
+        return self._start_roll(initiative_spec(profile), callback=callback, return_screen=return_screen)
@@ -0,0 +1,42 @@
+"""Shared test setup: run from anywhere with the project root importable.
+
+Most tests cover the Kivy-free modules (``rules/`` and most of ``utils/``)
+and give anything that needs a clock a fake one. Tests of screens and
+components take the ``kivy_window`` fixture, which opens a window (headless
+where there is no display) and skips them where Kivy is not installed.
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Headless window where there is no display, as in benchmarks/suite.py; keep
+# Kivy away from pytest's arguments and out of the terminal and ~/.kivy/logs
+if not (os.environ.get('DISPLAY') or os.environ.get('WAYLAND_DISPLAY')):
+    os.environ.setdefault('SDL_VIDEODRIVER', 'offscreen')
+os.environ.setdefault('KIVY_NO_ARGS', '1')
+os.environ.setdefault('KIVY_NO_CONSOLELOG', '1')
+os.environ.setdefault('KIVY_NO_FILELOG', '1')
+
+KV_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'kv')
+
+
+@pytest.fixture(scope='session')
+def kivy_window():
+    """The Kivy window, for tests that build widgets"""
+    pytest.importorskip('kivy')
+    from kivy.base import EventLoop
+
+    EventLoop.ensure_window()
+    return EventLoop.window
+
+
+@pytest.fixture(scope='session')
+def load_kv(kivy_window):
+    """Load kv/<name> once, as the app does on first use of a screen"""
+    from components.lazy_screen_manager import load_kv_once
+
+    return lambda name: load_kv_once(os.path.join(KV_PATH, name))
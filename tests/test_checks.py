@@ -0,0 +1,157 @@
+"""Roll specs, outcomes and the command line built on them"""
+
+import json
+import random
+
+import pytest
+
+import cli
+from rules.abilities import calculate_modifier, calculate_proficiency_bonus
+from rules.checks import (
+    ability_check_spec,
+    attack_spec,
+    damage_spec,
+    initiative_spec,
+    resolve_roll,
+    roll_damage,
+    roll_spec,
+    saving_throw_spec,
+)
+from rules.initiative import roll_initiative
+
+PROFILE = {
+    'name': 'Aria', 'level': 5,
+    'abilities': {'STR': 16, 'DEX': 14, 'CON': 12, 'INT': 10, 'WIS': 13, 'CHA': 8},
+    'skill_proficiencies': ['Stealth'],
+    'saving_throw_proficiencies': ['CON'],
+}
+LONGSWORD = {'name': 'Longsword', 'ability': 'STR', 'proficient': True,
+             'damage_dice': '1d8', 'damage_bonus': 3, 'damage_type': 'slashing'}
+
+
+@pytest.mark.parametrize('score, modifier', [(1, -5), (8, -1), (10, 0), (11, 0), (16, 3), (30, 10)])
+def test_ability_modifier(score, modifier):
+    assert calculate_modifier(score) == modifier
+
+
+@pytest.mark.parametrize('level, bonus', [(1, 2), (4, 2), (5, 3), (9, 4), (13, 5), (17, 6), (20, 6)])
+def test_proficiency_bonus(level, bonus):
+    assert calculate_proficiency_bonus(level) == bonus
+
+
+def test_attack_adds_proficiency():
+    assert attack_spec(PROFILE, LONGSWORD).modifier == 3 + 3
+    assert attack_spec(PROFILE, dict(LONGSWORD, proficient=False)).modifier == 3
+
+
+def test_saving_throw_and_checks():
+    assert saving_throw_spec(PROFILE, 'CON').modifier == 1 + 3
+    assert saving_throw_spec(PROFILE, 'DEX').modifier == 2
+    stealth = ability_check_spec(PROFILE, 'Stealth')
+    assert stealth.modifier == 2 + 3
+    assert stealth.description == "Stealth (DEX) Check (Proficient)"
+    assert ability_check_spec(PROFILE, 'WIS').modifier == 1
+
+
+@pytest.mark.parametrize('name', ['Stelth', 'stealth', 'FOO', ''])
+def test_unknown_check_raises(name):
+    with pytest.raises(ValueError, match="unknown ability or skill"):
+        ability_check_spec(PROFILE, name)
+
+
+@pytest.mark.parametrize('name', ['STRENGTH', 'dex', 'Stealth'])
+def test_unknown_saving_throw_raises(name):
+    with pytest.raises(ValueError, match="unknown ability"):
+        saving_throw_spec(PROFILE, name)
+
+
+@pytest.mark.parametrize('roll_type', ['attack', 'saving_throw', 'ability_check'])
+def test_d20_rolls_flag_criticals(roll_type):
+    assert resolve_roll(roll_type, 20, 20, 5)['critical_hit']
+    assert resolve_roll(roll_type, 20, 1, 5)['critical_fail']
+    assert not resolve_roll(roll_type, 20, 19, 5)['critical_hit']
+
+
+@pytest.mark.parametrize('roll_type, dice_type', [('initiative', 20), ('basic', 20), ('damage', 20), ('attack', 12)])
+def test_other_rolls_never_flag_criticals(roll_type, dice_type):
+    for natural in (1, dice_type):
+        outcome = resolve_roll(roll_type, dice_type, natural)
+        assert not outcome['critical_hit']
+        assert not outcome['critical_fail']
+
+
+def test_initiative_has_no_criticals():
+    spec = initiative_spec(PROFILE)
+    assert spec.roll_type == 'initiative'
+    assert spec.modifier == 2
+    outcomes = [roll_initiative(2, random.Random(seed)) for seed in range(200)]
+    assert {outcome['natural'] for outcome in outcomes} >= {1, 20}
+    assert not any(outcome['critical_hit'] or outcome['critical_fail'] for outcome in outcomes)
+
+
+def test_roll_spec_is_seedable():
+    spec = attack_spec(PROFILE, LONGSWORD)
+    assert roll_spec(spec, random.Random(4)) == roll_spec(spec, random.Random(4))
+
+
+def test_critical_damage_doubles_the_dice():
+    spec, expression = damage_spec(LONGSWORD, critical=True)
+    assert spec.count == 2
+    assert spec.modifier == 3
+    assert spec.dice_pool == (8, 8)
+    assert spec.description == "Critical Damage: 2d8 + 3 (slashing)"
+    _, outcome = roll_damage(LONGSWORD, critical=True, rng=random.Random(2))
+    assert len(outcome['rolls']) == 2
+    assert outcome['total'] == sum(outcome['rolls']) + 3
+    assert outcome['damage_type'] == 'slashing'
+
+
+@pytest.mark.parametrize('weapon, critical, description', [
+    ({'damage_dice': '5', 'damage_type': 'fire'}, False, "Damage: 5 (fire)"),
+    ({'damage_dice': '1d8+2d6', 'damage_bonus': 1}, True, "Critical Damage: 2d8 + 4d6 + 1 (slashing)"),
+    ({'damage_dice': '1d4', 'damage_bonus': -1}, False, "Damage: 1d4 - 1 (slashing)"),
+])
+def test_damage_description_shows_the_rolled_expression(weapon, critical, description):
+    spec, _ = damage_spec(weapon, critical=critical)
+    assert spec.description == description
+
+
+def test_damage_defaults_without_a_weapon():
+    spec, _ = damage_spec(None)
+    assert spec.dice_type == 8
+    assert spec.description == "Damage: 1d8 (slashing)"
+
+
+# ----------------------------------------------------------------------
+# Command line
+# ----------------------------------------------------------------------
+@pytest.fixture
+def profile_file(tmp_path):
+    path = tmp_path / 'aria.json'
+    path.write_text(json.dumps(PROFILE))
+    return str(path)
+
+
+def test_cli_check(profile_file, capsys):
+    assert cli.main(['--seed', '1', '--format', 'json', 'check', profile_file, 'Stealth', '-n', '3']) == 0
+    outcomes = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert len(outcomes) == 3
+    assert all(outcome['modifier'] == 5 and outcome['character'] == 'Aria' for outcome in outcomes)
+
+
+@pytest.mark.parametrize('argv, message', [
+    (['check', '{}', 'Stelth'], "unknown ability or skill: 'Stelth'"),
+    (['save', '{}', 'strength'], "unknown ability: 'STRENGTH'"),
+])
+def test_cli_rejects_unknown_names(profile_file, argv, message):
+    with pytest.raises(SystemExit) as exit_info:
+        cli.main([arg.format(profile_file) for arg in argv])
+    assert str(exit_info.value) == message
+
+
+def test_cli_reports_bad_damage_dice(tmp_path):
+    path = tmp_path / 'aria.json'
+    path.write_text(json.dumps(dict(PROFILE, weapons=[dict(LONGSWORD, damage_dice='abc')])))
+    with pytest.raises(SystemExit) as exit_info:
+        cli.main(['attack', str(path), '--damage'])
+    assert str(exit_info.value) == "Cannot roll damage for Longsword: invalid dice expression: 'abc'"
@@ -0,0 +1,131 @@
+"""Event-sourced combat state and the journal it is rebuilt from"""
+
+import random
+
+import pytest
+
+from rules.combat_state import CombatState
+from utils.combat_journal import CombatLog
+from utils.io_executor import IOExecutor
+from utils.roll_controller import ManualClock
+
+
+def test_damage_soaks_temp_hp_and_stops_at_zero():
+    state = CombatState()
+    state.apply({'op': 'set_max_hp', 'target': 'Aria', 'max_hp': 20})
+    state.apply({'op': 'temp_hp', 'target': 'Aria', 'amount': 5})
+    state.apply({'op': 'temp_hp', 'target': 'Aria', 'amount': 3})  # Does not stack
+    state.apply({'op': 'damage', 'target': 'Aria', 'source': 'Goblin', 'amount': 8})
+    aria = state.creatures['Aria']
+    assert (aria.hp, aria.temp_hp) == (17, 0)
+    assert state.creatures['Goblin'].damage_dealt == 8
+    state.apply({'op': 'damage', 'target': 'Aria', 'amount': 50})
+    assert aria.hp == 0
+    state.apply({'op': 'heal', 'target': 'Aria', 'amount': 100})
+    assert aria.hp == 20
+
+
+def test_damage_without_a_target_only_counts_for_the_source():
+    state = CombatState()
+    state.apply({'op': 'damage', 'target': None, 'source': 'Aria', 'amount': 7})
+    assert list(state.creatures) == ['Aria']
+    assert state.creatures['Aria'].damage_dealt == 7
+
+
+def test_conditions_slots_and_long_rest():
+    state = CombatState()
+    state.apply({'op': 'set_max_hp', 'target': 'Cael', 'max_hp': 12})
+    state.apply({'op': 'condition_add', 'target': 'Cael', 'condition': 'poisoned'})
+    state.apply({'op': 'condition_remove', 'target': 'Cael', 'condition': 'stunned'})
+    state.apply({'op': 'set_slots', 'target': 'Cael', 'level': 1, 'total': 2})
+    for _ in range(3):
+        state.apply({'op': 'slot_use', 'target': 'Cael', 'level': 1})
+    cael = state.creatures['Cael']
+    assert cael.conditions == {'poisoned'}
+    assert cael.slots_left(1) == 0
+    state.apply({'op': 'damage', 'target': 'Cael', 'amount': 5})
+    state.apply({'op': 'long_rest', 'target': 'Cael'})
+    assert cael.hp == 12 and cael.slots_left(1) == 2
+    with pytest.raises(ValueError):
+        state.apply({'op': 'resurrect', 'target': 'Cael'})
+
+
+def random_events(rng, count):
+    names = ('Aria', 'Borin', 'Goblin')
+    events = [{'op': 'set_max_hp', 'target': name, 'max_hp': 30} for name in names]
+    for _ in range(count):
+        target = rng.choice(names)
+        op = rng.choice(('damage', 'heal', 'temp_hp', 'condition_add', 'slot_use'))
+        if op == 'condition_add':
+            events.append({'op': op, 'target': target, 'condition': rng.choice(('prone', 'poisoned'))})
+        elif op == 'slot_use':
+            events.append({'op': op, 'target': target, 'level': rng.randint(1, 3)})
+        else:
+            events.append({'op': op, 'target': target, 'amount': rng.randint(0, 12),
+                           **({'source': rng.choice(names)} if op == 'damage' else {})})
+    return events
+
+
+def test_snapshot_plus_tail_equals_full_replay():
+    events = random_events(random.Random(2), 300)
+    full = CombatState()
+    full.replay(events)
+    partial = CombatState()
+    partial.replay(events[:150])
+    resumed = CombatState()
+    resumed.replay([partial.snapshot()] + events[150:])
+    assert resumed.snapshot() == full.snapshot()
+
+
+@pytest.fixture
+def executor():
+    executor = IOExecutor(clock=ManualClock())
+    yield executor
+    executor.shutdown()
+
+
+def flush(executor):
+    executor.submit(lambda: None, write=True).result()
+
+
+def test_combat_log_reloads_from_snapshots_and_compacts(tmp_path, executor):
+    path = str(tmp_path / 'combat.jsonl')
+    log = CombatLog(path, snapshot_every=10, compact_after=3, executor=executor)
+    log.load()
+    log.record('set_max_hp', target='Aria', max_hp=40)
+    for amount in range(1, 46):
+        log.damage(amount % 4, target='Aria', source='Goblin')
+        if amount % 5 == 0:
+            log.heal('Aria', 3)
+    log.add_condition('Aria', 'prone')
+    log.use_slot('Aria', 1)
+    flush(executor)
+
+    events = log.journal.load()
+    assert events[0]['op'] == 'snapshot'  # Older lines were compacted away
+    assert len(events) <= 2 * log.snapshot_every
+
+    reloaded = CombatLog(path, executor=executor)
+    reloaded.load()
+    assert reloaded.state.snapshot() == log.state.snapshot()
+
+
+def test_events_recorded_before_loading_follow_the_loaded_state(tmp_path, executor):
+    path = str(tmp_path / 'combat.jsonl')
+    first = CombatLog(path, executor=executor)
+    first.load()
+    first.record('set_max_hp', target='Borin', max_hp=25)
+    flush(executor)
+
+    second = CombatLog(path, executor=executor)
+    seen = []
+    second.listeners.append(seen.append)
+    second.damage(5, target='Borin')  # Before its log is loaded
+    assert not second.loaded and seen[0]['op'] == 'damage'
+    second.load()
+    assert second.state.creatures['Borin'].hp == 20
+    flush(executor)
+
+    third = CombatLog(path, executor=executor)
+    third.load()
+    assert third.state.creatures['Borin'].hp == 20
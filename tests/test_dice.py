@@ -0,0 +1,72 @@
+"""Dice notation parsing and rolling"""
+
+import random
+
+import pytest
+
+from rules.dice import DiceExpression, roll_dice, roll_die
+
+
+@pytest.mark.parametrize('text, dice, bonus', [
+    ('1d20+5', ((1, 20, 1),), 5),
+    ('d20', ((1, 20, 1),), 0),
+    ('2d6 - 1', ((2, 6, 1),), -1),
+    ('1d6+3d6+2', ((1, 6, 1), (3, 6, 1)), 2),
+    ('1d8 - 1d4', ((1, 8, 1), (1, 4, -1)), 0),
+    ('7', (), 7),
+])
+def test_parse(text, dice, bonus):
+    expression = DiceExpression.parse(text)
+    assert expression.dice == dice
+    assert expression.bonus == bonus
+
+
+@pytest.mark.parametrize('text', ['', '   ', 'abc', '1d0', '0d6', '1d6 2', '1d6+', None])
+def test_parse_rejects_malformed_notation(text):
+    with pytest.raises(ValueError):
+        DiceExpression.parse(text)
+
+
+def test_pool_and_count_follow_the_groups():
+    expression = DiceExpression.parse('2d6+1d4+3')
+    assert expression.sides == 6
+    assert expression.count == 3
+    assert expression.pool() == [6, 6, 4]
+
+
+def test_doubled_doubles_the_dice_but_not_the_bonus():
+    doubled = DiceExpression.parse('2d6+3').doubled()
+    assert doubled.dice == ((4, 6, 1),)
+    assert doubled.bonus == 3
+
+
+def test_roll_stays_in_range_and_is_seedable():
+    expression = DiceExpression.parse('3d6')
+    for _ in range(500):
+        total, rolls = expression.roll()
+        assert len(rolls) == 3
+        assert all(1 <= value <= 6 for value in rolls)
+        assert total == sum(rolls)
+    assert expression.roll(random.Random(7)) == expression.roll(random.Random(7))
+
+
+def test_subtracted_groups_count_against_the_total():
+    total, rolls = DiceExpression.parse('1d8 - 1d4').roll(random.Random(3))
+    assert total == rolls[0] - rolls[1]
+
+
+@pytest.mark.parametrize('text, rendered', [
+    ('1d20+5', '1d20 + 5'),
+    ('2d6-1', '2d6 - 1'),
+    ('1d8-1d4', '1d8 - 1d4'),
+    ('0', '0'),
+])
+def test_str(text, rendered):
+    assert str(DiceExpression.parse(text)) == rendered
+
+
+def test_roll_helpers():
+    rng = random.Random(1)
+    assert 1 <= roll_die(20, rng) <= 20
+    rolls = roll_dice(6, 4, rng)
+    assert len(rolls) == 4 and all(1 <= value <= 6 for value in rolls)
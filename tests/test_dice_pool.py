@@ -0,0 +1,57 @@
+"""Dice pools drawn from one atlas texture"""
+
+import pytest
+
+
+@pytest.fixture(scope='module')
+def atlas(kivy_window):
+    from components.dice_pool import DiceAtlas
+
+    atlas = DiceAtlas(face_size=64, max_number=12)
+    atlas.build()
+    return atlas
+
+
+def test_atlas_holds_every_face_and_number(atlas):
+    from components.dice_pool import DICE_SIDES
+
+    width, height = atlas.texture.size
+    assert width & (width - 1) == 0 and height & (height - 1) == 0
+    faces = [atlas.face(sides) for sides in DICE_SIDES]
+    assert all(face.size == (64, 64) for face in faces)
+    assert len({face.uvpos for face in faces}) == len(DICE_SIDES)
+    assert atlas.face(3).uvpos == atlas.face(20).uvpos  # Unknown dice borrow the d20
+    assert atlas.number(12).uvpos != atlas.number(11).uvpos
+
+
+def test_numbers_beyond_the_atlas_come_from_the_glyph_cache(atlas):
+    from components.glyph_cache import glyph_cache
+
+    assert atlas.number(13) is glyph_cache.get('13', atlas.number_font_size, True)
+
+
+def test_pool_lays_the_dice_out_in_a_grid(atlas):
+    from components.dice_pool import DicePool
+
+    pool = DicePool([6] * 8, atlas=atlas, size=(400, 200), pos=(0, 0))
+    assert pool.cell_size == 100  # 4 columns by 2 rows
+    centers = sorted(pool._centers)
+    assert len(set(centers)) == 8
+    for cx, cy in centers:
+        assert 0 < cx < 400 and 0 < cy < 200
+    for face in pool._faces:
+        assert tuple(face.size) == (pool.die_size, pool.die_size)
+
+
+def test_pool_shows_each_value_and_settles_flat(atlas):
+    from components.dice_pool import DicePool
+
+    pool = DicePool([6, 6, 4], atlas=atlas, size=(300, 100))
+    pool.set_values([6, 2, 4])
+    assert [number.texture.uvpos for number in pool._numbers] == [
+        atlas.number(value).uvpos for value in (6, 2, 4)]
+    pool.set_roll_progress(0.5)
+    assert all(rotation.angle != 0 for rotation in pool._rotations)
+    pool.set_settle_progress(1.0)
+    assert all(rotation.angle == 0 for rotation in pool._rotations)
+    assert all(tuple(face.size) == (pool.die_size, pool.die_size) for face in pool._faces)
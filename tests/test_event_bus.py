@@ -0,0 +1,147 @@
+"""Publish/subscribe: delivery modes, queue policies and counters"""
+
+import threading
+import time
+
+import pytest
+
+from utils.event_bus import BLOCK, DROP_NEWEST, MAIN, SYNC, WORKER, EventBus, Topic
+from utils.roll_controller import ManualClock
+
+NUMBERS = Topic('test.numbers', int)
+
+
+def make_bus(**kwargs):
+    clock = ManualClock()
+    return clock, EventBus(clock=clock, **kwargs)
+
+
+def test_payload_type_is_checked():
+    _, bus = make_bus()
+    with pytest.raises(TypeError):
+        bus.publish(NUMBERS, 'seven')
+
+
+def test_unknown_mode_or_policy():
+    _, bus = make_bus()
+    with pytest.raises(ValueError):
+        bus.subscribe(NUMBERS, print, mode='later')
+    with pytest.raises(ValueError):
+        bus.subscribe(NUMBERS, print, policy='drop_all')
+
+
+def test_sync_runs_before_publish_returns():
+    _, bus = make_bus()
+    seen = []
+    assert not bus.has_subscribers(NUMBERS)
+    bus.subscribe(NUMBERS, seen.append, mode=SYNC)
+    assert bus.has_subscribers(NUMBERS)
+    assert bus.publish(NUMBERS, 1) == 1
+    assert seen == [1]
+
+
+def test_main_delivery_waits_for_the_clock():
+    clock, bus = make_bus()
+    seen = []
+    subscription = bus.subscribe(NUMBERS, seen.append, mode=MAIN)
+    for number in range(5):
+        bus.publish(NUMBERS, number)
+    assert seen == [] and subscription.pending == 5
+    clock.advance(1 / 60.0)
+    assert seen == [0, 1, 2, 3, 4]
+    assert clock.pending == 0
+
+
+def test_main_delivery_spreads_over_frames_past_the_budget():
+    clock, bus = make_bus(frame_budget=0)
+    seen = []
+    bus.subscribe(NUMBERS, seen.append)
+    for number in range(3):
+        bus.publish(NUMBERS, number)
+    for frames in range(1, 4):
+        clock.advance(1 / 60.0, step=1 / 60.0)
+        assert seen == list(range(frames))
+
+
+def test_full_queues_drop_oldest_or_newest():
+    clock, bus = make_bus()
+    oldest, newest = [], []
+    drop_oldest = bus.subscribe(NUMBERS, oldest.append, maxsize=3)
+    drop_newest = bus.subscribe(NUMBERS, newest.append, maxsize=3, policy=DROP_NEWEST)
+    for number in range(5):
+        bus.publish(NUMBERS, number)
+    clock.advance(1 / 60.0)
+    assert oldest == [2, 3, 4] and newest == [0, 1, 2]
+    assert drop_oldest.dropped == drop_newest.dropped == 2
+    assert drop_oldest.stats()['high_water'] == 3
+
+
+def test_block_waits_for_room_then_drops():
+    clock, bus = make_bus(block_timeout=0.01)
+    subscription = bus.subscribe(NUMBERS, lambda number: None, maxsize=1, policy=BLOCK)
+    bus.publish(NUMBERS, 1)
+    started = time.perf_counter()
+    assert bus.publish(NUMBERS, 2) == 0
+    assert time.perf_counter() - started >= 0.01
+    assert subscription.dropped == 1
+
+    # A consumer making room lets the blocked publisher through
+    threading.Timer(0.005, subscription.drain).start()
+    bus.block_timeout = 1.0
+    assert bus.publish(NUMBERS, 3) == 1
+
+
+def test_worker_delivers_in_order_on_its_own_thread():
+    _, bus = make_bus()
+    seen, threads = [], set()
+
+    def handler(number):
+        threads.add(threading.current_thread().name)
+        seen.append(number)
+
+    bus.subscribe(NUMBERS, handler, mode=WORKER, name='collector', maxsize=1000)
+    publishers = [threading.Thread(target=lambda: [bus.publish(NUMBERS, n) for n in range(100)]) for _ in range(2)]
+    for thread in publishers:
+        thread.start()
+    for thread in publishers:
+        thread.join()
+    bus.shutdown()
+    assert len(seen) == 200
+    assert threads == {'bus-collector'}
+    assert sorted(seen) == sorted(list(range(100)) * 2)
+
+
+def test_handler_errors_are_counted_and_unsubscribing_stops_delivery(capsys):
+    clock, bus = make_bus()
+    seen = []
+
+    def handler(number):
+        if number < 0:
+            raise ValueError("negative")
+        seen.append(number)
+
+    subscription = bus.subscribe(NUMBERS, handler, mode=SYNC, name='picky')
+    bus.publish(NUMBERS, -1)
+    bus.publish(NUMBERS, 1)
+    assert subscription.errors == 1 and seen == [1]
+    assert 'picky failed on test.numbers' in capsys.readouterr().out
+
+    main = bus.subscribe(NUMBERS, seen.append)
+    bus.publish(NUMBERS, 2)
+    subscription.cancel()
+    main.cancel()
+    clock.advance(1 / 60.0)
+    assert seen == [1, 2]
+    assert bus.publish(NUMBERS, 3) == 0
+    assert not bus.has_subscribers(NUMBERS)
+
+
+def test_stats():
+    clock, bus = make_bus()
+    subscription = bus.subscribe(NUMBERS, lambda number: None, name='counter')
+    bus.publish(NUMBERS, 1)
+    assert subscription.stats()['latency_mean_ms'] is None
+    clock.advance(1 / 60.0)
+    stats = bus.stats()
+    assert [entry['name'] for entry in stats] == ['counter']
+    assert stats[0]['delivered'] == 1 and stats[0]['latency_max_ms'] >= 0
@@ -0,0 +1,84 @@
+"""Frame governor activity tracking, without a Kivy clock"""
+
+from utils.frame_governor import ACTIVE, IDLE, FrameGovernor
+
+
+class FakeAnimation:
+    """Dispatches on_start/on_complete like kivy.animation.Animation"""
+
+    def __init__(self, duration):
+        self.duration = duration
+        self.handlers = {}
+
+    def bind(self, **handlers):
+        self.handlers.update(handlers)
+
+    def dispatch(self, event, widget=None):
+        self.handlers[event](self, widget)
+
+
+def test_tracked_animation_keeps_it_active_until_complete():
+    governor = FrameGovernor()
+    governor.mode = IDLE
+    animation = FakeAnimation(duration=10.0)
+    governor.track(animation)
+    assert not governor._is_busy()
+
+    animation.dispatch('on_start')
+    assert governor.mode == ACTIVE
+    assert governor._is_busy()
+
+    animation.dispatch('on_complete')
+    assert not governor._is_busy()
+
+
+def test_cancelled_animation_stops_counting_after_its_duration():
+    governor = FrameGovernor()
+    animation = FakeAnimation(duration=0.0)
+    governor.track(animation)
+    animation.dispatch('on_start')  # And never completes
+    assert not governor._is_busy()
+    assert not governor._animations
+
+
+def test_activity_sources():
+    governor = FrameGovernor()
+    busy = [False]
+    governor.add_activity_source(lambda: busy[0])
+    assert not governor._is_busy()
+    busy[0] = True
+    assert governor._is_busy()
+
+
+class FakeManager:
+    """A ScreenManager whose transition runs until told otherwise"""
+
+    def __init__(self):
+        self.transition = type('Transition', (), {'is_active': False})()
+        self.handlers = {}
+
+    def bind(self, **handlers):
+        self.handlers.update(handlers)
+
+    def switch_to(self, name):
+        self.transition.is_active = True
+        self.handlers['current'](self, name)
+
+
+def test_screen_transitions_keep_it_active_until_they_finish():
+    governor = FrameGovernor()
+    governor.mode = IDLE
+    manager = FakeManager()
+    governor.track_transitions(manager)
+    assert not governor._is_busy()
+
+    manager.switch_to('profiles')
+    assert governor.mode == ACTIVE
+    assert governor._is_busy()
+
+    manager.transition.is_active = False
+    assert not governor._is_busy()
+
+
+def test_disabled_by_a_zero_idle_rate():
+    assert not FrameGovernor(idle_fps=0).enabled
@@ -0,0 +1,59 @@
+"""Dice value textures rendered once and shared by every label"""
+
+import pytest
+
+
+@pytest.fixture
+def cache(kivy_window):
+    from components.glyph_cache import GlyphCache
+
+    return GlyphCache(max_entries=3)
+
+
+def test_each_text_is_rendered_once(cache):
+    texture = cache.get('7')
+    assert cache.get('7') is texture
+    assert cache.get('7', font_size=48) is not texture
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_least_recently_used_entry_is_evicted(cache):
+    for text in ('1', '2', '3'):
+        cache.get(text)
+    cache.get('1')  # Now the most recent
+    cache.get('4')
+    assert len(cache) == 3
+    misses = cache.misses
+    cache.get('1')
+    cache.get('3')
+    assert cache.misses == misses
+    cache.get('2')
+    assert cache.misses == misses + 1
+
+
+def test_prewarm_when_idle_renders_a_few_per_frame(cache):
+    from kivy.base import EventLoop
+
+    cache.max_entries = 100
+    cache.prewarm_when_idle([str(value) for value in range(1, 21)], per_frame=8)
+    EventLoop.idle()
+    assert len(cache) == 8
+    for _ in range(3):
+        EventLoop.idle()
+    assert len(cache) == 20
+    assert cache._prewarm_event is None
+
+
+def test_label_swaps_textures_without_rendering_again(cache):
+    from components.glyph_cache import GlyphLabel
+
+    label = GlyphLabel(cache=cache, text='12', size=(100, 40))
+    first = label._rect.texture
+    label.text = '13'
+    label.text = '12'
+    label.color = (1, 0, 0, 1)
+    assert label._rect.texture is first
+    assert cache.misses == 2
+    assert list(label._color.rgba) == [1, 0, 0, 1]
+    label.text = ''
+    assert tuple(label._rect.size) == (0, 0)
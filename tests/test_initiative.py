@@ -0,0 +1,112 @@
+"""Initiative order, and rebuilding it from its events"""
+
+import random
+
+import pytest
+
+from rules.initiative import InitiativeQueue, dex_modifier, roll_initiative
+
+
+def names(queue):
+    return [combatant.name for combatant in queue.order()]
+
+
+def make_queue():
+    events = []
+    queue = InitiativeQueue(on_event=events.append)
+    queue.add('Aria', 15, dex=3)
+    queue.add('Goblin', 15, dex=2, monster=True)
+    queue.add('Borin', 8, dex=-1)
+    queue.add('Cael', 20, dex=1)
+    return queue, events
+
+
+def test_order_by_initiative_then_dex_then_joining():
+    queue, _ = make_queue()
+    assert names(queue) == ['Cael', 'Aria', 'Goblin', 'Borin']
+    queue.add('Dalia', 15, dex=3)
+    assert names(queue) == ['Cael', 'Aria', 'Dalia', 'Goblin', 'Borin']
+
+
+def test_turns_wrap_into_new_rounds():
+    queue, _ = make_queue()
+    assert queue.round == 0 and queue.current is None
+    turns = [queue.next_turn().name for _ in range(6)]
+    assert turns == ['Cael', 'Aria', 'Goblin', 'Borin', 'Cael', 'Aria']
+    assert queue.round == 2
+    assert queue.on_deck.name == 'Goblin'
+    assert names(queue) == ['Aria', 'Goblin', 'Borin', 'Cael']
+
+
+def test_joining_after_their_slot_waits_for_the_next_round():
+    queue, _ = make_queue()
+    queue.next_turn()
+    queue.next_turn()  # Aria
+    queue.add('Eve', 18)
+    assert names(queue) == ['Aria', 'Goblin', 'Borin', 'Cael', 'Eve']
+
+
+def test_removing_the_current_combatant_moves_on():
+    queue, _ = make_queue()
+    queue.next_turn()
+    queue.remove(queue.current.id)
+    assert queue.current.name == 'Aria'
+    assert len(queue) == 3
+
+
+def test_delay_and_ready_acts_right_after_the_current_combatant():
+    queue, _ = make_queue()
+    cael = queue.next_turn()
+    queue.delay()
+    assert queue.current.name == 'Aria'
+    assert cael.id in queue.held
+    queue.next_turn()  # Goblin
+    queue.ready(cael.id)
+    assert names(queue) == ['Goblin', 'Cael', 'Borin', 'Aria']
+    assert queue.next_turn().name == 'Cael'
+
+
+def test_replaying_the_events_rebuilds_the_encounter():
+    queue, events = make_queue()
+    rng = random.Random(3)
+    for _ in range(200):
+        action = rng.random()
+        if action < 0.5:
+            queue.next_turn()
+        elif action < 0.65 and queue.current is not None:
+            queue.delay()
+        elif action < 0.8 and queue.held:
+            queue.ready(rng.choice(list(queue.held)))
+        elif action < 0.9:
+            queue.add(f'Monster {rng.randint(1, 99)}', rng.randint(1, 25), monster=True)
+        elif len(queue) > 2:
+            queue.remove(rng.choice(list(queue.combatants)))
+        if rng.random() < 0.1:
+            events.append(queue.snapshot())
+
+    replayed = InitiativeQueue()
+    replayed.replay(events)
+    assert replayed.snapshot() == queue.snapshot()
+    assert names(replayed) == names(queue)
+
+    last = max(index for index, event in enumerate(events) if event['op'] == 'snapshot')
+    from_snapshot = InitiativeQueue()
+    from_snapshot.replay(events[last:])
+    assert names(from_snapshot) == names(queue)
+    assert from_snapshot.round == queue.round
+
+
+def test_clear_and_unknown_events():
+    queue, _ = make_queue()
+    queue.clear()
+    assert len(queue) == 0 and queue.order() == []
+    with pytest.raises(ValueError):
+        queue.apply({'op': 'teleport'})
+
+
+def test_roll_initiative():
+    outcome = roll_initiative(2, random.Random(9))
+    assert outcome['total'] == outcome['natural'] + 2
+    assert outcome['roll_type'] == 'initiative'
+    assert dex_modifier({'abilities': {'DEX': 14}}) == 2
+    assert dex_modifier({}) == 0
@@ -0,0 +1,51 @@
+"""File I/O thread pool, delivering on a ManualClock"""
+
+import json
+import os
+import time
+
+from utils.io_executor import IOExecutor, write_json
+from utils.roll_controller import ManualClock
+
+
+def wait_for(clock, condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.001)
+        clock.advance(1 / 60.0)
+
+
+def test_write_json_syncs_before_replacing(tmp_path, monkeypatch):
+    calls = []
+    real_fsync, real_replace = os.fsync, os.replace
+    monkeypatch.setattr(os, 'fsync', lambda fd: calls.append('fsync') or real_fsync(fd))
+    monkeypatch.setattr(os, 'replace', lambda src, dst: calls.append('replace') or real_replace(src, dst))
+    path = str(tmp_path / 'profile.json')
+    assert write_json(path, {'name': 'Aria'}) == path
+    assert calls == ['fsync', 'replace']
+    assert json.loads(open(path).read()) == {'name': 'Aria'}
+    assert os.listdir(tmp_path) == ['profile.json']
+
+
+def test_read_sees_the_write_submitted_before_it(tmp_path):
+    clock = ManualClock()
+    executor = IOExecutor(clock=clock)
+    path = str(tmp_path / 'profile.json')
+    results = []
+    executor.write_json(path, {'level': 3})
+    executor.read_json(path, on_done=results.append)
+    wait_for(clock, lambda: results)
+    assert results == [{'level': 3}]
+    executor.shutdown()
+
+
+def test_errors_reach_on_error_on_the_clock(tmp_path):
+    clock = ManualClock()
+    executor = IOExecutor(clock=clock)
+    errors = []
+    executor.read_json(str(tmp_path / 'missing.json'), on_done=None, on_error=errors.append)
+    wait_for(clock, lambda: errors)
+    assert isinstance(errors[0], FileNotFoundError)
+    assert executor.errors == 1
+    executor.shutdown()
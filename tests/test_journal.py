@@ -0,0 +1,72 @@
+"""JSON-lines journals: appends, torn lines, checkpoints and rewrites"""
+
+import pytest
+
+from utils.io_executor import IOExecutor
+from utils.journal import Journal
+from utils.roll_controller import ManualClock
+
+
+@pytest.fixture
+def journal(tmp_path):
+    executor = IOExecutor(clock=ManualClock())
+    yield Journal(str(tmp_path / 'data' / 'encounter.jsonl'), executor)
+    executor.shutdown()
+
+
+def test_appends_in_order(journal):
+    for index in range(20):
+        journal.append({'op': 'add', 'index': index})
+    journal.append_line('{"op":"next"}\n').result()
+    events = journal.load()
+    assert [event.get('index') for event in events] == list(range(20)) + [None]
+    assert journal.appended == 21
+
+
+def test_a_torn_last_line_is_skipped(journal):
+    journal.append({'op': 'add', 'index': 1})
+    journal.append_line('{"op":"add","ind').result()
+    assert journal.load() == [{'op': 'add', 'index': 1}]
+
+
+def test_appending_after_a_torn_line_keeps_every_later_event(tmp_path):
+    path = str(tmp_path / 'encounter.jsonl')
+    with open(path, 'w') as file:
+        file.write('{"op":"add","index":1}\n{"op":"add","index":2,"na')  # Power cut mid-write
+    for run in range(2):  # Each reboot gets a new Journal
+        executor = IOExecutor(clock=ManualClock())
+        journal = Journal(path, executor)
+        journal.append({'op': 'add', 'index': 3 + 2 * run})
+        journal.append({'op': 'next', 'index': 4 + 2 * run}).result()
+        executor.shutdown()
+    assert [event['index'] for event in journal.load()] == [1, 3, 4, 5, 6]
+    with open(path) as file:
+        assert file.read().count('\n') == 6
+
+
+def test_load_from_the_last_checkpoint_and_compact(journal):
+    journal.append({'op': 'add', 'index': 1})
+    journal.append({'op': 'snapshot', 'round': 1})
+    journal.append({'op': 'next'})
+    journal.append({'op': 'snapshot', 'round': 2})
+    journal.append({'op': 'add', 'index': 2}).result()
+    tail = [{'op': 'snapshot', 'round': 2}, {'op': 'add', 'index': 2}]
+    assert journal.load('snapshot') == tail
+    assert len(journal.load()) == 5
+
+    assert journal.compact().result() == 2
+    assert journal.load() == tail
+
+
+def test_rewrite_replaces_everything_queued_before_it(journal):
+    journal.append({'op': 'add', 'index': 1})
+    journal.rewrite([{'op': 'snapshot', 'round': 3}])
+    journal.append({'op': 'next'}).result()
+    assert journal.load() == [{'op': 'snapshot', 'round': 3}, {'op': 'next'}]
+    journal.clear().result()
+    assert journal.load() == []
+
+
+def test_missing_file_loads_empty(journal):
+    assert journal.load() == []
+    assert journal.load('snapshot') == []
@@ -0,0 +1,49 @@
+from utils.latency_tracer import BUCKET_BOUNDS_MS, LatencyTracer, StageHistogram
+
+
+def test_histogram_buckets_and_percentiles():
+    histogram = StageHistogram()
+    for ms in (0.5, 3, 3, 40, 6000):
+        histogram.add(int(ms * 1_000_000))
+    stats = histogram.to_dict()
+    assert stats['count'] == 5
+    assert stats['buckets']['<=1ms'] == 1
+    assert stats['buckets']['<=5ms'] == 2
+    assert stats['buckets']['<=50ms'] == 1
+    assert stats['buckets'][f'>{BUCKET_BOUNDS_MS[-1]}ms'] == 1
+    assert stats['min_ms'] == 0.5
+    assert stats['max_ms'] == 6000
+    assert stats['p50_ms'] == 3
+
+
+def test_trace_records_each_stage_and_the_total():
+    tracer = LatencyTracer(enabled=True)
+    tracer.begin('tap')
+    tracer.stamp('screen_enter')
+    tracer.stamp('result')
+    tracer.end()
+    stages = tracer.snapshot()['stages']
+    assert set(stages) == {'tap->screen_enter', 'screen_enter->result', 'result->rendered', 'total:tap'}
+    assert all(stats['count'] == 1 for stats in stages.values())
+    assert tracer.completed == 1
+    assert not tracer.active
+
+
+def test_a_new_trace_abandons_the_unfinished_one():
+    tracer = LatencyTracer(enabled=True)
+    tracer.begin('tap')
+    tracer.ensure('motion')  # A trace is in flight: kept
+    tracer.begin('motion')
+    tracer.end()
+    snapshot = tracer.snapshot()
+    assert snapshot['abandoned'] == 1
+    assert 'total:motion' in snapshot['stages'] and 'total:tap' not in snapshot['stages']
+
+
+def test_disabled_tracer_records_nothing():
+    tracer = LatencyTracer(enabled=False)
+    tracer.begin('tap')
+    tracer.stamp('result')
+    tracer.end()
+    assert tracer.snapshot() == {'completed': 0, 'abandoned': 0, 'stages': {}}
+    assert tracer.export() is None
@@ -0,0 +1,68 @@
+"""Screens built on first use, or one per idle frame"""
+
+import pytest
+
+
+@pytest.fixture
+def manager(kivy_window):
+    from kivy.uix.screenmanager import NoTransition, Screen
+    from components.lazy_screen_manager import LazyScreenManager
+
+    built = []
+
+    def factory(**kwargs):
+        built.append(kwargs['name'])
+        return Screen(**kwargs)
+
+    manager = LazyScreenManager(transition=NoTransition())
+    manager.built = built
+    for name in ('main', 'roll', 'profiles'):
+        manager.register_screen(name, factory)
+    return manager
+
+
+def frames(count):
+    from kivy.base import EventLoop
+
+    for _ in range(count):
+        EventLoop.idle()
+
+
+def test_screens_are_built_when_first_asked_for(manager):
+    assert manager.built == []
+    assert manager.has_screen('roll') and not manager.screen_names
+    manager.current = 'main'
+    assert manager.built == ['main']
+    screen = manager.get_screen('roll')
+    assert screen.name == 'roll' and manager.get_screen('roll') is screen
+    assert manager.built == ['main', 'roll']
+    assert manager.pending_screens == ['profiles']
+
+
+def test_prebuild_builds_one_screen_per_frame(manager):
+    done = []
+    manager.current = 'main'
+    manager.prebuild_when_idle(delay=0, on_complete=lambda: done.append(manager.pending_screens))
+    frames(1)
+    assert manager.built == ['main', 'roll']
+    frames(3)
+    assert manager.built == ['main', 'roll', 'profiles']
+    assert done == [[]]
+
+
+def test_kv_rules_are_loaded_once(kivy_window, tmp_path, monkeypatch):
+    from kivy.lang import Builder
+    from components.lazy_screen_manager import load_kv_once
+
+    kv_file = tmp_path / 'lazy_probe.kv'
+    kv_file.write_text("<LazyProbe@Widget>:\n    size_hint: None, None\n")
+    loads = []
+    real_load_file = Builder.load_file
+    monkeypatch.setattr(Builder, 'load_file', lambda path: loads.append(path) or real_load_file(path))
+    try:
+        load_kv_once(str(kv_file))
+        load_kv_once(str(kv_file))
+        load_kv_once(None)
+    finally:
+        Builder.unload_file(str(kv_file))
+    assert loads == [str(kv_file)]
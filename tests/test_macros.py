@@ -0,0 +1,86 @@
+"""Roll macros: parsing, binding to a character and the compiled cache"""
+
+import random
+
+import pytest
+
+from rules.checks import roll_damage
+from rules.macros import MacroLibrary, compile_macro, macro_variables, split_macro
+from rules.models import Character
+
+PROFILE = {
+    'name': 'Aria', 'level': 5,
+    'abilities': {'STR': 8, 'DEX': 16, 'CON': 12, 'INT': 10, 'WIS': 13, 'CHA': 14},
+    'macros': [
+        'Sneak Attack: 1d20+{DEX}+{PB}; on hit 1d6+{DEX}+3d6 piercing',
+        'Shove: 1d20+{STR}',
+        'Fireball: 8d6',
+        'Broken: 1d20+{LUCK}',
+    ],
+}
+
+
+def test_variables():
+    variables = macro_variables(PROFILE)
+    assert (variables['DEX'], variables['STR'], variables['PB'], variables['LEVEL']) == (3, -1, 3, 5)
+
+
+def test_split_macro():
+    assert split_macro('Shove: 1d20+{STR}') == ('Shove', '1d20+{STR}', None)
+    assert split_macro(' Hit : 1d20 ; ON HIT 1d8 ') == ('Hit', '1d20', '1d8')
+    assert split_macro('1d20+2') == ('1d20+2', '1d20+2', None)  # No name: the roll names itself
+    for text in ('', 'Name:', 'Hit: 1d20; then 1d8'):
+        with pytest.raises(ValueError):
+            split_macro(text)
+
+
+def test_attack_macro():
+    program = compile_macro(PROFILE['macros'][0], PROFILE)
+    assert program.roll_type == 'attack'
+    assert (program.spec.dice_type, program.spec.modifier) == (20, 3 + 3)
+    assert program.damage == {'name': 'Sneak Attack', 'damage_dice': '1d6 + 3d6', 'damage_bonus': 3,
+                              'damage_type': 'piercing'}
+    _, outcome = roll_damage(program.damage, critical=True, rng=random.Random(1))
+    assert len(outcome['rolls']) == 8
+    assert outcome['damage_type'] == 'piercing'
+
+
+def test_negative_modifiers_fold_into_the_sign():
+    program = compile_macro('Shove: 1d20+{STR}', PROFILE)
+    assert program.roll_type == 'ability_check'
+    assert program.spec.modifier == -1
+
+
+def test_dice_pool_macro():
+    program = compile_macro('Mixed: 2d6+1d4+{LEVEL}', PROFILE)
+    assert program.roll_type == 'custom'
+    assert program.spec.dice_pool == (6, 6, 4)
+    assert program.spec.modifier == 5
+
+
+@pytest.mark.parametrize('text, message', [
+    ('Broken: 1d20+{LUCK}', 'unknown macro value'),
+    ('Drain: 1d8-1d4', 'subtracts dice'),
+    ('Volley: 2d20; on hit 1d8', 'single d20'),
+    ('Flat: 1d20; on hit 5', 'no damage dice'),
+    ('Nothing: {PB}', 'rolls no dice'),
+])
+def test_invalid_macros(text, message):
+    with pytest.raises(ValueError, match=message):
+        compile_macro(text, PROFILE)
+
+
+def test_library_caches_until_the_stats_change():
+    library = MacroLibrary()
+    programs = library.programs(PROFILE)
+    assert [program.name for program in programs] == ['Sneak Attack', 'Shove', 'Fireball']
+    assert [line for line, _ in library.errors(PROFILE)] == ['Broken: 1d20+{LUCK}']
+    assert library.programs(dict(PROFILE)) is programs
+    assert (library.misses, library.hits) == (1, 2)
+
+    character = Character.from_dict(PROFILE)
+    assert library.programs(character) is programs  # Same fingerprint as the dict
+    stronger = character.replace(abilities=character.abilities.replace(STR=18))
+    assert library.programs(stronger)[1].spec.modifier == 4
+    assert library.misses == 2
+    assert library.programs(None) == ()
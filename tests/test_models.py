@@ -0,0 +1,83 @@
+"""Character, ability and weapon models"""
+
+import json
+
+import pytest
+
+from rules.abilities import ability_modifier, skill_modifier
+from rules.checks import attack_spec, damage_spec
+from rules.models import Abilities, Character, Weapon
+
+PROFILE = {
+    'name': 'Aria', 'level': 5,
+    'abilities': {'STR': 16, 'DEX': 14, 'CON': 12, 'INT': 10, 'WIS': 13, 'CHA': 8},
+    'saving_throw_proficiencies': ['CON'],
+    'skill_proficiencies': ['Stealth'],
+    'weapons': [{'name': 'Longsword', 'ability': 'STR', 'damage_dice': '1d8', 'damage_bonus': 3,
+                 'proficient': True, 'damage_type': 'slashing', 'notes': 'heirloom'}],
+    'macros': ['Smite: 1d20+{STR}'],
+    'portrait': 'aria.png',
+}
+
+
+def test_round_trip_keeps_unknown_keys():
+    character = Character.from_dict(PROFILE)
+    assert character.to_dict() == PROFILE
+    assert json.loads(json.dumps(character.to_dict())) == PROFILE
+
+
+def test_models_read_like_the_json_dicts():
+    character = Character.from_dict(PROFILE)
+    assert character['name'] == 'Aria'
+    assert character.get('missing', 'default') == 'default'
+    assert ability_modifier(character, 'STR') == 3
+    assert skill_modifier(character, 'Stealth') == (2 + 3, True)
+    weapon = character.weapons[0]
+    assert weapon['notes'] == 'heirloom'
+    assert attack_spec(character, weapon).modifier == 6
+    assert damage_spec(weapon)[0].description == "Damage: 1d8 + 3 (slashing)"
+
+
+def test_abilities_clamp_and_default():
+    abilities = Abilities.from_dict({'STR': 40, 'DEX': 0})
+    assert abilities['STR'] == 30
+    assert abilities['DEX'] == 1
+    assert abilities['CON'] == 10
+    with pytest.raises(ValueError):
+        Abilities([10, 10])
+
+
+def test_replace_leaves_the_original_alone():
+    character = Character.from_dict(PROFILE)
+    stronger = character.replace(abilities=character.abilities.replace(STR=18), level=6)
+    assert character.abilities['STR'] == 16 and character.level == 5
+    assert stronger.abilities['STR'] == 18 and stronger.level == 6
+    assert stronger.weapons is character.weapons
+    assert character.to_dict() == PROFILE
+
+
+def test_to_dict_shares_nothing_with_the_model():
+    character = Character.from_dict(PROFILE)
+    data = character.to_dict()
+    data['weapons'][0]['notes'] = 'lost'
+    data['skill_proficiencies'].append('Arcana')
+    assert character.to_dict() == PROFILE
+
+
+@pytest.mark.parametrize('data, ability, damage_dice, damage_type', [
+    ({'ability': None, 'damage_dice': None, 'damage_type': None}, 'STR', 'd6', None),
+    ({'ability': '', 'damage_dice': '', 'damage_type': ''}, 'STR', 'd6', None),
+    ({'damage_dice': 6, 'damage_type': 7}, 'STR', '6', '7'),
+    ({'ability': 'DEX', 'damage_dice': '2d4', 'damage_type': 'piercing'}, 'DEX', '2d4', 'piercing'),
+])
+def test_weapon_coerces_hand_edited_fields(data, ability, damage_dice, damage_type):
+    weapon = Weapon.from_dict(data)
+    assert weapon.ability == ability
+    assert weapon.damage_dice == damage_dice
+    assert weapon.damage_type == damage_type
+
+
+def test_weapon_replace_carries_damage_type_and_unknown_keys():
+    weapon = Weapon.from_dict(PROFILE['weapons'][0])
+    edited = weapon.replace(name='Greatsword', damage_dice='2d6')
+    assert edited.to_dict() == dict(PROFILE['weapons'][0], name='Greatsword', damage_dice='2d6')
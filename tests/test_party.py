@@ -0,0 +1,94 @@
+"""Group rolls and the derived-stat cache"""
+
+import random
+
+import pytest
+
+from rules.checks import ability_check_spec, initiative_spec, saving_throw_spec
+from rules.models import Character
+from rules.party import (
+    GROUP_CHECKS,
+    INITIATIVE,
+    DerivedStats,
+    check_description,
+    check_roll_type,
+    derived_row,
+    group_roll,
+)
+
+PARTY = [
+    Character.from_dict({'name': 'Aria', 'level': 5, 'abilities': {'DEX': 16, 'WIS': 12},
+                         'skill_proficiencies': ['Stealth'], 'saving_throw_proficiencies': ['DEX']}),
+    Character.from_dict({'name': 'Borin', 'level': 1, 'abilities': {'DEX': 8, 'STR': 18}}),
+    Character.from_dict({'name': 'Cael', 'level': 9, 'abilities': {'DEX': 12, 'INT': 17}}),
+]
+
+
+def test_derived_row_matches_the_single_roll_specs():
+    for character in PARTY:
+        modifiers, proficient = derived_row(character)
+        assert len(modifiers) == len(proficient) == len(GROUP_CHECKS)
+        for index, check in enumerate(GROUP_CHECKS):
+            if check == INITIATIVE:
+                spec = initiative_spec(character)
+            elif check.endswith(' Save'):
+                spec = saving_throw_spec(character, check[:-len(' Save')])
+            else:
+                spec = ability_check_spec(character, check)
+            assert modifiers[index] == spec.modifier, (character.name, check)
+
+
+def test_group_roll_ranks_best_first():
+    results = group_roll(PARTY, 'Stealth', rng=random.Random(5), table=DerivedStats())
+    assert [result['rank'] for result in results] == [1, 2, 3]
+    assert sorted(result['name'] for result in results) == ['Aria', 'Borin', 'Cael']
+    totals = [result['total'] for result in results]
+    assert totals == sorted(totals, reverse=True)
+    aria = next(result for result in results if result['name'] == 'Aria')
+    assert aria['proficient'] and aria['modifier'] == 3 + 3
+
+
+def test_ties_go_to_the_higher_modifier_then_the_name():
+    class Fixed:
+        def randint(self, low, high):
+            return 10
+    twins = [Character.from_dict({'name': name, 'abilities': {'DEX': 14}}) for name in ('Zed', 'Ann')]
+    results = group_roll(twins + [PARTY[1]], INITIATIVE, rng=Fixed(), table=DerivedStats())
+    assert [result['name'] for result in results] == ['Ann', 'Zed', 'Borin']
+
+
+def test_group_roll_is_seedable_and_takes_profile_dicts():
+    dicts = [character.to_dict() for character in PARTY]
+    assert group_roll(dicts, 'DEX Save', rng=random.Random(1)) == group_roll(PARTY, 'DEX Save', rng=random.Random(1))
+
+
+def test_unknown_check_raises():
+    with pytest.raises(ValueError):
+        group_roll(PARTY, 'Stelth')
+
+
+def test_roll_types_and_descriptions():
+    assert check_roll_type(INITIATIVE) == 'initiative'
+    assert check_roll_type('CON Save') == 'saving_throw'
+    assert check_roll_type('Stealth') == 'ability_check'
+    assert check_description(INITIATIVE) == "Initiative (DEX)"
+    assert check_description('CON Save') == "CON Saving Throw"
+    assert check_description('Stealth') == "Stealth (DEX) Check"
+    assert check_description('STR') == "STR Check"
+
+
+def test_initiative_never_flags_criticals():
+    for seed in range(50):
+        for result in group_roll(PARTY, INITIATIVE, rng=random.Random(seed)):
+            assert not result['critical_hit'] and not result['critical_fail']
+
+
+def test_cache_is_keyed_by_identity_and_bounded():
+    table = DerivedStats(max_rows=2)
+    table.column(PARTY, 'Stealth')
+    table.column(PARTY[1:], 'Stealth')
+    assert (table.misses, table.hits) == (3, 2)
+    table.row(PARTY[0])  # Dropped when Cael came in
+    assert table.misses == 4
+    table.row(PARTY[1].replace(level=5))  # An edit is a new Character
+    assert table.misses == 5
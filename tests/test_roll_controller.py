@@ -0,0 +1,104 @@
+import random
+
+from utils.roll_controller import DAMAGE, IDLE, RESULT, ROLLING, SETTLING, ManualClock, RollController
+
+
+def make_controller(seed=1):
+    clock = ManualClock()
+    controller = RollController(clock=clock, rng=random.Random(seed))
+    states, frames, results = [], [], []
+    controller.on_state = states.append
+    controller.on_frame = lambda state, progress, value: frames.append((state, progress, value))
+    controller.on_result = results.append
+    return clock, controller, states, frames, results
+
+
+def test_roll_goes_through_every_state_to_the_decided_value():
+    clock, controller, states, frames, results = make_controller()
+    controller.start(20, duration=2.0, pause_before=0.5, settle_time=0.3, final_value=17)
+    assert controller.state == ROLLING and controller.busy
+    clock.advance(2.6)
+    assert controller.state == SETTLING
+    clock.advance(0.5)
+    assert states == [ROLLING, SETTLING, RESULT]
+    assert results == [17] and controller.value == 17
+    assert not controller.busy
+    assert clock.pending == 0  # The tick was unscheduled
+    rolling = [progress for state, progress, _ in frames if state == ROLLING]
+    assert rolling == sorted(rolling) and rolling[-1] == 1.0
+    assert frames[-1][1] == 1.0
+
+
+def test_result_is_drawn_from_the_rng_when_not_decided():
+    outcomes = []
+    for _ in range(2):
+        clock, controller, _, _, results = make_controller(seed=42)
+        controller.start([6] * 8)
+        clock.advance(3.0)
+        outcomes.append((results[0], controller.values))
+    assert outcomes[0] == outcomes[1]
+    total, values = outcomes[0]
+    assert len(values) == 8 and all(1 <= value <= 6 for value in values) and total == sum(values)
+
+
+def test_pool_ends_on_the_decided_faces():
+    clock, controller, _, _, results = make_controller()
+    controller.start([8, 8, 6], final_values=[3, 8, 1])
+    clock.advance(3.0)
+    assert controller.values == [3, 8, 1] and results == [12]
+
+
+def test_a_thousand_rolls_run_at_a_thousand_times_real_speed():
+    clock, controller, _, _, results = make_controller()
+    for index in range(1000):
+        controller.start(20, final_value=index % 20 + 1)
+        clock.advance(3.0, step=0.25)  # 2.8 s of animation in a dozen ticks
+    assert results == [index % 20 + 1 for index in range(1000)]
+    assert clock.pending == 0
+
+
+def test_skip_jumps_to_the_result():
+    clock, controller, states, frames, results = make_controller()
+    controller.start(20, final_value=5)
+    clock.advance(0.8)
+    controller.skip()
+    assert states == [ROLLING, SETTLING, RESULT]
+    assert results == [5] and clock.pending == 0
+    clock.advance(3.0)
+    assert results == [5]  # Nothing fires afterwards
+
+
+def test_skip_when_idle_does_nothing():
+    _, controller, states, _, results = make_controller()
+    controller.skip()
+    assert controller.state == IDLE and states == [] and results == []
+
+
+def test_cancel_returns_to_idle_without_a_result():
+    clock, controller, states, _, results = make_controller()
+    controller.start(20)
+    clock.advance(1.0)
+    controller.cancel()
+    assert controller.state == IDLE and states == [ROLLING, IDLE]
+    clock.advance(3.0)
+    assert results == [] and clock.pending == 0
+
+
+def test_starting_again_replaces_the_roll_in_progress():
+    clock, controller, _, _, results = make_controller()
+    controller.start(20, final_value=2)
+    clock.advance(1.0)
+    controller.start(20, final_value=19)
+    assert clock.pending == 1  # Only the new roll's tick
+    clock.advance(3.0)
+    assert results == [19]
+
+
+def test_damage_result_resolved_without_animation():
+    clock, controller, states, _, _ = make_controller()
+    controller.start(20, final_value=20)
+    clock.advance(3.0)
+    controller.resolve(11, damage=True)
+    assert controller.state == DAMAGE and states[-1] == DAMAGE
+    assert controller.value == 11 and controller.final_value == 11
+    assert not controller.busy
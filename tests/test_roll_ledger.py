@@ -0,0 +1,109 @@
+"""The chained roll ledger, its checkpoints and inclusion proofs"""
+
+import json
+import random
+
+import pytest
+
+import cli
+from utils.io_executor import IOExecutor
+from utils.roll_ledger import RollLedger, fold_path, merkle_path, merkle_root, prove, verify_file, verify_proof
+from utils.roll_controller import ManualClock
+
+
+@pytest.fixture
+def executor():
+    executor = IOExecutor(clock=ManualClock())
+    yield executor
+    executor.shutdown()
+
+
+def flush(executor):
+    executor.submit(lambda: None, write=True).result()
+
+
+def write_ledger(path, executor, rolls=40, checkpoint_every=16):
+    ledger = RollLedger(path, checkpoint_every=checkpoint_every, executor=executor)
+    ledger.load()
+    rng = random.Random(1)
+    for _ in range(rolls):
+        natural = rng.randint(1, 20)
+        ledger.record({'roll_type': 'attack', 'dice_type': 20, 'natural': natural, 'modifier': 5,
+                       'total': natural + 5}, character='Aria')
+    flush(executor)
+    return ledger
+
+
+@pytest.mark.parametrize('count', [1, 2, 3, 7, 16])
+def test_every_merkle_path_folds_to_the_root(count):
+    leaves = [f'{index:064x}' for index in range(count)]
+    root = merkle_root(leaves)
+    for index, leaf in enumerate(leaves):
+        assert fold_path(leaf, merkle_path(leaves, index)) == root
+
+
+def test_chain_and_checkpoints_verify(tmp_path, executor):
+    path = str(tmp_path / 'ledger.jsonl')
+    ledger = write_ledger(path, executor)
+    report = verify_file(path)
+    assert report['ok'], report['error']
+    assert (report['rolls'], report['checkpoints'], report['unsealed']) == (40, 2, 8)
+    assert report['head'] == ledger.head
+
+
+def test_a_restart_continues_the_chain(tmp_path, executor):
+    path = str(tmp_path / 'ledger.jsonl')
+    write_ledger(path, executor, rolls=20)
+    with open(path, 'a') as file:
+        file.write('{"op":"roll","prev":"')  # Torn by a power cut
+    resumed = write_ledger(path, executor, rolls=20)
+    assert resumed.seq == 40
+    report = verify_file(path)
+    assert report['ok'], report['error']
+    assert (report['rolls'], report['torn']) == (40, 1)
+
+
+@pytest.mark.parametrize('tamper', ['edit', 'drop', 'swap'])
+def test_tampering_breaks_the_chain(tmp_path, executor, tamper):
+    path = str(tmp_path / 'ledger.jsonl')
+    write_ledger(path, executor)
+    with open(path) as file:
+        lines = file.readlines()
+    if tamper == 'edit':
+        lines[3] = lines[3].replace('"character":"Aria"', '"character":"Borin"')
+    elif tamper == 'drop':
+        del lines[3]
+    else:
+        lines[3], lines[4] = lines[4], lines[3]
+    with open(path, 'w') as file:
+        file.writelines(lines)
+    report = verify_file(path)
+    assert not report['ok']
+    assert report['error'].startswith('line 4:')
+
+
+def test_inclusion_proof(tmp_path, executor):
+    path = str(tmp_path / 'ledger.jsonl')
+    write_ledger(path, executor)
+    checkpoint = verify_file(path)['last_checkpoint']
+    proof = prove(path, 20)
+    assert json.loads(proof['line'])['seq'] == 20
+    assert verify_proof(proof, checkpoint)
+    assert not verify_proof(proof, '0' * 64)
+    assert not verify_proof(dict(proof, path=proof['path'][1:]))
+    assert prove(path, 35) is None  # Not sealed by a checkpoint yet
+
+
+def test_cli_verify(tmp_path, executor, capsys):
+    path = str(tmp_path / 'ledger.jsonl')
+    write_ledger(path, executor)
+    assert cli.main(['verify', path]) == 0
+    assert capsys.readouterr().out.startswith('OK: 40 rolls, 2 checkpoints')
+    assert cli.main(['verify', path, '--seq', '3']) == 0
+
+
+def test_cli_verify_without_a_ledger(tmp_path):
+    missing = str(tmp_path / 'ledger.jsonl')
+    with pytest.raises(SystemExit) as exit_info:
+        cli.main(['verify', missing])
+    assert str(exit_info.value) == f"No ledger at {missing}"
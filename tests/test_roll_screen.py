@@ -0,0 +1,72 @@
+"""Roll screen fast mode: the result is on screen before the transition"""
+
+import pytest
+
+from utils.roll_controller import ManualClock, RESULT
+
+
+class FakeApp:
+    """The attributes of the app the roll screen reads"""
+
+    def __init__(self, fast_mode):
+        self.current_profile = {'name': 'Aria'}
+        self.fast_mode = fast_mode
+        self.screen_manager = None
+
+
+@pytest.fixture
+def make_screen(load_kv):
+    load_kv('roll_screen.kv')
+    from screens.roll_screen import RollScreen
+
+    def make_screen(fast_mode):
+        screen = RollScreen(name='roll')
+        screen.app = FakeApp(fast_mode)
+        screen.controller.clock = ManualClock()
+        return screen
+    return make_screen
+
+
+def test_fast_mode_shows_the_result_in_on_pre_enter(make_screen):
+    screen = make_screen(fast_mode=True)
+    results = []
+    screen.setup_roll('ability_check', 20, modifier=3, description="STR Check", callback=results.append)
+    screen.on_pre_enter()
+
+    assert len(results) == 1
+    assert screen.result == results[0]['natural']
+    assert screen.total == screen.result + 3
+    # The short settle animation is still running and lands on the same value
+    assert screen.controller.busy
+    screen.controller.clock.advance(screen.fast_animation_duration + 0.1)
+    assert screen.controller.state == RESULT
+    assert screen.controller.value == screen.result
+    screen.on_enter()
+    assert len(results) == 1  # Not rolled a second time
+
+
+def test_tapping_skips_the_fast_animation(make_screen):
+    screen = make_screen(fast_mode=True)
+    screen.setup_roll('basic', 6, dice_pool=(6, 6, 6))
+    screen.on_pre_enter()
+    container = screen.ids.animation_container
+    assert screen.controller.busy
+
+    from kivy.tests.common import UTMotionEvent
+    touch = UTMotionEvent('unittest', 1, {'x': 0, 'y': 0})
+    touch.pos = container.center
+    assert screen.on_touch_down(touch)
+    assert screen.controller.state == RESULT
+    assert sum(screen.controller.values) == screen.result
+
+
+def test_full_animation_waits_for_on_enter(make_screen):
+    screen = make_screen(fast_mode=False)
+    results = []
+    screen.setup_roll('basic', 20, callback=results.append)
+    screen.on_pre_enter()
+    assert not results
+    screen.on_enter()
+    assert not results and screen.controller.busy
+    screen.controller.clock.advance(5.0)
+    assert len(results) == 1
@@ -0,0 +1,103 @@
+"""Streaming roll results as JSON lines over a Unix socket"""
+
+import json
+import os
+import socket
+import time
+
+import pytest
+
+from utils.event_bus import ROLL_RESULT, EventBus
+from utils.roll_stream import RollStream
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, 'AF_UNIX'), reason="needs Unix sockets")
+
+OUTCOME = {'roll_type': 'attack', 'dice_type': 20, 'natural': 17, 'modifier': 5, 'total': 22,
+           'critical_hit': False, 'critical_fail': False, 'character': 'Aria'}
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.002)
+
+
+@pytest.fixture
+def stream(tmp_path):
+    bus = EventBus(clock=object())  # The stream subscribes synchronously; nothing is scheduled
+    stream = RollStream(str(tmp_path / 'rolls.sock'), buffer=4, bus=bus)
+    assert stream.start()
+    yield stream
+    stream.stop()
+
+
+def connect(stream):
+    count = stream.stats()['clients']
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    client.connect(stream.path)
+    client.settimeout(5.0)
+    wait_for(lambda: stream.stats()['clients'] > count)
+    return client
+
+
+def read_lines(client, count):
+    data = b''
+    while data.count(b'\n') < count:
+        chunk = client.recv(65536)
+        assert chunk, "stream closed"
+        data += chunk
+    return [json.loads(line) for line in data.decode('utf-8').splitlines()]
+
+
+def test_every_client_gets_every_roll(stream):
+    first, second = connect(stream), connect(stream)
+    for natural in (17, 3):
+        stream.bus.publish(ROLL_RESULT, dict(OUTCOME, natural=natural))
+    for client in (first, second):
+        lines = read_lines(client, 2)
+        assert [line['seq'] for line in lines] == [0, 1]
+        assert [line['natural'] for line in lines] == [17, 3]
+        assert lines[0]['character'] == 'Aria'
+        client.close()
+
+
+def test_nothing_is_replayed_to_late_clients(stream):
+    stream.bus.publish(ROLL_RESULT, OUTCOME)
+    client = connect(stream)
+    stream.bus.publish(ROLL_RESULT, OUTCOME)
+    assert [line['seq'] for line in read_lines(client, 1)] == [1]
+    client.close()
+
+
+def test_a_client_leaving_is_noticed(stream):
+    client = connect(stream)
+    client.close()
+    wait_for(lambda: stream.stats()['clients'] == 0)
+    stream.bus.publish(ROLL_RESULT, OUTCOME)
+    assert stream.stats()['published'] == 1
+
+
+def test_a_client_that_stops_reading_loses_its_oldest_lines(stream):
+    client = connect(stream)
+    client.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+    big = dict(OUTCOME, character='x' * 2000)
+    for _ in range(2000):
+        stream.bus.publish(ROLL_RESULT, big)
+    wait_for(lambda: stream.stats()['dropped'] > 0)
+    assert stream.stats()['pending'] <= stream.buffer
+    client.close()
+
+
+def test_stale_socket_is_replaced_and_a_live_one_is_refused(tmp_path, stream):
+    other = RollStream(stream.path, bus=stream.bus)
+    assert not other.start()  # Someone is listening there
+
+    stale_path = str(tmp_path / 'stale.sock')
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(stale_path)
+    stale.close()  # Left behind as if the app had crashed
+    restarted = RollStream(stale_path, bus=stream.bus)
+    assert restarted.start()
+    restarted.stop()
+    assert not os.path.exists(stale_path)
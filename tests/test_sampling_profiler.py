@@ -0,0 +1,101 @@
+"""Sampling profiler: thread filtering and the collapsed-stack output"""
+
+import threading
+import time
+
+import pytest
+
+from utils import sampling_profiler as sampling
+from utils.io_executor import IOExecutor
+from utils.roll_controller import ManualClock
+from utils.sampling_profiler import SamplingProfiler, _label
+
+
+@pytest.fixture
+def executor(monkeypatch):
+    executor = IOExecutor(clock=ManualClock())
+    monkeypatch.setattr(sampling, 'io_executor', executor)
+    yield executor
+    executor.shutdown()
+
+
+@pytest.fixture
+def worker():
+    """A thread named 'worker' parked in park_worker() until the test ends"""
+    release = threading.Event()
+
+    def park_worker():
+        release.wait()
+
+    thread = threading.Thread(target=park_worker, name='worker', daemon=True)
+    thread.start()
+    yield thread
+    release.set()
+    thread.join()
+
+
+def test_only_the_named_threads_are_sampled(worker):
+    profiler = SamplingProfiler(threads=('worker',))
+    profiler._sample()
+    assert profiler.samples == 1
+    assert len(profiler._counts) == 1
+    (stack, count), = profiler._counts.items()
+    assert count == 1
+    assert stack[-1] == 'worker'  # Leaf first, thread name last
+    assert stack[0].startswith('wait (')
+    assert any(label.startswith('park_worker (tests/test_sampling_profiler.py:') for label in stack)
+
+
+def test_label_names_the_function_and_its_file():
+    assert _label(test_label_names_the_function_and_its_file.__code__) == (
+        f"test_label_names_the_function_and_its_file (tests/test_sampling_profiler.py:"
+        f"{test_label_names_the_function_and_its_file.__code__.co_firstlineno})")
+
+
+def test_write_puts_the_root_first(tmp_path):
+    path = str(tmp_path / 'capture.collapsed')
+    SamplingProfiler._write(path, {
+        ('leaf (a/b.py:3)', 'root (a/c.py:1)', 'MainThread'): 7,
+        ('root (a/c.py:1)', 'MainThread'): 2,
+    })
+    assert open(path).read() == (
+        "MainThread;root (a/c.py:1) 2\n"
+        "MainThread;root (a/c.py:1);leaf (a/b.py:3) 7\n"
+    )
+
+
+def test_stop_queues_the_capture_on_the_writer(tmp_path, executor):
+    profiler = SamplingProfiler(str(tmp_path), interval=0.001, threads=('MainThread',))
+    profiler.start()
+    deadline = time.monotonic() + 5.0
+    while not profiler.samples:
+        assert time.monotonic() < deadline, "no samples taken"
+        time.sleep(0.005)
+    saved = []
+    path = profiler.stop(on_saved=saved.append)
+    assert not profiler.running
+
+    executor.submit(lambda: None, write=True).result()
+    executor.clock.advance(1 / 60.0)
+    assert saved == [path]
+    lines = open(path).read().splitlines()
+    assert sum(int(line.rsplit(' ', 1)[1]) for line in lines) == profiler.samples
+    assert all(line.startswith('MainThread;') for line in lines)
+    assert any('test_stop_queues_the_capture_on_the_writer' in line for line in lines)
+
+
+def test_stop_skips_the_write_while_the_sampler_is_stuck(tmp_path, executor, monkeypatch):
+    monkeypatch.setattr(sampling, 'JOIN_TIMEOUT', 0.01)
+    profiler = SamplingProfiler(str(tmp_path))
+    release = threading.Event()
+    # Stands in for a sampler that cannot get the GIL back before the join times out
+    profiler._thread = threading.Thread(target=release.wait, daemon=True)
+    profiler._thread.start()
+    profiler._counts = {('MainThread',): 1}
+    try:
+        assert profiler.stop() is None
+    finally:
+        release.set()
+    assert not profiler.running
+    executor.submit(lambda: None, write=True).result()
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,124 @@
+"""Recording a seeded session and replaying it against a stand-in app"""
+
+import json
+
+import pytest
+
+from rules.checks import basic_spec, resolve_roll
+from utils.io_executor import io_executor
+from utils.session import Session, session
+from utils.session_replay import SessionPlayer, load_session
+
+
+class StandInScreen:
+    fast_animation = True
+
+    def __init__(self, app):
+        self.app = app
+        self.last = None
+
+    def new_roll(self):
+        session.input('new_roll')
+        self.app.roll_manager.show(self.last or 20)
+
+    def flush_deferred(self):
+        pass
+
+
+class StandInManager:
+    """Draws outcomes from the session RNG and shows them, like the roll screen"""
+
+    def __init__(self, app):
+        self.app = app
+
+    def roll_dice(self, sides):
+        session.input('roll_dice', sides)
+        self.show(sides)
+
+    def show(self, sides):
+        self.app.screen.last = sides
+        spec = basic_spec(sides)
+        session.result(resolve_roll(spec.roll_type, sides, session.rng.randint(1, sides)))
+
+
+class StandInApp:
+    def __init__(self):
+        self.fast_mode = False
+        self.current_profile = None
+        self.roll_manager = StandInManager(self)
+        self.screen = StandInScreen(self)
+        self.screen_manager = self
+
+    def get_screen(self, name):
+        return self.screen
+
+
+def record(path, seed=1234, rolls=(20, 6, 8, 20, 100)):
+    ticks = iter(range(1000))
+    session.clock = lambda: next(ticks) * 0.5
+    app = StandInApp()
+    session.start(path, seed=seed)
+    for sides in rolls:
+        app.roll_manager.roll_dice(sides)
+    app.screen.new_roll()
+    session.stop()
+    io_executor.submit(lambda: None, write=True).result()
+    return load_session(path)
+
+
+@pytest.fixture(autouse=True)
+def restore_session():
+    clock = session.clock
+    yield
+    session.stop()
+    session.reseed(None)
+    session.clock = clock
+
+
+def test_seed_gives_the_same_stream():
+    first, second = Session(), Session()
+    first.reseed(7)
+    second.reseed(7)
+    assert [first.rng.randint(1, 20) for _ in range(20)] == [second.rng.randint(1, 20) for _ in range(20)]
+
+
+def test_recording_layout(tmp_path):
+    events = record(str(tmp_path / 'session.jsonl'))
+    assert events[0]['op'] == 'session' and events[0]['seed'] == 1234
+    inputs = [event for event in events if event['op'] == 'input']
+    results = [event for event in events if event['op'] == 'result']
+    assert [event['action'] for event in inputs] == ['roll_dice'] * 5 + ['new_roll']
+    assert all(event['source'] == 'tap' for event in inputs)
+    assert len(results) == 6
+    times = [event['t'] for event in events[1:]]
+    assert times == sorted(times)
+
+
+def test_replay_matches_the_recording(tmp_path):
+    events = record(str(tmp_path / 'session.jsonl'))
+    report = SessionPlayer(events, StandInApp()).run()
+    assert report['divergences'] == []
+    assert report['results_replayed'] == report['results_recorded'] == 6
+    assert session.seed_value is None  # Restored afterwards
+
+
+def test_replay_reports_divergences_and_unknown_actions(tmp_path):
+    events = record(str(tmp_path / 'session.jsonl'), rolls=(20, 20))
+    del events[-2:]  # The new_roll and its result
+    results = [event for event in events if event['op'] == 'result']
+    results[1]['natural'] += 1
+    events.append({'op': 'input', 't': 99, 'action': 'teleport', 'args': []})
+    report = SessionPlayer(events, StandInApp()).run()
+    assert [divergence['index'] for divergence in report['divergences']] == [1]
+    assert report['unknown_actions'] == ['teleport']
+
+
+def test_load_session_rejects_other_files_and_tolerates_a_torn_tail(tmp_path):
+    path = tmp_path / 'not_a_session.jsonl'
+    path.write_text(json.dumps({'op': 'add'}) + '\n')
+    with pytest.raises(ValueError):
+        load_session(str(path))
+    path.write_text(json.dumps({'op': 'session', 'seed': 1}) + '\n{"op":"inp')
+    assert load_session(str(path)) == [{'op': 'session', 'seed': 1}]
+    path.write_text(json.dumps({'op': 'session', 'seed': 1}) + '\n{"op":"inp\n' + json.dumps({'op': 'input'}) + '\n')
+    assert load_session(str(path)) == [{'op': 'session', 'seed': 1}, {'op': 'input'}]
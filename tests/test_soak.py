@@ -0,0 +1,37 @@
+"""Soak harness arithmetic: leak slope and type growth"""
+
+import pytest
+
+pytest.importorskip('kivy')
+
+from benchmarks.soak import _round_up, floor_trend, top_growth  # noqa: E402
+
+
+def sawtooth(floor_slope, cycles=40, teeth=5):
+    """Heap samples that rise and fall by 10 KiB on top of a floor"""
+    return [(cycle, 100_000 + floor_slope * cycle + (cycle % teeth) * 2048) for cycle in range(cycles)]
+
+
+def test_a_steady_sawtooth_does_not_count_as_growth():
+    assert floor_trend(sawtooth(0)) == 0
+
+
+def test_a_rising_floor_is_growth_per_cycle():
+    assert floor_trend(sawtooth(32)) == pytest.approx(32, rel=0.1)
+
+
+@pytest.mark.parametrize('points', [[], [(0, 5)], [(3, 5), (3, 9)]])
+def test_too_few_points_mean_no_trend(points):
+    assert floor_trend(points) == 0.0
+
+
+def test_top_growth_lists_only_types_that_grew():
+    before = {'Widget': 10, 'Texture': 4, 'dict': 100}
+    after = {'Widget': 13, 'Texture': 4, 'dict': 90, 'ClockEvent': 7}
+    assert top_growth(before, after, 5) == [('ClockEvent', 7), ('Widget', 3)]
+    assert top_growth(before, after, 1) == [('ClockEvent', 7)]
+
+
+@pytest.mark.parametrize('value, rounded', [(0, 0), (1, 6), (6, 6), (500, 504)])
+def test_cycle_counts_round_up_to_whole_action_rounds(value, rounded):
+    assert _round_up(value, 6) == rounded
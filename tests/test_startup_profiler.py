@@ -0,0 +1,122 @@
+"""Startup phases and marks, and what compare_startup calls a regression"""
+
+import json
+import sys
+
+import pytest
+
+from benchmarks import compare_startup
+from utils import startup_profiler
+from utils.startup_profiler import StartupProfiler
+
+
+class FakeTime:
+    """perf_counter_ns that moves only when told to"""
+
+    def __init__(self):
+        self.ns = 0
+
+    def __call__(self):
+        return self.ns
+
+    def advance(self, ms):
+        self.ns += int(ms * 1_000_000)
+
+
+@pytest.fixture
+def fake_time(monkeypatch):
+    fake = FakeTime()
+    monkeypatch.setattr(startup_profiler, '_perf_ns', fake)
+    return fake
+
+
+def test_phases_accumulate_and_marks_count_from_start(fake_time, tmp_path):
+    profiler = StartupProfiler(str(tmp_path / 'startup.json'))
+    fake_time.advance(10)
+    with profiler.phase('kv'):
+        fake_time.advance(4)
+    with profiler.phase('kv'):
+        fake_time.advance(2.5)
+    with pytest.raises(RuntimeError):
+        with profiler.phase('window'):
+            fake_time.advance(30)
+            raise RuntimeError("no display")
+    assert profiler.mark('first_frame') == 46.5
+
+    assert profiler.phases == {'kv': 6.5, 'window': 30.0}
+    assert profiler.marks == {'first_frame': 46.5}
+    path = profiler.write_report()
+    report = json.load(open(path))
+    assert report['phases'] == {'kv': 6.5, 'window': 30.0}
+    assert report['marks'] == {'first_frame': 46.5}
+
+
+def test_disabled_profiler_records_nothing(fake_time):
+    profiler = StartupProfiler(None)
+    with profiler.phase('kv'):
+        fake_time.advance(4)
+    assert profiler.mark('first_frame') == 4.0  # Still returned for the caller's own log
+    assert profiler.phases == {} and profiler.marks == {}
+    profiler.install()
+    assert profiler._original_import is None
+    assert profiler.write_report() is None
+
+
+def test_imports_are_timed_once_per_module(tmp_path, monkeypatch):
+    (tmp_path / 'startup_probe.py').write_text("import json\nVALUE = 1\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, 'startup_probe', raising=False)
+    profiler = StartupProfiler(str(tmp_path / 'startup.json'))
+    profiler.install()
+    try:
+        import startup_probe  # noqa: F401
+        import startup_probe  # noqa: F401,F811 - already loaded, not timed again
+    finally:
+        profiler.uninstall()
+    assert list(profiler.imports) == ['startup_probe']  # json was already loaded
+    cumulative, self_ns = profiler.imports['startup_probe']
+    assert 0 < self_ns <= cumulative
+
+
+def report(marks=None, phases=None, imports=None):
+    return {
+        'marks': marks or {},
+        'phases': phases or {},
+        'imports': {name: {'cumulative_ms': ms, 'self_ms': ms} for name, ms in (imports or {}).items()},
+    }
+
+
+@pytest.mark.parametrize('before, after, status', [
+    (100.0, 120.0, 'REGRESSION'),  # +20 ms, +20%
+    (100.0, 104.0, 'ok'),  # +4 ms is under --min-ms
+    (1000.0, 1060.0, 'ok'),  # +60 ms is only +6%
+    (10.0, 14.0, 'ok'),  # +40% but only +4 ms
+    (100.0, 80.0, 'improved'),
+    (0.0, 6.0, 'REGRESSION'),
+])
+def test_a_regression_must_pass_both_thresholds(before, after, status):
+    rows = compare_startup.compare(report(marks={'first_frame': before}),
+                                   report(marks={'first_frame': after}))
+    assert rows == [('mark:first_frame', before, after, status)]
+
+
+def test_new_and_removed_entries_are_listed_but_not_regressions(tmp_path, capsys):
+    baseline = report(phases={'kv': 40.0}, imports={'kivy': 300.0})
+    current = report(phases={'kv': 41.0, 'window': 90.0}, imports={'numpy': 2.0})
+    rows = compare_startup.compare(baseline, current)
+    assert rows == [
+        ('import:kivy', 300.0, None, 'removed'),
+        ('import:numpy', None, 2.0, 'ok'),
+        ('phase:kv', 40.0, 41.0, 'ok'),
+        ('phase:window', None, 90.0, 'new'),
+    ]
+
+    paths = []
+    for name, data in (('baseline', baseline), ('current', current)):
+        paths.append(str(tmp_path / f'{name}.json'))
+        json.dump(data, open(paths[-1], 'w'))
+    assert compare_startup.main(paths) == 0
+    current['phases']['kv'] = 60.0
+    json.dump(current, open(paths[1], 'w'))
+    assert compare_startup.main(paths) == 1
+    assert "1 regression(s)" in capsys.readouterr().out
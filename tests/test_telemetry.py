@@ -0,0 +1,177 @@
+"""Telemetry batching and the outbox, against a local HTTP stand-in"""
+
+import gzip
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from utils.event_bus import ROLL_RESULT, EventBus
+from utils.telemetry import HttpUplink, Telemetry, UplinkError, uplink_for
+
+
+class StandIn:
+    """The dashboard endpoint: answers with ``statuses`` first, then keeps every batch."""
+
+    def __init__(self, statuses=()):
+        self.statuses = list(statuses)
+        self.batches = []
+        self.requests = 0
+        self.in_flight = threading.Event()
+        self.release = threading.Event()
+        self.release.set()
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers['Content-Length']))
+                stand_in.requests += 1
+                if stand_in.statuses:
+                    self.send_response(stand_in.statuses.pop(0))
+                    self.send_header('Retry-After', '0')
+                    self.end_headers()
+                    return
+                stand_in.in_flight.set()
+                stand_in.release.wait(10)
+                if self.headers.get('Content-Encoding') == 'gzip':
+                    body = gzip.decompress(body)
+                stand_in.batches.append(json.loads(body))
+                self.send_response(200)
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}/telemetry'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.release.set()
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stand_in():
+    stand_in = StandIn()
+    yield stand_in
+    stand_in.close()
+
+
+def make_telemetry(outbox, **kwargs):
+    options = dict(bucket_seconds=60, flush_every=60.0, min_interval=0.0, base_backoff=0.01, max_backoff=0.05,
+                   bus=EventBus(clock=object()))
+    options.update(kwargs)
+    return Telemetry(outbox=str(outbox), **options)
+
+
+def publish(telemetry, rolls):
+    for character, dice, natural in rolls:
+        telemetry.bus.publish(ROLL_RESULT, {
+            'roll_type': 'attack', 'dice_type': dice, 'natural': natural, 'modifier': 2, 'total': natural + 2,
+            'critical_hit': dice == 20 and natural == 20, 'critical_fail': dice == 20 and natural == 1,
+            'character': character,
+        })
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+def test_rolls_arrive_summed_per_character_and_die(tmp_path, stand_in):
+    telemetry = make_telemetry(tmp_path)
+    telemetry.start(HttpUplink(stand_in.url))
+    publish(telemetry, [('Aria', 20, 20), ('Aria', 20, 10), ('Aria', 6, 4), ('Borin', 20, 1)])
+    telemetry.flush()
+    wait_for(lambda: telemetry.stats()['sent'] == 1)
+    telemetry.stop()
+
+    buckets = {(bucket['character'], bucket['dice']): bucket for bucket in stand_in.batches[0]['buckets']}
+    assert set(buckets) == {('Aria', 20), ('Aria', 6), ('Borin', 20)}
+    assert (buckets['Aria', 20]['count'], buckets['Aria', 20]['mean'], buckets['Aria', 20]['crit_rate']) == (2, 15, 0.5)
+    assert buckets['Borin', 20]['fail_rate'] == 1.0
+    assert buckets['Aria', 6]['last_total'] == 6
+    assert os.listdir(tmp_path) == []
+
+
+def test_max_rolls_flushes_early(tmp_path, stand_in):
+    telemetry = make_telemetry(tmp_path, max_rolls=10)
+    telemetry.start(HttpUplink(stand_in.url))
+    publish(telemetry, [('Aria', 20, 5)] * 10)
+    wait_for(lambda: telemetry.stats()['sent'] == 1)
+    telemetry.stop()
+    assert stand_in.batches[0]['buckets'][0]['count'] == 10
+
+
+def test_failed_sends_are_retried_and_malformed_batches_dropped(tmp_path):
+    stand_in = StandIn(statuses=[503, 429, 400])
+    telemetry = make_telemetry(tmp_path)
+    telemetry.start(HttpUplink(stand_in.url))
+    publish(telemetry, [('Aria', 20, 5)])
+    telemetry.flush()
+    wait_for(lambda: telemetry.stats()['rejected'] == 1)
+    publish(telemetry, [('Aria', 20, 7)])
+    telemetry.flush()
+    wait_for(lambda: telemetry.stats()['sent'] == 1)
+    telemetry.stop()
+    stand_in.close()
+    stats = telemetry.stats()
+    assert (stats['failures'], stats['rejected'], stats['pending']) == (2, 1, 0)
+    assert stats['last_error'] == 'HTTP 400'
+    assert [batch['buckets'][0]['last'] for batch in stand_in.batches] == [7]
+
+
+def test_the_outbox_waits_for_the_next_run(tmp_path, stand_in):
+    down = make_telemetry(tmp_path)
+    down.start(HttpUplink('http://127.0.0.1:9/telemetry', timeout=1.0))  # Nothing listens there
+    publish(down, [('Aria', 20, 12), ('Borin', 8, 3)])
+    down.stop()
+    assert down.stats()['pending'] == 1
+    (tmp_path / '1.json.gz.tmp').write_bytes(b'torn')
+
+    up = make_telemetry(tmp_path)
+    up.start(HttpUplink(stand_in.url))
+    wait_for(lambda: up.stats()['sent'] == 1)
+    up.stop()
+    assert sum(bucket['count'] for bucket in stand_in.batches[0]['buckets']) == 2
+    assert os.listdir(tmp_path) == []
+
+
+def test_stop_during_a_send_keeps_the_last_batch(tmp_path, stand_in):
+    telemetry = make_telemetry(tmp_path, max_batches=1)
+    telemetry.start(HttpUplink(stand_in.url))
+    stand_in.release.clear()
+    publish(telemetry, [('Aria', 20, 5)])
+    telemetry.flush()
+    assert stand_in.in_flight.wait(5)
+    thread = telemetry._thread
+
+    # The send hangs, so stop() writes the last rolls itself; the full outbox drops the batch in flight
+    publish(telemetry, [('Aria', 20, 9)])
+    telemetry.stop(timeout=0.05)
+    stand_in.release.set()
+    thread.join(5)
+
+    assert telemetry.stats()['pending'] == 1
+    [name] = os.listdir(tmp_path)
+    with open(tmp_path / name, 'rb') as file:
+        assert json.loads(gzip.decompress(file.read()))['buckets'][0]['last'] == 9
+
+
+def test_uplink_for():
+    assert isinstance(uplink_for('https://example.com/telemetry'), HttpUplink)
+    with pytest.raises(ValueError):
+        uplink_for('ftp://example.com')
+
+
+def test_unreachable_endpoint_is_a_retryable_error():
+    with pytest.raises(UplinkError) as error:
+        HttpUplink('http://127.0.0.1:9/telemetry', timeout=1.0).send(b'{}', compressed=False)
+    assert not error.value.permanent
@@ -0,0 +1,82 @@
+"""Snapshot fade and per-route transitions"""
+
+import pytest
+
+
+@pytest.fixture
+def manager(kivy_window):
+    from kivy.uix.screenmanager import Screen
+    from components.lazy_screen_manager import LazyScreenManager
+    from components.transitions import SnapshotFadeTransition
+
+    manager = LazyScreenManager(transition=SnapshotFadeTransition(duration=0.05))
+    for name in ('main', 'roll', 'profiles'):
+        manager.add_widget(Screen(name=name))
+    kivy_window.add_widget(manager)
+    frames(1)
+    yield manager
+    kivy_window.remove_widget(manager)
+
+
+def frames(count):
+    from kivy.base import EventLoop
+
+    for _ in range(count):
+        EventLoop.idle()
+
+
+def run_transition(manager):
+    import time
+
+    while manager.transition.is_active:
+        time.sleep(0.005)
+        frames(1)
+
+
+def test_fade_draws_the_snapshot_over_the_new_screen(manager):
+    fade = manager.transition
+    manager.current = 'profiles'
+    frames(1)
+    assert fade.is_active
+    assert fade._overlay in manager.canvas.after.children
+    assert manager.get_screen('main').parent is None  # Only the snapshot is left of it
+    run_transition(manager)
+    assert fade._overlay is None
+    assert manager.children == [manager.get_screen('profiles')]
+    assert fade.cuts == 0
+
+
+def test_slow_frames_cut_the_fade_short(manager, monkeypatch):
+    from components import transitions
+
+    fade = manager.transition
+    fade.duration = 10.0
+    now = [0.0]
+    monkeypatch.setattr(transitions.time, 'perf_counter', lambda: now[0])
+    manager.current = 'profiles'
+    for _ in range(4):
+        now[0] += 0.1  # Every frame over the budget
+        frames(1)
+        if not fade.is_active:
+            break
+    assert fade.cuts == 1
+    assert not fade.is_active
+    assert manager.current_screen.name == 'profiles'
+
+
+def test_routes_pick_their_own_transition(manager):
+    from kivy.uix.screenmanager import NoTransition
+
+    fade = manager.default_transition
+    direct = NoTransition()
+    manager.set_route_transition('main', 'roll', direct)
+    manager.set_route_transition('*', 'main', direct)
+    manager.current = 'roll'
+    assert manager.transition is direct
+    manager.current = 'main'
+    assert manager.transition is direct
+    manager.current = 'profiles'
+    assert manager.transition is fade
+    run_transition(manager)
+    manager.current = 'main'
+    assert manager.transition is direct
@@ -0,0 +1,63 @@
+import os
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from utils.tumble import DICE_SIDES, TRAJECTORY_VERSION, TrajectoryLibrary, face_sequence  # noqa: E402
+
+
+def cache_file(library, sides):
+    return os.path.join(library.path, f"d{sides}_v{TRAJECTORY_VERSION}.npz")
+
+
+def test_face_sequence_ends_on_the_final_face_and_always_changes_face():
+    import random
+    rng = random.Random(3)
+    for final in range(1, 21):
+        faces = face_sequence(20, 12, final, rng)
+        assert faces[-1] == final and len(faces) == 13
+        assert all(a != b for a, b in zip(faces, faces[1:]))
+
+
+def test_trajectories_end_on_the_picked_face_and_at_rest(tmp_path):
+    library = TrajectoryLibrary(str(tmp_path), throws=6, per_face=2)
+    assert library.pick(6, 3) is None  # Not loaded yet: never simulated during a roll
+    library.load(6)
+    assert os.path.exists(cache_file(library, 6))
+    for face in range(1, 7):
+        trajectory = library.pick(6, face)
+        assert trajectory.final_face == face
+        assert trajectory.faces[-1] == face
+
+
+def test_cache_is_reused(tmp_path):
+    TrajectoryLibrary(str(tmp_path), throws=6, per_face=2).load(4)
+    library = TrajectoryLibrary(str(tmp_path), throws=6, per_face=2)
+    library._build = lambda sides: pytest.fail("simulated again despite the cache")
+    assert library.load(4)
+
+
+def test_torn_cache_is_rebuilt(tmp_path):
+    TrajectoryLibrary(str(tmp_path), throws=6, per_face=2).load(20)
+    path = cache_file(TrajectoryLibrary(str(tmp_path)), 20)
+    with open(path, 'rb') as file:
+        data = file.read()
+    with open(path, 'wb') as file:
+        file.write(data[:len(data) // 2])  # Power cut during the save
+
+    library = TrajectoryLibrary(str(tmp_path), throws=6, per_face=2)
+    assert library.load(20)[20]
+    with np.load(path) as cached:  # Replaced by a whole file
+        assert 'faces' in cached
+    assert not os.path.exists(path + '.tmp')
+
+
+def test_warming_stops_once_every_die_type_is_ready(tmp_path):
+    library = TrajectoryLibrary(str(tmp_path), throws=4, per_face=1)
+    warmed = []
+    while library.next_cold() is not None:
+        warmed.append(library.next_cold())
+        library.warm_next()
+    assert warmed == list(DICE_SIDES)
+    assert library.warm_next() is False
@@ -0,0 +1,118 @@
+"""Event-sourced hit points, conditions and spell slots for the session.
+
+Every change to :class:`rules.combat_state.CombatState` is appended to
+``data/combat.jsonl`` as one event (see :mod:`utils.journal`). Every
+``snapshot_every`` events a snapshot event is appended as well, so loading
+only parses the last snapshot and the short tail after it instead of
+replaying the whole session. Once ``compact_after`` snapshots have been
+written, the lines before the latest one are dropped by a compaction queued
+on the I/O writer thread; the UI never waits for it.
+
+Events recorded before the log has been loaded are applied straight away
+and written, after the loaded state, once loading finishes.
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Callable, List, Optional
+
+from rules.combat_state import CombatState
+from utils.journal import Journal
+
+COMBAT_LOG_PATH = os.path.join('data', 'combat.jsonl')
+
+
+class CombatLog:
+    """The session's combat state and the journal it is rebuilt from."""
+
+    def __init__(self, path: str = COMBAT_LOG_PATH, snapshot_every: int = 50, compact_after: int = 4,
+                 executor=None) -> None:
+        self.journal = Journal(path, executor)
+        self.snapshot_every = snapshot_every
+        self.compact_after = compact_after
+        self.state = CombatState()
+        self.loaded = False
+        self.listeners: List[Callable[[dict], None]] = []
+        self._since_snapshot = 0
+        self._snapshots = 0
+        self._waiting: List[dict] = []  # Recorded before loading finished
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+    def record(self, op: str, **fields) -> dict:
+        """Apply one event to the state and log it"""
+        event = {'op': op}
+        event.update(fields)
+        self.state.apply(event)
+        if self.loaded:
+            self._append(event)
+        else:
+            self._waiting.append(event)
+        for listener in self.listeners:
+            listener(event)
+        return event
+
+    def damage(self, amount: int, target: Optional[str] = None, source: Optional[str] = None,
+               damage_type: Optional[str] = None, critical: bool = False) -> dict:
+        return self.record('damage', target=target, source=source, amount=amount, damage_type=damage_type,
+                           critical=critical)
+
+    def heal(self, target: str, amount: int) -> dict:
+        return self.record('heal', target=target, amount=amount)
+
+    def add_condition(self, target: str, condition: str) -> dict:
+        return self.record('condition_add', target=target, condition=condition)
+
+    def remove_condition(self, target: str, condition: str) -> dict:
+        return self.record('condition_remove', target=target, condition=condition)
+
+    def use_slot(self, target: str, level: int) -> dict:
+        return self.record('slot_use', target=target, level=level)
+
+    def snapshot(self):
+        """Append a snapshot now (and compact once enough have piled up)"""
+        self.journal.append(self.state.snapshot())
+        self._since_snapshot = 0
+        self._snapshots += 1
+        if self._snapshots >= self.compact_after:
+            self._snapshots = 1
+            return self.journal.compact('snapshot')
+        return None
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+    def load_async(self, on_done: Optional[Callable[[], None]] = None):
+        """Rebuild the state from the last snapshot and its tail, off-thread"""
+        def loaded(events):
+            self._restore(events)
+            if on_done is not None:
+                on_done()
+        return self.journal.load_async(loaded, checkpoint='snapshot')
+
+    def load(self) -> None:
+        """Blocking load (tools and tests)"""
+        self._restore(self.journal.load('snapshot'))
+
+    def _restore(self, events: List[dict]) -> None:
+        self.state = CombatState()
+        self.state.replay(events)
+        self._since_snapshot = len(events)
+        self._snapshots = 1 if events and events[0]['op'] == 'snapshot' else 0
+        self.loaded = True
+        waiting, self._waiting = self._waiting, []
+        for event in waiting:
+            self.state.apply(event)
+            self._append(event)
+
+    def _append(self, event: dict) -> None:
+        self.journal.append(event)
+        self._since_snapshot += 1
+        if self._since_snapshot >= self.snapshot_every:
+            self.snapshot()
+
+
+# Global instance
+combat_log = CombatLog()
@@ -0,0 +1,300 @@
+"""In-process publish/subscribe between the sensor thread, the UI, the
+journals and telemetry.
+
+Publishers call :meth:`EventBus.publish` from any thread with a
+:class:`Topic` and a payload of the topic's type. Each subscriber has its
+own bounded queue and one of three deliveries:
+
+``main``
+    on the Kivy main thread, drained on the clock with at most
+    ``frame_budget`` seconds a frame (widgets, screens)
+``worker``
+    on a daemon thread of the subscriber's own, in publish order (logging,
+    network, files)
+``sync``
+    in the publisher's thread, before ``publish`` returns (cheap bookkeeping)
+
+When a queue is full the subscriber's ``policy`` decides: ``drop_oldest``
+(the default; the latest state wins), ``drop_newest``, or ``block``, where
+the publisher waits up to ``block_timeout`` for room before dropping. Never
+give a main-thread subscriber ``block`` if the main thread publishes to it.
+
+Queues are deques, whose appends and pops are atomic, so publishing takes
+no lock beyond waking a sleeping consumer. Each subscriber counts the events
+delivered and dropped, handler errors, its queue's high-water mark and the
+latency from publish to handler (see :meth:`Subscription.stats`). The clock
+is injectable like :class:`utils.io_executor.IOExecutor`'s.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+MAIN = 'main'
+WORKER = 'worker'
+SYNC = 'sync'
+
+DROP_OLDEST = 'drop_oldest'
+DROP_NEWEST = 'drop_newest'
+BLOCK = 'block'
+
+_perf_ns = time.perf_counter_ns
+
+
+class Topic:
+    """A named event type; payloads published on it must be ``payload_type``."""
+
+    __slots__ = ('name', 'payload_type')
+
+    def __init__(self, name: str, payload_type: Any = object) -> None:
+        self.name = name
+        self.payload_type = payload_type
+
+    def __repr__(self) -> str:
+        return f"Topic({self.name!r})"
+
+
+# Topics published by the app
+MOTION_DETECTED = Topic('motion.detected', type(None))  # Sensor thread
+MOTION_STATUS = Topic('motion.status', str)  # Sensor thread
+MOTION_ERROR = Topic('motion.error', Exception)  # Sensor thread
+ROLL_RESULT = Topic('roll.result', dict)  # Roll screen: a resolve_roll() outcome plus 'character'
+
+
+class Subscription:
+    """One handler on one topic, with its queue and counters."""
+
+    def __init__(self, bus: 'EventBus', topic: Topic, handler: Callable[[Any], None], mode: str, policy: str,
+                 maxsize: int, name: str) -> None:
+        self.bus = bus
+        self.topic = topic
+        self.handler = handler
+        self.mode = mode
+        self.policy = policy
+        self.maxsize = maxsize
+        self.name = name
+        self.active = True
+        self.stopping = False  # Worker: finish the queue, then exit
+        self.delivered = 0
+        self.dropped = 0
+        self.errors = 0
+        self.high_water = 0
+        self.latency_total_ns = 0
+        self.latency_max_ns = 0
+        self._samples = deque(maxlen=256)  # Recent latencies, for the p95
+        self._queue = deque()  # (publish time ns, payload)
+        self._wake = threading.Event() if mode == WORKER else None
+        self._room = threading.Condition() if policy == BLOCK else None
+        self._thread: Optional[threading.Thread] = None
+
+    # ------------------------------------------------------------------
+    # Publisher side
+    # ------------------------------------------------------------------
+    def offer(self, payload: Any) -> bool:
+        """Queue (or, for sync, handle) one event; False if it was dropped"""
+        if self.mode == SYNC:
+            self._handle(_perf_ns(), payload)
+            return True
+        queue = self._queue
+        if len(queue) >= self.maxsize:
+            if self.policy == DROP_NEWEST:
+                self.dropped += 1
+                return False
+            if self.policy == BLOCK:
+                with self._room:
+                    if not self._room.wait_for(lambda: len(queue) < self.maxsize, self.bus.block_timeout):
+                        self.dropped += 1
+                        return False
+            else:
+                try:
+                    queue.popleft()
+                    self.dropped += 1
+                except IndexError:
+                    pass  # The consumer got there first
+        queue.append((_perf_ns(), payload))
+        if len(queue) > self.high_water:
+            self.high_water = len(queue)
+        if self._wake is not None:
+            if not self._wake.is_set():
+                self._wake.set()
+        else:
+            self.bus._schedule_main()
+        return True
+
+    # ------------------------------------------------------------------
+    # Consumer side
+    # ------------------------------------------------------------------
+    def drain(self, deadline_ns: Optional[int] = None) -> bool:
+        """Handle queued events (until ``deadline_ns``); True if any are left"""
+        queue = self._queue
+        while queue:
+            try:
+                published, payload = queue.popleft()
+            except IndexError:
+                break
+            if self._room is not None:
+                with self._room:
+                    self._room.notify()
+            if self.active:
+                self._handle(published, payload)
+            if deadline_ns is not None and _perf_ns() >= deadline_ns:
+                break
+        return bool(queue)
+
+    def _handle(self, published: int, payload: Any) -> None:
+        latency = _perf_ns() - published
+        self.latency_total_ns += latency
+        if latency > self.latency_max_ns:
+            self.latency_max_ns = latency
+        self._samples.append(latency)
+        self.delivered += 1
+        try:
+            self.handler(payload)
+        except Exception as error:
+            self.errors += 1
+            print(f"Event handler {self.name} failed on {self.topic.name}: {error}")
+
+    def _run(self) -> None:
+        """Worker thread: sleep until woken, then handle everything queued"""
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            self.drain()
+            if self.stopping or not self.active:
+                return
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    @property
+    def pending(self) -> int:
+        return len(self._queue)
+
+    def cancel(self) -> None:
+        self.bus.unsubscribe(self)
+
+    def stats(self) -> dict:
+        samples = sorted(self._samples)
+        return {
+            'name': self.name,
+            'topic': self.topic.name,
+            'mode': self.mode,
+            'policy': self.policy,
+            'delivered': self.delivered,
+            'dropped': self.dropped,
+            'errors': self.errors,
+            'pending': len(self._queue),
+            'high_water': self.high_water,
+            'latency_mean_ms': round(self.latency_total_ns / self.delivered / 1e6, 3) if self.delivered else None,
+            'latency_p95_ms': round(samples[min(len(samples) - 1, int(len(samples) * 0.95))] / 1e6, 3)
+            if samples else None,
+            'latency_max_ms': round(self.latency_max_ns / 1e6, 3),
+        }
+
+
+class EventBus:
+    """Topics, their subscribers and main-thread delivery."""
+
+    def __init__(self, frame_budget: float = 0.004, block_timeout: float = 0.05, clock=None) -> None:
+        self.frame_budget = frame_budget
+        self.block_timeout = block_timeout
+        self.clock = clock
+        # topic name -> subscribers; replaced, never changed, so publishing needs no lock
+        self._subscribers: Dict[str, Tuple[Subscription, ...]] = {}
+        self._main: Tuple[Subscription, ...] = ()
+        self._lock = threading.Lock()
+        self._drain_scheduled = False
+
+    def subscribe(self, topic: Topic, handler: Callable[[Any], None], mode: str = MAIN, policy: str = DROP_OLDEST,
+                  maxsize: int = 256, name: Optional[str] = None) -> Subscription:
+        """Call ``handler(payload)`` for each event on ``topic``; see the module docstring for the options"""
+        if mode not in (MAIN, WORKER, SYNC):
+            raise ValueError(f"unknown delivery mode: {mode!r}")
+        if policy not in (DROP_OLDEST, DROP_NEWEST, BLOCK):
+            raise ValueError(f"unknown queue policy: {policy!r}")
+        subscription = Subscription(self, topic, handler, mode, policy, max(1, maxsize),
+                                    name or getattr(handler, '__qualname__', repr(handler)))
+        with self._lock:
+            self._subscribers[topic.name] = self._subscribers.get(topic.name, ()) + (subscription,)
+            if mode == MAIN:
+                self._main = self._main + (subscription,)
+        if mode == WORKER:
+            subscription._thread = threading.Thread(target=subscription._run, name=f'bus-{subscription.name}',
+                                                    daemon=True)
+            subscription._thread.start()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            name = subscription.topic.name
+            self._subscribers[name] = tuple(s for s in self._subscribers.get(name, ()) if s is not subscription)
+            self._main = tuple(s for s in self._main if s is not subscription)
+        subscription.active = False
+        if subscription._wake is not None:
+            subscription._wake.set()
+
+    def has_subscribers(self, topic: Topic) -> bool:
+        """Whether publishing on ``topic`` reaches anyone (to skip building a payload)"""
+        return bool(self._subscribers.get(topic.name))
+
+    def publish(self, topic: Topic, payload: Any = None) -> int:
+        """Hand ``payload`` to every subscriber of ``topic``; returns how many took it"""
+        if not isinstance(payload, topic.payload_type):
+            raise TypeError(f"{topic.name} expects {topic.payload_type.__name__}, got {type(payload).__name__}")
+        taken = 0
+        for subscription in self._subscribers.get(topic.name, ()):
+            taken += subscription.offer(payload)
+        return taken
+
+    def stats(self) -> List[dict]:
+        """Counters of every subscriber"""
+        return [subscription.stats() for subscriptions in self._subscribers.values()
+                for subscription in subscriptions]
+
+    def shutdown(self, timeout: float = 1.0) -> None:
+        """Stop the worker threads once their queues are empty"""
+        workers = [s for subscriptions in self._subscribers.values() for s in subscriptions if s.mode == WORKER]
+        for subscription in workers:
+            subscription.stopping = True
+            subscription._wake.set()
+        for subscription in workers:
+            subscription._thread.join(timeout)
+
+    # ------------------------------------------------------------------
+    # Main-thread delivery
+    # ------------------------------------------------------------------
+    def _get_clock(self):
+        if self.clock is None:
+            from kivy.clock import Clock
+            self.clock = Clock
+        return self.clock
+
+    def _schedule_main(self) -> None:
+        with self._lock:
+            if self._drain_scheduled:
+                return
+            self._drain_scheduled = True
+        self._get_clock().schedule_once(self._drain, 0)
+
+    def _drain(self, dt) -> None:
+        """Handle queued main-thread events until this frame's budget is spent"""
+        deadline = _perf_ns() + int(self.frame_budget * 1e9)
+        left = False
+        for subscription in self._main:
+            if subscription.drain(deadline):
+                left = True
+            if _perf_ns() >= deadline:
+                left = left or any(s.pending for s in self._main)
+                break
+        with self._lock:
+            if not left and not any(s.pending for s in self._main):
+                self._drain_scheduled = False
+                return
+        self._get_clock().schedule_once(self._drain, 0)
+
+
+# Global instance
+event_bus = EventBus()
@@ -0,0 +1,208 @@
+"""Adaptive frame pacing for the Kivy main loop.
+
+Kivy redraws at ``maxfps`` even when nothing on screen changes. The governor
+lowers the clock's frame cap to an idle rate once nothing has been animating
+or touched for ``idle_after`` seconds, and raises it again as soon as a frame
+sees activity: a touch or key press, an ``Animation`` handed to
+:meth:`FrameGovernor.track`, a screen transition
+(:meth:`FrameGovernor.track_transitions`), an explicit
+:meth:`FrameGovernor.boost` (e.g. the motion sensor firing) or any
+registered activity source such as a busy roll controller.
+
+The idle cap also bounds how long a touch can wait for the next frame, so it
+is kept at 10 fps by default (``DICE_IDLE_FPS``); ``DICE_IDLE_FPS=0`` turns the
+governor off.
+
+Kivy reads ``maxfps`` from its config only when the clock is created and has
+no public way to change it afterwards, so the cap is set on the clock's
+``_max_fps``. That attribute is there from Kivy 2.1 to 2.3 (the versions the
+README installs and this was tested with); on a clock without it the
+governor turns itself off and the configured ``maxfps`` stays in place.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from typing import Callable, Dict, List, Optional
+
+ACTIVE = "active"
+IDLE = "idle"
+
+ActivitySource = Callable[[], bool]
+
+
+class FrameGovernor:
+    """Switches the Kivy clock between an active and an idle frame rate."""
+
+    def __init__(self, idle_fps: float = 10.0, active_fps: Optional[float] = None,
+                 idle_after: float = 2.0, sample_interval: float = 2.0) -> None:
+        self.enabled = idle_fps > 0
+        self.idle_fps = idle_fps
+        self.active_fps = active_fps  # None: keep the configured maxfps
+        self.idle_after = idle_after
+        self.sample_interval = sample_interval
+
+        self.mode = ACTIVE
+        self.boosts = 0
+        self.mode_seconds = {ACTIVE: 0.0, IDLE: 0.0}
+        self.measured_fps = 0.0
+        self.cpu_percent = 0.0
+
+        self._sources: List[ActivitySource] = []
+        self._clock = None
+        self._window = None
+        self._animations: Dict[int, float] = {}  # id(Animation) -> when it should be over
+        self._last_activity = 0.0
+        self._mode_since = 0.0
+        self._sample_start = 0.0
+        self._sample_cpu = 0.0
+        self._sample_frames = 0
+        self._frame_event = None
+
+    @classmethod
+    def from_env(cls) -> "FrameGovernor":
+        try:
+            idle_fps = float(os.environ.get("DICE_IDLE_FPS", "10"))
+        except ValueError:
+            idle_fps = 10.0
+        return cls(idle_fps=idle_fps)
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def install(self) -> None:
+        """Start watching for activity (call once the window exists)."""
+        if not self.enabled or self._frame_event is not None:
+            return
+        from kivy.clock import Clock
+        from kivy.core.window import Window
+
+        if not hasattr(Clock, '_max_fps'):
+            print("Frame governor: this Kivy clock has no frame cap to adjust, leaving maxfps as configured")
+            self.enabled = False
+            return
+        self._clock = Clock
+        self._window = Window
+        if self.active_fps is None:
+            self.active_fps = Clock._max_fps
+
+        now = time.perf_counter()
+        self._last_activity = now
+        self._mode_since = now
+        self._sample_start = now
+        self._sample_cpu = time.process_time()
+        Window.bind(on_motion=self._on_input, on_key_down=self._on_input)
+        self._frame_event = Clock.schedule_interval(self._on_frame, 0)
+
+    def uninstall(self) -> None:
+        """Stop governing and restore the active frame rate."""
+        if self._frame_event is None:
+            return
+        self._frame_event.cancel()
+        self._frame_event = None
+        self._window.unbind(on_motion=self._on_input, on_key_down=self._on_input)
+        self._set_mode(ACTIVE)
+
+    def add_activity_source(self, source: ActivitySource) -> None:
+        """Keep the active rate while ``source()`` returns True."""
+        self._sources.append(source)
+
+    def track(self, animation) -> None:
+        """Keep the active rate while ``animation`` runs (bind before starting it)."""
+        animation.bind(on_start=self._on_animation_start, on_complete=self._on_animation_complete)
+
+    def track_transitions(self, manager) -> None:
+        """Keep the active rate while ``manager`` runs a screen transition.
+
+        The manager starts each transition's ``Animation`` itself, so its
+        ``current`` changing boosts straight away and the transition's
+        ``is_active`` keeps the rate up until the switch is over.
+        """
+        manager.bind(current=self._on_input)
+        self.add_activity_source(lambda: manager.transition.is_active)
+
+    def boost(self) -> None:
+        """Switch to the active rate now and restart the idle countdown."""
+        self._last_activity = time.perf_counter()
+        if self.mode != ACTIVE:
+            self.boosts += 1
+            self._set_mode(ACTIVE)
+
+    def stats(self) -> dict:
+        """Current mode plus the most recent CPU and frame-rate sample."""
+        mode_seconds = dict(self.mode_seconds)
+        if self._frame_event is not None:
+            mode_seconds[self.mode] += time.perf_counter() - self._mode_since
+        return {
+            "enabled": self.enabled,
+            "mode": self.mode,
+            "target_fps": self._target_fps(self.mode),
+            "measured_fps": round(self.measured_fps, 1),
+            "cpu_percent": round(self.cpu_percent, 1),
+            "boosts": self.boosts,
+            "active_seconds": round(mode_seconds[ACTIVE], 1),
+            "idle_seconds": round(mode_seconds[IDLE], 1),
+        }
+
+    def summary(self) -> str:
+        stats = self.stats()
+        return (
+            f"Frame governor: {stats['mode']} at {stats['measured_fps']} fps, "
+            f"CPU {stats['cpu_percent']}%, idle {stats['idle_seconds']} s / "
+            f"active {stats['active_seconds']} s, {stats['boosts']} boosts"
+        )
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+    def _on_input(self, *args) -> None:
+        self.boost()
+
+    def _on_animation_start(self, animation, widget) -> None:
+        # Cancelling an animation does not dispatch on_complete, so each one
+        # also stops counting once its duration is over
+        self._animations[id(animation)] = time.perf_counter() + animation.duration
+        self.boost()
+
+    def _on_animation_complete(self, animation, widget) -> None:
+        self._animations.pop(id(animation), None)
+
+    def _is_busy(self) -> bool:
+        if self._animations:
+            now = time.perf_counter()
+            for key, ends in list(self._animations.items()):
+                if ends > now:
+                    return True
+                del self._animations[key]
+        return any(source() for source in self._sources)
+
+    def _on_frame(self, dt) -> None:
+        now = time.perf_counter()
+        self._sample_frames += 1
+        if now - self._sample_start >= self.sample_interval:
+            cpu = time.process_time()
+            elapsed = now - self._sample_start
+            self.measured_fps = self._sample_frames / elapsed
+            self.cpu_percent = (cpu - self._sample_cpu) / elapsed * 100
+            self._sample_start, self._sample_cpu, self._sample_frames = now, cpu, 0
+
+        if self._is_busy():
+            self.boost()
+        elif self.mode == ACTIVE and now - self._last_activity >= self.idle_after:
+            self._set_mode(IDLE)
+
+    def _target_fps(self, mode: str) -> float:
+        return self.idle_fps if mode == IDLE else (self.active_fps or 0)
+
+    def _set_mode(self, mode: str) -> None:
+        now = time.perf_counter()
+        self.mode_seconds[self.mode] += now - self._mode_since
+        self._mode_since = now
+        self.mode = mode
+        if self._clock is not None:
+            self._clock._max_fps = self._target_fps(mode)  # See the module docstring
+
+
+# Global instance
+frame_governor = FrameGovernor.from_env()
@@ -0,0 +1,219 @@
+"""Profile file I/O off the Kivy main thread.
+
+Reading, parsing and writing JSON on the main thread stalls the UI for as
+long as the SD card takes to answer. :class:`IOExecutor` runs that work on a
+small thread pool and hands the results back to the main thread through the
+clock, a few at a time, so a frame never spends more than ``frame_budget``
+seconds on them.
+
+Reads run on ``readers`` threads. Writes and deletes share a single thread so
+they reach the card in the order they were made, and every write goes to a
+temporary file that is synced to the card and then replaces the target, so
+neither a concurrent read nor a power cut leaves half a file. A read waits for the writes submitted before it, so e.g.
+the profile list shown right after saving a profile includes it.
+
+Callbacks (``on_done``, ``on_item``, ``on_error``) always run on the main
+thread. The clock is injectable like :class:`utils.roll_controller.RollController`'s.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, Optional
+
+Callback = Optional[Callable[..., None]]
+
+
+def read_json(path: str):
+    with open(path, 'r') as file:
+        return json.load(file)
+
+
+def write_json(path: str, data, indent: int = 4) -> str:
+    """Write ``data`` to ``path`` atomically; returns the path."""
+    temporary = f"{path}.tmp"
+    with open(temporary, 'w') as file:
+        json.dump(data, file, indent=indent)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary, path)
+    return path
+
+
+class Stream:
+    """Handle for :meth:`IOExecutor.stream`; cancel it to drop later items."""
+
+    __slots__ = ('cancelled',)
+
+    def __init__(self) -> None:
+        self.cancelled = False
+
+    def cancel(self) -> None:
+        self.cancelled = True
+
+
+class IOExecutor:
+    """Thread pool for file I/O whose results are delivered on the clock."""
+
+    def __init__(self, readers: int = 2, frame_budget: float = 0.004, clock=None) -> None:
+        self.readers = readers
+        self.frame_budget = frame_budget
+        self.clock = clock
+        self.errors = 0
+        self._read_pool: Optional[ThreadPoolExecutor] = None
+        self._write_pool: Optional[ThreadPoolExecutor] = None
+        self._results = deque()
+        self._lock = threading.Lock()
+        self._drain_scheduled = False
+        self._last_write = None  # Reads wait for this before starting
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def submit(self, fn: Callable[..., Any], *args, on_done: Callback = None, on_error: Callback = None,
+               write: bool = False):
+        """Run ``fn(*args)`` off-thread; ``on_done(result)`` runs on the main thread."""
+        pool = self._writer() if write else self._reader()
+        barrier = None if write else self._last_write
+
+        def run():
+            if barrier is not None:
+                barrier.result()
+            try:
+                result = fn(*args)
+            except Exception as error:
+                self._deliver(self._report, error, on_error)
+                return None
+            if on_done is not None:
+                self._deliver(on_done, result)
+            return result
+
+        future = pool.submit(run)
+        if write:
+            self._last_write = future
+        return future
+
+    def read_json(self, path: str, on_done: Callback, on_error: Callback = None, parse: Callable = None):
+        """Read and parse a JSON file; ``parse(data)`` also runs off-thread."""
+        if parse is None:
+            return self.submit(read_json, path, on_done=on_done, on_error=on_error)
+        return self.submit(lambda: parse(read_json(path)), on_done=on_done, on_error=on_error)
+
+    def write_json(self, path: str, data, on_done: Callback = None, on_error: Callback = None):
+        """Write ``data`` as JSON, after every write submitted before it."""
+        return self.submit(write_json, path, data, on_done=on_done, on_error=on_error, write=True)
+
+    def remove(self, path: str, on_done: Callback = None, on_error: Callback = None):
+        """Delete a file (if it exists) in order with the writes."""
+        def remove():
+            if os.path.exists(path):
+                os.remove(path)
+            return path
+        return self.submit(remove, on_done=on_done, on_error=on_error, write=True)
+
+    def stream(self, fn: Callable[[Any], Any], items: Iterable, on_item: Callable[[Any, Any], None],
+               on_done: Callback = None) -> Stream:
+        """Call ``fn(item)`` for each item in order on one reader thread.
+
+        ``on_item(item, result)`` is delivered as soon as each result is
+        ready, so a list can fill in while the rest is still loading. Items
+        whose ``fn`` raises are reported as ``on_item(item, None)``.
+        ``items`` may be a callable, which is then also run off-thread
+        (e.g. listing a directory).
+        """
+        handle = Stream()
+        barrier = self._last_write
+
+        def deliver_item(item, result):
+            if not handle.cancelled:
+                on_item(item, result)
+
+        def deliver_done():
+            if not handle.cancelled and on_done is not None:
+                on_done()
+
+        def run():
+            if barrier is not None:
+                barrier.result()
+            try:
+                listed = items() if callable(items) else items
+            except Exception as error:
+                self._deliver(self._report, error, None)
+                return
+            for item in listed:
+                if handle.cancelled:
+                    return
+                try:
+                    result = fn(item)
+                except Exception:
+                    result = None
+                self._deliver(deliver_item, item, result)
+            self._deliver(deliver_done)
+
+        self._reader().submit(run)
+        return handle
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Finish queued writes (when ``wait``) and stop the threads."""
+        for pool in (self._write_pool, self._read_pool):
+            if pool is not None:
+                pool.shutdown(wait=wait)
+        self._read_pool = self._write_pool = None
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+    def _reader(self) -> ThreadPoolExecutor:
+        if self._read_pool is None:
+            self._read_pool = ThreadPoolExecutor(max_workers=self.readers, thread_name_prefix='io-read')
+        return self._read_pool
+
+    def _writer(self) -> ThreadPoolExecutor:
+        if self._write_pool is None:
+            self._write_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='io-write')
+        return self._write_pool
+
+    def _get_clock(self):
+        if self.clock is None:
+            from kivy.clock import Clock
+            self.clock = Clock
+        return self.clock
+
+    def _report(self, error: Exception, on_error: Callback) -> None:
+        self.errors += 1
+        if on_error is not None:
+            on_error(error)
+        else:
+            print(f"File I/O failed: {error}")
+
+    def _deliver(self, callback: Callable, *args) -> None:
+        """Queue a callback for the main thread (called from worker threads)."""
+        self._results.append((callback, args))
+        with self._lock:
+            if self._drain_scheduled:
+                return
+            self._drain_scheduled = True
+        self._get_clock().schedule_once(self._drain, 0)
+
+    def _drain(self, dt) -> None:
+        """Run queued callbacks until this frame's budget is spent."""
+        deadline = time.perf_counter() + self.frame_budget
+        while self._results:
+            callback, args = self._results.popleft()
+            callback(*args)
+            if time.perf_counter() >= deadline:
+                break
+        with self._lock:
+            if not self._results:
+                self._drain_scheduled = False
+                return
+        self._get_clock().schedule_once(self._drain, 0)
+
+
+# Global instance
+io_executor = IOExecutor()
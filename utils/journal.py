@@ -0,0 +1,153 @@
+"""Append-only JSON-lines journals for state that must survive a reboot.
+
+Each event is one line, appended on the I/O writer thread
+(:mod:`utils.io_executor`) and flushed to the card before the next one, so
+at most the event in flight when the power went is lost. The first append of
+a run ends a line torn that way, so it is not glued onto the next event, and
+a line that does not parse is skipped on load. :meth:`Journal.rewrite` replaces the whole file atomically,
+e.g. with a single snapshot event once the journal has grown long; it is
+queued behind the appends already made, so none of them are lost either.
+
+Events are serialized on the writer thread too, so callers must hand over
+dicts they no longer change.
+
+A journal may also be checkpointed: a checkpoint event (``{"op": "snapshot",
+...}`` by default) restores everything before it, so :meth:`Journal.load`
+can start from the last one and :meth:`Journal.compact` can drop the lines
+before it, in the background.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from typing import Callable, List, Optional
+
+from utils.io_executor import IOExecutor, io_executor
+
+
+def _encode(event: dict) -> str:
+    """One journal line; "op" comes first in every event dict"""
+    return json.dumps(event, separators=(',', ':')) + '\n'
+
+
+class Journal:
+    """One JSON-lines file of events."""
+
+    def __init__(self, path: str, executor: Optional[IOExecutor] = None) -> None:
+        self.path = path
+        self.executor = executor or io_executor
+        self.appended = 0  # Events appended since the last load or rewrite
+        self._checked = False  # Whether a torn last line has been ended (writer thread)
+
+    def append(self, event: dict):
+        """Queue one event for the end of the file"""
+        self.appended += 1
+        return self.executor.submit(self._write_line, event, write=True)
+
+    def append_line(self, line: str):
+        """Queue one line serialized by the caller (it must end with a newline)"""
+        self.appended += 1
+        return self.executor.submit(self._write_text, line, write=True)
+
+    def rewrite(self, events: List[dict]):
+        """Queue an atomic replacement of the whole journal with ``events``"""
+        self.appended = 0
+        return self.executor.submit(self._replace, events, write=True)
+
+    def clear(self):
+        return self.rewrite([])
+
+    def compact(self, checkpoint: str = 'snapshot'):
+        """Queue dropping every line before the last checkpoint event"""
+        def compact():
+            lines = self._read_lines()
+            start = self._last_checkpoint(lines, checkpoint)
+            if start:
+                self._replace_lines(''.join(lines[start:]))
+            return len(lines) - start
+        return self.executor.submit(compact, write=True)
+
+    def load(self, checkpoint: Optional[str] = None) -> List[dict]:
+        """Every complete event in the file, or only those from the last
+        ``checkpoint`` event on (blocking; run it off-thread)"""
+        lines = self._read_lines()
+        start = self._last_checkpoint(lines, checkpoint) if checkpoint else 0
+        events = []
+        for line in lines[start:]:
+            try:
+                events.append(json.loads(line))
+            except ValueError:
+                continue  # Torn write at the moment of a power cut
+        return events
+
+    def load_async(self, on_done: Callable[[List[dict]], None], checkpoint: Optional[str] = None):
+        """Load on a reader thread, after the queued writes; ``on_done(events)`` on the main thread"""
+        def load():
+            events = self.load(checkpoint)
+            self.appended = len(events)
+            return events
+        return self.executor.submit(load, on_done=on_done)
+
+    # ------------------------------------------------------------------
+    # Internal helpers (writer thread)
+    # ------------------------------------------------------------------
+    def _ensure_directory(self) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _read_lines(self) -> List[str]:
+        try:
+            with open(self.path, 'r') as file:
+                return file.readlines()
+        except FileNotFoundError:
+            return []
+
+    @staticmethod
+    def _last_checkpoint(lines: List[str], checkpoint: str) -> int:
+        """Index of the last checkpoint line, or 0; found without parsing the others"""
+        prefix = _encode({'op': checkpoint})[:-2]
+        for index in range(len(lines) - 1, -1, -1):
+            if lines[index].startswith(prefix):
+                return index
+        return 0
+
+    def _end_torn_line(self) -> None:
+        """Finish a line cut short by a power loss, so the next one starts on its own line"""
+        try:
+            with open(self.path, 'rb+') as file:
+                file.seek(0, os.SEEK_END)
+                if file.tell() == 0:
+                    return
+                file.seek(-1, os.SEEK_END)
+                if file.read(1) != b'\n':
+                    file.write(b'\n')
+        except FileNotFoundError:
+            pass
+
+    def _write_line(self, event: dict) -> None:
+        self._write_text(_encode(event))
+
+    def _write_text(self, text: str) -> None:
+        self._ensure_directory()
+        if not self._checked:
+            self._end_torn_line()
+            self._checked = True
+        with open(self.path, 'a') as file:
+            file.write(text)
+            file.flush()
+            os.fsync(file.fileno())
+
+    def _replace(self, events: List[dict]) -> None:
+        self._replace_lines(''.join(map(_encode, events)))
+
+    def _replace_lines(self, lines: str) -> None:
+        self._ensure_directory()
+        temporary = f"{self.path}.tmp"
+        with open(temporary, 'w') as file:
+            file.write(lines)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, self.path)
+        self._checked = True
@@ -0,0 +1,213 @@
+"""Lightweight stage tracing for the input-to-result roll path.
+
+A trace starts when the user taps (or the motion sensor fires) and is stamped
+at every stage on the way to the rendered result. Each stamp records the time
+since the previous stage with ``time.perf_counter_ns`` into a per-stage
+histogram, so a session can be exported and compared on the Pi.
+
+Tracing is disabled unless the ``DICE_TRACE`` environment variable is set; in
+that case every call returns after a single attribute check.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Deque, Dict, List, Optional
+
+_perf_ns = time.perf_counter_ns
+
+# Histogram bucket upper bounds in milliseconds (last bucket is open-ended)
+BUCKET_BOUNDS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+
+class StageHistogram:
+    """Latency histogram for a single stage."""
+
+    __slots__ = ("counts", "count", "total_ns", "min_ns", "max_ns", "samples")
+
+    def __init__(self, max_samples: int = 1000) -> None:
+        self.counts: List[int] = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+        self.count = 0
+        self.total_ns = 0
+        self.min_ns: Optional[int] = None
+        self.max_ns = 0
+        self.samples: Deque[int] = deque(maxlen=max_samples)
+
+    def add(self, elapsed_ns: int) -> None:
+        elapsed_ms = elapsed_ns / 1_000_000
+        index = len(BUCKET_BOUNDS_MS)
+        for i, bound in enumerate(BUCKET_BOUNDS_MS):
+            if elapsed_ms <= bound:
+                index = i
+                break
+        self.counts[index] += 1
+        self.count += 1
+        self.total_ns += elapsed_ns
+        if self.min_ns is None or elapsed_ns < self.min_ns:
+            self.min_ns = elapsed_ns
+        if elapsed_ns > self.max_ns:
+            self.max_ns = elapsed_ns
+        self.samples.append(elapsed_ns)
+
+    def percentile(self, fraction: float) -> float:
+        """Return the given percentile (0-1) in ms over the retained samples."""
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+        return ordered[index] / 1_000_000
+
+    def to_dict(self) -> dict:
+        labels = [f"<={bound}ms" for bound in BUCKET_BOUNDS_MS] + [f">{BUCKET_BOUNDS_MS[-1]}ms"]
+        return {
+            "count": self.count,
+            "mean_ms": (self.total_ns / self.count) / 1_000_000 if self.count else 0.0,
+            "min_ms": (self.min_ns or 0) / 1_000_000,
+            "max_ms": self.max_ns / 1_000_000,
+            "p50_ms": self.percentile(0.50),
+            "p95_ms": self.percentile(0.95),
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+class LatencyTracer:
+    """Collects per-stage latencies for one in-flight trace at a time."""
+
+    def __init__(self, enabled: bool = False, max_age: float = 30.0) -> None:
+        self.enabled = enabled
+        self.max_age_ns = int(max_age * 1_000_000_000)
+        self._lock = threading.Lock()
+        self._origin: Optional[str] = None
+        self._start_ns = 0
+        self._last_ns = 0
+        self._last_stage = ""
+        self._histograms: Dict[str, StageHistogram] = {}
+        self.completed = 0
+        self.abandoned = 0
+
+    @property
+    def active(self) -> bool:
+        """Return True while a non-stale trace is in flight."""
+        if self._origin is None:
+            return False
+        return _perf_ns() - self._start_ns < self.max_age_ns
+
+    def begin(self, origin: str) -> None:
+        """Start a new trace, abandoning any unfinished one."""
+        if not self.enabled:
+            return
+        now = _perf_ns()
+        with self._lock:
+            if self._origin is not None:
+                self.abandoned += 1
+            self._origin = origin
+            self._start_ns = now
+            self._last_ns = now
+            self._last_stage = origin
+
+    def ensure(self, origin: str) -> None:
+        """Start a trace only if none is currently in flight."""
+        if not self.enabled:
+            return
+        if not self.active:
+            self.begin(origin)
+
+    def cancel(self) -> None:
+        """Drop the in-flight trace without recording a total."""
+        if not self.enabled or self._origin is None:
+            return
+        with self._lock:
+            if self._origin is not None:
+                self._origin = None
+                self.abandoned += 1
+
+    def stamp(self, stage: str) -> None:
+        """Record the time elapsed since the previous stage."""
+        if not self.enabled or self._origin is None:
+            return
+        now = _perf_ns()
+        with self._lock:
+            if self._origin is None:
+                return
+            self._record(f"{self._last_stage}->{stage}", now - self._last_ns)
+            self._last_ns = now
+            self._last_stage = stage
+
+    def end(self, stage: str = "rendered") -> None:
+        """Stamp the final stage and record the end-to-end latency."""
+        if not self.enabled or self._origin is None:
+            return
+        now = _perf_ns()
+        with self._lock:
+            if self._origin is None:
+                return
+            self._record(f"{self._last_stage}->{stage}", now - self._last_ns)
+            self._record(f"total:{self._origin}", now - self._start_ns)
+            self._origin = None
+            self.completed += 1
+
+    def end_on_next_flip(self, stage: str = "rendered") -> None:
+        """End the trace once the next frame has been flipped to the screen."""
+        if not self.enabled or self._origin is None:
+            return
+        from kivy.core.window import Window
+
+        def on_flip(*args):
+            Window.unbind(on_flip=on_flip)
+            self.end(stage)
+
+        Window.bind(on_flip=on_flip)
+
+    def _record(self, key: str, elapsed_ns: int) -> None:
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            histogram = self._histograms[key] = StageHistogram()
+        histogram.add(elapsed_ns)
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+    def snapshot(self) -> dict:
+        """Return the collected histograms as a JSON-serialisable dict."""
+        with self._lock:
+            return {
+                "completed": self.completed,
+                "abandoned": self.abandoned,
+                "stages": {key: hist.to_dict() for key, hist in sorted(self._histograms.items())},
+            }
+
+    def summary(self) -> str:
+        """Return a human readable table of mean/p95 per stage."""
+        lines = [f"{'stage':<44}{'n':>6}{'mean ms':>10}{'p95 ms':>10}"]
+        for key, stats in self.snapshot()["stages"].items():
+            lines.append(f"{key:<44}{stats['count']:>6}{stats['mean_ms']:>10.1f}{stats['p95_ms']:>10.1f}")
+        return "\n".join(lines)
+
+    def export(self, file_path: Optional[str] = None) -> Optional[str]:
+        """Write the histograms to JSON and return the path written."""
+        if not self.enabled:
+            return None
+        if file_path is None:
+            file_path = os.environ.get("DICE_TRACE_FILE")
+        if not file_path:
+            base_path = os.path.dirname(os.path.abspath(__file__))
+            traces_path = os.path.join(base_path, "..", "data", "traces")
+            os.makedirs(traces_path, exist_ok=True)
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            file_path = os.path.join(traces_path, f"latency_{timestamp}.json")
+        with open(file_path, "w") as file:
+            json.dump(self.snapshot(), file, indent=4)
+        return file_path
+
+
+def _env_enabled() -> bool:
+    return os.environ.get("DICE_TRACE", "") not in ("", "0", "false", "False")
+
+
+# Global instance
+tracer = LatencyTracer(enabled=_env_enabled())
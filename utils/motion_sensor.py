@@ -67,7 +67,7 @@ class MotionSensorWatcher:
         self._on_status = on_status
         self._on_error = on_error
 
-        self._thread = threading.Thread(target=self._monitor_loop, daemon=True)
+        self._thread = threading.Thread(target=self._monitor_loop, name='motion-sensor', daemon=True)
         self._thread.start()
         self._is_running = True
         return True
@@ -0,0 +1,256 @@
+"""Roll lifecycle state machine driven by a single clock tick.
+
+The controller owns the whole life of a roll: it decides the flicker values
+while the dice tumble, the final value, and when the result is shown. It
+schedules exactly one interval event at a time and cancels it whenever a new
+roll starts or the roll is abandoned, so no timer can fire against widgets
+that have already been cleared.
+
+A roll can be a single die or a pool of dice (e.g. 8d6): ``values`` holds one
+value per die and ``value`` is their sum.
+
+The clock is injectable. In the app it is ``kivy.clock.Clock``; headless
+drivers pass a :class:`ManualClock` and advance it as fast as they like.
+"""
+
+from __future__ import annotations
+
+import random
+from typing import Callable, List, Optional, Sequence, Union
+
+IDLE = "idle"
+ROLLING = "rolling"
+SETTLING = "settling"
+RESULT = "result"
+DAMAGE = "damage"
+
+StateCallback = Optional[Callable[[str], None]]
+FrameCallback = Optional[Callable[[str, float, int], None]]
+ResultCallback = Optional[Callable[[int], None]]
+
+
+class RollController:
+    """Explicit idle -> rolling -> settling -> result/damage state machine."""
+
+    def __init__(
+        self,
+        clock=None,
+        rng: Optional[random.Random] = None,
+        tick_interval: float = 1 / 30.0,
+        flicker_interval: float = 0.1,
+    ) -> None:
+        self.clock = clock
+        self.rng = rng or random.Random()
+        self.tick_interval = tick_interval
+        self.flicker_interval = flicker_interval
+
+        self.state = IDLE
+        self.sides = 20
+        self.pool: List[int] = [20]  # Sides of each die in the roll
+        self.values: List[int] = [1]
+        self.value = 1
+        self.final_value: Optional[int] = None
+        self._final_values: Optional[List[int]] = None
+
+        self.on_state: StateCallback = None
+        self.on_frame: FrameCallback = None
+        self.on_result: ResultCallback = None
+
+        self._event = None
+        self._started_at = 0.0
+        self._pause = 0.0
+        self._duration = 0.0
+        self._settle = 0.0
+        self._next_flicker = 0.0
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    @property
+    def busy(self) -> bool:
+        """Return True while the dice are still tumbling or settling."""
+        return self.state in (ROLLING, SETTLING)
+
+    def start(
+        self,
+        sides: Union[int, Sequence[int]],
+        duration: float = 2.0,
+        pause_before: float = 0.5,
+        settle_time: float = 0.3,
+        final_value: Optional[int] = None,
+        final_values: Optional[Sequence[int]] = None,
+    ) -> None:
+        """Begin a new roll, cancelling whatever was in progress.
+
+        ``sides`` is a die size or one size per die for a pool. A known result
+        can be passed as ``final_value`` (single die) or ``final_values``.
+        """
+        self._cancel_tick()
+        self.pool = [sides] if isinstance(sides, int) else list(sides)
+        self.sides = self.pool[0]
+        self.values = [1] * len(self.pool)
+        self.value = sum(self.values)
+        if final_values is None and final_value is not None:
+            final_values = [final_value]
+        self._final_values = list(final_values) if final_values is not None else None
+        self.final_value = sum(self._final_values) if self._final_values is not None else None
+        self._pause = max(0.0, pause_before)
+        self._duration = max(0.0, duration)
+        self._settle = max(0.0, settle_time)
+        self._started_at = self._now()
+        self._next_flicker = self._pause
+
+        self._set_state(ROLLING)
+        self._event = self._get_clock().schedule_interval(self._tick, self.tick_interval)
+        # Render the first frame without waiting for the clock
+        self._tick(0)
+
+    def skip(self) -> None:
+        """Jump straight to the result (e.g. the user tapped the dice)."""
+        if not self.busy:
+            return
+        self._cancel_tick()
+        self._decide_final()
+        self._finish()
+
+    def resolve(self, value: int, damage: bool = False) -> None:
+        """Mark a result that was computed without an animation."""
+        self._cancel_tick()
+        self.value = value
+        self.final_value = value
+        self._set_state(DAMAGE if damage else RESULT)
+
+    def cancel(self) -> None:
+        """Abandon the current roll and return to idle."""
+        self._cancel_tick()
+        self._set_state(IDLE)
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+    def _get_clock(self):
+        if self.clock is None:
+            from kivy.clock import Clock
+            self.clock = Clock
+        return self.clock
+
+    def _now(self) -> float:
+        return self._get_clock().get_time()
+
+    def _cancel_tick(self) -> None:
+        if self._event is not None:
+            self._event.cancel()
+            self._event = None
+
+    def _set_state(self, state: str) -> None:
+        if state == self.state:
+            return
+        self.state = state
+        if self.on_state:
+            self.on_state(state)
+
+    def _decide_final(self) -> None:
+        if self._final_values is None:
+            self._final_values = [self.rng.randint(1, sides) for sides in self.pool]
+        self.values = list(self._final_values)
+        self.value = sum(self.values)
+        self.final_value = self.value
+
+    def _tick(self, dt) -> None:
+        elapsed = self._now() - self._started_at
+        rolling_end = self._pause + self._duration
+
+        if self.state == ROLLING:
+            if elapsed < rolling_end:
+                if elapsed >= self._next_flicker:
+                    randint = self.rng.randint
+                    self.values = [randint(1, sides) for sides in self.pool]
+                    self.value = sum(self.values)
+                    self._next_flicker = elapsed + self.flicker_interval
+                progress = 0.0
+                if self._duration and elapsed > self._pause:
+                    progress = (elapsed - self._pause) / self._duration
+                self._emit_frame(progress)
+                return
+            self._decide_final()
+            self._emit_frame(1.0)
+            self._set_state(SETTLING)
+
+        if self.state == SETTLING:
+            settled = elapsed - rolling_end
+            if settled < self._settle:
+                self._emit_frame(settled / self._settle)
+                return
+            self._cancel_tick()
+            self._finish()
+
+    def _emit_frame(self, progress: float) -> None:
+        if self.on_frame:
+            self.on_frame(self.state, min(1.0, progress), self.value)
+
+    def _finish(self) -> None:
+        self._set_state(SETTLING)
+        self._emit_frame(1.0)
+        self._set_state(RESULT)
+        if self.on_result:
+            self.on_result(self.value)
+
+
+class _ManualEvent:
+    """Scheduled callback belonging to a :class:`ManualClock`."""
+
+    __slots__ = ("callback", "interval", "deadline", "repeat", "cancelled")
+
+    def __init__(self, callback, interval: float, deadline: float, repeat: bool) -> None:
+        self.callback = callback
+        self.interval = interval
+        self.deadline = deadline
+        self.repeat = repeat
+        self.cancelled = False
+
+    def cancel(self) -> None:
+        self.cancelled = True
+
+
+class ManualClock:
+    """Deterministic stand-in for ``kivy.clock.Clock`` driven by ``advance()``."""
+
+    def __init__(self, start: float = 0.0) -> None:
+        self._time = start
+        self._events: List[_ManualEvent] = []
+
+    def get_time(self) -> float:
+        return self._time
+
+    def schedule_once(self, callback, timeout: float = 0) -> _ManualEvent:
+        return self._schedule(callback, timeout, repeat=False)
+
+    def schedule_interval(self, callback, timeout: float) -> _ManualEvent:
+        return self._schedule(callback, timeout, repeat=True)
+
+    @property
+    def pending(self) -> int:
+        """Number of events that are still scheduled."""
+        return sum(1 for event in self._events if not event.cancelled)
+
+    def advance(self, seconds: float, step: float = 1 / 60.0) -> None:
+        """Move time forward in frames of ``step`` seconds, firing due events."""
+        target = self._time + seconds
+        while self._time < target:
+            self._time = min(target, self._time + step)
+            self._fire_due(step)
+
+    def _schedule(self, callback, timeout: float, repeat: bool) -> _ManualEvent:
+        event = _ManualEvent(callback, timeout, self._time + timeout, repeat)
+        self._events.append(event)
+        return event
+
+    def _fire_due(self, dt: float) -> None:
+        for event in list(self._events):
+            if event.cancelled or event.deadline > self._time:
+                continue
+            if event.callback(dt) is False or not event.repeat:
+                event.cancelled = True
+            else:
+                event.deadline = self._time + event.interval
+        self._events = [event for event in self._events if not event.cancelled]
@@ -0,0 +1,277 @@
+"""Tamper-evident ledger of every roll shown, for organised play.
+
+Each roll the roll screen shows (damage included) is appended to
+``data/ledger.jsonl`` as one line that carries the SHA-256 of the line
+before it, so editing, dropping or reordering any roll breaks the chain
+from there on. Every ``checkpoint_every`` rolls a checkpoint line commits
+to the Merkle root of the rolls since the previous one; it is chained like
+any other line. Publishing a checkpoint's hash (read it out, photograph the
+screen) fixes everything before it.
+
+A line is the entry's JSON with its hash appended as the last field::
+
+    {"op":"roll","prev":"<64 hex>","seq":0,...,"hash":"<64 hex>"}
+
+and the hash is taken over the line as written minus that field, so
+:func:`verify_lines` checks the chain without parsing JSON (only
+checkpoints are parsed) and :func:`prove` / :func:`verify_proof` check a
+single roll against its checkpoint with O(log n) hashes.
+
+Hashing happens on the main thread (a few microseconds a roll); writing is
+queued on the I/O writer thread through :mod:`utils.journal`.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import time
+from typing import Callable, Iterable, List, Optional
+
+from utils.journal import Journal
+
+LEDGER_PATH = os.path.join('data', 'ledger.jsonl')
+GENESIS = '0' * 64
+
+# Fields of a roll outcome kept in the ledger
+ROLL_FIELDS = ('roll_type', 'dice_type', 'natural', 'modifier', 'total')
+
+_HASH_MARK = ',"hash":"'
+_PREV_MARK = '"prev":"'
+_CHECKPOINT_PREFIX = '{"op":"checkpoint"'
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def seal(body: dict) -> tuple:
+    """The ledger line for ``body`` (with "op" and "prev" first) and its hash"""
+    text = json.dumps(body, separators=(',', ':'))
+    digest = _sha256(text)
+    return f'{text[:-1]}{_HASH_MARK}{digest}"}}\n', digest
+
+
+def split_line(line: str) -> tuple:
+    """(body text, recorded hash) of a ledger line, or (None, None) if it is not one"""
+    index = line.rfind(_HASH_MARK)
+    if index < 0:
+        return None, None
+    return line[:index] + '}', line[index + len(_HASH_MARK):index + len(_HASH_MARK) + 64]
+
+
+# ----------------------------------------------------------------------
+# Merkle trees over the roll hashes between two checkpoints
+# ----------------------------------------------------------------------
+def _node(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(b'\x01' + left + right).digest()
+
+
+def merkle_root(leaves: List[str]) -> str:
+    """Root of the hex leaf hashes; an odd node out is carried up unchanged"""
+    level = [bytes.fromhex(leaf) for leaf in leaves]
+    if not level:
+        return GENESIS
+    while len(level) > 1:
+        paired = [_node(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            paired.append(level[-1])
+        level = paired
+    return level[0].hex()
+
+
+def merkle_path(leaves: List[str], index: int) -> List[list]:
+    """Sibling hashes from leaf ``index`` up to the root, as [side, hex] pairs"""
+    level = [bytes.fromhex(leaf) for leaf in leaves]
+    path = []
+    while len(level) > 1:
+        sibling = index ^ 1
+        if sibling < len(level):
+            path.append(['L' if sibling < index else 'R', level[sibling].hex()])
+        paired = [_node(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            paired.append(level[-1])
+        level = paired
+        index //= 2
+    return path
+
+
+def fold_path(leaf: str, path: List[list]) -> str:
+    node = bytes.fromhex(leaf)
+    for side, sibling in path:
+        node = _node(bytes.fromhex(sibling), node) if side == 'L' else _node(node, bytes.fromhex(sibling))
+    return node.hex()
+
+
+# ----------------------------------------------------------------------
+# Verification (no Kivy; used by ``cli.py verify``)
+# ----------------------------------------------------------------------
+def verify_lines(lines: Iterable[str]) -> dict:
+    """Check a whole ledger in one pass; stops at the first broken link"""
+    prev = GENESIS
+    leaves: List[str] = []
+    report = {'ok': True, 'rolls': 0, 'checkpoints': 0, 'torn': 0, 'unsealed': 0, 'error': None,
+              'last_checkpoint': None}
+    for number, line in enumerate(lines, 1):
+        body, digest = split_line(line)
+        if body is None or len(digest) != 64:
+            # A write cut short by a power loss; the next entry links to the one before it
+            report['torn'] += 1
+            continue
+        start = body.find(_PREV_MARK) + len(_PREV_MARK)
+        if body[start:start + 64] != prev:
+            report.update(ok=False, error=f"line {number}: does not follow the previous entry")
+            return report
+        if _sha256(body) != digest:
+            report.update(ok=False, error=f"line {number}: contents do not match its hash")
+            return report
+        if body.startswith(_CHECKPOINT_PREFIX):
+            checkpoint = json.loads(body)
+            if checkpoint['count'] != len(leaves) or merkle_root(leaves) != checkpoint['root']:
+                report.update(ok=False, error=f"line {number}: checkpoint does not match the rolls before it")
+                return report
+            report['checkpoints'] += 1
+            report['last_checkpoint'] = digest
+            leaves = []
+        else:
+            leaves.append(digest)
+            report['rolls'] += 1
+        prev = digest
+    report['unsealed'] = len(leaves)  # Rolls after the last checkpoint
+    report['head'] = prev
+    return report
+
+
+def verify_file(path: str) -> dict:
+    with open(path, 'r') as file:
+        return verify_lines(file)
+
+
+def prove(path: str, seq: int) -> Optional[dict]:
+    """Inclusion proof of roll ``seq``: its line, the Merkle path and the checkpoint
+    that covers it (None until that checkpoint has been written)"""
+    leaves: List[str] = []
+    entry = None
+    with open(path, 'r') as file:
+        for line in file:
+            body, digest = split_line(line)
+            if body is None:
+                continue
+            if body.startswith(_CHECKPOINT_PREFIX):
+                if entry is not None:
+                    index = leaves.index(entry[1])
+                    return {'line': entry[0], 'path': merkle_path(leaves, index), 'checkpoint': line.rstrip('\n')}
+                leaves = []
+                continue
+            leaves.append(digest)
+            if entry is None and json.loads(body)['seq'] == seq:
+                entry = (line.rstrip('\n'), digest)
+    return None
+
+
+def verify_proof(proof: dict, checkpoint_hash: Optional[str] = None) -> bool:
+    """Check a proof from :func:`prove`; pass the published checkpoint hash to pin it"""
+    body, digest = split_line(proof['line'])
+    checkpoint_body, checkpoint_digest = split_line(proof['checkpoint'])
+    if body is None or checkpoint_body is None:
+        return False
+    if _sha256(body) != digest or _sha256(checkpoint_body) != checkpoint_digest:
+        return False
+    if checkpoint_hash is not None and checkpoint_digest != checkpoint_hash:
+        return False
+    return fold_path(digest, proof['path']) == json.loads(checkpoint_body)['root']
+
+
+# ----------------------------------------------------------------------
+# Recording (app side)
+# ----------------------------------------------------------------------
+class RollLedger:
+    """Appends the rolls of the session to the chained ledger."""
+
+    def __init__(self, path: str = LEDGER_PATH, checkpoint_every: int = 256, executor=None) -> None:
+        self.journal = Journal(path, executor)
+        self.checkpoint_every = checkpoint_every
+        self.head = GENESIS  # Hash of the last line
+        self.seq = 0
+        self.loaded = False
+        self._leaves: List[str] = []  # Roll hashes since the last checkpoint
+        self._waiting: List[dict] = []  # Recorded before loading finished
+
+    def record(self, outcome: dict, character: Optional[str] = None) -> None:
+        """Append one roll outcome (see :func:`rules.checks.resolve_roll`)"""
+        body = {'op': 'roll', 'prev': None, 'seq': None, 'time': round(time.time(), 3), 'character': character}
+        for field in ROLL_FIELDS:
+            body[field] = outcome.get(field)
+        if self.loaded:
+            self._append(body)
+        else:
+            self._waiting.append(body)
+
+    def checkpoint(self):
+        """Seal the rolls since the last checkpoint under a Merkle root; returns its hash"""
+        if not self._leaves:
+            return None
+        body = {'op': 'checkpoint', 'prev': self.head, 'first': self.seq - len(self._leaves),
+                'count': len(self._leaves), 'root': merkle_root(self._leaves), 'time': round(time.time(), 3)}
+        self._leaves = []
+        return self._write(body)
+
+    def load_async(self, on_done: Optional[Callable[[], None]] = None):
+        """Pick the chain up where the last run left it, off-thread"""
+        def loaded(events):
+            self._restore(events)
+            if on_done is not None:
+                on_done()
+        # On the writer thread: it may have to finish a torn line first
+        return self.journal.executor.submit(self._read_tail, on_done=loaded, write=True)
+
+    def load(self) -> None:
+        """Blocking load (tools and tests)"""
+        self._restore(self._read_tail())
+
+    def _read_tail(self) -> List[dict]:
+        """The last checkpoint and the rolls after it, skipping torn lines"""
+        self.journal._end_torn_line()
+        lines = self.journal._read_lines()
+        events = []
+        for line in lines[Journal._last_checkpoint(lines, 'checkpoint'):]:
+            body, digest = split_line(line)
+            if body is not None and len(digest) == 64:
+                event = json.loads(body)
+                event['hash'] = digest
+                events.append(event)
+        return events
+
+    def _restore(self, events: List[dict]) -> None:
+        self.head, self.seq, self._leaves = GENESIS, 0, []
+        for event in events:
+            self.head = event['hash']
+            if event['op'] == 'checkpoint':
+                self.seq = event['first'] + event['count']
+                self._leaves = []
+            else:
+                self.seq = event['seq'] + 1
+                self._leaves.append(event['hash'])
+        self.loaded = True
+        waiting, self._waiting = self._waiting, []
+        for body in waiting:
+            self._append(body)
+
+    def _append(self, body: dict) -> None:
+        body['seq'] = self.seq
+        self.seq += 1
+        self._leaves.append(self._write(body))
+        if len(self._leaves) >= self.checkpoint_every:
+            self.checkpoint()
+
+    def _write(self, body: dict) -> str:
+        body['prev'] = self.head
+        line, digest = seal(body)
+        self.journal.append_line(line)
+        self.head = digest
+        return digest
+
+
+# Global instance
+roll_ledger = RollLedger()
@@ -0,0 +1,264 @@
+"""Live roll results for local consumers, as JSON lines on a Unix socket.
+
+While the app runs it listens on ``data/rolls.sock`` (``DICE_STREAM=<path>``
+moves it, ``DICE_STREAM=0`` turns it off) and writes one line per roll the
+roll screen shows to every connected client::
+
+    {"seq":12,"time":1729350000.123,"roll_type":"attack","dice_type":20,
+     "natural":17,"modifier":5,"total":22,"critical_hit":false,
+     "critical_fail":false,"character":"Aria"}
+
+Any number of clients can connect and disconnect at any time; nothing is
+replayed to a client that connects later. Try it with
+``nc -U data/rolls.sock`` or ``socat - UNIX-CONNECT:data/rolls.sock``; both
+also work as the command of a Node-RED exec node.
+
+The line is encoded once, in the :data:`~utils.event_bus.ROLL_RESULT`
+subscriber on the main thread, and appended to each client's bounded
+buffer. A server thread does the socket I/O with non-blocking writes, so a
+client that stops reading first fills its socket buffer, then its own
+``buffer`` lines, and after that loses its oldest lines (counted in
+:meth:`RollStream.stats`); the UI never waits on it.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import selectors
+import socket
+import stat
+import threading
+import time
+from collections import deque
+from typing import Optional, Tuple
+
+from utils.event_bus import ROLL_RESULT, SYNC, event_bus
+
+STREAM_PATH = os.path.join('data', 'rolls.sock')
+
+
+class _Client:
+    """One connected consumer and the lines it has not been sent yet."""
+
+    __slots__ = ('sock', 'lines', 'partial', 'sent', 'dropped')
+
+    def __init__(self, sock: socket.socket) -> None:
+        self.sock = sock
+        self.lines = deque()  # Encoded lines; appended on the main thread
+        self.partial = b''  # What is left of a line the socket took only part of
+        self.sent = 0
+        self.dropped = 0
+
+
+class RollStream:
+    """Unix socket server streaming roll results to local clients."""
+
+    def __init__(self, path: str = STREAM_PATH, buffer: int = 256, bus=None) -> None:
+        self.path = path
+        self.buffer = buffer  # Lines kept per client that is not reading
+        self.bus = bus or event_bus
+        self.seq = 0
+        self.dropped = 0  # Lines dropped for clients that have since gone
+        self._clients: Tuple[_Client, ...] = ()  # Replaced, never changed, by the server thread
+        self._listener: Optional[socket.socket] = None
+        self._selector: Optional[selectors.BaseSelector] = None
+        self._wake_read: Optional[socket.socket] = None
+        self._wake_write: Optional[socket.socket] = None
+        self._subscription = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self) -> bool:
+        """Listen on ``path`` and stream every roll result; False if it cannot"""
+        if self.running:
+            return True
+        if not hasattr(socket, 'AF_UNIX'):
+            print("Roll stream: Unix sockets are not available on this platform")
+            return False
+        try:
+            self._listener = self._listen()
+        except OSError as error:
+            print(f"Roll stream: cannot listen on {self.path}: {error}")
+            return False
+        self._wake_read, self._wake_write = socket.socketpair()
+        for sock in (self._listener, self._wake_read, self._wake_write):
+            sock.setblocking(False)
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self._listener, selectors.EVENT_READ)
+        self._selector.register(self._wake_read, selectors.EVENT_READ)
+        self._stopping = False
+        self._thread = threading.Thread(target=self._serve, name='roll-stream', daemon=True)
+        self._thread.start()
+        self._subscription = self.bus.subscribe(ROLL_RESULT, self.publish, mode=SYNC, name='roll_stream')
+        return True
+
+    def stop(self, timeout: float = 1.0) -> None:
+        """Disconnect every client and remove the socket file"""
+        if not self.running:
+            return
+        if self._subscription is not None:
+            self._subscription.cancel()
+            self._subscription = None
+        self._stopping = True
+        self._wake()
+        self._thread.join(timeout)
+        self._thread = None
+        for client in self._clients:
+            self._close(client)
+        for sock in (self._listener, self._wake_read, self._wake_write):
+            sock.close()
+        self._selector.close()
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+    def publish(self, outcome: dict) -> None:
+        """Queue one roll outcome for every client (the ROLL_RESULT subscriber)"""
+        event = {'seq': self.seq, 'time': round(time.time(), 3)}
+        event.update(outcome)
+        self.seq += 1
+        clients = self._clients
+        if not clients:
+            return
+        line = (json.dumps(event, separators=(',', ':'), default=str) + '\n').encode('utf-8')
+        for client in clients:
+            if len(client.lines) >= self.buffer:
+                try:
+                    client.lines.popleft()
+                    client.dropped += 1
+                except IndexError:
+                    pass  # The server thread got there first
+            client.lines.append(line)
+        self._wake()
+
+    def stats(self) -> dict:
+        clients = self._clients
+        return {
+            'running': self.running,
+            'path': self.path,
+            'clients': len(clients),
+            'published': self.seq,
+            'sent': sum(client.sent for client in clients),
+            'pending': sum(len(client.lines) for client in clients),
+            'dropped': self.dropped + sum(client.dropped for client in clients),
+        }
+
+    # ------------------------------------------------------------------
+    # Server thread
+    # ------------------------------------------------------------------
+    def _listen(self) -> socket.socket:
+        """Bind ``path``, replacing the socket a crashed run left behind"""
+        try:
+            if stat.S_ISSOCK(os.stat(self.path).st_mode):
+                probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                try:
+                    probe.connect(self.path)
+                except OSError:
+                    os.unlink(self.path)  # Nobody is listening on it
+                else:
+                    raise OSError(f"another instance is streaming to {self.path}")
+                finally:
+                    probe.close()
+        except FileNotFoundError:
+            pass
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            listener.bind(self.path)
+            listener.listen(8)
+        except OSError:
+            listener.close()
+            raise
+        return listener
+
+    def _wake(self) -> None:
+        try:
+            self._wake_write.send(b'\0')
+        except (BlockingIOError, OSError):
+            pass  # Already awake (or stopping)
+
+    def _serve(self) -> None:
+        while not self._stopping:
+            for key, events in self._selector.select():
+                sock = key.fileobj
+                if sock is self._listener:
+                    self._accept()
+                elif sock is self._wake_read:
+                    try:
+                        while sock.recv(4096):
+                            pass
+                    except (BlockingIOError, OSError):
+                        pass
+                    for client in self._clients:
+                        self._flush(client)
+                else:
+                    client = key.data
+                    if events & selectors.EVENT_READ:
+                        self._read(client)
+                    if events & selectors.EVENT_WRITE and client in self._clients:
+                        self._flush(client)
+
+    def _accept(self) -> None:
+        try:
+            sock, _ = self._listener.accept()
+        except (BlockingIOError, OSError):
+            return
+        sock.setblocking(False)
+        client = _Client(sock)
+        self._selector.register(sock, selectors.EVENT_READ, client)
+        self._clients = self._clients + (client,)
+
+    def _read(self, client: _Client) -> None:
+        """Clients have nothing to say; reading only notices them leaving"""
+        try:
+            if client.sock.recv(4096):
+                return
+        except BlockingIOError:
+            return
+        except OSError:
+            pass
+        self._drop(client)
+
+    def _flush(self, client: _Client) -> None:
+        """Write what the socket will take; wait for it to drain if it is full"""
+        sock = client.sock
+        try:
+            while client.partial or client.lines:
+                if not client.partial:
+                    client.partial = client.lines.popleft()
+                written = sock.send(client.partial)
+                client.partial = client.partial[written:]
+                if not client.partial:
+                    client.sent += 1
+        except BlockingIOError:
+            self._selector.modify(sock, selectors.EVENT_READ | selectors.EVENT_WRITE, client)
+            return
+        except OSError:
+            self._drop(client)
+            return
+        if self._selector.get_key(sock).events & selectors.EVENT_WRITE:
+            self._selector.modify(sock, selectors.EVENT_READ, client)
+
+    def _drop(self, client: _Client) -> None:
+        self._clients = tuple(c for c in self._clients if c is not client)
+        self.dropped += client.dropped
+        self._close(client)
+
+    def _close(self, client: _Client) -> None:
+        try:
+            self._selector.unregister(client.sock)
+        except (KeyError, ValueError):
+            pass
+        client.sock.close()
+
+
+# Global instance
+roll_stream = RollStream()
@@ -0,0 +1,114 @@
+"""Seeded roll outcomes and session recording for deterministic replay.
+
+Every roll outcome the roll screen decides is drawn from :attr:`Session.rng`
+(the ``random`` module unless a session is seeded), never from the RNG the
+animations use, so the same seed and the same inputs give the same results
+whether the dice are animated, in fast mode or not drawn at all.
+
+With ``DICE_RECORD=<path>`` the app records a session: a header with the
+seed, the profile and fast mode, then every input that starts or steers a
+roll (RollManager calls, the roll screen's buttons) with the time it
+happened and where it came from (``tap``, ``dialog`` or ``motion``), and
+every result the roll screen showed. Lines are written through
+:mod:`utils.journal`. :mod:`utils.session_replay` plays a recording back.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import os
+import random
+import time
+from typing import Callable, List, Optional
+
+from utils.journal import Journal
+
+# Fields of a result that must match between a recording and its replay
+RESULT_FIELDS = ('roll_type', 'dice_type', 'natural', 'modifier', 'total')
+
+
+def result_event(outcome: dict, t: float) -> dict:
+    event = {'op': 'result', 't': round(t, 4)}
+    for field in RESULT_FIELDS:
+        event[field] = outcome.get(field)
+    return event
+
+
+class Session:
+    """The outcome RNG, and the recorder for the session in progress."""
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter) -> None:
+        self.clock = clock  # Seconds; injectable for synthetic recordings
+        self.rng = random
+        self.seed_value: Optional[int] = None
+        self.journal: Optional[Journal] = None
+        self.listeners: List[Callable[[dict], None]] = []  # e.g. a replay comparing results
+        self._started = clock()
+        self._source = 'tap'
+
+    @property
+    def recording(self) -> bool:
+        return self.journal is not None
+
+    def reseed(self, seed: Optional[int]) -> None:
+        """Draw outcomes from a new seeded stream (None: the shared ``random``)"""
+        self.seed_value = seed
+        self.rng = random if seed is None else random.Random(seed)
+        self._started = self.clock()
+
+    def start(self, path: str, app=None, seed: Optional[int] = None) -> dict:
+        """Start recording to ``path``; ``app`` supplies the profile and fast mode"""
+        if seed is None:
+            seed = int.from_bytes(os.urandom(4), 'little')
+        self.reseed(seed)
+        self.journal = Journal(path)
+        self.journal.clear()
+        header = {
+            'op': 'session',
+            'version': 1,
+            'seed': seed,
+            'started': time.time(),
+            'fast_mode': bool(getattr(app, 'fast_mode', False)),
+            'profile': dict(app.current_profile) if app is not None and app.current_profile else None,
+        }
+        self.journal.append(header)
+        if app is not None and hasattr(app, 'bind'):
+            app.bind(current_profile=lambda instance, profile: self.input(
+                'set_profile', dict(profile) if profile else None))
+            app.bind(fast_mode=lambda instance, fast: self.input('set_fast_mode', fast))
+        return header
+
+    def stop(self) -> None:
+        self.journal = None
+
+    def elapsed(self) -> float:
+        return self.clock() - self._started
+
+    @contextlib.contextmanager
+    def source(self, name: str):
+        """Attribute the inputs made inside the block to ``name`` (e.g. 'motion')"""
+        previous, self._source = self._source, name
+        try:
+            yield
+        finally:
+            self._source = previous
+
+    def input(self, action: str, *args) -> None:
+        """Record one input (a no-op unless recording)"""
+        if self.journal is not None:
+            self.journal.append({'op': 'input', 't': round(self.elapsed(), 4), 'action': action,
+                                 'args': list(args), 'source': self._source})
+
+    def result(self, outcome: dict) -> None:
+        """Record a result the roll screen showed"""
+        if self.journal is None and not self.listeners:
+            return
+        event = result_event(outcome, self.elapsed())
+        if self.journal is not None:
+            self.journal.append(event)
+        for listener in self.listeners:
+            listener(event)
+
+
+# Global instance
+session = Session()
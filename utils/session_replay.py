@@ -0,0 +1,168 @@
+"""Play a recorded session (see :mod:`utils.session`) back through the app.
+
+The recording's seed is restored before the first input, so every roll
+draws the same outcomes it did when recorded. Inputs are dispatched to the
+app's RollManager and roll screen, and each result the roll screen shows is
+compared, in order, with the recorded one; mismatches are collected as
+divergences.
+
+:meth:`SessionPlayer.play` replays on the Kivy clock at ``speed`` times real
+time (1.0 for demos, with the recorded fast mode and animations).
+:meth:`SessionPlayer.run` replays as fast as possible without a clock: fast
+mode is forced, the fast animation is switched off and the roll screen's
+deferred actions run immediately (see benchmarks/replay.py).
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from typing import Callable, List, Optional
+
+from utils.session import RESULT_FIELDS, session
+
+# Inputs handled by RollManager and by the roll screen
+MANAGER_ACTIONS = ('roll_attack', 'roll_saving_throw', 'roll_ability_check', 'roll_custom_dice', 'roll_dice',
+                   'roll_macro')
+SCREEN_ACTIONS = ('confirm_hit', 'new_roll', 'back_to_main')
+
+
+def load_session(path: str) -> List[dict]:
+    """Every event of a recording, header first"""
+    events = []
+    with open(path, 'r') as file:
+        for line in file:
+            try:
+                events.append(json.loads(line))
+            except ValueError:
+                continue  # A line torn by a power cut
+    if not events or events[0].get('op') != 'session':
+        raise ValueError(f"not a session recording: {path}")
+    return events
+
+
+class SessionPlayer:
+    """Replays one recording against an app (or a stand-in with the same attributes)."""
+
+    def __init__(self, events: List[dict], app) -> None:
+        self.header = events[0]
+        self.inputs = [event for event in events if event['op'] == 'input']
+        self.expected = [event for event in events if event['op'] == 'result']
+        self.app = app
+        self.results: List[dict] = []
+        self.divergences: List[dict] = []
+        self.unknown: List[str] = []
+        self.elapsed = 0.0
+        self.on_complete: Optional[Callable[['SessionPlayer'], None]] = None
+        self._index = 0
+        self._started = 0.0
+        self._speed = 1.0
+
+    @property
+    def recorded_seconds(self) -> float:
+        times = [event['t'] for event in self.inputs + self.expected]
+        return max(times) if times else 0.0
+
+    @property
+    def roll_screen(self):
+        return self.app.screen_manager.get_screen('roll')
+
+    # ------------------------------------------------------------------
+    # Playing
+    # ------------------------------------------------------------------
+    def begin(self, accelerated: bool) -> None:
+        session.reseed(self.header['seed'])
+        session.listeners.append(self.compare)
+        self.app.current_profile = self.header.get('profile')
+        if accelerated:
+            self.app.fast_mode = True
+            self.roll_screen.fast_animation = False
+        else:
+            self.app.fast_mode = self.header.get('fast_mode', False)
+        self._index = 0
+        self._started = time.perf_counter()
+
+    def finish(self) -> dict:
+        self.elapsed = time.perf_counter() - self._started
+        if self.compare in session.listeners:
+            session.listeners.remove(self.compare)
+        session.reseed(None)
+        # Results recorded but never shown in the replay
+        for index in range(len(self.results), len(self.expected)):
+            self.divergences.append({'index': index, 'expected': self.expected[index], 'replayed': None})
+        report = self.report()
+        if self.on_complete is not None:
+            self.on_complete(self)
+        return report
+
+    def run(self) -> dict:
+        """Replay every input as fast as possible, without a clock"""
+        self.begin(accelerated=True)
+        screen = self.roll_screen
+        for event in self.inputs:
+            self.dispatch(event, accelerated=True)
+            screen.flush_deferred()
+        return self.finish()
+
+    def play(self, speed: float = 1.0) -> None:
+        """Replay on the Kivy clock at ``speed`` times the recorded pace"""
+        from kivy.clock import Clock
+
+        self._speed = speed
+        self.begin(accelerated=False)
+
+        def step(dt):
+            now = (time.perf_counter() - self._started) * self._speed
+            while self._index < len(self.inputs) and self.inputs[self._index]['t'] <= now:
+                self.dispatch(self.inputs[self._index], accelerated=False)
+                self._index += 1
+            if self._index < len(self.inputs):
+                wait = (self.inputs[self._index]['t'] - now) / self._speed
+                Clock.schedule_once(step, max(0.0, wait))
+            else:
+                # Let the last roll finish before reporting
+                Clock.schedule_once(lambda dt: self.finish(), 3.0 / self._speed)
+
+        Clock.schedule_once(step, 0)
+
+    def dispatch(self, event: dict, accelerated: bool) -> None:
+        action, args = event['action'], event.get('args', [])
+        if action in MANAGER_ACTIONS:
+            getattr(self.app.roll_manager, action)(*args)
+        elif action in SCREEN_ACTIONS:
+            getattr(self.roll_screen, action)()
+        elif action == 'roll_initiative':
+            self.app.roll_manager.roll_initiative(args[0], callback=None, return_screen='main')
+        elif action == 'set_profile':
+            self.app.current_profile = args[0]
+        elif action == 'set_fast_mode':
+            if not accelerated:
+                self.app.fast_mode = args[0]
+        elif action == 'skip':
+            self.roll_screen.controller.skip()
+        else:
+            self.unknown.append(action)
+
+    # ------------------------------------------------------------------
+    # Checking
+    # ------------------------------------------------------------------
+    def compare(self, replayed: dict) -> None:
+        index = len(self.results)
+        self.results.append(replayed)
+        expected = self.expected[index] if index < len(self.expected) else None
+        if expected is None or any(expected.get(field) != replayed.get(field) for field in RESULT_FIELDS):
+            self.divergences.append({'index': index, 'expected': expected, 'replayed': replayed})
+
+    def report(self) -> dict:
+        elapsed = self.elapsed or 1e-9
+        return {
+            'inputs': len(self.inputs),
+            'results_recorded': len(self.expected),
+            'results_replayed': len(self.results),
+            'recorded_seconds': round(self.recorded_seconds, 3),
+            'replay_seconds': round(self.elapsed, 4),
+            'inputs_per_second': round(len(self.inputs) / elapsed, 1),
+            'speedup': round(self.recorded_seconds / elapsed, 1),
+            'divergences': self.divergences,
+            'unknown_actions': sorted(set(self.unknown)),
+        }
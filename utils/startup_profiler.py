@@ -0,0 +1,145 @@
+"""Startup instrumentation: per-module import cost and startup phases.
+
+Set ``DICE_STARTUP_PROFILE`` before launching ``app.py`` to enable it. The
+value is the JSON report path, or ``1`` to write the report to
+``data/startup/``. The report lists every module imported during start-up
+with its cumulative and self time, plus the timed phases (KV compile,
+Window creation, profile loading) and the time of the first frame.
+``benchmarks/compare_startup.py`` diffs two reports and flags regressions.
+
+This module only imports the standard library so it can be installed before
+Kivy.
+"""
+
+from __future__ import annotations
+
+import builtins
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional
+
+_perf_ns = time.perf_counter_ns
+
+
+class StartupProfiler:
+    """Times imports and named phases from process start to the first frame."""
+
+    def __init__(self, output: Optional[str] = None) -> None:
+        self.enabled = output is not None
+        self.output = output
+        self.started_ns = _perf_ns()
+        self.phases: Dict[str, float] = {}
+        self.marks: Dict[str, float] = {}
+        self.imports: Dict[str, List[int]] = {}  # name -> [cumulative_ns, self_ns]
+        self._stack: List[int] = []
+        self._main_thread = threading.get_ident()
+        self._original_import = None
+
+    @classmethod
+    def from_env(cls) -> "StartupProfiler":
+        value = os.environ.get("DICE_STARTUP_PROFILE", "")
+        if value in ("", "0", "false", "False"):
+            return cls(None)
+        if value in ("1", "true", "True"):
+            base_path = os.path.dirname(os.path.abspath(__file__))
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            value = os.path.join(base_path, "..", "data", "startup", f"startup_{timestamp}.json")
+        return cls(value)
+
+    # ------------------------------------------------------------------
+    # Import timing
+    # ------------------------------------------------------------------
+    def install(self) -> None:
+        """Start timing imports (no-op when disabled or already installed)."""
+        if not self.enabled or self._original_import is not None:
+            return
+        self._original_import = builtins.__import__
+        builtins.__import__ = self._timed_import
+
+    def uninstall(self) -> None:
+        """Restore the original import function."""
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        original = self._original_import
+        if level != 0 or name in sys.modules or threading.get_ident() != self._main_thread:
+            return original(name, globals, locals, fromlist, level)
+
+        start = _perf_ns()
+        self._stack.append(0)
+        try:
+            return original(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = _perf_ns() - start
+            children = self._stack.pop()
+            if self._stack:
+                self._stack[-1] += elapsed
+            entry = self.imports.setdefault(name, [0, 0])
+            entry[0] += elapsed
+            entry[1] += elapsed - children
+
+    # ------------------------------------------------------------------
+    # Phases
+    # ------------------------------------------------------------------
+    @contextmanager
+    def phase(self, name: str):
+        """Time a block of start-up work (accumulates if repeated)."""
+        if not self.enabled:
+            yield
+            return
+        start = _perf_ns()
+        try:
+            yield
+        finally:
+            elapsed_ms = (_perf_ns() - start) / 1_000_000
+            self.phases[name] = self.phases.get(name, 0.0) + elapsed_ms
+
+    def mark(self, name: str) -> float:
+        """Record a point in time (ms since process start) and return it."""
+        elapsed_ms = (_perf_ns() - self.started_ns) / 1_000_000
+        if self.enabled:
+            self.marks[name] = elapsed_ms
+        return elapsed_ms
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+    def report(self) -> dict:
+        imports = {
+            name: {
+                "cumulative_ms": round(cumulative / 1_000_000, 3),
+                "self_ms": round(self_ns / 1_000_000, 3),
+            }
+            for name, (cumulative, self_ns) in sorted(
+                self.imports.items(), key=lambda item: item[1][0], reverse=True
+            )
+        }
+        return {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "marks": {name: round(value, 3) for name, value in self.marks.items()},
+            "phases": {name: round(value, 3) for name, value in self.phases.items()},
+            "imports": imports,
+        }
+
+    def write_report(self) -> Optional[str]:
+        """Write the JSON report and stop timing imports; returns the path."""
+        if not self.enabled:
+            return None
+        self.uninstall()
+        output = os.path.abspath(self.output)
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+        with open(output, "w") as file:
+            json.dump(self.report(), file, indent=4)
+        return output
+
+
+# Global instance
+profiler = StartupProfiler.from_env()
@@ -0,0 +1,374 @@
+"""Aggregated, rate-limited roll telemetry for the cloud dashboard.
+
+Rather than one message per roll, rolls are summed into buckets of
+``bucket_seconds`` per character and die: the count, the mean natural roll,
+the critical hit and fail rates and the last value. Every ``flush_every``
+seconds, or as soon as ``max_rolls`` rolls are waiting, the buckets are
+written as one gzip-compressed JSON batch to the outbox directory
+(``data/telemetry/``), and the uplink thread sends the outbox oldest first,
+at most one batch every ``min_interval`` seconds::
+
+    {"id":"1729350060123456789","device":"dnd-dice-roller","time":1729350060.1,
+     "bucket_seconds":60,"buckets":[{"start":1729350000,"character":"Aria",
+     "dice":20,"count":12,"mean":11.25,"crit_rate":0.083,"fail_rate":0.0,
+     "last":17,"last_total":22}]}
+
+A batch holds the rolls since the previous one, so a bucket that spans two
+flushes is split over two batches whose counts add up; ``id`` is unique and
+lets the receiver drop a batch it gets twice. A batch leaves the outbox only
+once the endpoint accepted it (or rejected it as malformed). A failed send
+is retried with exponential backoff and jitter, up to ``max_backoff``, and
+an HTTP Retry-After is honoured. Batches are written atomically, so a power
+loss keeps them for the next run, and beyond ``max_batches`` the oldest are
+dropped.
+
+Enabled with ``DICE_TELEMETRY_URL``:
+
+``http://`` or ``https://``
+    POST to the URL (e.g. a Node-RED "http in" node that forwards to
+    Ubidots), with ``DICE_TELEMETRY_TOKEN`` sent as ``X-Auth-Token``
+``mqtt://host[:port]/topic``
+    publish with QoS 1 through paho-mqtt (optional dependency), with the
+    token as the user name
+
+``benchmarks/telemetry.py`` runs the whole stage against a local stand-in.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from utils.event_bus import ROLL_RESULT, SYNC, event_bus
+
+OUTBOX_PATH = os.path.join('data', 'telemetry')
+
+
+class UplinkError(Exception):
+    """A batch was not delivered.
+
+    ``permanent`` means sending it again cannot succeed (it is dropped);
+    ``retry_after`` is how long the endpoint asked us to wait, in seconds.
+    """
+
+    def __init__(self, message: str, permanent: bool = False, retry_after: Optional[float] = None) -> None:
+        super().__init__(message)
+        self.permanent = permanent
+        self.retry_after = retry_after
+
+
+class HttpUplink:
+    """POSTs batches to an HTTP endpoint."""
+
+    def __init__(self, url: str, token: Optional[str] = None, timeout: float = 10.0) -> None:
+        self.url = url
+        self.token = token
+        self.timeout = timeout
+
+    def send(self, body: bytes, compressed: bool) -> None:
+        headers = {'Content-Type': 'application/json'}
+        if compressed:
+            headers['Content-Encoding'] = 'gzip'
+        if self.token:
+            headers['X-Auth-Token'] = self.token
+        request = urllib.request.Request(self.url, data=body, headers=headers, method='POST')
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                response.read()
+        except urllib.error.HTTPError as error:
+            retry_after = error.headers.get('Retry-After') if error.headers else None
+            raise UplinkError(
+                f"HTTP {error.code}",
+                permanent=400 <= error.code < 500 and error.code not in (408, 429),
+                retry_after=float(retry_after) if retry_after and retry_after.isdigit() else None,
+            )
+        except (urllib.error.URLError, OSError) as error:
+            raise UplinkError(str(getattr(error, 'reason', error)))
+
+
+class MqttUplink:
+    """Publishes batches to an MQTT broker (needs paho-mqtt)."""
+
+    def __init__(self, url: str, token: Optional[str] = None, timeout: float = 10.0) -> None:
+        from paho.mqtt import publish  # noqa: F401 - fail at start-up, not on the first flush
+        parts = urlsplit(url)
+        self.host = parts.hostname or 'localhost'
+        self.port = parts.port or 1883
+        self.topic = parts.path.lstrip('/') or 'dice/telemetry'
+        self.token = token
+        self.timeout = timeout
+
+    def send(self, body: bytes, compressed: bool) -> None:
+        from paho.mqtt import publish
+        try:
+            publish.single(self.topic, body, qos=1, hostname=self.host, port=self.port,
+                           auth={'username': self.token} if self.token else None,
+                           keepalive=max(5, int(self.timeout)))
+        except Exception as error:  # paho raises socket errors and its own exceptions alike
+            raise UplinkError(str(error))
+
+
+def uplink_for(url: str, token: Optional[str] = None):
+    """The uplink for ``url``'s scheme"""
+    scheme = urlsplit(url).scheme
+    if scheme in ('http', 'https'):
+        return HttpUplink(url, token)
+    if scheme == 'mqtt':
+        return MqttUplink(url, token)
+    raise ValueError(f"unsupported telemetry URL: {url!r}")
+
+
+class _Bucket:
+    """Rolls of one character and die in one time bucket."""
+
+    __slots__ = ('count', 'total', 'crits', 'fails', 'last', 'last_total')
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0
+        self.crits = 0
+        self.fails = 0
+        self.last = None
+        self.last_total = None
+
+
+class Telemetry:
+    """Aggregates roll results and sends them through a durable outbox."""
+
+    def __init__(self, outbox: str = OUTBOX_PATH, device: str = 'dnd-dice-roller', bucket_seconds: int = 60,
+                 flush_every: float = 60.0, max_rolls: int = 500, min_interval: float = 1.0,
+                 base_backoff: float = 2.0, max_backoff: float = 300.0, max_batches: int = 1000,
+                 compress: bool = True, bus=None) -> None:
+        self.outbox = outbox
+        self.device = device
+        self.bucket_seconds = bucket_seconds
+        self.flush_every = flush_every
+        self.max_rolls = max_rolls
+        self.min_interval = min_interval
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.max_batches = max_batches
+        self.compress = compress
+        self.bus = bus or event_bus
+        self.uplink = None
+        # Counters
+        self.rolls = 0
+        self.batches = 0
+        self.sent = 0
+        self.bytes_sent = 0
+        self.failures = 0  # Failed sends, retried
+        self.rejected = 0  # Batches the endpoint refused for good
+        self.dropped = 0  # Batches dropped from a full outbox
+        self.last_error: Optional[str] = None
+        self._lock = threading.Lock()
+        self._buckets: Dict[Tuple[int, Optional[str], int], _Bucket] = {}
+        self._waiting = 0  # Rolls not yet in a batch
+        self._pending: List[str] = []  # Outbox file names, oldest first
+        self._attempts = 0  # Consecutive failures of the oldest batch
+        self._flush_at = 0.0
+        self._retry_at = 0.0
+        self._wake = threading.Event()
+        self._stopping = False
+        self._subscription = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self, uplink) -> None:
+        """Send batches through ``uplink`` (see :func:`uplink_for`), the outbox left by earlier runs first"""
+        if self.running:
+            return
+        self.uplink = uplink
+        os.makedirs(self.outbox, exist_ok=True)
+        self._pending = []
+        for name in sorted(os.listdir(self.outbox)):
+            if name.endswith(('.json', '.json.gz')):
+                self._pending.append(name)
+            elif name.endswith('.tmp'):
+                self._remove(name)  # A batch cut short by a power loss
+        self._stopping = False
+        self._flush_at = time.monotonic() + self.flush_every
+        self._retry_at = 0.0
+        self._thread = threading.Thread(target=self._run, name='telemetry', daemon=True)
+        self._thread.start()
+        self._subscription = self.bus.subscribe(ROLL_RESULT, self.record, mode=SYNC, name='telemetry')
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """Write the rolls not yet in a batch to the outbox; unsent batches wait for the next run"""
+        if not self.running:
+            return
+        if self._subscription is not None:
+            self._subscription.cancel()
+            self._subscription = None
+        self._stopping = True
+        self._wake.set()
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            self._write_batch()  # Still waiting on a send; keep the rolls anyway
+        self._thread = None
+
+    def record(self, outcome: dict) -> None:
+        """Add one roll outcome to its bucket (the ROLL_RESULT subscriber)"""
+        start = int(time.time() // self.bucket_seconds * self.bucket_seconds)
+        key = (start, outcome.get('character'), outcome['dice_type'])
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = _Bucket()
+            bucket.count += 1
+            bucket.total += outcome['natural']
+            bucket.crits += bool(outcome.get('critical_hit'))
+            bucket.fails += bool(outcome.get('critical_fail'))
+            bucket.last = outcome['natural']
+            bucket.last_total = outcome['total']
+            self.rolls += 1
+            self._waiting += 1
+            full = self._waiting >= self.max_rolls
+        if full:
+            self._wake.set()
+
+    def flush(self) -> None:
+        """Batch the waiting rolls now instead of at the next scheduled flush"""
+        self._flush_at = 0.0
+        self._wake.set()
+
+    def stats(self) -> dict:
+        return {
+            'running': self.running,
+            'rolls': self.rolls,
+            'waiting': self._waiting,
+            'batches': self.batches,
+            'pending': len(self._pending),
+            'sent': self.sent,
+            'bytes_sent': self.bytes_sent,
+            'failures': self.failures,
+            'rejected': self.rejected,
+            'dropped': self.dropped,
+            'last_error': self.last_error,
+        }
+
+    # ------------------------------------------------------------------
+    # Uplink thread
+    # ------------------------------------------------------------------
+    def _run(self) -> None:
+        while True:
+            stopping = self._stopping
+            now = time.monotonic()
+            if stopping or now >= self._flush_at or self._waiting >= self.max_rolls:
+                self._write_batch()
+                self._flush_at = now + self.flush_every
+            if stopping:
+                return
+            if self._pending and now >= self._retry_at:
+                self._send_oldest()
+            timeout = self._flush_at - time.monotonic()
+            if self._pending:
+                timeout = min(timeout, self._retry_at - time.monotonic())
+            self._wake.wait(max(0.0, timeout))
+            self._wake.clear()
+
+    def _write_batch(self) -> None:
+        """Move the waiting rolls into one outbox file"""
+        with self._lock:
+            buckets, self._buckets = self._buckets, {}
+            self._waiting = 0
+        if not buckets:
+            return
+        batch_id = str(time.time_ns())
+        batch = {
+            'id': batch_id,
+            'device': self.device,
+            'time': round(time.time(), 3),
+            'bucket_seconds': self.bucket_seconds,
+            'buckets': [
+                {
+                    'start': start,
+                    'character': character,
+                    'dice': dice,
+                    'count': bucket.count,
+                    'mean': round(bucket.total / bucket.count, 3),
+                    'crit_rate': round(bucket.crits / bucket.count, 3),
+                    'fail_rate': round(bucket.fails / bucket.count, 3),
+                    'last': bucket.last,
+                    'last_total': bucket.last_total,
+                }
+                for (start, character, dice), bucket in sorted(buckets.items(), key=lambda item: (item[0][0], str(item[0][1]), item[0][2]))
+            ],
+        }
+        body = json.dumps(batch, separators=(',', ':')).encode('utf-8')
+        name = batch_id + '.json'
+        if self.compress:
+            body = gzip.compress(body)
+            name += '.gz'
+        path = os.path.join(self.outbox, name)
+        temporary = path + '.tmp'
+        try:
+            with open(temporary, 'wb') as file:
+                file.write(body)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temporary, path)
+        except OSError as error:
+            self.last_error = f"outbox: {error}"
+            print(f"Telemetry: cannot write {path}: {error}")
+            return
+        # stop() writes the last batch on the main thread if a send is still in flight
+        with self._lock:
+            self.batches += 1
+            self._pending.append(name)
+            overflow = self._pending[:max(0, len(self._pending) - self.max_batches)]
+            del self._pending[:len(overflow)]
+            self.dropped += len(overflow)
+        for old in overflow:
+            self._remove(old)
+
+    def _send_oldest(self) -> None:
+        with self._lock:
+            name = self._pending[0]
+        try:
+            with open(os.path.join(self.outbox, name), 'rb') as file:
+                body = file.read()
+            self.uplink.send(body, name.endswith('.gz'))
+        except UplinkError as error:
+            self.last_error = str(error)
+            if not error.permanent:
+                self.failures += 1
+                self._attempts += 1
+                delay = min(self.max_backoff, self.base_backoff * 2 ** (self._attempts - 1))
+                delay *= random.uniform(0.5, 1.0)
+                self._retry_at = time.monotonic() + max(delay, error.retry_after or 0.0)
+                return
+            self.rejected += 1
+        except OSError as error:  # The file went missing or cannot be read
+            self.last_error = f"outbox: {error}"
+            self.rejected += 1
+        else:
+            self.sent += 1
+            self.bytes_sent += len(body)
+        self._attempts = 0
+        with self._lock:
+            # Unless a full outbox dropped it while it was being sent
+            if self._pending and self._pending[0] == name:
+                self._pending.pop(0)
+        self._remove(name)
+        self._retry_at = time.monotonic() + self.min_interval
+
+    def _remove(self, name: str) -> None:
+        try:
+            os.unlink(os.path.join(self.outbox, name))
+        except OSError:
+            pass
+
+
+# Global instance
+telemetry = Telemetry()
@@ -0,0 +1,353 @@
+"""Precomputed dice tumble trajectories.
+
+A small rigid-body simulation (a disc thrown into a walled tray: flight,
+bounces, wall hits, friction and rolling) is run with NumPy for a batch of
+throws per die type. Every time a die rolls over an edge its upward face
+changes, so each throw also gets face sequences that end on every possible
+result. The tracks are cached in ``data/trajectories`` and, at roll time,
+the roll screen picks one that ends on the already-decided value and plays
+it back by interpolating keyframes - no physics runs during the roll.
+
+Positions are offsets from the die's resting place in tray units (the tray
+is 1 x 1), angles are in degrees and always come to rest upright, and the
+height above the table is turned into a scale factor.
+
+NumPy is only needed to build the library; without it :data:`tumble_library`
+reports itself unavailable and the roll screen keeps the simple spin.
+"""
+
+from __future__ import annotations
+
+import os
+import random
+from bisect import bisect_right
+from typing import Dict, List, Optional, Sequence, Tuple
+
+try:  # pragma: no cover - NumPy is optional on the Pi
+    import numpy as np  # type: ignore
+except ImportError:
+    np = None  # type: ignore
+
+TRAJECTORY_VERSION = 1
+DICE_SIDES = (4, 6, 8, 10, 12, 20, 100)
+
+# Rotation that rolls each die's silhouette over one edge
+EDGE_ANGLE = {4: 120.0, 6: 90.0, 8: 90.0, 10: 72.0, 12: 72.0, 20: 60.0, 100: 72.0}
+
+Pose = Tuple[float, float, float, float]  # (dx, dy, angle, scale)
+
+
+class Trajectory:
+    """One recorded throw, with the face sequence it shows on the way."""
+
+    __slots__ = ("sides", "final_face", "times", "xs", "ys", "angles", "scales", "face_times", "faces")
+
+    def __init__(self, sides, final_face, times, xs, ys, angles, scales, face_times, faces) -> None:
+        self.sides = sides
+        self.final_face = final_face
+        self.times = times
+        self.xs = xs
+        self.ys = ys
+        self.angles = angles
+        self.scales = scales
+        self.face_times = face_times  # Times at which the die rolls onto a new face
+        self.faces = faces  # len(face_times) + 1 faces, ending on final_face
+
+    @property
+    def duration(self) -> float:
+        return self.times[-1]
+
+    def sample(self, t: float) -> Pose:
+        """Interpolated pose at time ``t`` (clamped to the recording)."""
+        times = self.times
+        if t <= 0:
+            return self.xs[0], self.ys[0], self.angles[0], self.scales[0]
+        if t >= times[-1]:
+            return self.xs[-1], self.ys[-1], self.angles[-1], self.scales[-1]
+        index = bisect_right(times, t) - 1
+        span = times[index + 1] - times[index]
+        f = (t - times[index]) / span if span else 0.0
+        return (
+            self.xs[index] + (self.xs[index + 1] - self.xs[index]) * f,
+            self.ys[index] + (self.ys[index + 1] - self.ys[index]) * f,
+            self.angles[index] + (self.angles[index + 1] - self.angles[index]) * f,
+            self.scales[index] + (self.scales[index + 1] - self.scales[index]) * f,
+        )
+
+    def face_at(self, t: float) -> int:
+        """Face showing at time ``t``."""
+        return self.faces[bisect_right(self.face_times, t)]
+
+
+# ----------------------------------------------------------------------
+# Simulation
+# ----------------------------------------------------------------------
+def simulate_throws(sides: int, count: int, seed: int = 0, fps: int = 30,
+                    radius: float = 0.12, max_time: float = 3.0) -> List[dict]:
+    """Simulate ``count`` throws of one die type at once; returns motion tracks."""
+    if np is None:
+        raise RuntimeError("NumPy is required to simulate dice trajectories")
+    rng = np.random.default_rng(seed)
+    substeps = 8
+    dt = 1.0 / (fps * substeps)
+    gravity, bounce, wall_bounce, friction = 9.0, 0.45, 0.6, 1.6
+    low, high = radius, 1.0 - radius
+
+    # Thrown in from one side of the tray, aimed roughly at the middle
+    pos = np.column_stack((rng.uniform(low, low + 0.1, count), rng.uniform(low, high, count)))
+    flip = rng.random(count) < 0.5
+    pos[flip, 0] = 1.0 - pos[flip, 0]
+    target = rng.uniform(0.35, 0.65, (count, 2))
+    heading = target - pos
+    heading /= np.linalg.norm(heading, axis=1, keepdims=True)
+    vel = heading * rng.uniform(1.2, 2.0, (count, 1))
+    height = rng.uniform(0.25, 0.5, count)
+    vz = rng.uniform(0.5, 1.5, count)
+    spin = rng.uniform(400.0, 900.0, count) * rng.choice((-1.0, 1.0), count)
+    angle = np.zeros(count)
+    resting = np.zeros(count, dtype=bool)
+
+    frames = [(pos.copy(), angle.copy(), height.copy())]
+    rest_frame = np.full(count, -1)
+    steps = int(max_time * fps)
+    for frame in range(1, steps + 1):
+        for _ in range(substeps):
+            airborne = (height > 0) | (vz > 0)
+            vz = np.where(airborne, vz - gravity * dt, 0.0)
+            height = np.where(airborne, height + vz * dt, 0.0)
+
+            # Landing: lose vertical speed, scrub some slide and spin
+            landed = airborne & (height <= 0)
+            height[landed] = 0.0
+            vz[landed] = -vz[landed] * bounce
+            vz[landed & (vz < 0.3)] = 0.0
+            vel[landed] *= 0.8
+            spin[landed] *= 0.6
+
+            # On the table the die slides to a stop and rolls with its speed
+            on_table = ~airborne & ~resting
+            speed = np.linalg.norm(vel, axis=1)
+            slowed = np.maximum(speed - friction * dt, 0.0)
+            scale = np.divide(slowed, speed, out=np.zeros_like(speed), where=speed > 0)
+            vel[on_table] *= scale[on_table, None]
+            rolling = np.degrees(slowed / radius) * np.sign(spin)
+            spin = np.where(on_table, 0.7 * spin + 0.3 * rolling, spin)
+
+            stopped = on_table & (slowed < 0.02)
+            resting |= stopped
+            vel[resting] = 0.0
+            spin[resting] = 0.0
+
+            pos += vel * dt
+            angle += spin * dt
+
+            # Walls
+            for axis in (0, 1):
+                hit_low = pos[:, axis] < low
+                hit_high = pos[:, axis] > high
+                hit = hit_low | hit_high
+                pos[hit_low, axis] = low
+                pos[hit_high, axis] = high
+                vel[hit, axis] *= -wall_bounce
+                spin[hit] *= -0.7
+
+        frames.append((pos.copy(), angle.copy(), height.copy()))
+        rest_frame[(rest_frame < 0) & resting] = frame
+        if resting.all():
+            break
+
+    rest_frame[rest_frame < 0] = len(frames) - 1
+    positions = np.stack([f[0] for f in frames])  # (frames, count, 2)
+    angles = np.stack([f[1] for f in frames])  # (frames, count)
+    heights = np.stack([f[2] for f in frames])
+
+    edge = EDGE_ANGLE.get(sides, 60.0)
+    tracks = []
+    for index in range(count):
+        end = int(rest_frame[index]) + 1
+        xy = positions[:end, index]
+        track_angles = angles[:end, index]
+        # Rotation does not affect the motion, so start at the angle that lands upright
+        track_angles = track_angles - track_angles[-1]
+        # The upward face changes each time the die has rolled over another edge
+        rolled = np.concatenate(([0.0], np.cumsum(np.abs(np.diff(track_angles)))))
+        changed = np.nonzero(np.diff(np.floor(rolled / edge)) > 0)[0] + 1
+        tracks.append({
+            'times': np.arange(end) / fps,
+            'xs': xy[:, 0] - xy[-1, 0],
+            'ys': xy[:, 1] - xy[-1, 1],
+            'angles': track_angles,
+            'scales': 1.0 + 0.6 * heights[:end, index],
+            'face_times': changed / fps,
+        })
+    return tracks
+
+
+def face_sequence(sides: int, events: int, final_face: int, rng: random.Random) -> List[int]:
+    """Random walk of ``events`` face changes that ends on ``final_face``."""
+    faces = [final_face]
+    for _ in range(events):
+        previous = rng.randint(1, sides - 1)
+        faces.append(previous if previous < faces[-1] else previous + 1)
+    faces.reverse()
+    return faces
+
+
+# ----------------------------------------------------------------------
+# Library
+# ----------------------------------------------------------------------
+class TrajectoryLibrary:
+    """Per-die-type throws, indexed by final face, built at idle time."""
+
+    def __init__(self, path: Optional[str] = None, throws: int = 24, per_face: int = 4, seed: int = 7) -> None:
+        if path is None:
+            base_path = os.path.dirname(os.path.abspath(__file__))
+            path = os.path.join(base_path, "..", "data", "trajectories")
+        self.path = path
+        self.throws = throws
+        self.per_face = per_face
+        self.seed = seed
+        self._library: Dict[int, Dict[int, List[Trajectory]]] = {}
+        self._rng = random.Random()
+
+    @property
+    def available(self) -> bool:
+        return np is not None
+
+    def is_ready(self, sides: int) -> bool:
+        return sides in self._library
+
+    def pick(self, sides: int, final_face: int) -> Optional[Trajectory]:
+        """A trajectory of a ``sides`` die that ends on ``final_face``.
+
+        Returns None until the die type has been loaded, so a roll never
+        waits for a simulation.
+        """
+        by_face = self._library.get(sides)
+        if not by_face or final_face not in by_face:
+            return None
+        return self._rng.choice(by_face[final_face])
+
+    def pick_many(self, pool: Sequence[int], final_faces: Sequence[int]) -> Optional[List[Trajectory]]:
+        """One trajectory per die, or None if any die type has no library."""
+        picked = [self.pick(sides, face) for sides, face in zip(pool, final_faces)]
+        if not picked or any(trajectory is None for trajectory in picked):
+            return None
+        return picked
+
+    def load(self, sides: int) -> Optional[Dict[int, List[Trajectory]]]:
+        """Load a die type from the cache, building and saving it if needed."""
+        if sides in self._library:
+            return self._library[sides]
+        if not self.available:
+            return None
+        cache_file = os.path.join(self.path, f"d{sides}_v{TRAJECTORY_VERSION}.npz")
+        try:
+            with np.load(cache_file) as cached:
+                library = self._unpack(sides, dict(cached))
+        except Exception:  # Missing, torn by a power cut or otherwise unreadable: simulate it again
+            arrays = self._build(sides)
+            self._save(cache_file, arrays)
+            library = self._unpack(sides, arrays)
+        self._library[sides] = library
+        return library
+
+    def next_cold(self) -> Optional[int]:
+        """The next die type still to load or build (None once all are ready, or without NumPy)."""
+        if not self.available:
+            return None
+        for sides in DICE_SIDES:
+            if sides not in self._library:
+                return sides
+        return None
+
+    def warm_next(self) -> bool:
+        """Load or build one more die type; returns False once all are ready."""
+        sides = self.next_cold()
+        if sides is None:
+            return False
+        self.load(sides)
+        return True
+
+    @staticmethod
+    def _save(cache_file: str, arrays: dict) -> None:
+        """Write a cache file atomically, so a power cut never leaves a torn one behind."""
+        temporary = cache_file + '.tmp'
+        try:
+            os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+            with open(temporary, 'wb') as file:
+                np.savez_compressed(file, **arrays)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temporary, cache_file)
+        except OSError as error:
+            # The trajectories still work for this run; they are simulated again next time
+            print(f"Could not cache trajectories in {cache_file}: {error}")
+
+    def _build(self, sides: int) -> dict:
+        """Simulate the throws and the face sequences, as arrays ready to save."""
+        tracks = simulate_throws(sides, self.throws, seed=self.seed + sides)
+        frames = max(len(track['times']) for track in tracks)
+        events = max(len(track['face_times']) for track in tracks)
+
+        def padded(key, width):
+            array = np.full((len(tracks), width), np.nan)
+            for index, track in enumerate(tracks):
+                array[index, :len(track[key])] = track[key]
+            return array
+
+        rng = random.Random(self.seed * 1000 + sides)
+        motion = np.zeros((sides, self.per_face), dtype=np.int16)
+        faces = np.zeros((sides, self.per_face, events + 1), dtype=np.int16)
+        for face in range(1, sides + 1):
+            for slot in range(self.per_face):
+                index = rng.randrange(len(tracks))
+                sequence = face_sequence(sides, len(tracks[index]['face_times']), face, rng)
+                motion[face - 1, slot] = index
+                faces[face - 1, slot, :len(sequence)] = sequence
+
+        return {
+            'times': padded('times', frames),
+            'xs': padded('xs', frames),
+            'ys': padded('ys', frames),
+            'angles': padded('angles', frames),
+            'scales': padded('scales', frames),
+            'face_times': padded('face_times', events),
+            'motion': motion,
+            'faces': faces,
+        }
+
+    @staticmethod
+    def _unpack(sides: int, arrays: dict) -> Dict[int, List[Trajectory]]:
+        """Turn the saved arrays into Trajectory objects backed by plain lists."""
+        tracks = []
+        for index in range(arrays['times'].shape[0]):
+            frames = int(np.count_nonzero(~np.isnan(arrays['times'][index])))
+            events = int(np.count_nonzero(~np.isnan(arrays['face_times'][index])))
+            tracks.append({
+                key: arrays[key][index, :frames].tolist()
+                for key in ('times', 'xs', 'ys', 'angles', 'scales')
+            })
+            tracks[-1]['face_times'] = arrays['face_times'][index, :events].tolist()
+
+        by_face: Dict[int, List[Trajectory]] = {}
+        for face in range(1, sides + 1):
+            for slot, index in enumerate(arrays['motion'][face - 1]):
+                track = tracks[int(index)]
+                faces = arrays['faces'][face - 1, slot, :len(track['face_times']) + 1].tolist()
+                by_face.setdefault(face, []).append(Trajectory(
+                    sides, face, track['times'], track['xs'], track['ys'], track['angles'],
+                    track['scales'], track['face_times'], faces
+                ))
+        return by_face
+
+
+# Global instance
+tumble_library = TrajectoryLibrary()
+
+
+if __name__ == '__main__':
+    # Prebuild the whole cache offline: python3 -m utils.tumble
+    while tumble_library.warm_next():
+        pass
+    print(f"Trajectories cached in {os.path.abspath(tumble_library.path)}")